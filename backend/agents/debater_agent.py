@@ -10,7 +10,9 @@
 
 from typing import Dict, Any, List, Optional
 from .base_agent import BaseAgent, ThinkResult
+import asyncio
 import json
+import time
 from utils.logger import get_logger
 
 
@@ -59,6 +61,10 @@ class DebaterAgent(BaseAgent):
         self.temperature = temperature
         self.argument_history: List[str] = []
         self.opponent_arguments: List[str] = []
+
+        # 推测预取的分析请求：(messages, task, timing)
+        self._prefetch: Optional[tuple[list, asyncio.Task, Dict[str, float]]] = None
+        self.last_prefetch: Optional[Dict[str, Any]] = None
         
         # 初始化目标
         self.add_goal(f"作为{self.position_label}赢得辩论")
@@ -194,6 +200,62 @@ class DebaterAgent(BaseAgent):
 
 请直接输出你的发言内容，不要包含任何格式标记。"""
     
+    def _build_analysis_messages(self, context: Dict[str, Any]) -> List[Dict[str, str]]:
+        """构建分析请求消息"""
+        return [
+            {"role": "system", "content": f"你是一个善于深度分析的辩论策略师，代表{self.position_label}。"},
+            {"role": "user", "content": self._build_analysis_prompt(context)}
+        ]
+    
+    def prefetch_analysis(self, context: Dict[str, Any]) -> None:
+        """推测性地提前发起下一次 think 的分析请求
+        
+        请求在后台任务中执行。只有当真正调用 think 时构建出的消息与预取时
+        完全一致才会采用预取结果，否则取消并重新请求，保证结果与顺序执行一致。
+        """
+        self.cancel_prefetch()
+        messages = self._build_analysis_messages(context)
+        task = asyncio.create_task(
+            self.ai_client.get_completion(messages, temperature=self.temperature)
+        )
+        timing = {"started_at": time.perf_counter()}
+
+        def _on_done(done: asyncio.Task) -> None:
+            timing["finished_at"] = time.perf_counter()
+            # 被丢弃的预取可能以异常结束，这里取出异常避免未检索告警
+            if not done.cancelled():
+                done.exception()
+
+        task.add_done_callback(_on_done)
+        self._prefetch = (messages, task, timing)
+    
+    def cancel_prefetch(self) -> None:
+        """取消尚未被采用的预取请求"""
+        if self._prefetch is not None:
+            self._prefetch[1].cancel()
+            self._prefetch = None
+    
+    async def _request_analysis(self, messages: List[Dict[str, str]]) -> str:
+        """获取分析回复，命中预取时复用后台任务的结果"""
+        prefetch, self._prefetch = self._prefetch, None
+        if prefetch is None:
+            self.last_prefetch = None
+            return await self.ai_client.get_completion(messages, temperature=self.temperature)
+        
+        prefetched_messages, task, timing = prefetch
+        if prefetched_messages != messages:
+            task.cancel()
+            self.last_prefetch = {"hit": False, "saved_ms": 0.0}
+            return await self.ai_client.get_completion(messages, temperature=self.temperature)
+        
+        adopted_at = time.perf_counter()
+        finished_at = timing.get("finished_at", adopted_at)
+        self.last_prefetch = {
+            "hit": True,
+            "saved_ms": round((min(adopted_at, finished_at) - timing["started_at"]) * 1000, 2),
+        }
+        return await task
+    
     async def think(self, context: Dict[str, Any]) -> ThinkResult:
         """推理过程 - 分析对手论点，制定策略
         
@@ -203,15 +265,10 @@ class DebaterAgent(BaseAgent):
         Returns:
             ThinkResult 包含分析结果
         """
-        prompt = self._build_analysis_prompt(context)
-        
-        messages = [
-            {"role": "system", "content": f"你是一个善于深度分析的辩论策略师，代表{self.position_label}。"},
-            {"role": "user", "content": prompt}
-        ]
+        messages = self._build_analysis_messages(context)
         
         try:
-            response = await self.ai_client.get_completion(messages, temperature=self.temperature)
+            response = await self._request_analysis(messages)
             analysis = self._parse_json_response(response, {
                 "opponent_weaknesses": [],
                 "selected_strategy": "direct_refute",
@@ -328,6 +385,7 @@ class DebaterAgent(BaseAgent):
         
         Yields:
             dict: {"type": "thinking"|"argument", "content": ...}
+            argument 增量帧额外携带 delta（本次新增文本）与 offset（此前已输出字符数）
         """
         self.update_belief("current_context", context)
         
@@ -359,12 +417,15 @@ class DebaterAgent(BaseAgent):
         full_response = ""
         try:
             async for chunk in self.ai_client.chat_stream(messages, temperature=self.temperature):
+                offset = len(full_response)
                 full_response += chunk
                 yield {
                     "type": "argument",
                     "side": self.position,
                     "name": self.name,
                     "content": full_response,
+                    "delta": chunk,
+                    "offset": offset,
                     "is_complete": False
                 }
             
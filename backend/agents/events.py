@@ -59,3 +59,16 @@ class DebateEvent(BaseModel):
             "payload": self.payload,
             "timestamp": self.timestamp.isoformat(),
         }
+
+
+def stream_frame(event_type: str, seq: int, payload: dict[str, Any]) -> dict[str, Any]:
+    """Build a transient stream frame without going through ``DebateEvent``.
+
+    Transient frames (argument chunks) are sent to the client and then
+    discarded, so they skip the pydantic model, uuid and timestamp. The
+    per-run ``seq`` gives their order relative to durable events. The
+    caller must hand over a ``payload`` it owns; it is updated in place.
+    """
+    payload["type"] = event_type
+    payload["seq"] = seq
+    return payload
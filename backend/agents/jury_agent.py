@@ -188,6 +188,30 @@ class JuryAgent(BaseAgent):
         round_num: int,
         history: List[Dict] = None
     ) -> RoundEvaluation:
+        evaluation = await self.score_round(pro_argument, con_argument, round_num, history)
+        self.record_evaluation(evaluation)
+        return evaluation
+
+    def record_evaluation(self, evaluation: RoundEvaluation) -> None:
+        """将评估结果计入评审状态（失败回退的结果不计入）
+
+        与 score_round 分离，便于并发评估时仍按轮次顺序记录。
+        """
+        if evaluation.is_fallback:
+            return
+        self.evaluations.append(evaluation)
+        self.pro_scores.append(evaluation.pro_score)
+        self.con_scores.append(evaluation.con_score)
+        self.add_to_memory({"type": "evaluation", "round": evaluation.round, "result": evaluation.model_dump()})
+
+    async def score_round(
+        self,
+        pro_argument: str,
+        con_argument: str,
+        round_num: int,
+        history: List[Dict] = None
+    ) -> RoundEvaluation:
+        """调用模型为一轮辩论评分，不修改评审状态"""
         prompt = self._build_evaluation_prompt(pro_argument, con_argument, round_num, history)
         messages = [
             {"role": "system", "content": "你是一位公正、专业的辩论评审。"},
@@ -214,11 +238,6 @@ class JuryAgent(BaseAgent):
                 highlights=result.get("highlights", []),
                 suggestions=result.get("suggestions", {}),
             )
-
-            self.evaluations.append(evaluation)
-            self.pro_scores.append(evaluation.pro_score)
-            self.con_scores.append(evaluation.con_score)
-            self.add_to_memory({"type": "evaluation", "round": round_num, "result": evaluation.model_dump()})
             return evaluation
         except Exception as exc:
             logger.exception("JuryAgent 评估出错")
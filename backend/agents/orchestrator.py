@@ -2,17 +2,22 @@
 Debate orchestrator for the multi-agent flow.
 """
 
+import asyncio
+import itertools
+import time
+from collections import deque
 from datetime import datetime
-from typing import Any, AsyncGenerator, Dict, List, Optional
+from typing import Any, AsyncGenerator, Deque, Dict, List, Optional, Tuple
 
-from config import DEFAULT_MODEL, DEFAULT_PROVIDER, RUN_CONFIG_PRESETS
+from config import DEFAULT_MODEL, DEFAULT_PROVIDER, resolve_run_settings
 from memory.shared_memory import DebateMemory
+from services.llm_metrics import UsageCollector, llm_call_scope
 from utils.logger import get_logger
 
 from .base_orchestrator import BaseOrchestrator
 from .debater_agent import DebaterAgent
-from .events import DebateEvent
-from .jury_agent import JuryAgent
+from .events import DebateEvent, stream_frame
+from .jury_agent import JuryAgent, RoundEvaluation
 from .protocol import AgentMessage, MessageBus, MessageTemplates, MessageType
 
 
@@ -34,14 +39,36 @@ class DebateOrchestrator(BaseOrchestrator):
         self.memory_store: Optional[DebateMemory] = None
         self.message_bus = MessageBus()
         self.event_log: List[DebateEvent] = []
+        # 流式事件的单调序号（持久事件与瞬时帧共用），用于客户端排序
+        self._event_seq = itertools.count(1)
         self.debate_state = self.STATE_NOT_STARTED
         self.total_rounds = 3
+        self.pipeline_rounds = False
+        self.pipeline_jury = False
+        self.pipeline_stats: List[Dict[str, Any]] = []
+        self.jury_stats: List[Dict[str, Any]] = []
+        # 后台评审任务 (round, task, timing)，按轮次先进先出
+        self._pending_evaluations: Deque[Tuple[int, asyncio.Task, Dict[str, float]]] = deque()
+        # 已记录但尚未通过 MessageBus 下发给辩手的评审结果
+        self._undelivered_evaluations: Deque[RoundEvaluation] = deque()
+        # 本次运行的 LLM 用量（tokens / 延迟），按模型与 Agent 细分
+        self.session_id: Optional[int] = None
+        self.usage = UsageCollector()
 
     def _record_event(self, event_type: str, *, transient: bool = False, **payload: Any) -> Dict[str, Any]:
-        event = DebateEvent.from_payload(event_type, payload, transient=transient)
-        if not transient:
-            self.event_log.append(event)
-        return event.to_stream_payload()
+        seq = next(self._event_seq)
+        if transient:
+            # 瞬时帧不进入 event_log，走轻量路径，避免每个流式块构建 pydantic 模型
+            return stream_frame(event_type, seq, payload)
+        event = DebateEvent.from_payload(event_type, payload)
+        self.event_log.append(event)
+        data = event.to_stream_payload()
+        data["seq"] = seq
+        return data
+
+    def _transient_frame(self, event: Dict[str, Any]) -> Dict[str, Any]:
+        """把调用方独占的事件字典原地转换为瞬时帧"""
+        return stream_frame(event.get("type", ""), next(self._event_seq), event)
 
     def add_to_memory(self, event: Dict[str, Any]) -> None:
         event["timestamp"] = datetime.now().isoformat()
@@ -68,15 +95,25 @@ class DebateOrchestrator(BaseOrchestrator):
         preset: Optional[str] = None,
         pro_ai_client=None,
         con_ai_client=None,
+        pipeline_rounds: bool = False,
+        pipeline_jury: bool = False,
+        session_id: Optional[int] = None,
     ) -> Dict[str, Any]:
-        preset_config = RUN_CONFIG_PRESETS.get(preset, {}) if preset else {}
-        if temperature is None:
-            temperature = preset_config.get("temperature", 0.7)
-        if seed is None:
-            seed = preset_config.get("seed")
-        max_rounds = preset_config.get("max_rounds")
-        if max_rounds:
-            total_rounds = min(total_rounds, max_rounds)
+        """初始化辩论
+
+        Args:
+            session_id: 关联的会话 ID，用于给本次运行的 LLM 调用打标签
+            pipeline_rounds: 启用流水线轮次。评审评估本轮时，推测性地预取下一轮
+                首位发言方的分析请求；仅当实际提示词完全一致时采用，否则重新请求，
+                辩论记录与顺序模式相同。分析提示词包含最新评审反馈，辩手收到
+                反馈后预取几乎必然落空，此后不再为其预取。
+            pipeline_jury: 评审与下一轮并行。第 N 轮的评估在后台进行，同时第 N+1
+                轮辩手开始发言；evaluation/standings 事件在评估完成后发出。
+                评审反馈固定滞后一轮下发：第 N 轮的反馈在第 N+2 轮开始时
+                才进入辩手的信念，保证相同 seed 下结果可复现。
+        """
+        resolved = resolve_run_settings(total_rounds, temperature, seed, preset)
+        total_rounds, temperature, seed = resolved["total_rounds"], resolved["temperature"], resolved["seed"]
         self.total_rounds = total_rounds
 
         is_mixed = pro_ai_client is not None or con_ai_client is not None
@@ -89,7 +126,18 @@ class DebateOrchestrator(BaseOrchestrator):
             seed=seed,
             preset=preset,
             mixed_model=is_mixed,
+            pipeline_rounds=pipeline_rounds,
+            pipeline_jury=pipeline_jury,
+            jury_feedback_lag=1 if pipeline_jury else 0,
         )
+        self.pipeline_rounds = pipeline_rounds
+        self.pipeline_jury = pipeline_jury
+        self.pipeline_stats = []
+        self.jury_stats = []
+        self._pending_evaluations = deque()
+        self._undelivered_evaluations = deque()
+        self.session_id = session_id
+        self.usage = UsageCollector()
 
         if pro_ai_client is not None:
             self.run_config["pro_provider"] = getattr(pro_ai_client, "provider", "unknown")
@@ -102,6 +150,7 @@ class DebateOrchestrator(BaseOrchestrator):
             self.ai_client.seed = seed
 
         self.event_log = []
+        self._event_seq = itertools.count(1)
         self.memory_store = DebateMemory(topic=topic, total_rounds=total_rounds)
         self.memory_store.set_run_config(self.run_config)
 
@@ -139,11 +188,120 @@ class DebateOrchestrator(BaseOrchestrator):
             "run_config": self.run_config,
         }
 
+    def _turn_order(self, round_num: int) -> List[str]:
+        return ["pro", "con"] if round_num % 2 == 1 else ["con", "pro"]
+
+    def _build_turn_context(self, round_num: int, side: str, history: List[Dict[str, Any]]) -> Dict[str, Any]:
+        return {
+            "round": round_num,
+            "is_opening": round_num == 1 and side == self._turn_order(round_num)[0],
+            "opponent_last_argument": history[-1]["content"] if history else "",
+            "history": history,
+        }
+
+    def _get_agent(self, side: str) -> DebaterAgent:
+        return self.pro_agent if side == "pro" else self.con_agent
+
+    def _cancel_prefetches(self) -> None:
+        for agent in (self.pro_agent, self.con_agent):
+            if agent is not None:
+                agent.cancel_prefetch()
+        while self._pending_evaluations:
+            _, task, _ = self._pending_evaluations.popleft()
+            task.cancel()
+
+    def _schedule_evaluation(self, round_num: int, round_arguments: Dict[str, str]) -> None:
+        """在后台启动本轮评审"""
+        timing = {"started_at": time.perf_counter()}
+        with llm_call_scope(agent="jury"):
+            task = asyncio.create_task(
+                self.jury_agent.score_round(
+                    round_arguments.get("pro", ""),
+                    round_arguments.get("con", ""),
+                    round_num,
+                )
+            )
+        task.add_done_callback(lambda _: timing.setdefault("finished_at", time.perf_counter()))
+        self._pending_evaluations.append((round_num, task, timing))
+
+    def _apply_evaluation(self, evaluation: RoundEvaluation) -> List[Dict[str, Any]]:
+        """记录评审结果，返回需要发出的 evaluation/standings 事件"""
+        eval_dict = evaluation.model_dump()
+        self.memory_store.add_evaluation(eval_dict)
+        self._undelivered_evaluations.append(evaluation)
+        events = [
+            self._record_event("evaluation", **eval_dict),
+            self._record_event("standings", standings=self.memory_store.get_current_standings()),
+        ]
+        self.memory_store.end_round(evaluation.round)
+        return events
+
+    def _deliver_evaluations(self, through_round: int) -> None:
+        """通过 MessageBus 下发评审反馈（更新辩手的“最新评审反馈”信念）"""
+        while self._undelivered_evaluations and self._undelivered_evaluations[0].round <= through_round:
+            evaluation = self._undelivered_evaluations.popleft()
+            self.message_bus.publish(
+                MessageTemplates.evaluation(
+                    sender="jury",
+                    receiver="",
+                    scores={
+                        "pro": evaluation.pro_score.model_dump(),
+                        "con": evaluation.con_score.model_dump(),
+                    },
+                    commentary=evaluation.commentary,
+                    round=evaluation.round,
+                )
+            )
+
+    def _drain_ready_evaluations(self) -> List[Dict[str, Any]]:
+        """按轮次顺序记录已完成的后台评审，不等待未完成的任务"""
+        events: List[Dict[str, Any]] = []
+        while self._pending_evaluations and self._pending_evaluations[0][1].done():
+            round_num, task, timing = self._pending_evaluations.popleft()
+            events.extend(self._finish_evaluation(round_num, task.result(), timing, blocked_ms=0.0))
+        return events
+
+    async def _await_evaluations(self, through_round: int) -> List[Dict[str, Any]]:
+        """等待并记录不晚于指定轮次的后台评审"""
+        events: List[Dict[str, Any]] = []
+        while self._pending_evaluations and self._pending_evaluations[0][0] <= through_round:
+            round_num, task, timing = self._pending_evaluations.popleft()
+            wait_started = time.perf_counter()
+            evaluation = await task
+            blocked_ms = (time.perf_counter() - wait_started) * 1000
+            events.extend(self._finish_evaluation(round_num, evaluation, timing, blocked_ms))
+        return events
+
+    def _finish_evaluation(
+        self,
+        round_num: int,
+        evaluation: RoundEvaluation,
+        timing: Dict[str, float],
+        blocked_ms: float,
+    ) -> List[Dict[str, Any]]:
+        self.jury_agent.record_evaluation(evaluation)
+        jury_ms = (timing.get("finished_at", time.perf_counter()) - timing["started_at"]) * 1000
+        self.jury_stats.append({
+            "round": round_num,
+            "jury_ms": round(jury_ms, 2),
+            "blocked_ms": round(blocked_ms, 2),
+            "saved_ms": round(max(0.0, jury_ms - blocked_ms), 2),
+        })
+        return self._apply_evaluation(evaluation)
+
     async def run_debate_streaming(self) -> AsyncGenerator[Dict[str, Any], None]:
         if self.debate_state != self.STATE_READY:
             yield {"type": "error", "message": "辩论未就绪，请先调用 setup_debate"}
             return
 
+        try:
+            with llm_call_scope(self.usage, session_id=self.session_id):
+                async for event in self._run_rounds():
+                    yield event
+        finally:
+            self._cancel_prefetches()
+
+    async def _run_rounds(self) -> AsyncGenerator[Dict[str, Any], None]:
         self.debate_state = self.STATE_IN_PROGRESS
         self.memory_store.start_debate()
         yield self._record_event(
@@ -156,33 +314,44 @@ class DebateOrchestrator(BaseOrchestrator):
         debate_context: Dict[str, Any] = {"topic": self.topic, "history": []}
 
         for round_num in range(1, self.total_rounds + 1):
+            if self.pipeline_jury:
+                # 反馈滞后一轮：进入第 N 轮前，第 N-2 轮的评审必须已记录并下发
+                for event in await self._await_evaluations(round_num - 2):
+                    yield event
+                self._deliver_evaluations(round_num - 2)
+
             self.current_round = round_num
             self.memory_store.start_round(round_num)
             yield self._record_event("round_start", round=round_num, total_rounds=self.total_rounds)
 
-            turn_order = ["pro", "con"] if round_num % 2 == 1 else ["con", "pro"]
+            turn_order = self._turn_order(round_num)
             round_arguments: Dict[str, str] = {}
             round_thinking: Dict[str, Any] = {}
 
             for side in turn_order:
-                agent = self.pro_agent if side == "pro" else self.con_agent
+                agent = self._get_agent(side)
                 label = "正方" if side == "pro" else "反方"
-                context = {
-                    "round": round_num,
-                    "is_opening": round_num == 1 and side == turn_order[0],
-                    "opponent_last_argument": debate_context["history"][-1]["content"] if debate_context["history"] else "",
-                    "history": debate_context["history"],
-                }
+                context = self._build_turn_context(round_num, side, debate_context["history"])
                 full_argument = ""
                 thinking = None
                 async for event in self._stream_agent_react(agent, context):
-                    if event.get("type") == "thinking":
-                        thinking = event.get("content")
                     event_type = event.get("type", "")
-                    payload = {key: value for key, value in event.items() if key != "type"}
-                    yield self._record_event(event_type, transient=event_type == "argument", **payload)
-                    if event.get("type") == "argument_complete":
-                        full_argument = event.get("content", "")
+                    if event_type == "argument":
+                        # 辩手为每个块新建事件字典，直接复用为瞬时帧
+                        yield self._transient_frame(event)
+                    else:
+                        if event_type == "thinking":
+                            thinking = event.get("content")
+                        elif event_type == "argument_complete":
+                            full_argument = event.get("content", "")
+                        payload = {key: value for key, value in event.items() if key != "type"}
+                        yield self._record_event(event_type, **payload)
+                    if self._pending_evaluations:
+                        for ready_event in self._drain_ready_evaluations():
+                            yield ready_event
+
+                if self.pipeline_rounds and agent.last_prefetch is not None:
+                    self.pipeline_stats.append({"round": round_num, "side": side, **agent.last_prefetch})
 
                 round_arguments[side] = full_argument
                 round_thinking[side] = thinking
@@ -190,28 +359,39 @@ class DebateOrchestrator(BaseOrchestrator):
                 self.message_bus.publish(MessageTemplates.argument(sender=side, content=full_argument, round=round_num))
                 debate_context["history"].append({"round": round_num, "side": side, "content": full_argument})
 
-            evaluation = await self.jury_agent.evaluate_round(
-                round_arguments.get("pro", ""),
-                round_arguments.get("con", ""),
-                round_num
-            )
-            eval_dict = evaluation.model_dump()
-            self.memory_store.add_evaluation(eval_dict)
-            self.message_bus.publish(
-                MessageTemplates.evaluation(
-                    sender="jury",
-                    receiver="",
-                    scores={"pro": eval_dict["pro_score"], "con": eval_dict["con_score"]},
-                    commentary=evaluation.commentary,
-                    round=round_num,
-                )
-            )
-
-            yield self._record_event("evaluation", **eval_dict)
-            yield self._record_event("standings", standings=self.memory_store.get_current_standings())
-            self.memory_store.end_round(round_num)
+            if self.pipeline_jury:
+                self._schedule_evaluation(round_num, round_arguments)
+                continue
 
-        verdict = await self.jury_agent.final_verdict()
+            if self.pipeline_rounds and round_num < self.total_rounds:
+                next_side = self._turn_order(round_num + 1)[0]
+                next_agent = self._get_agent(next_side)
+                # 下一轮首位发言方的上下文此时已确定（评审反馈除外），与评审并行预取；
+                # 已收到过评审反馈时本轮评审会再次更新反馈，预取几乎必然落空，不再发起
+                if not next_agent.get_belief("latest_evaluation_commentary", ""):
+                    with llm_call_scope(agent=next_side):
+                        next_agent.prefetch_analysis(
+                            self._build_turn_context(round_num + 1, next_side, debate_context["history"])
+                        )
+
+            with llm_call_scope(agent="jury"):
+                evaluation = await self.jury_agent.evaluate_round(
+                    round_arguments.get("pro", ""),
+                    round_arguments.get("con", ""),
+                    round_num
+                )
+            events = self._apply_evaluation(evaluation)
+            self._deliver_evaluations(round_num)
+            for event in events:
+                yield event
+
+        if self.pipeline_jury:
+            for event in await self._await_evaluations(self.total_rounds):
+                yield event
+            self._deliver_evaluations(self.total_rounds)
+
+        with llm_call_scope(agent="jury"):
+            verdict = await self.jury_agent.final_verdict()
         verdict_dict = verdict.model_dump()
         self.memory_store.set("verdict", verdict_dict)
         self.memory_store.complete_debate(verdict_dict)
@@ -234,9 +414,10 @@ class DebateOrchestrator(BaseOrchestrator):
         agent: DebaterAgent,
         context: Dict[str, Any],
     ) -> AsyncGenerator[Dict[str, Any], None]:
-        async for event in agent.stream_react(context):
-            event["round"] = context.get("round", 1)
-            yield event
+        with llm_call_scope(agent=agent.position):
+            async for event in agent.stream_react(context):
+                event["round"] = context.get("round", 1)
+                yield event
 
     def get_debate_state(self) -> Dict[str, Any]:
         return {
@@ -257,6 +438,29 @@ class DebateOrchestrator(BaseOrchestrator):
     def get_full_state(self) -> Dict[str, Any]:
         return self.memory_store.get_full_state() if self.memory_store else {}
 
+    def get_pipeline_summary(self) -> Optional[Dict[str, Any]]:
+        """流水线模式的预取命中情况、评审重叠情况与每轮节省的墙钟时间"""
+        if not (self.pipeline_rounds or self.pipeline_jury):
+            return None
+        saved_by_round: Dict[int, float] = {}
+        for item in self.pipeline_stats + self.jury_stats:
+            saved_by_round[item["round"]] = saved_by_round.get(item["round"], 0.0) + item["saved_ms"]
+        return {
+            "enabled": True,
+            "prefetch_think": self.pipeline_rounds,
+            "overlap_jury": self.pipeline_jury,
+            "jury_feedback_lag": 1 if self.pipeline_jury else 0,
+            "prefetches": self.pipeline_stats,
+            "hits": sum(1 for item in self.pipeline_stats if item["hit"]),
+            "misses": sum(1 for item in self.pipeline_stats if not item["hit"]),
+            "jury": self.jury_stats,
+            "saved_ms_by_round": [
+                {"round": round_num, "saved_ms": round(saved, 2)}
+                for round_num, saved in sorted(saved_by_round.items())
+            ],
+            "total_saved_ms": round(sum(saved_by_round.values()), 2),
+        }
+
     def build_trace(self) -> Dict[str, Any]:
         if not self.memory_store:
             return {}
@@ -318,4 +522,6 @@ class DebateOrchestrator(BaseOrchestrator):
             "verdict": verdict,
             "standings": standings,
             "message_history": self.message_bus.export_history(),
+            "pipeline": self.get_pipeline_summary(),
+            "usage": self.usage.summary(),
         }
@@ -3,6 +3,7 @@
 """
 import os
 from functools import lru_cache
+from typing import Any, Dict, Optional
 
 from dotenv import load_dotenv
 from pydantic_settings import BaseSettings, SettingsConfigDict
@@ -38,10 +39,52 @@ class Settings(BaseSettings):
     
     # 数据库
     database_url: str = ""
+    # SQLite 存储档位（default / production），部署时通过 DB_PROFILE=production 启用调优；
+    # 单项 PRAGMA 可单独覆盖
+    db_profile: str = "default"
+    sqlite_journal_mode: Optional[str] = None
+    sqlite_synchronous: Optional[str] = None
+    sqlite_busy_timeout_ms: Optional[int] = None
+    sqlite_cache_size: Optional[int] = None
+    sqlite_mmap_size: Optional[int] = None
+    # 只读接口独立连接池大小，0 表示与写入共用
+    db_read_pool_size: int = 8
     
     # CORS
     cors_origins: list[str] = ["http://localhost:5173", "http://localhost:3000"]
-    
+
+    # LLM 补全缓存
+    llm_cache_enabled: bool = True
+    llm_cache_max_entries: int = 512
+    llm_cache_ttl_seconds: float = 24 * 3600
+    llm_cache_disk_enabled: bool = False
+    llm_cache_seeded_only: bool = True
+
+    # LLM 限流（按 provider + API Key 分桶，进程内共享）
+    llm_max_concurrency: int = 8
+    llm_min_concurrency: int = 1
+    llm_rate_limit_rps: float = 0.0  # 0 表示不限速，仅做并发调节
+    llm_rate_limit_burst: int = 10
+    llm_provider_concurrency: dict[str, int] = {}
+    llm_provider_rps: dict[str, float] = {}
+    llm_rate_limit_retries: int = 5
+    llm_backoff_max_seconds: float = 30.0
+
+    # Provider 客户端池（所有 provider 共享一个 httpx 连接池）
+    llm_pool_max_clients: int = 32
+    llm_pool_idle_seconds: float = 300.0
+    llm_http_max_connections: int = 100
+    llm_http_max_keepalive: int = 20
+    llm_http_keepalive_expiry: float = 30.0
+
+    # 论点图谱 AI 分析：同时在途的 LLM 调用数、批量模式下每次调用处理的论点 / 论点对数
+    graph_analyzer_concurrency: int = 4
+    graph_analyzer_batch_size: int = 8
+
+    # 流式路由的写后缓冲：按数量或时间批量提交消息
+    db_flush_max_pending: int = 32
+    db_flush_interval_seconds: float = 0.25
+
     model_config = SettingsConfigDict(
         env_file=os.path.join(os.path.dirname(os.path.abspath(__file__)), ".env"),
         env_file_encoding="utf-8",
@@ -84,3 +127,20 @@ RUN_CONFIG_PRESETS = {
     }
 }
 
+
+def resolve_run_settings(
+    total_rounds: int,
+    temperature: Optional[float] = None,
+    seed: Optional[int] = None,
+    preset: Optional[str] = None,
+) -> Dict[str, Any]:
+    """按预设补全运行参数：未指定的温度 / seed 取预设值，轮数不超过预设上限"""
+    preset_config = RUN_CONFIG_PRESETS.get(preset, {}) if preset else {}
+    if temperature is None:
+        temperature = preset_config.get("temperature", 0.7)
+    if seed is None:
+        seed = preset_config.get("seed")
+    max_rounds = preset_config.get("max_rounds")
+    if max_rounds:
+        total_rounds = min(total_rounds, max_rounds)
+    return {"total_rounds": total_rounds, "temperature": temperature, "seed": seed, "preset": preset}
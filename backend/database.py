@@ -1,20 +1,111 @@
 """
 数据库连接配置
 """
-from sqlalchemy import create_engine
+from typing import Any, Dict, Optional
+
+from sqlalchemy import create_engine, event, inspect, text
+from sqlalchemy.engine import make_url
 from sqlalchemy.orm import sessionmaker, declarative_base
 from config import get_settings
+from services.telemetry import instrument_engine
 
 settings = get_settings()
 
+# SQLite 存储调优档位，连接建立时逐条执行 PRAGMA
+# production：WAL 让读写互不阻塞；synchronous=NORMAL 在 WAL 下只在检查点 fsync，
+# 断电最多丢失最近提交但不会损坏数据库
+SQLITE_PROFILES: Dict[str, Dict[str, Any]] = {
+    "default": {},
+    "production": {
+        "journal_mode": "WAL",
+        "synchronous": "NORMAL",
+        "busy_timeout": 5000,
+        "cache_size": -65536,  # 负数表示 KiB，即 64 MiB
+        "mmap_size": 268435456,  # 256 MiB
+        "temp_store": "MEMORY",
+    },
+}
+
+
+def is_sqlite_url(url: str) -> bool:
+    return url.startswith("sqlite")
+
+
+def sqlite_file_path(url: str) -> Optional[str]:
+    """SQLite 文件路径；内存数据库返回 None"""
+    if not is_sqlite_url(url):
+        return None
+    database = make_url(url).database
+    if not database or database == ":memory:" or database.startswith("file::memory:"):
+        return None
+    return database
+
+
+def resolve_sqlite_pragmas(config=None) -> Dict[str, Any]:
+    """当前配置对应的 PRAGMA：档位默认值叠加单项覆盖"""
+    config = config or settings
+    profile = SQLITE_PROFILES.get(config.db_profile)
+    if profile is None:
+        raise ValueError(f"未知的数据库档位: {config.db_profile}（可选 {', '.join(SQLITE_PROFILES)}）")
+    pragmas = dict(profile)
+    overrides = {
+        "journal_mode": config.sqlite_journal_mode,
+        "synchronous": config.sqlite_synchronous,
+        "busy_timeout": config.sqlite_busy_timeout_ms,
+        "cache_size": config.sqlite_cache_size,
+        "mmap_size": config.sqlite_mmap_size,
+    }
+    pragmas.update({key: value for key, value in overrides.items() if value is not None})
+    return pragmas
+
+
+def apply_sqlite_pragmas(target_engine, pragmas: Dict[str, Any], read_only: bool = False) -> None:
+    """在每个新连接上执行 PRAGMA；read_only 时额外开启 query_only"""
+    statements = [f"PRAGMA {name}={value}" for name, value in pragmas.items()]
+    if read_only:
+        statements.append("PRAGMA query_only=ON")
+    if not statements:
+        return
+
+    @event.listens_for(target_engine, "connect")
+    def _set_pragmas(dbapi_connection, connection_record):
+        cursor = dbapi_connection.cursor()
+        try:
+            for statement in statements:
+                cursor.execute(statement)
+        finally:
+            cursor.close()
+
+
+def create_app_engine(url: str, pragmas: Optional[Dict[str, Any]] = None, read_only: bool = False, **kwargs):
+    """创建引擎；SQLite 时挂载 PRAGMA 与语句计时"""
+    connect_args = {"check_same_thread": False} if is_sqlite_url(url) else {}
+    new_engine = create_engine(url, connect_args=connect_args, **kwargs)
+    if is_sqlite_url(url):
+        apply_sqlite_pragmas(new_engine, pragmas or {}, read_only=read_only)
+    instrument_engine(new_engine)
+    return new_engine
+
+
+SQLITE_PRAGMAS = resolve_sqlite_pragmas() if is_sqlite_url(settings.database_url) else {}
+
 # 创建数据库引擎
-engine = create_engine(
-    settings.database_url,
-    connect_args={"check_same_thread": False} if "sqlite" in settings.database_url else {}
-)
+engine = create_app_engine(settings.database_url, SQLITE_PRAGMAS)
+
+# 只读连接池：历史与分析等只读接口使用独立连接，WAL 下不与流式写入争用连接池。
+# 内存数据库无法跨连接共享，此时回退到主引擎。
+read_engine = engine
+if settings.db_read_pool_size > 0 and sqlite_file_path(settings.database_url):
+    read_engine = create_app_engine(
+        settings.database_url,
+        SQLITE_PRAGMAS,
+        read_only=True,
+        pool_size=settings.db_read_pool_size,
+    )
 
 # 创建会话工厂
 SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
+ReadSessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=read_engine)
 
 # 创建基类
 Base = declarative_base()
@@ -29,8 +120,108 @@ def get_db():
         db.close()
 
 
+def get_read_db():
+    """获取只读数据库会话的依赖（历史、分析等只读接口）"""
+    db = ReadSessionLocal()
+    try:
+        yield db
+    finally:
+        db.close()
+
+
+def get_session_factory():
+    """写会话工厂的依赖：只读接口偶尔需要回写（如缓存未命中）时再自行打开写会话"""
+    return SessionLocal
+
+
+def storage_diagnostics() -> Dict[str, Any]:
+    """存储配置与实际生效的 PRAGMA"""
+    result: Dict[str, Any] = {
+        "dialect": engine.dialect.name,
+        "profile": settings.db_profile,
+        "configured": dict(SQLITE_PRAGMAS),
+        "read_pool": {
+            "separate": read_engine is not engine,
+            "size": settings.db_read_pool_size if read_engine is not engine else 0,
+            "status": read_engine.pool.status(),
+        },
+        "write_pool": {"status": engine.pool.status()},
+    }
+    if engine.dialect.name != "sqlite":
+        return result
+    effective = {}
+    with engine.connect() as conn:
+        for name in ("journal_mode", "synchronous", "busy_timeout", "cache_size", "mmap_size", "temp_store"):
+            effective[name] = conn.exec_driver_sql(f"PRAGMA {name}").scalar()
+        result["sqlite_version"] = conn.exec_driver_sql("select sqlite_version()").scalar()
+    result["effective"] = effective
+    return result
+
+
+# create_all 不会给已存在的表补列，这里登记后续新增的列：(表名, 列名, 列 DDL)
+COLUMN_MIGRATIONS = [
+    ("debate_records", "usage", "JSON"),
+    ("session", "message_count", "INTEGER NOT NULL DEFAULT 0"),
+]
+
+# 新增列后需要根据已有数据回填的，补列时执行一次
+COLUMN_BACKFILLS = {
+    "session.message_count": (
+        "UPDATE session SET message_count = "
+        "(SELECT count(*) FROM message WHERE message.session_id = session.id)"
+    ),
+}
+
+
+def migrate_columns(bind=None) -> list[str]:
+    """为旧数据库补齐新增列，返回本次添加的 "表.列" 列表"""
+    bind = bind or engine
+    inspector = inspect(bind)
+    existing_tables = set(inspector.get_table_names())
+    added = []
+    with bind.begin() as conn:
+        for table, column, ddl in COLUMN_MIGRATIONS:
+            if table not in existing_tables:
+                continue
+            columns = {col["name"] for col in inspector.get_columns(table)}
+            if column not in columns:
+                conn.execute(text(f'ALTER TABLE {table} ADD COLUMN "{column}" {ddl}'))
+                added.append(f"{table}.{column}")
+                backfill = COLUMN_BACKFILLS.get(f"{table}.{column}")
+                if backfill:
+                    conn.execute(text(backfill))
+    return added
+
+
+def migrate_indexes(bind=None) -> list[str]:
+    """create_all 不会给已存在的表补索引，这里按模型定义补齐，返回新建的索引名"""
+    bind = bind or engine
+    inspector = inspect(bind)
+    existing_tables = set(inspector.get_table_names())
+    created = []
+    for table in Base.metadata.sorted_tables:
+        if table.name not in existing_tables:
+            continue
+        existing = {index["name"] for index in inspector.get_indexes(table.name)}
+        for index in table.indexes:
+            if index.name not in existing:
+                index.create(bind)
+                created.append(index.name)
+    return created
+
+
 def init_db():
     """初始化数据库表"""
     from models import session  # noqa: F401
     from models import debate_record  # noqa: F401
+    from services.debate_stats import backfill_debate_stats
+    from services.search_index import ensure_search_index
+    from services.trace_store import migrate_record_traces, migrate_settings_traces
     Base.metadata.create_all(bind=engine)
+    migrate_columns(engine)
+    migrate_indexes(engine)
+    migrate_settings_traces(engine)
+    migrate_record_traces(engine)
+    backfill_debate_stats(engine)
+    with engine.begin() as conn:
+        ensure_search_index(conn)
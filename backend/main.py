@@ -9,7 +9,7 @@ import time
 from fastapi import FastAPI, Request
 from fastapi.middleware.cors import CORSMiddleware
 from fastapi.staticfiles import StaticFiles
-from fastapi.responses import FileResponse, JSONResponse
+from fastapi.responses import FileResponse, JSONResponse, PlainTextResponse
 
 # 添加当前目录到路径
 sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
@@ -20,8 +20,10 @@ from routers.debate import router as debate_router
 from routers import chat, qa, history, evaluation
 from routers import dialectic
 from routers import analysis
+from routers import metrics
 from exceptions import AIgumentException
 from runtime import get_frontend_dist_dir, is_frozen
+from services import telemetry
 from utils.logger import get_logger
 
 settings = get_settings()
@@ -34,7 +36,12 @@ async def lifespan(app: FastAPI):
     logger.info("正在初始化数据库...")
     init_db()
     logger.info("数据库初始化完成")
+    telemetry.install()
     yield
+    from services.providers.client_pool import close_client_pool
+    from services.db_writer import close_db_writer
+    await close_client_pool()
+    close_db_writer()
     logger.info("应用关闭")
 
 
@@ -91,12 +98,19 @@ async def log_requests(request: Request, call_next):
     request_id = generate_request_id()
     set_request_id(request_id)
     
-    start_time = time.time()
+    start_time = time.perf_counter()
     response = await call_next(request)
-    duration = (time.time() - start_time) * 1000
+    elapsed = time.perf_counter() - start_time
+    duration = elapsed * 1000
     
     # 添加追踪 ID 到响应头
     response.headers["X-Request-ID"] = request_id
+
+    # 路由在 call_next 中完成匹配，此时 scope 中已有路由模板
+    route = telemetry.route_template(request.scope)
+    telemetry.observe_http_request(request.method, route, response.status_code, elapsed)
+    if response.headers.get("content-type", "").startswith("text/event-stream"):
+        response.body_iterator = telemetry.track_sse_stream(response.body_iterator, route)
     
     logger.info(f"{request.method} {request.url.path} - {response.status_code} ({duration:.2f}ms)")
     return response
@@ -110,6 +124,7 @@ app.include_router(history.router)
 app.include_router(evaluation.router)
 app.include_router(dialectic.router, prefix="/api", tags=["dialectic"])
 app.include_router(analysis.router)
+app.include_router(metrics.router)
 
 
 @app.get("/health")
@@ -118,6 +133,30 @@ async def health_check():
     return {"status": "healthy"}
 
 
+@app.get("/health/llm")
+async def llm_health():
+    """LLM 限流器与客户端池状态：并发窗口、排队等待与连接复用统计"""
+    from services.providers.client_pool import get_client_pool
+    from services.rate_limiter import get_rate_limiter_registry
+    return {
+        "limiters": get_rate_limiter_registry().stats(),
+        "client_pool": get_client_pool().stats(),
+    }
+
+
+@app.get("/health/db")
+async def db_health():
+    """存储档位与实际生效的 SQLite PRAGMA、读写连接池状态"""
+    from database import storage_diagnostics
+    return storage_diagnostics()
+
+
+@app.get("/metrics", include_in_schema=False)
+async def prometheus_metrics():
+    """Prometheus 文本格式指标：HTTP / SSE / LLM / DB"""
+    return PlainTextResponse(telemetry.render_metrics(), media_type=telemetry.CONTENT_TYPE)
+
+
 frontend_dist_dir = get_frontend_dist_dir()
 frontend_index_file = frontend_dist_dir / "index.html"
 frontend_assets_dir = frontend_dist_dir / "assets"
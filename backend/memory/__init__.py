@@ -13,6 +13,8 @@ from .argument_graph import (
     RelationType,
     ArgumentStrength,
 )
+from .argumentation import AttackFramework
+from .relation_inference import LexicalRelationInferer
 from .dialectic_memory import DialecticMemory
 
 __all__ = [
@@ -24,6 +26,8 @@ __all__ = [
     "ArgumentAnalyzer",
     "RelationType",
     "ArgumentStrength",
+    "AttackFramework",
+    "LexicalRelationInferer",
     "DialecticMemory",
 ]
 
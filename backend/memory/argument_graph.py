@@ -5,13 +5,24 @@
 - 论点节点（ArgumentNode）
 - 关系边（支持、反驳、削弱等）
 - 图谱分析（未被反驳的论点、有效攻击等）
+- 形式化语义（基础 / 优先外延、h-categorizer 强度，见 argumentation.py）
 """
 
-from typing import Dict, Any, List, Optional, Set
+from array import array
+from typing import Awaitable, Callable, Dict, Any, List, Optional, Set, Tuple
 from dataclasses import dataclass, field
 from enum import Enum
 from datetime import datetime
+from fractions import Fraction
+import asyncio
+import heapq
 import json
+import math
+import re
+
+import numpy as np
+
+from .argumentation import AttackFramework
 
 
 class RelationType(Enum):
@@ -23,6 +34,32 @@ class RelationType(Enum):
     BUILDS_ON = "builds_on"      # 基于（在己方论点基础上发展）
 
 
+RELATION_TYPE_VALUES = {relation.value for relation in RelationType}
+ATTACK_RELATIONS = (RelationType.ATTACKS, RelationType.REBUTS, RelationType.UNDERMINES)
+SUPPORT_RELATIONS = (RelationType.SUPPORTS, RelationType.BUILDS_ON)
+# 辩论评分中给攻击方加分的关系（削弱只计入被攻击，不给攻击方加分）
+SCORING_ATTACK_RELATIONS = (RelationType.ATTACKS, RelationType.REBUTS)
+RELATION_CODES = {relation: code for code, relation in enumerate(RelationType)}
+ATTACK_CODES = np.array([RELATION_CODES[relation] for relation in ATTACK_RELATIONS], dtype=np.int8)
+
+# 攻击链枚举的默认上限（AI 构建的稠密图谱中路径数随深度指数增长）
+DEFAULT_CHAIN_MAX_DEPTH = 16
+DEFAULT_CHAIN_MAX_PATHS = 1000
+DEFAULT_CHAIN_MAX_EXPANSIONS = 20000
+# 最强攻击链排序的相对容差：上界只比较尾数的高 40 位（约 1e-12）
+_CHAIN_KEY_BITS = 40
+
+
+def _chain_key(bound: float) -> float:
+    """按相对容差量化链强度上界
+
+    抹平乘法顺序带来的末位误差（否则等强度的链会退化成广度优先），
+    量化单调且按有效位数进行，数量级不同的强度不会被合并。
+    """
+    mantissa, exponent = math.frexp(bound)
+    return math.ldexp(round(math.ldexp(mantissa, _CHAIN_KEY_BITS)), exponent - _CHAIN_KEY_BITS)
+
+
 class ArgumentStrength(Enum):
     """论点强度"""
     WEAK = 1
@@ -31,7 +68,7 @@ class ArgumentStrength(Enum):
     DECISIVE = 4
 
 
-@dataclass
+@dataclass(slots=True)
 class ArgumentNode:
     """论点节点
     
@@ -71,7 +108,7 @@ class ArgumentNode:
         }
 
 
-@dataclass
+@dataclass(slots=True)
 class ArgumentEdge:
     """论点关系边"""
     id: str
@@ -101,6 +138,12 @@ class ArgumentGraph:
     - 未被反驳论点查询
     - 论点有效性分析
     - 辩论态势评估
+
+    双方得分、未被反驳数与最强论点堆在 add_argument / add_relation 中增量维护，
+    摘要类查询不再遍历全图；节点状态只应通过这两个方法修改。
+
+    论点另有按添加顺序的整数编号，关系同时追加到紧凑的整数数组中，
+    形式化语义查询（framework）据此构建 CSR 邻接，不再逐个访问边对象。
     """
     
     def __init__(self, topic: str = ""):
@@ -115,6 +158,54 @@ class ArgumentGraph:
         self._incoming_edges: Dict[str, List[ArgumentEdge]] = {}  # target_id -> edges
         self._nodes_by_author: Dict[str, List[str]] = {"pro": [], "con": []}
         self._nodes_by_round: Dict[int, List[str]] = {}
+        
+        # 整数编号与紧凑边表（下标对应 self.edges）
+        self._node_ids: List[str] = []
+        self._node_index: Dict[str, int] = {}
+        self._edge_sources = array("q")
+        self._edge_targets = array("q")
+        self._edge_weights = array("d")
+        self._edge_relations = array("b")  # RELATION_CODES
+        
+        # 增量维护的评分聚合
+        self._node_score_totals: Dict[str, int] = {"pro": 0, "con": 0}  # 节点得分均为整数
+        self._attack_totals: Dict[str, Fraction] = {"pro": Fraction(0), "con": Fraction(0)}  # 精确求和，与累加顺序无关
+        self._unrebutted_counts: Dict[str, int] = {"pro": 0, "con": 0}
+        self._strength_heaps: Dict[str, List[tuple]] = {"pro": [], "con": []}  # (-强度分, 序号, 版本, 节点 ID)
+        self._node_versions: Dict[str, int] = {}
+        self._node_sequence: Dict[str, int] = {}
+        
+        # 每次增删节点 / 关系递增，攻击链缓存据此失效
+        self._mutations = 0
+        self._chain_index: Optional["AttackChainIndex"] = None
+        self._framework: Optional[AttackFramework] = None
+        self._framework_version = -1
+    
+    @staticmethod
+    def _node_score(node: ArgumentNode) -> int:
+        """单个论点对本方得分的贡献（见 calculate_debate_score）"""
+        score = node.strength.value * 5
+        score += -3 * node.rebuttal_count if node.is_rebutted else 10
+        return score + node.support_count * 2
+    
+    @staticmethod
+    def _strongest_score(node: ArgumentNode) -> int:
+        """最强论点排序分（见 get_strongest_arguments）"""
+        rebuttal_penalty = node.rebuttal_count * 3 if node.is_rebutted else 0
+        return node.strength.value * 10 + node.support_count * 2 - rebuttal_penalty
+    
+    def _push_strongest(self, node: ArgumentNode) -> None:
+        """节点排序分变化后压入新条目，旧条目因版本号失效（惰性删除）"""
+        version = self._node_versions.get(node.id, -1) + 1
+        self._node_versions[node.id] = version
+        heap = self._strength_heaps[node.author]
+        heapq.heappush(heap, (-self._strongest_score(node), self._node_sequence[node.id], version, node.id))
+        if len(heap) > 2 * len(self._nodes_by_author[node.author]) + 16:
+            heap[:] = [
+                (-self._strongest_score(self.nodes[nid]), self._node_sequence[nid], self._node_versions[nid], nid)
+                for nid in self._nodes_by_author[node.author]
+            ]
+            heapq.heapify(heap)
     
     def add_argument(
         self,
@@ -141,6 +232,7 @@ class ArgumentGraph:
             创建的 ArgumentNode
         """
         self._node_counter += 1
+        self._mutations += 1
         node_id = f"arg_{round_num}_{author}_{self._node_counter}"
         
         node = ArgumentNode(
@@ -155,6 +247,8 @@ class ArgumentGraph:
         )
         
         self.nodes[node_id] = node
+        self._node_index[node_id] = len(self._node_ids)
+        self._node_ids.append(node_id)
         self._nodes_by_author[author].append(node_id)
         
         if round_num not in self._nodes_by_round:
@@ -165,6 +259,12 @@ class ArgumentGraph:
         self._outgoing_edges[node_id] = []
         self._incoming_edges[node_id] = []
         
+        # 更新评分聚合
+        self._node_sequence[node_id] = self._node_counter
+        self._node_score_totals[author] += self._node_score(node)
+        self._unrebutted_counts[author] += not node.is_rebutted
+        self._push_strongest(node)
+        
         return node
     
     def add_relation(
@@ -191,6 +291,7 @@ class ArgumentGraph:
             return None
         
         self._edge_counter += 1
+        self._mutations += 1
         edge_id = f"edge_{self._edge_counter}"
         
         edge = ArgumentEdge(
@@ -203,17 +304,31 @@ class ArgumentGraph:
         )
         
         self.edges.append(edge)
+        self._edge_sources.append(self._node_index[source_id])
+        self._edge_targets.append(self._node_index[target_id])
+        self._edge_weights.append(float(strength))
+        self._edge_relations.append(RELATION_CODES[relation])
         self._outgoing_edges[source_id].append(edge)
         self._incoming_edges[target_id].append(edge)
         
-        # 更新节点状态
+        # 更新节点状态与评分聚合
         target_node = self.nodes[target_id]
-        if relation in [RelationType.ATTACKS, RelationType.REBUTS, RelationType.UNDERMINES]:
+        source_node = self.nodes[source_id]
+        if relation in ATTACK_RELATIONS:
+            previous = self._node_score(target_node)
+            if not target_node.is_rebutted:
+                self._unrebutted_counts[target_node.author] -= 1
             target_node.is_rebutted = True
             target_node.rebuttal_count += 1
-        elif relation in [RelationType.SUPPORTS, RelationType.BUILDS_ON]:
-            source_node = self.nodes[source_id]
+            self._node_score_totals[target_node.author] += self._node_score(target_node) - previous
+            if relation in SCORING_ATTACK_RELATIONS:
+                self._attack_totals[source_node.author] += Fraction(edge.strength * 5)
+            self._push_strongest(target_node)
+        elif relation in SUPPORT_RELATIONS:
+            previous = self._node_score(source_node)
             source_node.support_count += 1
+            self._node_score_totals[source_node.author] += self._node_score(source_node) - previous
+            self._push_strongest(source_node)
         
         return edge
     
@@ -236,48 +351,97 @@ class ArgumentGraph:
         
         return unaddressed
     
+    def count_unaddressed_arguments(self, side: str) -> int:
+        """len(get_unaddressed_arguments(side))，O(1)"""
+        opponent = "con" if side == "pro" else "pro"
+        return self._unrebutted_counts[opponent]
+    
     def get_strongest_arguments(self, side: str, limit: int = 3) -> List[ArgumentNode]:
         """获取指定方最强的论点
         
-        基于：强度级别、支持数量、未被反驳状态
+        基于：强度级别、支持数量、未被反驳状态；同分按添加顺序。
+        从惰性删除堆中取前 limit 个有效条目再放回，O(limit · log n)。
         """
-        nodes = [self.nodes[nid] for nid in self._nodes_by_author[side]]
-        
-        def score(node: ArgumentNode) -> float:
-            base = node.strength.value * 10
-            support_bonus = node.support_count * 2
-            rebuttal_penalty = node.rebuttal_count * 3 if node.is_rebutted else 0
-            return base + support_bonus - rebuttal_penalty
-        
-        sorted_nodes = sorted(nodes, key=score, reverse=True)
-        return sorted_nodes[:limit]
+        count = len(self._nodes_by_author[side])
+        limit = limit if limit >= 0 else max(0, count + limit)
+        heap = self._strength_heaps[side]
+        taken = []
+        while heap and len(taken) < limit:
+            entry = heapq.heappop(heap)
+            if self._node_versions[entry[3]] == entry[2]:
+                taken.append(entry)
+        for entry in taken:
+            heapq.heappush(heap, entry)
+        return [self.nodes[entry[3]] for entry in taken]
     
-    def get_attack_chains(self, node_id: str) -> List[List[str]]:
+    @property
+    def chain_index(self) -> "AttackChainIndex":
+        if self._chain_index is None:
+            self._chain_index = AttackChainIndex(self)
+        return self._chain_index
+    
+    def get_attack_chains(
+        self,
+        node_id: str,
+        max_depth: int = DEFAULT_CHAIN_MAX_DEPTH,
+        max_paths: int = DEFAULT_CHAIN_MAX_PATHS
+    ) -> List[List[str]]:
         """获取针对某论点的攻击链
         
+        从该论点沿攻击 / 反驳 / 削弱关系逆向追溯到无人攻击的论点；
+        遇到环（攻击者已在链上）或达到 max_depth 时就地截断，最多返回 max_paths 条。
+        
         Returns:
             攻击链列表，每条链是论点 ID 序列
         """
-        chains = []
-        
-        def dfs(current_id: str, chain: List[str]):
-            incoming = self._incoming_edges.get(current_id, [])
-            attacks = [e for e in incoming if e.relation in [
-                RelationType.ATTACKS, RelationType.REBUTS, RelationType.UNDERMINES
-            ]]
-            
-            if not attacks:
-                if len(chain) > 1:
-                    chains.append(chain[:])
-                return
-            
-            for edge in attacks:
-                chain.append(edge.source_id)
-                dfs(edge.source_id, chain)
-                chain.pop()
+        return self.chain_index.chains(node_id, max_depth=max_depth, max_paths=max_paths)
+    
+    def get_chain_summary(self, node_id: str) -> Dict[str, Any]:
+        """某论点的攻击链摘要：最长链、直接 / 间接攻击者数、按距离的攻击者分布"""
+        return self.chain_index.summary(node_id)
+    
+    def get_strongest_chains(
+        self,
+        node_id: str,
+        k: int = 3,
+        max_depth: int = DEFAULT_CHAIN_MAX_DEPTH
+    ) -> List[Dict[str, Any]]:
+        """强度最高的 k 条攻击链（链强度为各边强度之积）"""
+        return self.chain_index.strongest(node_id, k=k, max_depth=max_depth)
+    
+    @property
+    def framework(self) -> AttackFramework:
+        """攻击关系构成的抽象论辩框架（CSR 快照，图谱变化后重建）"""
+        if self._framework is None or self._framework_version != self._mutations:
+            relations = np.frombuffer(self._edge_relations, dtype=np.int8)
+            attacks = np.isin(relations, ATTACK_CODES)
+            self._framework = AttackFramework(
+                self._node_ids,
+                np.frombuffer(self._edge_sources, dtype=np.int64)[attacks],
+                np.frombuffer(self._edge_targets, dtype=np.int64)[attacks],
+                np.frombuffer(self._edge_weights, dtype=np.float64)[attacks],
+            )
+            self._framework_version = self._mutations
+        return self._framework
+    
+    def get_grounded_extension(self) -> List[ArgumentNode]:
+        """基础外延：在所有攻击都被考虑后仍然成立的论点（按添加顺序）
         
-        dfs(node_id, [node_id])
-        return chains
+        与 is_rebutted 不同，被攻击但攻击者自身已被击败的论点仍然成立。
+        """
+        return [self.nodes[nid] for nid in self.framework.grounded_extension()]
+    
+    def get_preferred_extensions(self) -> List[List[ArgumentNode]]:
+        """优先外延：极大的自洽且能自我辩护的论点集合，互相攻击的论点会分属不同外延"""
+        return [[self.nodes[nid] for nid in extension] for extension in self.framework.preferred_extensions()]
+    
+    def get_argument_strengths(self) -> Dict[str, float]:
+        """加权 h-categorizer 强度 (0-1)：论点自身强度按攻击者强度与攻击强度衰减"""
+        weights = np.array(
+            [self.nodes[nid].strength.value for nid in self._node_ids], dtype=np.float64
+        ) / ArgumentStrength.DECISIVE.value
+        strengths = self.framework.h_categorizer(weights)
+        return {nid: float(value) for nid, value in zip(self._node_ids, strengths)}
     
     def calculate_debate_score(self) -> Dict[str, Any]:
         """计算双方辩论得分
@@ -287,39 +451,11 @@ class ArgumentGraph:
         - 成功攻击数量
         - 未被反驳的论点
         - 论点强度加权
-        """
-        pro_score = 0.0
-        con_score = 0.0
         
-        # 计算论点得分
-        for node_id, node in self.nodes.items():
-            base_score = node.strength.value * 5
-            
-            # 未被反驳加分
-            if not node.is_rebutted:
-                base_score += 10
-            else:
-                base_score -= 3 * node.rebuttal_count
-            
-            # 支持加分
-            base_score += node.support_count * 2
-            
-            if node.author == "pro":
-                pro_score += base_score
-            else:
-                con_score += base_score
-        
-        # 计算攻击效果
-        for edge in self.edges:
-            if edge.relation in [RelationType.ATTACKS, RelationType.REBUTS]:
-                target = self.nodes[edge.target_id]
-                attacker = self.nodes[edge.source_id]
-                attack_value = edge.strength * 5
-                
-                if attacker.author == "pro":
-                    pro_score += attack_value
-                else:
-                    con_score += attack_value
+        各项由 add_argument / add_relation 增量累计，这里 O(1) 读取。
+        """
+        pro_score = float(self._node_score_totals["pro"] + self._attack_totals["pro"])
+        con_score = float(self._node_score_totals["con"] + self._attack_totals["con"])
         
         total = pro_score + con_score
         pro_percentage = (pro_score / total * 100) if total > 0 else 50
@@ -330,8 +466,8 @@ class ArgumentGraph:
             "pro_percentage": round(pro_percentage, 1),
             "con_percentage": round(100 - pro_percentage, 1),
             "leader": "pro" if pro_score > con_score else ("con" if con_score > pro_score else "tie"),
-            "pro_unaddressed": len(self.get_unaddressed_arguments("con")),
-            "con_unaddressed": len(self.get_unaddressed_arguments("pro")),
+            "pro_unaddressed": self.count_unaddressed_arguments("con"),
+            "con_unaddressed": self.count_unaddressed_arguments("pro"),
             "total_arguments": len(self.nodes),
             "total_relations": len(self.edges),
         }
@@ -387,14 +523,263 @@ class ArgumentGraph:
         return "\n".join(lines)
 
 
+class AttackChainIndex:
+    """攻击链分析
+    
+    全部用显式栈 / 队列迭代实现，不会因链过长触发递归上限；
+    链上已出现的论点不再展开，有环也能终止。
+    按论点缓存的摘要与强连通分量在图谱变化（_mutations 变化）后整体失效。
+    """
+    
+    def __init__(self, graph: "ArgumentGraph"):
+        self.graph = graph
+        self._version = -1
+        self._attackers: Dict[str, List[ArgumentEdge]] = {}
+        self._summaries: Dict[str, Dict[str, Any]] = {}
+        self._longest: Optional[Dict[str, int]] = None
+        self._cyclic: Set[str] = set()
+        self._bounds: List[Dict[str, float]] = []
+    
+    def _sync(self) -> None:
+        if self._version != self.graph._mutations:
+            self._version = self.graph._mutations
+            self._attackers.clear()
+            self._summaries.clear()
+            self._longest = None
+            self._cyclic = set()
+            self._bounds = []
+    
+    def attackers(self, node_id: str) -> List[ArgumentEdge]:
+        """指向该论点的攻击类关系（保持添加顺序）"""
+        self._sync()
+        edges = self._attackers.get(node_id)
+        if edges is None:
+            edges = [e for e in self.graph._incoming_edges.get(node_id, []) if e.relation in ATTACK_RELATIONS]
+            self._attackers[node_id] = edges
+        return edges
+    
+    def _open_attackers(self, node_id: str, on_path: Set[str]) -> List[ArgumentEdge]:
+        return [e for e in self.attackers(node_id) if e.source_id not in on_path]
+    
+    def chains(
+        self,
+        node_id: str,
+        max_depth: int = DEFAULT_CHAIN_MAX_DEPTH,
+        max_paths: int = DEFAULT_CHAIN_MAX_PATHS
+    ) -> List[List[str]]:
+        """枚举攻击链（深度优先，顺序与按添加顺序递归展开一致）"""
+        if node_id not in self.graph.nodes or max_depth < 1 or max_paths < 1:
+            return []
+        chains: List[List[str]] = []
+        path = [node_id]
+        on_path = {node_id}
+        # stack[i] 遍历 path[i] 尚未展开的攻击者
+        stack = [iter(self._open_attackers(node_id, on_path))]
+        while stack:
+            edge = next(stack[-1], None)
+            if edge is None:
+                stack.pop()
+                if stack:
+                    on_path.discard(path.pop())
+                continue
+            path.append(edge.source_id)
+            on_path.add(edge.source_id)
+            expandable = self._open_attackers(edge.source_id, on_path) if len(path) <= max_depth else []
+            if expandable:
+                stack.append(iter(expandable))
+                continue
+            chains.append(path[:])
+            if len(chains) >= max_paths:
+                break
+            on_path.discard(path.pop())
+        return chains
+    
+    def _compute_longest(self) -> None:
+        """强连通分量缩点后求最长攻击链（迭代 Tarjan）
+        
+        边方向为 被攻击者 -> 攻击者。Tarjan 先输出被依赖的分量（攻击者一侧），
+        按输出顺序即可自底向上递推；同一个环内的论点视为同一层。
+        """
+        index: Dict[str, int] = {}
+        low: Dict[str, int] = {}
+        on_stack: Set[str] = set()
+        stack: List[str] = []
+        component: Dict[str, int] = {}
+        longest_by_component: List[int] = []
+        counter = 0
+        
+        for root in self.graph.nodes:
+            if root in index:
+                continue
+            work = [(root, iter(self.attackers(root)))]
+            index[root] = low[root] = counter
+            counter += 1
+            stack.append(root)
+            on_stack.add(root)
+            while work:
+                node, edges = work[-1]
+                edge = next(edges, None)
+                if edge is not None:
+                    nxt = edge.source_id
+                    if nxt not in index:
+                        index[nxt] = low[nxt] = counter
+                        counter += 1
+                        stack.append(nxt)
+                        on_stack.add(nxt)
+                        work.append((nxt, iter(self.attackers(nxt))))
+                    elif nxt in on_stack:
+                        low[node] = min(low[node], index[nxt])
+                    continue
+                work.pop()
+                if work:
+                    parent = work[-1][0]
+                    low[parent] = min(low[parent], low[node])
+                if low[node] != index[node]:
+                    continue
+                members = []
+                while True:
+                    member = stack.pop()
+                    on_stack.discard(member)
+                    component[member] = len(longest_by_component)
+                    members.append(member)
+                    if member == node:
+                        break
+                current = len(longest_by_component)
+                best = 0
+                for member in members:
+                    for attacker in self.attackers(member):
+                        other = component[attacker.source_id]
+                        if other != current:
+                            best = max(best, longest_by_component[other] + 1)
+                        else:
+                            self._cyclic.add(member)
+                longest_by_component.append(best)
+        
+        self._longest = {node_id: longest_by_component[component[node_id]] for node_id in self.graph.nodes}
+    
+    def summary(self, node_id: str) -> Dict[str, Any]:
+        """攻击链摘要（按论点缓存）
+        
+        - longest_chain: 最长攻击链的边数（环按一层计）
+        - direct_attackers / total_attackers: 直接攻击者数与可逆向到达的全部攻击者数
+        - depth_histogram: {距离: 该距离上的攻击者数}（按最短距离计）
+        - in_cycle: 是否处在攻击环中
+        """
+        self._sync()
+        cached = self._summaries.get(node_id)
+        if cached is not None:
+            return cached
+        if node_id not in self.graph.nodes:
+            return {}
+        if self._longest is None:
+            self._compute_longest()
+        
+        distance = {node_id: 0}
+        queue = [node_id]
+        for current in queue:
+            for edge in self.attackers(current):
+                if edge.source_id not in distance:
+                    distance[edge.source_id] = distance[current] + 1
+                    queue.append(edge.source_id)
+        histogram: Dict[int, int] = {}
+        for other, depth in distance.items():
+            if other != node_id:
+                histogram[depth] = histogram.get(depth, 0) + 1
+        
+        result = {
+            "node_id": node_id,
+            "longest_chain": self._longest[node_id],
+            "direct_attackers": len({edge.source_id for edge in self.attackers(node_id)} - {node_id}),
+            "total_attackers": len(distance) - 1,
+            "depth_histogram": dict(sorted(histogram.items())),
+            "in_cycle": node_id in self._cyclic,
+        }
+        self._summaries[node_id] = result
+        return result
+    
+    def _completion_bound(self, node_id: str, remaining: int) -> float:
+        """从该论点再走至多 remaining 条边能乘上的最大强度（上界）
+        
+        bounds[d][n] = 1（无攻击者或 d = 0），否则 max(边强度 * bounds[d-1][攻击者])；
+        处在环中的论点可能因攻击者已在链上而就地结束，取 1 保证上界成立。
+        逐层计算并缓存，某层不再变化后更深的层与之相同。
+        """
+        if self._longest is None:
+            self._compute_longest()
+        if not self._bounds:
+            self._bounds.append({n: 1.0 for n in self.graph.nodes})
+        while len(self._bounds) <= remaining:
+            previous = self._bounds[-1]
+            layer = {}
+            for n in self.graph.nodes:
+                edges = self.attackers(n)
+                if not edges or n in self._cyclic:
+                    layer[n] = 1.0
+                else:
+                    layer[n] = max(min(1.0, max(0.0, float(e.strength))) * previous[e.source_id] for e in edges)
+            self._bounds.append(layer)
+            if layer == previous:
+                break
+        return self._bounds[min(remaining, len(self._bounds) - 1)][node_id]
+    
+    def strongest(
+        self,
+        node_id: str,
+        k: int = 3,
+        max_depth: int = DEFAULT_CHAIN_MAX_DEPTH,
+        max_expansions: int = DEFAULT_CHAIN_MAX_EXPANSIONS
+    ) -> List[Dict[str, Any]]:
+        """强度最高的 k 条攻击链（A* 搜索）
+        
+        链强度为各边强度（截断到 0-1）之积。队列按 已得强度 x 剩余上界 排序，
+        完整链的上界就是其强度，因此完整链出队时一定不弱于队列中其他任何链，
+        无需枚举全部路径。上界在相对容差内相同时优先展开更深的链，
+        结果最后按实际强度稳定排序，同强度按发现顺序排列；
+        max_expansions 限制出队次数，耗尽时可能返回不足 k 条。
+        """
+        if node_id not in self.graph.nodes or k < 1 or max_depth < 1:
+            return []
+        self._sync()
+        results: List[Dict[str, Any]] = []
+        sequence = 0
+        heap: List[tuple] = [(-_chain_key(self._completion_bound(node_id, max_depth)), 0, sequence, 1.0, (node_id,))]
+        expansions = 0
+        while heap and len(results) < k and expansions < max_expansions:
+            _, _, _, gained, path = heapq.heappop(heap)
+            expansions += 1
+            depth = len(path) - 1
+            expandable = self._open_attackers(path[-1], set(path)) if depth < max_depth else []
+            if not expandable:
+                if depth > 0:
+                    results.append({"chain": list(path), "strength": gained, "depth": depth})
+                continue
+            for edge in expandable:
+                sequence += 1
+                strength = gained * min(1.0, max(0.0, float(edge.strength)))
+                bound = strength * self._completion_bound(edge.source_id, max_depth - depth - 1)
+                heapq.heappush(heap, (-_chain_key(bound), -depth - 1, sequence, strength, path + (edge.source_id,)))
+        results.sort(key=lambda item: -item["strength"])
+        return results
+
+
 class ArgumentAnalyzer:
     """论点分析器
     
     使用 AI 分析论点内容，提取关键信息并建立关系。
+
+    构建图谱时所有 LLM 调用并发执行（信号量限制同时在途的请求数）；
+    batched=True 时每次调用一并处理多条论点 / 多组论点对，逐项解析，
+    缺失或无法解析的项单独补一次调用。
     """
     
-    def __init__(self, ai_client):
+    def __init__(self, ai_client, max_concurrency: int = 4, batch_size: int = 8):
         self.ai_client = ai_client
+        self.max_concurrency = max(1, max_concurrency)
+        self.batch_size = max(1, batch_size)
+    
+    async def _complete(self, prompt: str) -> str:
+        messages = [{"role": "user", "content": prompt}]
+        return await self.ai_client.get_completion(messages, temperature=0.3)
     
     async def extract_key_points(self, argument: str) -> List[str]:
         """提取论点的关键点"""
@@ -406,16 +791,13 @@ class ArgumentAnalyzer:
 请以 JSON 数组格式输出，例如：
 ["核心观点1", "核心观点2", "核心观点3"]
 """
-        messages = [{"role": "user", "content": prompt}]
-        response = await self.ai_client.get_completion(messages, temperature=0.3)
-        
+        response = await self._complete(prompt)
         try:
-            import json
             # 提取 JSON
             if "[" in response:
                 start = response.find("[")
                 end = response.rfind("]") + 1
-                return json.loads(response[start:end])
+                return _normalize_key_points(json.loads(response[start:end])) or []
         except (json.JSONDecodeError, ValueError, TypeError):
             pass
         return []
@@ -446,78 +828,236 @@ class ArgumentAnalyzer:
 }}
 ```
 """
-        messages = [{"role": "user", "content": prompt}]
-        response = await self.ai_client.get_completion(messages, temperature=0.3)
-        
+        response = await self._complete(prompt)
         try:
-            import json
             if "{" in response:
                 start = response.find("{")
                 end = response.rfind("}") + 1
-                result = json.loads(response[start:end])
-                if result.get("has_relation"):
-                    return result
+                return _normalize_relation(json.loads(response[start:end]))
         except (json.JSONDecodeError, ValueError, TypeError):
             pass
         return None
     
+    async def extract_key_points_batch(self, arguments: List[str]) -> Dict[int, List[str]]:
+        """一次调用提取多条论点的关键点，返回 {下标: 关键点}，解析失败的项不出现在结果中"""
+        blocks = "\n\n".join(f"【论点{i + 1}】\n{text[:600]}" for i, text in enumerate(arguments))
+        prompt = f"""请从以下每条辩论论点中分别提取 2-4 个核心观点/论据，每个用一句话概括：
+
+{blocks}
+
+请以 JSON 对象输出，键为论点编号，值为核心观点数组，例如：
+{{"1": ["核心观点1", "核心观点2"], "2": ["核心观点1", "核心观点2"]}}
+"""
+        response = await self._complete(prompt)
+        items = _parse_indexed_items(response, len(arguments))
+        return {
+            index: points
+            for index, points in ((index, _normalize_key_points(value)) for index, value in items.items())
+            if points is not None
+        }
+    
+    async def analyze_relations_batch(
+        self,
+        pairs: List[Tuple[Dict[str, Any], Dict[str, Any]]]
+    ) -> Dict[int, Optional[Dict[str, Any]]]:
+        """一次调用判断多组论点对（source, target）的关系，返回 {下标: 关系或 None}"""
+        blocks = "\n\n".join(
+            f"【关系{i + 1}】\n论点A({source['author']})：{source['content'][:300]}\n"
+            f"论点B({target['author']})：{target['content'][:300]}"
+            for i, (source, target) in enumerate(pairs)
+        )
+        prompt = f"""分析以下每组辩论论点中，论点A与论点B的关系：
+
+{blocks}
+
+请以 JSON 对象输出，键为关系编号，值的格式为：
+{{"has_relation": true/false, "relation_type": "attacks"/"rebuts"/"supports"/"undermines"/"builds_on"/"none", "strength": 0.1-1.0, "description": "关系描述，10字以内"}}
+例如：{{"1": {{"has_relation": true, "relation_type": "rebuts", "strength": 0.7, "description": "否定前提"}}}}
+"""
+        response = await self._complete(prompt)
+        items = _parse_indexed_items(response, len(pairs))
+        return {index: _normalize_relation(value) for index, value in items.items() if isinstance(value, dict)}
+    
+    async def _gather_limited(self, semaphore: asyncio.Semaphore, factories: List[Callable[[], Awaitable[Any]]]) -> List[Any]:
+        async def run(factory):
+            async with semaphore:
+                return await factory()
+        return await asyncio.gather(*(run(factory) for factory in factories))
+    
+    async def _key_points_for(self, contents: List[str], semaphore: asyncio.Semaphore, batched: bool) -> List[List[str]]:
+        if not batched:
+            return await self._gather_limited(
+                semaphore, [lambda text=text: self.extract_key_points(text) for text in contents]
+            )
+        chunks = [list(range(i, min(i + self.batch_size, len(contents)))) for i in range(0, len(contents), self.batch_size)]
+        parsed = await self._gather_limited(
+            semaphore,
+            [lambda chunk=chunk: self.extract_key_points_batch([contents[i] for i in chunk]) for chunk in chunks],
+        )
+        results: List[Optional[List[str]]] = [None] * len(contents)
+        for chunk, items in zip(chunks, parsed):
+            for offset, points in items.items():
+                results[chunk[offset]] = points
+        missing = [i for i, points in enumerate(results) if points is None]
+        retried = await self._gather_limited(
+            semaphore, [lambda i=i: self.extract_key_points(contents[i]) for i in missing]
+        )
+        for i, points in zip(missing, retried):
+            results[i] = points
+        return results
+    
+    async def _relations_for(
+        self,
+        pairs: List[Tuple[Dict[str, Any], Dict[str, Any]]],
+        semaphore: asyncio.Semaphore,
+        batched: bool
+    ) -> List[Optional[Dict[str, Any]]]:
+        def single(source, target):
+            return lambda: self.analyze_relation(
+                source_arg=source["content"],
+                target_arg=target["content"],
+                source_author=source["author"],
+                target_author=target["author"],
+            )
+
+        if not batched:
+            return await self._gather_limited(semaphore, [single(source, target) for source, target in pairs])
+        chunks = [list(range(i, min(i + self.batch_size, len(pairs)))) for i in range(0, len(pairs), self.batch_size)]
+        parsed = await self._gather_limited(
+            semaphore,
+            [lambda chunk=chunk: self.analyze_relations_batch([pairs[i] for i in chunk]) for chunk in chunks],
+        )
+        results: List[Optional[Dict[str, Any]]] = [None] * len(pairs)
+        answered = set()
+        for chunk, items in zip(chunks, parsed):
+            for offset, relation in items.items():
+                results[chunk[offset]] = relation
+                answered.add(chunk[offset])
+        missing = [i for i in range(len(pairs)) if i not in answered]
+        retried = await self._gather_limited(semaphore, [single(*pairs[i]) for i in missing])
+        for i, relation in zip(missing, retried):
+            results[i] = relation
+        return results
+    
     async def build_graph_from_debate(
         self,
         topic: str,
-        arguments: List[Dict[str, Any]]
+        arguments: List[Dict[str, Any]],
+        batched: bool = False
     ) -> ArgumentGraph:
         """从辩论记录构建论点图谱
         
+        关键点提取与关系判断互不依赖，两组调用同时发出。
+        
         Args:
             topic: 辩论主题
             arguments: 论点列表，每项包含 {content, author, round}
+            batched: 是否把多条论点 / 论点对合并到一次调用中
             
         Returns:
             构建好的 ArgumentGraph
         """
         graph = ArgumentGraph(topic=topic)
         
-        # 添加所有论点
-        node_map = {}  # (round, author) -> node_id
-        for arg in arguments:
-            key_points = await self.extract_key_points(arg["content"])
+        # 只分析相邻且立场不同的论点
+        pair_indexes = [
+            i for i in range(1, len(arguments))
+            if arguments[i]["author"] != arguments[i - 1]["author"]
+        ]
+        pairs = [(arguments[i], arguments[i - 1]) for i in pair_indexes]
+        
+        semaphore = asyncio.Semaphore(self.max_concurrency)
+        key_points_list, relations = await asyncio.gather(
+            self._key_points_for([arg["content"] for arg in arguments], semaphore, batched),
+            self._relations_for(pairs, semaphore, batched),
+        )
+        
+        # 按原顺序添加论点，节点 ID 与串行构建时一致
+        node_ids = []
+        for arg, key_points in zip(arguments, key_points_list):
             node = graph.add_argument(
                 content=arg["content"],
                 author=arg["author"],
                 round_num=arg["round"],
                 key_points=key_points
             )
-            node_map[(arg["round"], arg["author"])] = node.id
+            node_ids.append(node.id)
         
-        # 分析相邻论点的关系
-        for i, arg in enumerate(arguments):
-            if i == 0:
-                continue
-            
-            prev_arg = arguments[i - 1]
-            
-            # 只分析不同立场之间的关系
-            if arg["author"] != prev_arg["author"]:
-                relation = await self.analyze_relation(
-                    source_arg=arg["content"],
-                    target_arg=prev_arg["content"],
-                    source_author=arg["author"],
-                    target_author=prev_arg["author"]
+        for i, relation in zip(pair_indexes, relations):
+            if relation:
+                graph.add_relation(
+                    source_id=node_ids[i],
+                    target_id=node_ids[i - 1],
+                    relation=RelationType(relation["relation_type"]),
+                    strength=relation["strength"],
+                    description=relation["description"]
                 )
-                
-                if relation:
-                    source_id = node_map[(arg["round"], arg["author"])]
-                    target_id = node_map[(prev_arg["round"], prev_arg["author"])]
-                    
-                    relation_type = RelationType[relation["relation_type"].upper()]
-                    graph.add_relation(
-                        source_id=source_id,
-                        target_id=target_id,
-                        relation=relation_type,
-                        strength=relation.get("strength", 0.5),
-                        description=relation.get("description", "")
-                    )
         
         return graph
 
 
+def _parse_indexed_items(response: str, count: int) -> Dict[int, Any]:
+    """解析批量调用的输出，返回 {0 起始下标: 值}
+
+    依次尝试：整体解析为 JSON 对象（按编号取值）；逐项匹配 "编号": [...] / {...}
+    （输出被截断或夹杂说明文字时能救回多少算多少）；整体解析为 JSON 数组（按位置取值）。
+    """
+    items: Dict[int, Any] = {}
+    data = _loads_span(response, "{", "}")
+    if isinstance(data, dict):
+        for key, value in data.items():
+            match = re.fullmatch(r"\D*(\d+)\D*", str(key))
+            if match:
+                items[int(match.group(1)) - 1] = value
+    if not items:
+        decoder = json.JSONDecoder()
+        for match in re.finditer(r'"?(\d+)"?\s*:\s*(?=[\[{])', response):
+            try:
+                value, _ = decoder.raw_decode(response, match.end())
+            except (json.JSONDecodeError, ValueError):
+                continue
+            items.setdefault(int(match.group(1)) - 1, value)
+    if not items:
+        data = _loads_span(response, "[", "]")
+        for position, value in enumerate(data if isinstance(data, list) else []):
+            if isinstance(value, dict) and isinstance(value.get("index"), int):
+                items[value["index"] - 1] = value
+            else:
+                items[position] = value
+    return {index: value for index, value in items.items() if 0 <= index < count}
+
+
+def _loads_span(response: str, opening: str, closing: str) -> Any:
+    start = response.find(opening)
+    end = response.rfind(closing) + 1
+    if start < 0 or end <= start:
+        return None
+    try:
+        return json.loads(response[start:end])
+    except (json.JSONDecodeError, ValueError):
+        return None
+
+
+def _normalize_key_points(value: Any) -> Optional[List[str]]:
+    if not isinstance(value, list):
+        return None
+    return [str(point).strip() for point in value if isinstance(point, (str, int, float)) and str(point).strip()]
+
+
+def _normalize_relation(value: Any) -> Optional[Dict[str, Any]]:
+    """校验关系判断结果；无关系或类型未知时返回 None"""
+    if not isinstance(value, dict) or not value.get("has_relation"):
+        return None
+    relation_type = str(value.get("relation_type", "")).lower()
+    if relation_type not in RELATION_TYPE_VALUES:
+        return None
+    try:
+        strength = float(value.get("strength", 0.5))
+    except (TypeError, ValueError):
+        strength = 0.5
+    return {
+        **value,
+        "relation_type": relation_type,
+        "strength": min(1.0, max(0.0, strength)),
+        "description": str(value.get("description") or ""),
+    }
@@ -0,0 +1,186 @@
+"""
+形式化论辩语义（Dung 抽象论辩框架）
+
+把论点图谱中的攻击类关系（攻击 / 反驳 / 削弱）看作抽象论辩框架 (A, R)，计算：
+- 基础外延（grounded extension）：怀疑性地"站得住"的论点，唯一且多项式时间可得
+- 优先外延（preferred extensions）：极大的可采纳集合，即各种自洽的"最终立场"
+- 加权 h-categorizer 强度：h(a) = w(a) / (1 + Σ s(b, a) · h(b))，给出连续的存活程度
+
+攻击关系以整数下标的 CSR 数组存储（按攻击者 / 被攻击者各一份），
+基础外延按前沿批量传播，每条边只处理一次；强度迭代每轮是一次 bincount。
+"""
+from typing import List, Optional, Sequence
+
+import numpy as np
+
+
+LABEL_IN = 1
+LABEL_OUT = -1
+LABEL_UNDEC = 0
+
+# 优先外延搜索中的标签（Nofal 等人的标注算法）
+_BLANK, _IN, _OUT, _MUST_OUT, _UNDEC = range(5)
+
+
+def _csr(rows: np.ndarray, cols: np.ndarray, n: int):
+    """按 rows 分组的 CSR：返回 (indptr, cols 按行稳定排序, 对应的原边下标)"""
+    order = np.argsort(rows, kind="stable")
+    indptr = np.zeros(n + 1, dtype=np.int64)
+    np.cumsum(np.bincount(rows, minlength=n), out=indptr[1:])
+    return indptr, cols[order], order
+
+
+def _gather(indptr: np.ndarray, values: np.ndarray, rows: np.ndarray) -> np.ndarray:
+    """拼接若干行的 CSR 切片（不逐行循环）"""
+    starts = indptr[rows]
+    lengths = indptr[rows + 1] - starts
+    total = int(lengths.sum())
+    if total == 0:
+        return values[:0]
+    offsets = np.repeat(starts - np.cumsum(lengths) + lengths, lengths)
+    return values[offsets + np.arange(total)]
+
+
+class AttackFramework:
+    """攻击关系的 CSR 快照
+
+    Args:
+        ids: 论点 ID，下标即整数编号
+        sources / targets: 攻击边的攻击者 / 被攻击者下标
+        weights: 攻击强度 (0-1)，超出范围的截断
+    """
+
+    __slots__ = (
+        "ids", "size", "sources", "targets", "weights",
+        "attack_ptr", "attacked", "attacker_ptr", "attackers", "attacker_weights",
+        "_grounded",
+    )
+
+    def __init__(
+        self,
+        ids: Sequence[str],
+        sources: np.ndarray,
+        targets: np.ndarray,
+        weights: Optional[np.ndarray] = None,
+    ):
+        self.ids = list(ids)
+        self.size = len(self.ids)
+        self.sources = np.asarray(sources, dtype=np.int64)
+        self.targets = np.asarray(targets, dtype=np.int64)
+        if weights is None:
+            weights = np.ones(len(self.sources))
+        self.weights = np.clip(np.asarray(weights, dtype=np.float64), 0.0, 1.0)
+        # 攻击者 -> 被攻击者；被攻击者 -> 攻击者
+        self.attack_ptr, self.attacked, _ = _csr(self.sources, self.targets, self.size)
+        self.attacker_ptr, self.attackers, order = _csr(self.targets, self.sources, self.size)
+        self.attacker_weights = self.weights[order]
+        self._grounded: Optional[np.ndarray] = None
+
+    def grounded_labelling(self) -> np.ndarray:
+        """基础标注：IN(1) / OUT(-1) / UNDEC(0)
+
+        无存活攻击者的论点为 IN，被 IN 攻击的为 OUT，再把 OUT 论点从其目标的
+        存活攻击者计数中扣除，直到没有新的 IN。每条边至多被扣除一次，O(|A| + |R|)。
+        """
+        if self._grounded is not None:
+            return self._grounded
+        labels = np.zeros(self.size, dtype=np.int8)
+        live = np.bincount(self.targets, minlength=self.size)
+        frontier = np.flatnonzero(live == 0)
+        while frontier.size:
+            labels[frontier] = LABEL_IN
+            hit = np.unique(_gather(self.attack_ptr, self.attacked, frontier))
+            defeated = hit[labels[hit] == LABEL_UNDEC]
+            labels[defeated] = LABEL_OUT
+            released = _gather(self.attack_ptr, self.attacked, defeated)
+            np.subtract.at(live, released, 1)
+            candidates = np.unique(released)
+            frontier = candidates[(labels[candidates] == LABEL_UNDEC) & (live[candidates] == 0)]
+        self._grounded = labels
+        return labels
+
+    def grounded_extension(self) -> List[str]:
+        return [self.ids[i] for i in np.flatnonzero(self.grounded_labelling() == LABEL_IN)]
+
+    def preferred_extensions(self) -> List[List[str]]:
+        """全部优先外延（极大可采纳集），各外延内按论点下标排序
+
+        以基础标注为起点（基础外延包含于每个优先外延），只对 UNDEC 部分做
+        IN / UNDEC 二分回溯：选 IN 时其目标标 OUT、其攻击者标 MUST_OUT（必须被反击），
+        某个 MUST_OUT 论点已无可用的反击者时剪枝；所有攻击者都已 OUT 的论点直接标 IN。
+        最坏情况仍是指数级（判定问题本身是 NP 难的），辩论图谱的 UNDEC 部分通常很小。
+        """
+        grounded = self.grounded_labelling()
+        attacked = [self.attacked[self.attack_ptr[i]:self.attack_ptr[i + 1]].tolist() for i in range(self.size)]
+        attackers = [self.attackers[self.attacker_ptr[i]:self.attacker_ptr[i + 1]].tolist() for i in range(self.size)]
+        start = [_IN if label == LABEL_IN else _OUT if label == LABEL_OUT else _BLANK for label in grounded.tolist()]
+        for i in range(self.size):
+            if start[i] == _BLANK and i in attacked[i]:
+                start[i] = _UNDEC  # 自我攻击的论点不可能被接受
+
+        def label_in(labels: List[int], x: int) -> None:
+            labels[x] = _IN
+            for z in attacked[x]:
+                labels[z] = _OUT
+            for y in attackers[x]:
+                if labels[y] != _OUT:
+                    labels[y] = _MUST_OUT
+
+        found: List[frozenset] = []
+        stack = [start]
+        while stack:
+            labels = stack.pop()
+            # 传播：所有攻击者都已 OUT 的空白论点加入不会破坏可采纳性，也不会使集合变小
+            changed = True
+            while changed:
+                changed = False
+                for x in range(self.size):
+                    if labels[x] == _BLANK and all(labels[y] == _OUT for y in attackers[x]):
+                        label_in(labels, x)
+                        changed = True
+            if any(
+                labels[y] == _MUST_OUT and not any(labels[z] == _BLANK for z in attackers[y])
+                for y in range(self.size)
+            ):
+                continue
+            blank = next((x for x in range(self.size) if labels[x] == _BLANK), None)
+            if blank is None:
+                if _MUST_OUT not in labels:
+                    found.append(frozenset(x for x in range(self.size) if labels[x] == _IN))
+                continue
+            skipped = labels[:]
+            skipped[blank] = _UNDEC
+            chosen = labels[:]
+            label_in(chosen, blank)
+            # 先展开"接受"分支，较大的可采纳集先被找到
+            stack.append(skipped)
+            stack.append(chosen)
+
+        maximal = []
+        for extension in found:
+            if extension in maximal or any(extension < other for other in found):
+                continue
+            maximal.append(extension)
+        return [[self.ids[i] for i in sorted(extension)] for extension in maximal]
+
+    def h_categorizer(
+        self,
+        node_weights: Optional[np.ndarray] = None,
+        tolerance: float = 1e-9,
+        max_iterations: int = 1000,
+    ) -> np.ndarray:
+        """加权 h-categorizer 强度：h = w / (1 + Σ 攻击强度 · h(攻击者))
+
+        从 h = w 开始整体迭代到最大变化小于 tolerance；奇偶两个子序列从两侧
+        逼近唯一不动点，震荡时取两者平均收尾。
+        """
+        base = np.ones(self.size) if node_weights is None else np.asarray(node_weights, dtype=np.float64)
+        h = base.copy()
+        previous = h
+        for _ in range(max_iterations):
+            pressure = np.bincount(self.targets, weights=self.weights * h[self.sources], minlength=self.size)
+            updated = base / (1.0 + pressure)
+            if np.max(np.abs(updated - h), initial=0.0) < tolerance:
+                return updated
+            previous, h = h, updated
+        return (h + previous) / 2
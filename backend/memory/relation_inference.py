@@ -0,0 +1,213 @@
+"""
+论点关系推断（本地词法，不调用 LLM）
+
+对所有立场不同的论点对（后发言 -> 先发言）打分，超过阈值的建立加权关系边：
+- 字符 n-gram TF-IDF 余弦相似度（中文不分词，按 2/3 字组切分）
+- 反驳标志词（然而、并非、反驳……）与质疑标志词（片面、以偏概全……）
+- 发言间隔：越是紧接着的对方论点，越可能是回应对象
+
+向量化全部用 NumPy 完成：n-gram 编码成整数后用 np.unique 统计词频，
+论点向量保持稀疏（只保留出现在两篇以上论点中的 n-gram），只对候选论点对计算点积，
+内存与非零项数成线性，百个节点的图谱在毫秒级完成。
+"""
+import re
+from typing import List, Optional, Sequence, Tuple
+
+import numpy as np
+
+from .argument_graph import ArgumentGraph, RelationType
+
+
+REBUTTAL_CUES = (
+    "然而", "并非", "反驳", "并不", "不是", "不能", "未必", "恰恰相反", "相反",
+    "错误", "站不住", "谬误", "忽视", "忽略", "但是", "可是", "对方",
+)
+UNDERMINING_CUES = (
+    "质疑", "证据不足", "缺乏证据", "缺乏依据", "数据存在", "片面", "偏差", "以偏概全",
+    "样本", "来源不明", "夸大", "不具代表性",
+)
+
+_NON_WORD = re.compile(r"[\W_]+")
+_CODEPOINT_BITS = 21  # Unicode 码位最多 21 位，三字组正好放进 uint64
+
+
+def _cue_scores(texts: Sequence[str], cues: Sequence[str], saturation: int = 2) -> np.ndarray:
+    hits = np.array([sum(text.count(cue) for cue in cues) for text in texts], dtype=np.float64)
+    return np.minimum(hits / saturation, 1.0)
+
+
+class LexicalRelationInferer:
+    """基于字符 n-gram TF-IDF 与标志词的论点关系推断
+
+    Args:
+        ngram_sizes: 使用的字组长度
+        threshold: 建边的最低得分 (0-1)
+        max_edges_per_node: 每个论点最多指向的对方论点数
+        similarity_scale: 余弦相似度达到该值即视为完全相关（辩论文本同题，原始相似度偏低）
+        weights: (相似度, 标志词, 发言间隔) 的权重
+    """
+
+    def __init__(
+        self,
+        ngram_sizes: Tuple[int, ...] = (2, 3),
+        threshold: float = 0.35,
+        max_edges_per_node: int = 3,
+        similarity_scale: float = 0.4,
+        weights: Tuple[float, float, float] = (0.5, 0.2, 0.3),
+    ):
+        if any(size < 1 or size > 3 for size in ngram_sizes):
+            raise ValueError("n-gram 长度只支持 1-3")
+        self.ngram_sizes = ngram_sizes
+        self.threshold = threshold
+        self.max_edges_per_node = max(1, max_edges_per_node)
+        self.similarity_scale = similarity_scale
+        self.weights = weights
+
+    def _ngram_keys(self, texts: Sequence[str]) -> Tuple[np.ndarray, np.ndarray]:
+        """所有论点的 n-gram 编码为 uint64，返回 (文档下标, n-gram 编码)"""
+        cleaned = [_NON_WORD.sub("", text).lower() for text in texts]
+        # 文档之间用码位 0 分隔，跨文档的 n-gram 会因包含 0 被过滤
+        joined = "\0".join(cleaned) + "\0"
+        codes = np.frombuffer(joined.encode("utf-32-le"), dtype=np.uint32).astype(np.uint64)
+        doc_ids = np.cumsum(codes == 0) - (codes == 0)
+        docs, keys = [], []
+        for size in self.ngram_sizes:
+            count = len(codes) - size + 1
+            if count <= 0:
+                continue
+            key = np.zeros(count, dtype=np.uint64)
+            valid = np.ones(count, dtype=bool)
+            for offset in range(size):
+                window = codes[offset:offset + count]
+                key = (key << np.uint64(_CODEPOINT_BITS)) | window
+                valid &= window != 0
+            # 不同长度的字组编码互不冲突：首字码位非 0，k 字组恰好落在 [2^(21(k-1)), 2^(21k)) 区间
+            docs.append(doc_ids[:count][valid])
+            keys.append(key[valid])
+        if not docs:
+            return np.zeros(0, dtype=np.int64), np.zeros(0, dtype=np.uint64)
+        return np.concatenate(docs), np.concatenate(keys)
+
+    def _vectorize(self, texts: Sequence[str]) -> Tuple[np.ndarray, np.ndarray, np.ndarray, int]:
+        """L2 归一化的稀疏 TF-IDF 向量
+
+        返回按 (文档, 词) 排序的 (文档下标, 词下标, 权重) 与词表大小。只出现在一篇论点中的
+        n-gram 不影响任何相似度，归一化之后即丢弃，词下标只对共享 n-gram 编号。
+        """
+        n = len(texts)
+        doc_ids, keys = self._ngram_keys(texts)
+        if len(keys) == 0:
+            return np.zeros(0, dtype=np.int64), np.zeros(0, dtype=np.int64), np.zeros(0), 0
+
+        terms, term_ids = np.unique(keys, return_inverse=True)
+        pairs, tf = np.unique(doc_ids * len(terms) + term_ids, return_counts=True)
+        pair_docs, pair_terms = np.divmod(pairs, len(terms))
+        df = np.bincount(pair_terms, minlength=len(terms))
+        idf = np.log((1 + n) / (1 + df)) + 1.0
+        weights = (1.0 + np.log(tf)) * idf[pair_terms]
+        norms = np.sqrt(np.bincount(pair_docs, weights=weights * weights, minlength=n))
+        weights /= norms[pair_docs]
+
+        shared = df >= 2
+        keep = shared[pair_terms]
+        column = np.cumsum(shared) - 1
+        return pair_docs[keep], column[pair_terms[keep]], weights[keep], int(shared.sum())
+
+    def similarity_matrix(self, texts: Sequence[str]) -> np.ndarray:
+        """论点两两之间的 TF-IDF 余弦相似度 (n x n)，诊断用；infer 只计算候选论点对"""
+        n = len(texts)
+        sim = np.zeros((n, n), dtype=np.float64)
+        docs, terms, weights, vocabulary = self._vectorize(texts)
+        doc_ptr = np.zeros(n + 1, dtype=np.int64)
+        np.cumsum(np.bincount(docs, minlength=n), out=doc_ptr[1:])
+        scratch = np.zeros(vocabulary)
+        for i in range(1, n):
+            own = slice(doc_ptr[i], doc_ptr[i + 1])
+            scratch[terms[own]] = weights[own]
+            end = doc_ptr[i]
+            sim[i, :i] = np.bincount(docs[:end], weights=weights[:end] * scratch[terms[:end]], minlength=i)
+            scratch[terms[own]] = 0.0
+        return sim + sim.T
+
+    def infer(self, authors: Sequence[str], texts: Sequence[str]) -> List[Tuple[int, int, RelationType, float]]:
+        """推断关系，返回 [(source 下标, target 下标, 关系类型, 强度)]，source 总在 target 之后
+
+        候选目标是 source 之前的对方论点。每方的稀疏向量按发言顺序排成一段，
+        候选目标恰好是对方那段的前缀：把 source 的向量散布到词表长度的暂存数组，
+        再对前缀做一次 gather + bincount，总开销与候选对共享的非零项数成正比，不构造 n x n 矩阵。
+        """
+        n = len(texts)
+        if n < 2:
+            return []
+        is_pro = np.array([author == "pro" for author in authors])
+        docs, terms, weights, vocabulary = self._vectorize(texts)
+        counts = np.bincount(docs, minlength=n)
+
+        sides = {}
+        for side in (True, False):
+            members = np.flatnonzero(is_pro == side)
+            rank = np.zeros(n, dtype=np.int64)
+            rank[members] = np.arange(len(members))
+            postings = is_pro[docs] == side
+            ptr = np.zeros(len(members) + 1, dtype=np.int64)
+            np.cumsum(counts[members], out=ptr[1:])
+            # (成员下标, 前缀的非零项偏移, 本方序号, 词下标, 权重)
+            sides[side] = (members, ptr, rank[docs[postings]], terms[postings], weights[postings])
+        doc_ptr = np.zeros(n + 1, dtype=np.int64)
+        np.cumsum(counts, out=doc_ptr[1:])
+
+        rebuttal = _cue_scores(texts, REBUTTAL_CUES)
+        undermining = _cue_scores(texts, UNDERMINING_CUES)
+        cue = np.maximum(rebuttal, undermining)
+        relations = np.where(
+            rebuttal >= undermining,
+            np.where(rebuttal > 0, 1, 0),
+            2,
+        )
+        relation_types = (RelationType.ATTACKS, RelationType.REBUTS, RelationType.UNDERMINES)
+
+        w_sim, w_cue, w_recency = self.weights
+        scratch = np.zeros(vocabulary)
+        edges = []
+        for source in range(1, n):
+            members, ptr, local, side_terms, side_weights = sides[not is_pro[source]]
+            available = int(np.searchsorted(members, source))
+            if available == 0:
+                continue
+            own = slice(doc_ptr[source], doc_ptr[source + 1])
+            scratch[terms[own]] = weights[own]
+            end = ptr[available]
+            dots = np.bincount(local[:end], weights=side_weights[:end] * scratch[side_terms[:end]], minlength=available)
+            scratch[terms[own]] = 0.0
+
+            # 两个论点之间隔了几条目标方的论点：0 表示紧接着的回应
+            between = available - 1 - np.arange(available)
+            recency = 1.0 / (1.0 + between)
+            similarity = np.minimum(dots / self.similarity_scale, 1.0)
+            scores = np.minimum(w_sim * similarity + w_cue * cue[source] + w_recency * recency, 1.0)
+
+            candidates = np.flatnonzero((scores >= self.threshold) & (scores > 0))
+            best = candidates[np.argsort(-scores[candidates], kind="stable")[:self.max_edges_per_node]]
+            relation = relation_types[relations[source]]
+            for target in best:
+                edges.append((source, int(members[target]), relation, round(float(scores[target]), 3)))
+        return edges
+
+    def apply(self, graph: ArgumentGraph, node_ids: Optional[List[str]] = None) -> int:
+        """为图谱中的论点（默认按添加顺序）推断并添加关系边，返回新增边数"""
+        node_ids = node_ids if node_ids is not None else list(graph.nodes)
+        nodes = [graph.nodes[node_id] for node_id in node_ids]
+        descriptions = {RelationType.ATTACKS: "回应", RelationType.REBUTS: "反驳", RelationType.UNDERMINES: "质疑"}
+        added = 0
+        for source, target, relation, strength in self.infer(
+            [node.author for node in nodes], [node.content for node in nodes]
+        ):
+            edge = graph.add_relation(
+                source_id=node_ids[source],
+                target_id=node_ids[target],
+                relation=relation,
+                strength=strength,
+                description=descriptions[relation],
+            )
+            added += edge is not None
+        return added
@@ -1,13 +1,17 @@
 """
 辩论记录模型
 
-持久化完整辩论数据，包括 trace、图谱、评分和裁决
+持久化辩论结果，包括评分、裁决与运行配置（完整 trace 见 session_trace）
 """
-from sqlalchemy import Column, Integer, String, Text, Float, ForeignKey, JSON, DateTime
-from sqlalchemy.orm import relationship
+from collections import Counter
+from typing import Any, Dict, List, Tuple
+
+from sqlalchemy import Column, Integer, String, Text, Float, ForeignKey, JSON, DateTime, event, insert, inspect, select, update
+from sqlalchemy.orm import Session as DBSession, deferred, relationship
 from datetime import datetime, timezone
 
 from database import Base
+from utils.trace_codec import CompressedJSON
 
 
 class DebateRecord(Base):
@@ -36,11 +40,13 @@ class DebateRecord(Base):
     margin = Column(String(20), nullable=True)  # decisive / close / marginal
 
     # 完整数据（JSON）
-    trace = Column(JSON, nullable=True)          # 完整辩论 trace
+    # 旧版在此另存一份完整 trace；新记录只写 session_trace，启动迁移时移入后清空
+    trace = deferred(Column(CompressedJSON, nullable=True))
     graph = Column(JSON, nullable=True)          # 论点图谱数据
     verdict = Column(JSON, nullable=True)        # 最终裁决
     evaluations = Column(JSON, nullable=True)    # 各轮评分
     run_config = Column(JSON, nullable=True)     # 运行配置
+    usage = Column(JSON, nullable=True)          # LLM 用量（tokens / 延迟，按模型与 Agent 细分）
 
     # 时间
     created_at = Column(DateTime(timezone=True), default=lambda: datetime.now(timezone.utc), index=True)
@@ -53,3 +59,101 @@ class DebateRecord(Base):
         return f"<DebateRecord(id={self.id}, topic='{self.topic[:30]}', winner='{self.winner}')>"
 
 
+class DebateStat(Base):
+    """辩论统计聚合（计数器）
+
+    每行是一个 (metric, bucket) 计数，随 DebateRecord 的插入 / 删除在同一事务内增减：
+    - total: 总场次
+    - winner: 按胜方（pro / con / tie）
+    - mixed: 混合模型场次
+    - model: 按模型（正反方各计一次）
+    - day: 按创建日期（UTC，YYYY-MM-DD）
+    """
+    __tablename__ = "debate_stats"
+
+    metric = Column(String(20), primary_key=True)
+    bucket = Column(String(100), primary_key=True, default="")
+    value = Column(Integer, nullable=False, default=0)
+
+
+# 影响统计的字段，变更时按旧值减、新值加
+STAT_FIELDS = ("winner", "is_mixed", "pro_model", "con_model", "created_at")
+
+
+def debate_stat_keys(values: Dict[str, Any]) -> List[Tuple[str, str]]:
+    """一条辩论记录贡献的统计计数键"""
+    keys = [("total", "")]
+    if values.get("winner"):
+        keys.append(("winner", values["winner"]))
+    if values.get("is_mixed") == 1:
+        keys.append(("mixed", ""))
+    for field in ("pro_model", "con_model"):
+        if values.get(field):
+            keys.append(("model", values[field]))
+    created_at = values.get("created_at")
+    if created_at is not None:
+        if created_at.tzinfo is not None:
+            created_at = created_at.astimezone(timezone.utc)
+        keys.append(("day", created_at.date().isoformat()))
+    return keys
+
+
+def apply_stat_deltas(connection, deltas: Counter) -> None:
+    """把计数增量写入 debate_stats（先 UPDATE，不存在再 INSERT）"""
+    table = DebateStat.__table__
+    for (metric, bucket), delta in deltas.items():
+        if not delta:
+            continue
+        result = connection.execute(
+            update(table)
+            .where(table.c.metric == metric, table.c.bucket == bucket)
+            .values(value=table.c.value + delta)
+        )
+        if result.rowcount == 0:
+            connection.execute(insert(table).values(metric=metric, bucket=bucket, value=delta))
+
+
+def _record_values(record: DebateRecord) -> Dict[str, Any]:
+    return {field: getattr(record, field) for field in STAT_FIELDS}
+
+
+def _stored_values(db, record: DebateRecord) -> Dict[str, Any]:
+    """数据库中的当前值（提交后属性已过期，修改时拿不到旧值，只能回读）"""
+    table = DebateRecord.__table__
+    row = db.connection().execute(
+        select(*(table.c[field] for field in STAT_FIELDS)).where(table.c.id == record.id)
+    ).first()
+    return dict(row._mapping) if row is not None else {}
+
+
+@event.listens_for(DBSession, "before_flush")
+def _collect_debate_stat_changes(db, flush_context, instances):
+    """删除 / 修改前记下旧值（flush 之后旧行已被覆盖或删除）"""
+    deltas = Counter()
+    for obj in db.deleted:
+        if isinstance(obj, DebateRecord):
+            stored = _stored_values(db, obj)
+            if stored:
+                deltas.subtract(debate_stat_keys(stored))
+    for obj in db.dirty:
+        if not isinstance(obj, DebateRecord):
+            continue
+        state = inspect(obj)
+        if any(state.attrs[field].history.has_changes() for field in STAT_FIELDS):
+            stored = _stored_values(db, obj)
+            if stored:
+                deltas.subtract(debate_stat_keys(stored))
+                deltas.update(debate_stat_keys(_record_values(obj)))
+    # 每次 flush 重新计算；上一次 flush 失败时残留的增量被覆盖
+    db.info["debate_stat_deltas"] = deltas
+
+
+@event.listens_for(DBSession, "after_flush")
+def _sync_debate_stats(db, flush_context):
+    """在写入 DebateRecord 的同一事务内维护 debate_stats"""
+    deltas = db.info.pop("debate_stat_deltas", None) or Counter()
+    for obj in db.new:
+        if isinstance(obj, DebateRecord):
+            deltas.update(debate_stat_keys(_record_values(obj)))
+    if deltas:
+        apply_stat_deltas(db.connection(), deltas)
@@ -1,10 +1,12 @@
 """
 数据库模型 - Session和Message
 """
+from collections import Counter
 from datetime import datetime, timezone
-from sqlalchemy import Column, Integer, String, DateTime, Text, ForeignKey, JSON
-from sqlalchemy.orm import relationship
+from sqlalchemy import Column, Integer, String, DateTime, Text, ForeignKey, JSON, Index, event, update
+from sqlalchemy.orm import Session as DBSession, relationship
 from database import Base
+from utils.trace_codec import CompressedJSON
 
 
 class Session(Base):
@@ -17,8 +19,17 @@ class Session(Base):
     created_at = Column(DateTime(timezone=True), default=lambda: datetime.now(timezone.utc), index=True)
     updated_at = Column(DateTime(timezone=True), default=lambda: datetime.now(timezone.utc), onupdate=lambda: datetime.now(timezone.utc))
     settings = Column(JSON)  # 存储会话设置
+    message_count = Column(Integer, nullable=False, default=0, server_default="0")  # 由 flush 钩子维护
+
+    __table_args__ = (
+        # 按类型筛选的历史列表：(session_type, created_at, id) 上的键集分页
+        Index("ix_session_type_created_at", "session_type", "created_at"),
+    )
 
     messages = relationship("Message", back_populates="session", cascade="all, delete-orphan")
+    # 体积较大的 trace / final_state 单独存放，只在需要时加载
+    trace_store = relationship("SessionTrace", uselist=False, back_populates="session", cascade="all, delete-orphan")
+    graph_store = relationship("SessionGraph", uselist=False, back_populates="session", cascade="all, delete-orphan")
 
     def to_dict(self):
         return {
@@ -28,6 +39,7 @@ class Session(Base):
             "created_at": self.created_at.isoformat() if self.created_at else None,
             "updated_at": self.updated_at.isoformat() if self.updated_at else None,
             "settings": self.settings,
+            "message_count": self.message_count,
             "messages": [msg.to_dict() for msg in self.messages]
         }
 
@@ -53,3 +65,55 @@ class Message(Base):
             "created_at": self.created_at.isoformat() if self.created_at else None,
             "meta_info": self.meta_info
         }
+
+
+class SessionTrace(Base):
+    """会话 trace 存储
+
+    完整 trace 与最终状态往往有数百 KB，放在 Session.settings 里会让
+    历史列表、会话查找等只需要元数据的查询也一并加载解析。
+    """
+    __tablename__ = "session_trace"
+
+    session_id = Column(Integer, ForeignKey("session.id"), primary_key=True)
+    trace = Column(CompressedJSON)  # 辩论 / 辩证法 trace（去重压缩存储）
+    final_state = Column(CompressedJSON)  # 协调器最终状态
+    updated_at = Column(DateTime(timezone=True), default=lambda: datetime.now(timezone.utc), onupdate=lambda: datetime.now(timezone.utc))
+
+    session = relationship("Session", back_populates="trace_store")
+
+
+class SessionGraph(Base):
+    """会话论点图谱缓存
+
+    按 session_id 存放构建好的图谱、评分与 Mermaid 文本（见 services/graph_store.py），
+    任何类型的会话都可以缓存，不依赖 DebateRecord 是否存在。
+    """
+    __tablename__ = "session_graph"
+
+    session_id = Column(Integer, ForeignKey("session.id"), primary_key=True)
+    payload = Column(CompressedJSON)  # {"version", "graph", "mermaid", "scores"}
+    updated_at = Column(DateTime(timezone=True), default=lambda: datetime.now(timezone.utc), onupdate=lambda: datetime.now(timezone.utc))
+
+    session = relationship("Session", back_populates="graph_store")
+
+
+@event.listens_for(DBSession, "after_flush")
+def _sync_message_counts(db, flush_context):
+    """按会话汇总本次 flush 新增 / 删除的消息，更新 Session.message_count"""
+    deltas = Counter()
+    for obj in db.new:
+        if isinstance(obj, Message) and obj.session_id is not None:
+            deltas[obj.session_id] += 1
+    for obj in db.deleted:
+        if isinstance(obj, Message) and obj.session_id is not None:
+            deltas[obj.session_id] -= 1
+    table = Session.__table__
+    connection = db.connection()
+    for session_id, delta in deltas.items():
+        if delta:
+            connection.execute(
+                update(table)
+                .where(table.c.id == session_id)
+                .values(message_count=table.c.message_count + delta)
+            )
@@ -3,13 +3,15 @@
 
 提供辩论数据的查询和统计
 """
-from fastapi import APIRouter, Depends, HTTPException
+from fastapi import APIRouter, Depends, HTTPException, Query
 from sqlalchemy.orm import Session as DBSession
-from sqlalchemy import func
 
-from database import get_db
+from database import get_read_db
 from models.session import Session
 from models.debate_record import DebateRecord
+from services.debate_stats import read_debate_stats
+from services.graph_store import load_graph_payload
+from services.trace_store import load_session_trace
 from utils.logger import get_logger
 
 logger = get_logger(__name__)
@@ -18,7 +20,7 @@ router = APIRouter(prefix="/api/analysis", tags=["analysis"])
 
 
 @router.get("/debate/{session_id}")
-async def get_debate_analysis(session_id: int, db: DBSession = Depends(get_db)):
+async def get_debate_analysis(session_id: int, db: DBSession = Depends(get_read_db)):
     """获取完整辩论分析数据"""
     record = db.query(DebateRecord).filter(DebateRecord.session_id == session_id).first()
     if not record:
@@ -37,8 +39,8 @@ async def get_debate_analysis(session_id: int, db: DBSession = Depends(get_db)):
         "total_score_pro": record.total_score_pro,
         "total_score_con": record.total_score_con,
         "margin": record.margin,
-        "trace": record.trace,
-        "graph": record.graph,
+        "trace": load_session_trace(db, session_id),
+        "graph": load_graph_payload(db, session_id),
         "verdict": record.verdict,
         "evaluations": record.evaluations,
         "run_config": record.run_config,
@@ -48,32 +50,9 @@ async def get_debate_analysis(session_id: int, db: DBSession = Depends(get_db)):
 
 
 @router.get("/stats")
-async def get_debate_stats(db: DBSession = Depends(get_db)):
-    """获取辩论统计数据"""
-    total = db.query(func.count(DebateRecord.id)).scalar() or 0
-    pro_wins = db.query(func.count(DebateRecord.id)).filter(DebateRecord.winner == "pro").scalar() or 0
-    con_wins = db.query(func.count(DebateRecord.id)).filter(DebateRecord.winner == "con").scalar() or 0
-    ties = db.query(func.count(DebateRecord.id)).filter(DebateRecord.winner == "tie").scalar() or 0
-    mixed_count = db.query(func.count(DebateRecord.id)).filter(DebateRecord.is_mixed == 1).scalar() or 0
-
-    # 模型使用统计
-    model_stats = {}
-    pro_model_rows = db.query(DebateRecord.pro_model, func.count(DebateRecord.id)).filter(
-        DebateRecord.pro_model.isnot(None)
-    ).group_by(DebateRecord.pro_model).all()
-    con_model_rows = db.query(DebateRecord.con_model, func.count(DebateRecord.id)).filter(
-        DebateRecord.con_model.isnot(None)
-    ).group_by(DebateRecord.con_model).all()
-    for model_name, count in pro_model_rows:
-        model_stats[model_name] = model_stats.get(model_name, 0) + count
-    for model_name, count in con_model_rows:
-        model_stats[model_name] = model_stats.get(model_name, 0) + count
-
-    return {
-        "total_debates": total,
-        "pro_wins": pro_wins,
-        "con_wins": con_wins,
-        "ties": ties,
-        "mixed_model_debates": mixed_count,
-        "model_usage": model_stats,
-    }
+async def get_debate_stats(
+    days: int = Query(0, ge=0, le=366, description="附带最近 N 天的每日场次，0 表示不返回"),
+    db: DBSession = Depends(get_read_db),
+):
+    """获取辩论统计数据（读取增量维护的 debate_stats 聚合表）"""
+    return read_debate_stats(db, days=days)
@@ -17,7 +17,9 @@ from models.session import Session, Message
 from schemas.chat import ChatRequest, ChatMessage
 from services.ai_client import AIClient
 from services.dual_chat import create_dual_chat, ROLE_TEMPLATES
-from utils import get_api_key, mark_session_status, resolve_prompt, sse_event, sse_response
+from services.db_writer import get_db_writer
+from services.write_behind import WriteBehindBuffer
+from utils import ContentStreamEncoder, StreamMode, get_api_key, mark_session_status, resolve_prompt, sse_event, sse_response
 from utils.logger import get_logger
 
 router = APIRouter(prefix="/api", tags=["chat"])
@@ -143,11 +145,14 @@ async def stream_chat(
     provider: str = DEFAULT_PROVIDER,
     model: str = DEFAULT_MODEL,
     session_id: Optional[int] = None,
+    stream_mode: StreamMode = Query("cumulative", description="cumulative：每帧累计全文（兼容）；delta：只发增量"),
     db: DBSession = Depends(get_db)
 ):
     """流式对话接口"""
 
     async def generate():
+        writer = get_db_writer()
+        encoder = ContentStreamEncoder(stream_mode)
         session = None
         try:
             api_key = get_api_key(provider)
@@ -156,7 +161,8 @@ async def stream_chat(
             history_list = _parse_history(history)
             messages = build_chat_messages(message, history_list)
 
-            session = _get_or_create_chat_session(
+            session = await writer.run(
+                _get_or_create_chat_session,
                 db=db,
                 session_id=session_id,
                 message=message,
@@ -164,44 +170,45 @@ async def stream_chat(
                 model=model,
             )
             mark_session_status(session, "running")
-            db.commit()
+            await writer.commit(db, session)
 
             yield sse_event({"type": "session", "session_id": session.id})
 
             user_msg = Message(session_id=session.id, role="user", content=message)
             db.add(user_msg)
-            db.commit()
+            await writer.commit(db, session)
 
             full_response = ""
             async for chunk in client.chat_stream(messages):
+                offset = len(full_response)
                 full_response += chunk
-                yield sse_event({"type": "content", "content": full_response})
+                yield encoder.event({"type": "content", "content": full_response, "delta": chunk, "offset": offset})
 
             assistant_msg = Message(session_id=session.id, role="assistant", content=full_response)
             db.add(assistant_msg)
             mark_session_status(session, "completed")
-            db.commit()
+            await writer.commit(db)
 
             yield sse_event({"type": "complete"})
 
         except HTTPException as e:
-            db.rollback()
+            await writer.rollback(db)
             if session is not None:
                 try:
                     mark_session_status(session, "failed", str(e.detail))
-                    db.commit()
+                    await writer.commit(db)
                 except Exception:
-                    db.rollback()
+                    await writer.rollback(db)
                     logger.exception("failed to mark chat session as failed")
             yield sse_event({"type": "error", "error": e.detail})
         except Exception as e:
-            db.rollback()
+            await writer.rollback(db)
             if session is not None:
                 try:
                     mark_session_status(session, "failed", str(e))
-                    db.commit()
+                    await writer.commit(db)
                 except Exception:
-                    db.rollback()
+                    await writer.rollback(db)
                     logger.exception("failed to mark chat session as failed")
             logger.exception("stream chat failed")
             yield sse_event({"type": "error", "error": str(e)})
@@ -238,6 +245,7 @@ async def stream_dual_chat(
     turns: int = Query(3, ge=1, le=20),
     provider: str = DEFAULT_PROVIDER,
     model: str = DEFAULT_MODEL,
+    stream_mode: StreamMode = Query("cumulative", description="cumulative：每帧累计全文（兼容）；delta：只发增量"),
     db: DBSession = Depends(get_db)
 ):
     """
@@ -253,7 +261,10 @@ async def stream_dual_chat(
         - complete: 对话结束
     """
     async def generate():
+        writer = get_db_writer()
+        encoder = ContentStreamEncoder(stream_mode)
         session = None
+        buffer = None
         try:
             api_key = get_api_key(provider)
             client = AIClient(provider=provider, model=model, api_key=api_key)
@@ -279,17 +290,18 @@ async def stream_dual_chat(
                 },
             )
             db.add(session)
-            db.commit()
-            db.refresh(session)
+            await writer.commit(db, session)
+            session_id = session.id
+            buffer = WriteBehindBuffer(db, session, writer=writer)
 
-            yield sse_event({"type": "session", "session_id": session.id})
+            yield sse_event({"type": "session", "session_id": session_id})
 
             async for event in dual_chat.run_conversation(turns=turns):
-                yield sse_event(event, ensure_ascii=False)
+                yield encoder.event(event)
 
                 if event.get("type") == "message_complete":
                     msg = Message(
-                        session_id=session.id,
+                        session_id=session_id,
                         role=event.get("speaker", "unknown"),
                         content=event.get("content", ""),
                         meta_info={
@@ -298,19 +310,24 @@ async def stream_dual_chat(
                             "mode": "dual_character",
                         },
                     )
-                    db.add(msg)
+                    await buffer.add(msg)
+                    if event.get("turn", 0) % 2 == 0:
+                        # 双方各发言一次视为一轮，轮次边界强制落库
+                        await buffer.checkpoint()
 
-            mark_session_status(session, "completed")
-            db.commit()
+            await buffer.update_settings({"status": "completed"})
+            await buffer.close()
 
         except Exception as e:
-            db.rollback()
+            if buffer is not None:
+                await buffer.abort()
+            await writer.rollback(db)
             if session is not None:
                 try:
                     mark_session_status(session, "failed", str(e))
-                    db.commit()
+                    await writer.commit(db)
                 except Exception:
-                    db.rollback()
+                    await writer.rollback(db)
                     logger.exception("failed to mark dual chat session as failed")
             logger.exception("dual chat failed")
             yield sse_event({"type": "error", "error": str(e)})
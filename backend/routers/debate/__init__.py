@@ -8,6 +8,7 @@ from fastapi import APIRouter
 from .legacy import router as legacy_router
 from .agent import router as agent_router
 from .graph import router as graph_router
+from .batch import router as batch_router
 
 # 创建主路由器
 router = APIRouter(prefix="/api", tags=["debate"])
@@ -16,3 +17,4 @@ router = APIRouter(prefix="/api", tags=["debate"])
 router.include_router(legacy_router)
 router.include_router(agent_router)
 router.include_router(graph_router)
+router.include_router(batch_router)
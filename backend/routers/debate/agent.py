@@ -9,12 +9,16 @@ from sqlalchemy.orm import Session as DBSession
 
 from config import DEFAULT_MODEL, DEFAULT_PROVIDER
 from database import get_db
-from models.session import Session, Message
+from models.session import Session
 from schemas.debate import DebateRequest
 from services.ai_client import AIClient
+from services.debate_records import build_argument_message, build_debate_record
+from services.graph_store import build_graph_payload, save_graph_payload
+from services.trace_store import build_session_trace
 from agents import DebateOrchestrator
-from models.debate_record import DebateRecord
-from utils import get_api_key, mark_session_status, merge_session_settings, sse_event, sse_response
+from services.db_writer import get_db_writer
+from services.write_behind import WriteBehindBuffer
+from utils import ContentStreamEncoder, StreamMode, get_api_key, mark_session_status, merge_session_settings, sse_event, sse_response
 from utils.logger import get_logger
 
 logger = get_logger(__name__)
@@ -35,6 +39,9 @@ async def agent_stream_debate(
     pro_model: Optional[str] = None,
     con_provider: Optional[str] = None,
     con_model: Optional[str] = None,
+    pipeline_rounds: bool = False,
+    pipeline_jury: bool = False,
+    stream_mode: StreamMode = Query("cumulative", description="cumulative：每帧累计全文（兼容）；delta：只发增量"),
     db: DBSession = Depends(get_db)
 ):
     """
@@ -55,10 +62,18 @@ async def agent_stream_debate(
     - standings: 实时比分
     - verdict: 最终裁决
     - complete: 辩论完成
+
+    pipeline_rounds=true 时启用流水线轮次（评审与下一轮分析预取并行）。
+    pipeline_jury=true 时评审与下一轮发言并行，评审反馈滞后一轮下发。
+    stream_mode=delta 时 argument 帧只携带 delta / offset（定期附带 checksum），
+    完整论点以 argument_complete 为准；默认 cumulative 保持每帧发送累计全文。
     """
     
     async def generate():
+        writer = get_db_writer()
+        encoder = ContentStreamEncoder(stream_mode)
         session = None
+        buffer = None
         try:
             api_key = get_api_key(provider)
             
@@ -78,11 +93,13 @@ async def agent_stream_debate(
                 }
             )
             db.add(session)
-            db.commit()
-            db.refresh(session)
+            await writer.commit(db, session)
+            session_id = session.id
+            buffer = WriteBehindBuffer(db, session, writer=writer)
+            arguments = []
             
-            logger.info(f"创建 Multi-Agent 辩论会话: {session.id}")
-            yield sse_event({"type": "session", "session_id": session.id})
+            logger.info(f"创建 Multi-Agent 辩论会话: {session_id}")
+            yield sse_event({"type": "session", "session_id": session_id})
             
             # 创建 AI 客户端和协调器
             ai_client = AIClient(provider=provider, model=model, api_key=api_key, seed=seed)
@@ -108,9 +125,12 @@ async def agent_stream_debate(
                 seed=seed,
                 preset=preset,
                 pro_ai_client=pro_ai_client,
-                con_ai_client=con_ai_client
+                con_ai_client=con_ai_client,
+                pipeline_rounds=pipeline_rounds,
+                pipeline_jury=pipeline_jury,
+                session_id=session_id,
             )
-            merge_session_settings(session, {
+            await buffer.update_settings({
                 "rounds": orchestrator.total_rounds,
                 "temperature": orchestrator.run_config.get("temperature"),
                 "seed": orchestrator.run_config.get("seed"),
@@ -118,85 +138,54 @@ async def agent_stream_debate(
             })
             
             # 运行辩论 - 使用流式版本
-            messages_to_save = []
-            
             async for event in orchestrator.run_debate_streaming():
                 event_type = event.get("type", "")
                 
                 if event_type not in ("argument",):
                     logger.debug(f"Event: {event_type}")
                 
-                yield sse_event(event, ensure_ascii=False)
+                yield encoder.event(event)
                 
-                # 只收集完整论点
+                # 完整论点写入缓冲；新一轮开始时上一轮的论点必须已落库
                 if event_type == "argument_complete":
-                    messages_to_save.append({
-                        "round": event.get("round"),
-                        "side": event.get("side"),
-                        "name": event.get("name"),
-                        "content": event.get("content"),
-                        "thinking": None
-                    })
-            
-            # 保存所有消息到数据库
-            for msg_data in messages_to_save:
-                role = msg_data.get("name", msg_data.get("side", "unknown"))
-                message = Message(
-                    session_id=session.id,
-                    role=role,
-                    content=msg_data.get("content", ""),
-                    meta_info={
-                        "round": msg_data.get("round"),
-                        "side": msg_data.get("side"),
-                        "mode": "multi-agent"
-                    }
-                )
-                db.add(message)
+                    arguments.append(event)
+                    await buffer.add(build_argument_message(session_id, event))
+                elif event_type == "round_start":
+                    await buffer.checkpoint()
             
             # 保存最终状态
             final_state = orchestrator.get_full_state()
             trace = orchestrator.build_trace()
-            merge_session_settings(session, {
-                "final_state": final_state,
-                "trace": trace,
-                "status": "completed",
-            })
+            await buffer.update_settings({"status": "completed"})
 
-            # 保存 DebateRecord
-            run_cfg = orchestrator.run_config
-            verdict_data = trace.get("verdict") or {}
-            debate_record = DebateRecord(
-                session_id=session.id,
-                topic=topic,
-                total_rounds=orchestrator.total_rounds,
-                winner=verdict_data.get("winner"),
-                pro_provider=run_cfg.get("pro_provider", run_cfg.get("provider")),
-                pro_model=run_cfg.get("pro_model", run_cfg.get("model")),
-                con_provider=run_cfg.get("con_provider", run_cfg.get("provider")),
-                con_model=run_cfg.get("con_model", run_cfg.get("model")),
-                jury_model=run_cfg.get("model"),
-                is_mixed=1 if run_cfg.get("mixed_model") else 0,
-                total_score_pro=verdict_data.get("pro_total_score", 0),
-                total_score_con=verdict_data.get("con_total_score", 0),
-                margin=verdict_data.get("margin"),
-                trace=trace,
-                verdict=verdict_data,
-                evaluations=trace.get("evaluations"),
-                run_config=run_cfg,
+            # 保存 trace 与 DebateRecord
+            await buffer.add(
+                build_session_trace(session_id, trace, final_state),
+                build_debate_record(session_id, orchestrator, trace),
             )
-            db.add(debate_record)
-            
-            db.commit()
-            logger.info(f"Multi-Agent 辩论完成: 会话 {session.id}")
+            await buffer.close()
+
+            # 论点图谱单独按 session_id 覆盖写入：前端收到裁决后可能已经请求并缓存了
+            # 不完整的图谱，图谱写入失败也不影响已完成的辩论
+            payload = build_graph_payload(topic, [build_argument_message(session_id, event) for event in arguments])
+            if payload is not None:
+                try:
+                    await writer.run(save_graph_payload, db, session_id, payload)
+                except Exception:
+                    await writer.rollback(db)
+                    logger.exception(f"保存论点图谱失败: 会话 {session_id}")
+            logger.info(f"Multi-Agent 辩论完成: 会话 {session_id}")
             
         except Exception as e:
-            db.rollback()
+            if buffer is not None:
+                await buffer.abort()
+            await writer.rollback(db)
             if session is not None:
                 try:
                     mark_session_status(session, "failed", str(e))
-                    db.commit()
+                    await writer.commit(db)
                 except Exception:
-                    db.rollback()
+                    await writer.rollback(db)
                     logger.exception("failed to mark agent debate session as failed")
             import traceback
             error_detail = traceback.format_exc()
@@ -259,7 +248,10 @@ async def agent_debate(
             model=request.model,
             temperature=request.temperature,
             seed=request.seed,
-            preset=request.preset
+            preset=request.preset,
+            pipeline_rounds=request.pipeline_rounds,
+            pipeline_jury=request.pipeline_jury,
+            session_id=session.id,
         )
         merge_session_settings(session, {
             "rounds": orchestrator.total_rounds,
@@ -275,19 +267,9 @@ async def agent_debate(
 
             # 保存完整论点消息
             if event.get("type") == "argument_complete":
-                message = Message(
-                    session_id=session.id,
-                    role=event.get("name", event.get("side")),
-                    content=event.get("content", ""),
-                    meta_info={
-                        "round": event.get("round"),
-                        "side": event.get("side"),
-                        "mode": "multi-agent",
-                    },
-                )
-                db.add(message)
+                db.add(build_argument_message(session.id, event))
         
-        merge_session_settings(session, {"trace": orchestrator.build_trace()})
+        db.add(build_session_trace(session.id, orchestrator.build_trace()))
         db.commit()
         
         # 提取关键信息
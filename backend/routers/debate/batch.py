@@ -0,0 +1,99 @@
+"""
+批量辩论 API
+
+提交 N 个辩题 × M 组模型配对的批量任务，在后台运行并查询进度
+"""
+import asyncio
+from typing import Dict
+
+from fastapi import APIRouter, HTTPException
+
+from schemas.debate import BatchDebateRequest
+from services.batch_runner import BatchRunner, ModelPairing, build_jobs
+from utils.logger import get_logger
+
+logger = get_logger(__name__)
+
+router = APIRouter()
+
+# 进程内批量任务注册表（batch_id -> runner / task）
+_runners: Dict[str, BatchRunner] = {}
+_tasks: Dict[str, asyncio.Task] = {}
+
+
+def _on_batch_done(batch_id: str, task: asyncio.Task) -> None:
+    _tasks.pop(batch_id, None)
+    if not task.cancelled() and task.exception() is not None:
+        logger.error(f"批量辩论 {batch_id} 异常结束: {task.exception()}")
+
+
+@router.post("/debate/batch")
+async def create_batch(request: BatchDebateRequest):
+    """提交批量辩论任务，立即返回 batch_id；已存在 DebateRecord 的组合会被跳过"""
+    pairings = [
+        ModelPairing(
+            pro_provider=item.pro_provider,
+            pro_model=item.pro_model,
+            con_provider=item.con_provider or item.pro_provider,
+            con_model=item.con_model or item.pro_model,
+        )
+        for item in request.pairings
+    ]
+    jobs = build_jobs(
+        request.topics,
+        pairings,
+        rounds=request.rounds,
+        temperature=request.temperature,
+        seed=request.seed,
+        preset=request.preset,
+    )
+    if not jobs:
+        raise HTTPException(status_code=400, detail="没有有效的辩题")
+
+    runner = BatchRunner(
+        jobs,
+        provider_concurrency=request.concurrency,
+        provider_rpm=request.rpm,
+        commit_every=request.commit_every,
+        pipeline_rounds=request.pipeline_rounds,
+        pipeline_jury=request.pipeline_jury,
+    )
+    _runners[runner.batch_id] = runner
+    task = asyncio.create_task(runner.run())
+    _tasks[runner.batch_id] = task
+    task.add_done_callback(lambda t, batch_id=runner.batch_id: _on_batch_done(batch_id, t))
+
+    logger.info(f"创建批量辩论 {runner.batch_id}: {len(jobs)} 个任务")
+    return {"batch_id": runner.batch_id, "total": len(jobs), "status": runner.status}
+
+
+@router.get("/debate/batch")
+async def list_batches():
+    """列出当前进程内的批量任务（不含逐条结果）"""
+    batches = []
+    for runner in _runners.values():
+        summary = runner.progress()
+        summary.pop("results", None)
+        batches.append(summary)
+    return {"batches": batches}
+
+
+@router.get("/debate/batch/{batch_id}")
+async def get_batch(batch_id: str):
+    """查询批量任务进度与吞吐统计"""
+    runner = _runners.get(batch_id)
+    if runner is None:
+        raise HTTPException(status_code=404, detail="批量任务不存在")
+    return runner.progress()
+
+
+@router.delete("/debate/batch/{batch_id}")
+async def cancel_batch(batch_id: str):
+    """取消运行中的批量任务；已完成的结果会先提交"""
+    runner = _runners.get(batch_id)
+    if runner is None:
+        raise HTTPException(status_code=404, detail="批量任务不存在")
+    task = _tasks.get(batch_id)
+    if task is not None and not task.done():
+        task.cancel()
+    return {"batch_id": batch_id, "status": "cancelling" if task is not None else runner.status}
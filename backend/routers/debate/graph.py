@@ -3,118 +3,109 @@
 
 提供论点关系可视化和分析接口
 """
+from typing import Any, Dict
+
 from fastapi import APIRouter, Depends, HTTPException
+from sqlalchemy import select
 from sqlalchemy.orm import Session as DBSession
 
-from database import get_db
+from config import DEFAULT_MODEL, DEFAULT_PROVIDER, get_settings
+from database import get_read_db, get_session_factory
+from memory import ArgumentAnalyzer
 from models.session import Session, Message
-from memory import ArgumentGraph, ArgumentAnalyzer, RelationType, ArgumentStrength
+from services.ai_client import AIClient
+from services.db_writer import get_db_writer
+from services.graph_store import build_analyzed_payload, load_graph_payload, rebuild_graph_payload, save_graph_payload
+from utils import get_api_key
 from utils.logger import get_logger
 
 logger = get_logger(__name__)
 
 router = APIRouter()
-ROLE_TO_AUTHOR = {
-    "正方": "pro",
-    "反方": "con",
-    "pro": "pro",
-    "con": "con",
-}
+
+
+def _store_graph(session_factory, session_id: int, payload: Dict[str, Any]) -> Dict[str, Any]:
+    """在写线程中打开写会话保存图谱；已被并发请求写入时采用已保存的结果"""
+    with session_factory() as write_db:
+        return save_graph_payload(write_db, session_id, payload, replace=False)
+
+
+async def _load_or_build_graph(session_id: int, db: DBSession, session_factory) -> Dict[str, Any]:
+    """优先读取持久化的图谱；缺失或过期时从消息重建，并只在此时经写线程写回"""
+    payload = load_graph_payload(db, session_id)
+    if payload is None:
+        session = db.query(Session).filter(Session.id == session_id).first()
+        if not session:
+            raise HTTPException(status_code=404, detail="Session not found")
+
+        logger.info(f"构建论点图谱: 会话 {session_id}")
+        payload = rebuild_graph_payload(db, session_id, session.topic or "")
+        if payload is None:
+            has_messages = db.execute(
+                select(Message.id).where(Message.session_id == session_id).limit(1)
+            ).first() is not None
+            return {"error": "No debater messages in session" if has_messages else "No messages in session"}
+        payload = await get_db_writer().run(_store_graph, session_factory, session_id, payload)
+    return payload
+
+
+async def _build_analyzed_graph(
+    session_id: int,
+    db: DBSession,
+    provider: str,
+    model: str,
+    batched: bool,
+) -> Dict[str, Any]:
+    session = db.query(Session).filter(Session.id == session_id).first()
+    if not session:
+        raise HTTPException(status_code=404, detail="Session not found")
+
+    settings = get_settings()
+    analyzer = ArgumentAnalyzer(
+        AIClient(provider=provider, model=model, api_key=get_api_key(provider)),
+        max_concurrency=settings.graph_analyzer_concurrency,
+        batch_size=settings.graph_analyzer_batch_size,
+    )
+    logger.info(f"AI 分析论点图谱: 会话 {session_id}, batched={batched}")
+    payload = await build_analyzed_payload(db, session_id, session.topic or "", analyzer, batched=batched)
+    return payload if payload is not None else {"error": "No debater messages in session"}
 
 
 @router.get("/debate/{session_id}/graph")
 async def get_argument_graph(
     session_id: int,
     analyze: bool = False,
-    db: DBSession = Depends(get_db)
+    db: DBSession = Depends(get_read_db),
+    session_factory=Depends(get_session_factory),
+    provider: str = DEFAULT_PROVIDER,
+    model: str = DEFAULT_MODEL,
+    batched: bool = True,
 ):
     """
     获取辩论会话的论点图谱
     
     Args:
         session_id: 会话 ID
-        analyze: 是否使用 AI 分析论点关系（较慢但更准确）
+        analyze: 是否使用 AI 分析论点关系（较慢但更准确，结果不落库）
+        provider / model: AI 分析使用的模型
+        batched: AI 分析时把多条论点 / 论点对合并到一次调用中
         
     Returns:
         论点图谱数据，包括节点、边和摘要
     """
     try:
-        # 获取会话
-        session = db.query(Session).filter(Session.id == session_id).first()
-        if not session:
-            raise HTTPException(status_code=404, detail="Session not found")
-        
-        # 获取消息
-        messages = db.query(Message).filter(
-            Message.session_id == session_id
-        ).order_by(Message.created_at).all()
-        
-        if not messages:
-            return {"error": "No messages in session"}
-        
-        logger.info(f"构建论点图谱: 会话 {session_id}, 消息数 {len(messages)}")
-        
-        # 构建图谱
-        graph = ArgumentGraph(topic=session.topic or "")
-        
-        # 添加论点节点（仅保留辩手消息，跳过 user/assistant/system 等）
-        for msg in messages:
-            author = ROLE_TO_AUTHOR.get(msg.role or "")
-            if not author:
-                continue
-            round_num = msg.meta_info.get("round", 1) if msg.meta_info else 1
-            
-            # 简单的关键点提取
-            content = msg.content or ""
-            sentences = [s.strip() for s in content.replace("。", ".").split(".") if s.strip()]
-            key_points = sentences[:3] if len(sentences) > 3 else sentences
-            
-            # 根据内容长度判断强度
-            strength = ArgumentStrength.MODERATE
-            if len(content) > 400:
-                strength = ArgumentStrength.STRONG
-            elif len(content) < 100:
-                strength = ArgumentStrength.WEAK
-            
-            graph.add_argument(
-                content=content,
-                author=author,
-                round_num=round_num,
-                key_points=key_points,
-                strength=strength
-            )
-
-        if not graph.nodes:
-            return {"error": "No debater messages in session"}
-        
-        # 简单的关系推断
-        node_list = list(graph.nodes.values())
-        for i in range(1, len(node_list)):
-            current = node_list[i]
-            prev = node_list[i - 1]
-            
-            if current.author != prev.author:
-                graph.add_relation(
-                    source_id=current.id,
-                    target_id=prev.id,
-                    relation=RelationType.ATTACKS,
-                    strength=0.6,
-                    description="回应"
-                )
-            else:
-                graph.add_relation(
-                    source_id=current.id,
-                    target_id=prev.id,
-                    relation=RelationType.BUILDS_ON,
-                    strength=0.5,
-                    description="延续"
-                )
-        
+        if analyze:
+            payload = await _build_analyzed_graph(session_id, db, provider, model, batched)
+        else:
+            payload = await _load_or_build_graph(session_id, db, session_factory)
+        if "error" in payload:
+            return payload
         return {
             "session_id": session_id,
-            "graph": graph.to_dict(),
-            "mermaid": graph.to_mermaid(),
-            "scores": graph.calculate_debate_score(),
+            "graph": payload["graph"],
+            "mermaid": payload["mermaid"],
+            "scores": payload["scores"],
+            "analyzed": payload.get("analyzed", False),
         }
         
     except HTTPException:
@@ -127,21 +118,23 @@ async def get_argument_graph(
 @router.get("/debate/{session_id}/graph/mermaid")
 async def get_argument_graph_mermaid(
     session_id: int,
-    db: DBSession = Depends(get_db)
+    db: DBSession = Depends(get_read_db),
+    session_factory=Depends(get_session_factory),
 ):
     """
     获取 Mermaid 格式的论点图谱
     
     可直接用于前端渲染
     """
-    result = await get_argument_graph(session_id, False, db)
+    result = await get_argument_graph(session_id, db=db, session_factory=session_factory)
     return {"mermaid": result.get("mermaid", "")}
 
 
 @router.get("/debate/{session_id}/analysis")
 async def get_debate_analysis(
     session_id: int,
-    db: DBSession = Depends(get_db)
+    db: DBSession = Depends(get_read_db),
+    session_factory=Depends(get_session_factory),
 ):
     """
     获取辩论分析
@@ -152,7 +145,7 @@ async def get_debate_analysis(
     - 未被反驳的论点
     - 关键转折点
     """
-    result = await get_argument_graph(session_id, False, db)
+    result = await get_argument_graph(session_id, db=db, session_factory=session_factory)
     graph_data = result.get("graph", {})
     scores = result.get("scores", {})
     
@@ -11,7 +11,9 @@ from database import get_db
 from models.session import Session, Message
 from schemas.debate import DebateRequest
 from services.debater import Debater
-from utils import get_api_key, mark_session_status, sse_event, sse_response
+from services.db_writer import get_db_writer
+from services.write_behind import WriteBehindBuffer
+from utils import ContentStreamEncoder, StreamMode, get_api_key, mark_session_status, sse_event, sse_response
 from utils.logger import get_logger
 from config import DEFAULT_MODEL, DEFAULT_PROVIDER, RUN_CONFIG_PRESETS
 
@@ -141,12 +143,16 @@ async def stream_debate(
     temperature: Optional[float] = None,
     seed: Optional[int] = None,
     preset: Optional[Literal["basic", "quality", "budget"]] = None,
+    stream_mode: StreamMode = Query("cumulative", description="cumulative：每帧累计全文（兼容）；delta：只发增量"),
     db: DBSession = Depends(get_db)
 ):
     """流式辩论接口"""
     
     async def generate():
+        writer = get_db_writer()
+        encoder = ContentStreamEncoder(stream_mode)
         session = None
+        buffer = None
         try:
             api_key = get_api_key(provider)
             preset_config = RUN_CONFIG_PRESETS.get(preset, {}) if preset else {}
@@ -170,11 +176,12 @@ async def stream_debate(
                 }
             )
             db.add(session)
-            db.commit()
-            db.refresh(session)
+            await writer.commit(db, session)
+            session_id = session.id
+            buffer = WriteBehindBuffer(db, session, writer=writer)
             
             # 发送会话ID
-            yield sse_event({"type": "session", "session_id": session.id})
+            yield sse_event({"type": "session", "session_id": session_id})
             
             # 创建辩论者
             pro_debater = create_debater(
@@ -193,59 +200,67 @@ async def stream_debate(
                 pro_full = ""
                 
                 async for chunk in pro_debater.stream_response(pro_input):
+                    offset = len(pro_full)
                     pro_full += chunk
-                    yield sse_event({
+                    yield encoder.event({
                         "type": "content",
                         "round": round_num,
                         "side": "正方",
                         "content": pro_full,
+                        "delta": chunk,
+                        "offset": offset,
                     })
                 
                 # 保存正方消息
                 pro_msg = Message(
-                    session_id=session.id,
+                    session_id=session_id,
                     role="正方",
                     content=pro_full,
                     meta_info={"round": round_num}
                 )
-                db.add(pro_msg)
-                db.commit()
+                await buffer.add(pro_msg)
                 
                 # 反方发言
                 con_full = ""
                 async for chunk in con_debater.stream_response(pro_full):
+                    offset = len(con_full)
                     con_full += chunk
-                    yield sse_event({
+                    yield encoder.event({
                         "type": "content",
                         "round": round_num,
                         "side": "反方",
                         "content": con_full,
+                        "delta": chunk,
+                        "offset": offset,
                     })
                 
                 # 保存反方消息
                 con_msg = Message(
-                    session_id=session.id,
+                    session_id=session_id,
                     role="反方",
                     content=con_full,
                     meta_info={"round": round_num}
                 )
-                db.add(con_msg)
-                db.commit()
+                await buffer.add(con_msg)
+                # 轮次边界：本轮双方发言一并落库
+                await buffer.checkpoint()
                 
                 last_response = con_full
             
-            mark_session_status(session, "completed")
-            db.commit()
+            await buffer.update_settings({"status": "completed"})
+            await buffer.close()
             yield sse_event({"type": "complete"})
             
         except Exception as e:
-            db.rollback()
+            if buffer is not None:
+                await buffer.abort()
+            await writer.rollback(db)
             if session is not None:
                 try:
                     mark_session_status(session, "failed", str(e))
-                    db.commit()
+                    await writer.commit(db)
                 except Exception:
-                    db.rollback()
+                    await writer.rollback(db)
                     logger.exception("failed to mark debate session as failed")
             logger.error(f"流式辩论失败: {e}")
             yield sse_event({"type": "error", "error": str(e)})
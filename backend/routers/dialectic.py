@@ -12,7 +12,10 @@ from database import get_db
 from models.session import Session, Message
 from services.ai_client import AIClient
 from agents import DialecticOrchestrator
-from utils import get_api_key, mark_session_status, merge_session_settings, sse_event, sse_response
+from services.db_writer import get_db_writer
+from services.trace_store import build_session_trace, load_session_trace
+from services.write_behind import WriteBehindBuffer
+from utils import get_api_key, mark_session_status, sse_event, sse_response
 from utils.logger import get_logger
 
 logger = get_logger(__name__)
@@ -37,7 +40,9 @@ async def stream_dialectic(
     - opening / round_start / thesis / antithesis / synthesis / fallacy / tree_update / complete / error
     """
     async def generate():
+        writer = get_db_writer()
         session = None
+        buffer = None
         try:
             api_key = get_api_key(provider)
 
@@ -56,11 +61,12 @@ async def stream_dialectic(
                 }
             )
             db.add(session)
-            db.commit()
-            db.refresh(session)
+            await writer.commit(db, session)
+            session_id = session.id
+            buffer = WriteBehindBuffer(db, session, writer=writer)
 
-            logger.info(f"创建辩证法会话: {session.id}")
-            yield sse_event({"type": "session", "session_id": session.id})
+            logger.info(f"创建辩证法会话: {session_id}")
+            yield sse_event({"type": "session", "session_id": session_id})
 
             ai_client = AIClient(provider=provider, model=model, api_key=api_key, seed=seed)
             orchestrator = DialecticOrchestrator(ai_client=ai_client)
@@ -73,7 +79,6 @@ async def stream_dialectic(
                 seed=seed
             )
 
-            messages_to_save = []
             last_tree = None
 
             async for event in orchestrator.run_stream():
@@ -87,48 +92,44 @@ async def stream_dialectic(
                         "synthesis": "合题"
                     }
                     role = role_map.get(event_type, event_type)
-                    messages_to_save.append({
-                        "round": event.get("round"),
-                        "role": role,
-                        "content": event.get("content", ""),
-                        "meta": {
+                    await buffer.add(Message(
+                        session_id=session_id,
+                        role=role,
+                        content=event.get("content", ""),
+                        meta_info={
                             "round": event.get("round"),
                             "side": event.get("side"),
                             "mode": "dialectic"
                         }
-                    })
+                    ))
 
                 if event_type == "tree_update":
                     last_tree = {
                         "nodes": event.get("nodes", []),
                         "edges": event.get("edges", [])
                     }
+                    # tree_update 标志一轮结束：本轮消息与最新论证树一并落库
+                    await buffer.update_settings({"dialectic_tree": last_tree})
+                    await buffer.checkpoint()
 
-            for msg in messages_to_save:
-                message = Message(
-                    session_id=session.id,
-                    role=msg["role"],
-                    content=msg["content"],
-                    meta_info=msg["meta"]
-                )
-                db.add(message)
-
-            merge_session_settings(session, {
-                "dialectic_trace": orchestrator.build_trace(),
+            await buffer.update_settings({
                 "dialectic_tree": last_tree,
                 "status": "completed",
             })
-            db.commit()
-            logger.info(f"辩证法会话完成: {session.id}")
+            await buffer.add(build_session_trace(session_id, orchestrator.build_trace()))
+            await buffer.close()
+            logger.info(f"辩证法会话完成: {session_id}")
 
         except Exception as e:
-            db.rollback()
+            if buffer is not None:
+                await buffer.abort()
+            await writer.rollback(db)
             if session is not None:
                 try:
                     mark_session_status(session, "failed", str(e))
-                    db.commit()
+                    await writer.commit(db)
                 except Exception:
-                    db.rollback()
+                    await writer.rollback(db)
                     logger.exception("failed to mark dialectic session as failed")
             logger.error(f"辩证法流式失败: {e}")
             yield sse_event({"type": "error", "error": str(e)})
@@ -148,5 +149,5 @@ async def get_dialectic_tree(
     return {
         "session_id": session_id,
         "tree": settings.get("dialectic_tree"),
-        "trace": settings.get("dialectic_trace")
+        "trace": load_session_trace(db, session_id)
     }
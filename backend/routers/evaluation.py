@@ -8,19 +8,19 @@ from database import get_db
 from models.session import Session
 from schemas.evaluation import EvaluationRunRequest, EvaluationCompareRequest
 from services.evaluation import evaluate_trace, compare_traces
+from services.trace_store import load_session_trace
 
 
 router = APIRouter(prefix="/api", tags=["evaluation"])
 
 
 def _load_trace_from_session(session_id: int, db: DBSession) -> dict:
-    session = db.query(Session).filter(Session.id == session_id).first()
-    if not session:
+    if db.query(Session.id).filter(Session.id == session_id).first() is None:
         raise HTTPException(status_code=404, detail="Session not found")
-    trace = (session.settings or {}).get("trace")
+    trace = load_session_trace(db, session_id)
     if not trace:
         raise HTTPException(status_code=404, detail="Trace not found for session")
-    trace["trace_id"] = str(session.id)
+    trace["trace_id"] = str(session_id)
     return trace
 
 
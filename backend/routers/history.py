@@ -1,45 +1,35 @@
 """
 历史记录API路由
 """
-import json
-from fastapi import APIRouter, Depends, HTTPException
-from fastapi.responses import Response
+import base64
+from datetime import datetime
+from typing import Optional, Tuple
+
+from fastapi import APIRouter, Depends, HTTPException, Query
+from fastapi.responses import StreamingResponse
 from sqlalchemy.orm import Session as DBSession
-from sqlalchemy import func
+from sqlalchemy import func, tuple_
 
-from database import get_db
+from database import get_db, get_read_db
 from models.session import Session, Message
+from services.history_export import (
+    BULK_EXPORT_FORMATS,
+    EXPORT_EXTENSIONS,
+    EXPORT_MEDIA_TYPES,
+    SINGLE_EXPORT_FORMATS,
+    iter_session_rows,
+    normalize_export_format,
+    stream_ndjson,
+    stream_session,
+    stream_zip,
+)
+from services.search_index import search_sessions
 
 router = APIRouter(prefix="/api", tags=["history"])
 
 VALID_HISTORY_TYPES = {"all", "debate", "chat", "qa", "dialectic", "dual_chat", "qa_socratic"}
 
 
-def get_export_role_label(role: str, *, markdown: bool = False) -> str:
-    """Return a user-facing role label for exported session content."""
-    labels = {
-        "user": "用户",
-        "assistant": "AI",
-        "正方": "正方",
-        "反方": "反方",
-        "正题": "正题",
-        "反题": "反题",
-        "合题": "合题",
-    }
-    label = labels.get(role, role)
-
-    if not markdown:
-        return label
-
-    markdown_labels = {
-        "user": "👤 用户",
-        "assistant": "🤖 AI",
-        "正方": "👍 正方",
-        "反方": "👎 反方",
-    }
-    return markdown_labels.get(role, label)
-
-
 def validate_history_type(session_type: str) -> str:
     normalized_type = session_type.strip()
     if normalized_type not in VALID_HISTORY_TYPES:
@@ -47,47 +37,98 @@ def validate_history_type(session_type: str) -> str:
     return normalized_type
 
 
+def encode_history_cursor(created_at: datetime, session_id: int) -> str:
+    """键集分页游标：(created_at, id) 的不透明编码"""
+    raw = f"{created_at.isoformat()}|{session_id}".encode("utf-8")
+    return base64.urlsafe_b64encode(raw).decode("ascii").rstrip("=")
+
+
+def decode_history_cursor(cursor: str) -> Tuple[datetime, int]:
+    try:
+        raw = base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4)).decode("utf-8")
+        created_at, session_id = raw.rsplit("|", 1)
+        return datetime.fromisoformat(created_at), int(session_id)
+    except (ValueError, UnicodeDecodeError):
+        raise HTTPException(status_code=400, detail="无效的分页游标")
+
+
 @router.get("/history")
 async def get_history(
     type: str = "all",
     limit: int = 100,
     offset: int = 0,
     q: str = "",
-    db: DBSession = Depends(get_db)
+    cursor: Optional[str] = Query(None, description="上一页返回的 next_cursor；提供时忽略 offset（检索时不适用）"),
+    include_total: bool = Query(True, description="是否统计总数；翻页时可关闭以省去 count 查询"),
+    db: DBSession = Depends(get_read_db)
 ):
-    """获取历史记录列表（支持分页）"""
+    """获取历史记录列表（支持 offset 与键集游标分页）
+
+    提供 q 时在会话主题与消息正文中全文检索，按相关度排序并返回命中摘要。
+    """
     try:
         type = validate_history_type(type)
         limit = max(1, min(limit, 500))
         offset = max(0, offset)
         search_term = q.strip()
 
-        base_query = db.query(Session)
-        if type != "all":
-            base_query = base_query.filter(Session.session_type == type)
         if search_term:
-            base_query = base_query.filter(Session.topic.ilike(f"%{search_term}%"))
+            hits, has_more, total = search_sessions(
+                db,
+                search_term,
+                session_type=None if type == "all" else type,
+                limit=limit,
+                offset=offset,
+                include_total=include_total,
+            )
+            return {
+                "history": [
+                    {
+                        "session_id": hit.session_id,
+                        "topic": hit.topic or "未命名会话",
+                        "type": hit.session_type,
+                        "start_time": hit.created_at.isoformat() if hit.created_at else None,
+                        "message_count": hit.message_count,
+                        "snippet": hit.snippet,
+                        "score": hit.score,
+                    }
+                    for hit in hits
+                ],
+                "total": total,
+                "limit": limit,
+                "offset": offset,
+                "has_more": has_more,
+                "next_cursor": None,
+            }
+
+        filters = []
+        if type != "all":
+            filters.append(Session.session_type == type)
 
-        total = base_query.count()
+        total = None
+        if include_total:
+            total = db.query(func.count(Session.id)).filter(*filters).scalar()
 
         query = db.query(
             Session.id.label("session_id"),
             Session.topic,
             Session.session_type.label("type"),
             Session.created_at.label("start_time"),
-            func.count(Message.id).label("message_count")
-        ).outerjoin(Message).group_by(Session.id)
+            Session.message_count,
+        ).filter(*filters)
 
-        if type != "all":
-            query = query.filter(Session.session_type == type)
-        if search_term:
-            query = query.filter(Session.topic.ilike(f"%{search_term}%"))
+        if cursor:
+            cursor_created_at, cursor_id = decode_history_cursor(cursor)
+            query = query.filter(tuple_(Session.created_at, Session.id) < tuple_(cursor_created_at, cursor_id))
+            offset = 0
 
-        query = query.order_by(Session.created_at.desc()).offset(offset).limit(limit)
-        results = query.all()
+        # 多取一条判断是否还有下一页
+        rows = query.order_by(Session.created_at.desc(), Session.id.desc()).offset(offset).limit(limit + 1).all()
+        has_more = len(rows) > limit
+        rows = rows[:limit]
 
         history = []
-        for r in results:
+        for r in rows:
             history.append({
                 "session_id": r.session_id,
                 "topic": r.topic or "未命名会话",
@@ -96,12 +137,17 @@ async def get_history(
                 "message_count": r.message_count
             })
 
+        next_cursor = None
+        if has_more and rows and rows[-1].start_time is not None:
+            next_cursor = encode_history_cursor(rows[-1].start_time, rows[-1].session_id)
+
         return {
             "history": history,
             "total": total,
             "limit": limit,
             "offset": offset,
-            "has_more": offset + len(history) < total,
+            "has_more": has_more,
+            "next_cursor": next_cursor,
         }
 
     except HTTPException:
@@ -110,10 +156,41 @@ async def get_history(
         raise HTTPException(status_code=500, detail=str(e))
 
 
+@router.get("/history/export")
+async def export_sessions(
+    format: str = Query("ndjson", description="ndjson：每行一个会话；zip：每个会话一个文件"),
+    type: str = "all",
+    start: Optional[datetime] = Query(None, description="只导出此时间（含）之后创建的会话"),
+    end: Optional[datetime] = Query(None, description="只导出此时间之前创建的会话"),
+    item_format: str = Query("markdown", description="zip 内单个会话的格式：json / markdown / txt"),
+    db: DBSession = Depends(get_read_db)
+):
+    """批量导出会话（流式输出，内存占用与导出量无关）"""
+    export_format = normalize_export_format(format)
+    if export_format not in BULK_EXPORT_FORMATS:
+        raise HTTPException(status_code=400, detail="不支持的导出格式")
+    item_format = normalize_export_format(item_format)
+    if item_format not in SINGLE_EXPORT_FORMATS:
+        raise HTTPException(status_code=400, detail="不支持的导出格式")
+    type = validate_history_type(type)
+
+    sessions = iter_session_rows(db, session_type=None if type == "all" else type, start=start, end=end)
+    if export_format == "zip":
+        body = stream_zip(db, sessions, item_format)
+    else:
+        body = stream_ndjson(db, sessions)
+    filename = f"sessions_{type}.{EXPORT_EXTENSIONS[export_format]}"
+    return StreamingResponse(
+        body,
+        media_type=EXPORT_MEDIA_TYPES[export_format],
+        headers={"Content-Disposition": f"attachment; filename={filename}"},
+    )
+
+
 @router.get("/history/{session_id}")
 async def get_session_detail(
     session_id: int,
-    db: DBSession = Depends(get_db)
+    db: DBSession = Depends(get_read_db)
 ):
     """获取会话详情"""
     try:
@@ -174,96 +251,20 @@ async def delete_session(
 async def export_session(
     session_id: int,
     format: str = "json",
-    db: DBSession = Depends(get_db)
+    db: DBSession = Depends(get_read_db)
 ):
-    """导出会话"""
-    try:
-        normalized_format = format.lower()
-        if normalized_format == "md":
-            normalized_format = "markdown"
-        elif normalized_format == "text":
-            normalized_format = "txt"
-
-        if normalized_format not in {"json", "markdown", "txt"}:
-            raise HTTPException(status_code=400, detail="不支持的导出格式")
-
-        session = db.query(Session).filter(Session.id == session_id).first()
-        if not session:
-            raise HTTPException(status_code=404, detail="会话不存在")
-
-        messages = db.query(Message).filter(
-            Message.session_id == session_id
-        ).order_by(Message.created_at).all()
-
-        if normalized_format == "markdown":
-            # Markdown格式
-            content = f"# {session.topic or '会话记录'}\n\n"
-            content += f"类型: {session.session_type}\n"
-            content += f"时间: {session.created_at.isoformat() if session.created_at else 'N/A'}\n\n"
-            content += "---\n\n"
-
-            for msg in messages:
-                role_label = get_export_role_label(msg.role, markdown=True)
-
-                content += f"### {role_label}\n\n{msg.content}\n\n"
-
-            return Response(
-                content=content,
-                media_type="text/markdown",
-                headers={
-                    "Content-Disposition": f"attachment; filename=session_{session_id}.md"
-                }
-            )
-
-        if normalized_format == "txt":
-            lines = [
-                session.topic or "会话记录",
-                f"类型: {session.session_type}",
-                f"时间: {session.created_at.isoformat() if session.created_at else 'N/A'}",
-                "-" * 40,
-                "",
-            ]
-            for msg in messages:
-                role_label = get_export_role_label(msg.role)
-                lines.extend([
-                    f"[{role_label}]",
-                    msg.content or "",
-                    "",
-                ])
-
-            return Response(
-                content="\n".join(lines),
-                media_type="text/plain; charset=utf-8",
-                headers={
-                    "Content-Disposition": f"attachment; filename=session_{session_id}.txt"
-                }
-            )
-
-        # JSON格式
-        data = {
-            "session_id": session.id,
-            "type": session.session_type,
-            "topic": session.topic,
-            "created_at": session.created_at.isoformat() if session.created_at else None,
-            "messages": [
-                {
-                    "role": msg.role,
-                    "content": msg.content,
-                    "created_at": msg.created_at.isoformat() if msg.created_at else None
-                }
-                for msg in messages
-            ]
-        }
-
-        return Response(
-            content=json.dumps(data, ensure_ascii=False, indent=2),
-            media_type="application/json",
-            headers={
-                "Content-Disposition": f"attachment; filename=session_{session_id}.json"
-            }
-        )
-
-    except HTTPException:
-        raise
-    except Exception as e:
-        raise HTTPException(status_code=500, detail=str(e))
+    """导出会话（流式输出，消息分批读取）"""
+    export_format = normalize_export_format(format)
+    if export_format not in SINGLE_EXPORT_FORMATS:
+        raise HTTPException(status_code=400, detail="不支持的导出格式")
+
+    session = db.query(Session).filter(Session.id == session_id).first()
+    if not session:
+        raise HTTPException(status_code=404, detail="会话不存在")
+
+    filename = f"session_{session_id}.{EXPORT_EXTENSIONS[export_format]}"
+    return StreamingResponse(
+        stream_session(db, session, export_format),
+        media_type=EXPORT_MEDIA_TYPES[export_format],
+        headers={"Content-Disposition": f"attachment; filename={filename}"},
+    )
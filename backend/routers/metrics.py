@@ -0,0 +1,44 @@
+"""
+LLM 计量 API
+
+汇总 LLM 调用的 tokens、延迟与重试情况，以及缓存、限流器和客户端池状态
+"""
+from typing import Optional
+
+from fastapi import APIRouter, Depends, Query
+from sqlalchemy.orm import Session as DBSession
+
+from database import get_read_db
+from models.debate_record import DebateRecord
+from services.completion_cache import get_completion_cache
+from services.db_writer import get_db_writer
+from services.llm_metrics import get_llm_metrics
+from services.providers.client_pool import get_client_pool
+from services.rate_limiter import get_rate_limiter_registry
+
+
+router = APIRouter(prefix="/api", tags=["metrics"])
+
+
+@router.get("/metrics")
+async def get_metrics(
+    recent: int = Query(50, ge=0, le=500, description="返回最近多少条调用明细"),
+    session_id: Optional[int] = Query(None, description="只看某个辩论会话的调用"),
+    db: DBSession = Depends(get_read_db),
+):
+    """LLM 调用计量：全局汇总（按模型 / Agent）、最近调用明细与相关组件状态"""
+    registry = get_llm_metrics()
+    cache = get_completion_cache()
+    payload = {
+        "llm": registry.summary(),
+        "recent_calls": registry.recent(recent, session_id=session_id),
+        "cache": cache.stats() if cache is not None else None,
+        "rate_limiters": get_rate_limiter_registry().stats(),
+        "client_pool": get_client_pool().stats(),
+        "db_writer": get_db_writer().stats(),
+    }
+    if session_id is not None:
+        # 进程内缓冲只保留最近调用，已完成的辩论以 DebateRecord 中的汇总为准
+        record = db.query(DebateRecord.usage).filter(DebateRecord.session_id == session_id).first()
+        payload["session_usage"] = record.usage if record is not None else None
+    return payload
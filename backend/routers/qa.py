@@ -18,7 +18,8 @@ from models.session import Session, Message
 from schemas.qa import QARequest
 from services.ai_client import AIClient
 from services.socratic_qa import create_socratic_qa
-from utils import get_api_key, mark_session_status, resolve_prompt, sse_event, sse_response
+from services.db_writer import get_db_writer
+from utils import ContentStreamEncoder, StreamMode, get_api_key, mark_session_status, resolve_prompt, sse_event, sse_response
 from utils.logger import get_logger
 
 router = APIRouter(prefix="/api", tags=["qa"])
@@ -158,11 +159,14 @@ async def stream_qa(
     provider: str = DEFAULT_PROVIDER,
     model: str = DEFAULT_MODEL,
     session_id: Optional[int] = None,
+    stream_mode: StreamMode = Query("cumulative", description="cumulative：每帧累计全文（兼容）；delta：只发增量"),
     db: DBSession = Depends(get_db)
 ):
     """流式问答接口"""
 
     async def generate():
+        writer = get_db_writer()
+        encoder = ContentStreamEncoder(stream_mode)
         session = None
         try:
             api_key = get_api_key(provider)
@@ -171,7 +175,8 @@ async def stream_qa(
             history_list = _parse_history(history)
             messages = build_qa_messages(question=question, style=style, history=history_list)
 
-            session = _get_or_create_session(
+            session = await writer.run(
+                _get_or_create_session,
                 db=db,
                 session_id=session_id,
                 session_type="qa",
@@ -179,44 +184,45 @@ async def stream_qa(
                 settings={"provider": provider, "model": model, "style": style},
             )
             mark_session_status(session, "running")
-            db.commit()
+            await writer.commit(db, session)
 
             yield sse_event({"type": "session", "session_id": session.id})
 
             user_msg = Message(session_id=session.id, role="user", content=question)
             db.add(user_msg)
-            db.commit()
+            await writer.commit(db, session)
 
             full_response = ""
             async for chunk in client.chat_stream(messages):
+                offset = len(full_response)
                 full_response += chunk
-                yield sse_event({"type": "content", "content": full_response})
+                yield encoder.event({"type": "content", "content": full_response, "delta": chunk, "offset": offset})
 
             assistant_msg = Message(session_id=session.id, role="assistant", content=full_response)
             db.add(assistant_msg)
             mark_session_status(session, "completed")
-            db.commit()
+            await writer.commit(db)
 
             yield sse_event({"type": "complete"})
 
         except HTTPException as e:
-            db.rollback()
+            await writer.rollback(db)
             if session is not None:
                 try:
                     mark_session_status(session, "failed", str(e.detail))
-                    db.commit()
+                    await writer.commit(db)
                 except Exception:
-                    db.rollback()
+                    await writer.rollback(db)
                     logger.exception("failed to mark qa session as failed")
             yield sse_event({"type": "error", "error": e.detail})
         except Exception as e:
-            db.rollback()
+            await writer.rollback(db)
             if session is not None:
                 try:
                     mark_session_status(session, "failed", str(e))
-                    db.commit()
+                    await writer.commit(db)
                 except Exception:
-                    db.rollback()
+                    await writer.rollback(db)
                     logger.exception("failed to mark qa session as failed")
             logger.exception("stream qa failed")
             yield sse_event({"type": "error", "error": str(e)})
@@ -331,6 +337,7 @@ async def stream_socratic_qa(
     provider: str = DEFAULT_PROVIDER,
     model: str = DEFAULT_MODEL,
     session_id: Optional[int] = None,
+    stream_mode: StreamMode = Query("cumulative", description="cumulative：每帧累计全文（兼容）；delta：只发增量"),
     db: DBSession = Depends(get_db)
 ):
     """
@@ -339,6 +346,8 @@ async def stream_socratic_qa(
     流式返回引导式或结构化回答。
     """
     async def generate():
+        writer = get_db_writer()
+        encoder = ContentStreamEncoder(stream_mode)
         session = None
         try:
             api_key = get_api_key(provider)
@@ -355,7 +364,8 @@ async def stream_socratic_qa(
                 for msg in history_list
             ])
 
-            session = _get_or_create_session(
+            session = await writer.run(
+                _get_or_create_session,
                 db=db,
                 session_id=session_id,
                 session_type="qa_socratic",
@@ -363,17 +373,17 @@ async def stream_socratic_qa(
                 settings={"provider": provider, "model": model, "mode": mode},
             )
             mark_session_status(session, "running")
-            db.commit()
+            await writer.commit(db, session)
 
             yield sse_event({"type": "session", "session_id": session.id, "mode": mode})
 
             user_msg = Message(session_id=session.id, role="user", content=question)
             db.add(user_msg)
-            db.commit()
+            await writer.commit(db, session)
 
             full_response = ""
             async for event in qa_service.stream_ask(question):
-                yield sse_event(event, ensure_ascii=False)
+                yield encoder.event(event)
                 if event.get("type") == "complete":
                     full_response = event.get("content", "")
 
@@ -386,26 +396,26 @@ async def stream_socratic_qa(
                 )
                 db.add(assistant_msg)
             mark_session_status(session, "completed")
-            db.commit()
+            await writer.commit(db)
 
         except HTTPException as e:
-            db.rollback()
+            await writer.rollback(db)
             if session is not None:
                 try:
                     mark_session_status(session, "failed", str(e.detail))
-                    db.commit()
+                    await writer.commit(db)
                 except Exception:
-                    db.rollback()
+                    await writer.rollback(db)
                     logger.exception("failed to mark socratic qa session as failed")
             yield sse_event({"type": "error", "error": e.detail})
         except Exception as e:
-            db.rollback()
+            await writer.rollback(db)
             if session is not None:
                 try:
                     mark_session_status(session, "failed", str(e))
-                    db.commit()
+                    await writer.commit(db)
                 except Exception:
-                    db.rollback()
+                    await writer.rollback(db)
                     logger.exception("failed to mark socratic qa session as failed")
             logger.exception("stream socratic qa failed")
             yield sse_event({"type": "error", "error": str(e)})
@@ -76,6 +76,16 @@ class DebateRequest(BaseModel):
         default=None,
         description="反方模型名称（不设则使用统一 model）"
     )
+
+    pipeline_rounds: bool = Field(
+        default=False,
+        description="流水线轮次：评审评估时预取下一轮分析请求（结果与顺序模式一致）"
+    )
+
+    pipeline_jury: bool = Field(
+        default=False,
+        description="评审与下一轮发言并行：评审反馈滞后一轮下发给辩手"
+    )
     
     model_config = {
         "json_schema_extra": {
@@ -92,6 +102,41 @@ class DebateRequest(BaseModel):
     }
 
 
+class BatchPairing(BaseModel):
+    """批量辩论中的一组模型配对（评审默认使用正方模型）"""
+    pro_provider: Literal["deepseek", "openai", "gemini", "claude", "mock"]
+    pro_model: str
+    con_provider: Optional[Literal["deepseek", "openai", "gemini", "claude", "mock"]] = Field(
+        default=None,
+        description="反方 AI 提供商（不设则与正方相同）"
+    )
+    con_model: Optional[str] = Field(
+        default=None,
+        description="反方模型名称（不设则与正方相同）"
+    )
+
+
+class BatchDebateRequest(BaseModel):
+    """批量辩论请求：topics × pairings 的每个组合运行一场辩论"""
+    topics: list[str] = Field(..., min_length=1, max_length=1000, description="辩题列表")
+    pairings: list[BatchPairing] = Field(..., min_length=1, max_length=20, description="模型配对列表")
+    rounds: int = Field(default=3, ge=1, le=10, description="每场辩论轮次")
+    temperature: Optional[float] = Field(default=None, ge=0, le=1, description="采样温度（可选）")
+    seed: Optional[int] = Field(default=None, description="随机种子（可复现）")
+    preset: Optional[Literal["basic", "quality", "budget"]] = Field(default=None, description="运行配置预设")
+    concurrency: dict[str, int] = Field(
+        default_factory=dict,
+        description="每个 provider 的并发辩论数上限，如 {\"deepseek\": 4}"
+    )
+    rpm: dict[str, float] = Field(
+        default_factory=dict,
+        description="每个 provider 每分钟最多启动的辩论数"
+    )
+    commit_every: int = Field(default=10, ge=1, le=500, description="每累计多少场提交一次")
+    pipeline_rounds: bool = False
+    pipeline_jury: bool = False
+
+
 class DebateMessage(BaseModel):
     """辩论消息模型"""
     role: Literal["正方", "反方", "topic", "system"]
@@ -1,13 +1,32 @@
 """
 Unified async AI client with lightweight retries.
+
+Every request goes through the process-wide rate limiter for its
+(provider, API key) bucket, so concurrent debates share one view of
+in-flight load and back off together on 429s. Each call is reported to
+the LLM metrics registry with token usage, latency and retry counts.
 """
 
 import asyncio
+import time
 from typing import AsyncGenerator, Optional
 
-from config import DEFAULT_MODEL, DEFAULT_PROVIDER
+from config import DEFAULT_MODEL, DEFAULT_PROVIDER, get_settings
 from exceptions import AIClientException
+from services.completion_cache import CompletionCache, get_completion_cache, make_cache_key
+from services.llm_metrics import (
+    LLMCallRecord,
+    estimate_prompt_tokens,
+    estimate_tokens,
+    get_llm_metrics,
+)
 from services.providers import BaseProvider, create_provider
+from services.rate_limiter import (
+    OUTCOME_RATE_LIMITED,
+    ProviderRateLimiter,
+    compute_backoff,
+    get_rate_limiter_registry,
+)
 from utils.logger import get_logger
 
 
@@ -25,12 +44,20 @@ class AIClient:
         seed: Optional[int] = None,
         retry_attempts: int = 2,
         retry_delay: float = 0.5,
+        cache: Optional[CompletionCache] = None,
+        use_cache: bool = True,
+        limiter: Optional[ProviderRateLimiter] = None,
     ):
+        settings = get_settings()
         self.provider = provider
         self.model = model
         self.seed = seed
         self.retry_attempts = max(1, retry_attempts)
         self.retry_delay = max(0.0, retry_delay)
+        self.rate_limit_retries = max(0, settings.llm_rate_limit_retries)
+        self.backoff_max = settings.llm_backoff_max_seconds
+        self.cache = (cache or get_completion_cache()) if use_cache else None
+        self.limiter = limiter or get_rate_limiter_registry().get(provider, api_key)
         self._provider: BaseProvider = create_provider(
             provider=provider,
             model=model,
@@ -38,6 +65,63 @@ class AIClient:
             seed=seed,
         )
 
+    def _cache_key(self, messages: list[dict], temperature: float, max_tokens: int, kwargs: dict) -> Optional[str]:
+        """Return the cache key for a request, or None when it must not be cached."""
+        if self.cache is None or not self.cache.should_cache(self.seed):
+            return None
+        return make_cache_key(
+            provider=self.provider,
+            model=self.model,
+            messages=messages,
+            temperature=temperature,
+            max_tokens=max_tokens,
+            seed=self.seed,
+            extra=kwargs,
+        )
+
+    def _next_delay(self, slot, attempt: int, throttled: int) -> Optional[float]:
+        """Backoff before the next try, or None when the retry budget is spent.
+
+        Rate-limited calls draw from their own budget and honor Retry-After;
+        other failures use the regular attempt budget.
+        """
+        if slot.outcome == OUTCOME_RATE_LIMITED:
+            if throttled >= self.rate_limit_retries:
+                return None
+            return compute_backoff(throttled + 1, self.retry_delay, self.backoff_max, slot.retry_after)
+        if attempt + 1 >= self.retry_attempts:
+            return None
+        return compute_backoff(attempt + 1, self.retry_delay, self.backoff_max)
+
+    def _new_record(self, mode: str, messages: list[dict]) -> LLMCallRecord:
+        record = LLMCallRecord(provider=self.provider, model=self.model, mode=mode, started_at=time.time())
+        record.prompt_tokens = estimate_prompt_tokens(messages)
+        return record
+
+    @staticmethod
+    def _finish_record(
+        record: LLMCallRecord,
+        started: float,
+        usage: dict,
+        text: Optional[str],
+        error: Optional[Exception] = None,
+    ) -> None:
+        """Fill latency and token usage, falling back to estimates when the provider sent none."""
+        record.latency_ms = round((time.perf_counter() - started) * 1000, 2)
+        if error is not None:
+            record.success = False
+            record.error = str(error)
+        if "prompt_tokens" in usage:
+            record.prompt_tokens = usage["prompt_tokens"]
+        else:
+            record.usage_estimated = True
+        if "completion_tokens" in usage:
+            record.completion_tokens = usage["completion_tokens"]
+        elif text is not None:
+            record.completion_tokens = estimate_tokens(text)
+            record.usage_estimated = True
+        get_llm_metrics().record(record)
+
     async def get_completion(
         self,
         messages: list[dict],
@@ -46,29 +130,64 @@ class AIClient:
         **kwargs,
     ) -> str:
         """Get a full completion with small bounded retries."""
+        started = time.perf_counter()
+        record = self._new_record("completion", messages)
+        cache_key = self._cache_key(messages, temperature, max_tokens, kwargs)
+        if cache_key is not None:
+            cached = await self.cache.get(cache_key)
+            if cached is not None:
+                record.cached = True
+                record.prompt_tokens = 0
+                self._finish_record(record, started, {"prompt_tokens": 0, "completion_tokens": 0}, cached)
+                return cached
+
         last_error: Exception | None = None
+        attempt = 0
+        throttled = 0
 
-        for attempt in range(1, self.retry_attempts + 1):
-            try:
-                return await self._provider.get_completion(
-                    messages, temperature=temperature, max_tokens=max_tokens, **kwargs
-                )
-            except Exception as exc:
-                last_error = exc
-                if attempt >= self.retry_attempts:
-                    break
-                logger.warning(
-                    "AI completion failed (%s/%s) for %s/%s: %s",
-                    attempt,
-                    self.retry_attempts,
-                    self.provider,
-                    self.model,
-                    exc,
-                )
-                await asyncio.sleep(self.retry_delay * attempt)
+        while True:
+            usage: dict = {}
+            async with self.limiter.slot() as slot:
+                record.queue_wait_ms += round(slot.queue_wait * 1000, 2)
+                try:
+                    result = await self._provider.get_completion(
+                        messages, temperature=temperature, max_tokens=max_tokens, usage=usage, **kwargs
+                    )
+                except Exception as exc:
+                    slot.fail(exc)
+                    last_error = exc
+                else:
+                    if cache_key is not None:
+                        await self.cache.set(cache_key, result)
+                    record.retries, record.throttled = attempt, throttled
+                    self._finish_record(record, started, usage, result)
+                    return result
 
+            delay = self._next_delay(slot, attempt, throttled)
+            if delay is None:
+                break
+            if slot.outcome == OUTCOME_RATE_LIMITED:
+                throttled += 1
+            else:
+                attempt += 1
+            logger.warning(
+                "AI completion failed (%s, attempt %s/%s, throttled %s/%s) for %s/%s: %s; retrying in %.2fs",
+                slot.outcome,
+                attempt,
+                self.retry_attempts,
+                throttled,
+                self.rate_limit_retries,
+                self.provider,
+                self.model,
+                last_error,
+                delay,
+            )
+            await asyncio.sleep(delay)
+
+        record.retries, record.throttled = attempt, throttled
+        self._finish_record(record, started, {}, None, error=last_error)
         raise AIClientException(
-            f"Completion failed after {self.retry_attempts} attempts: {last_error}",
+            f"Completion failed after {attempt + throttled + 1} attempts ({throttled} throttled): {last_error}",
             provider=self.provider,
             model=self.model,
         ) from last_error
@@ -80,15 +199,73 @@ class AIClient:
         max_tokens: int = 2000,
         **kwargs,
     ) -> AsyncGenerator[str, None]:
-        """Stream a completion and normalize provider errors."""
+        """Stream a completion and normalize provider errors.
+
+        Cached completions are replayed as a single chunk; fresh streams are
+        stored only after they finish without error.
+        """
+        started = time.perf_counter()
+        record = self._new_record("stream", messages)
+        cache_key = self._cache_key(messages, temperature, max_tokens, kwargs)
+        if cache_key is not None:
+            cached = await self.cache.get(cache_key)
+            if cached is not None:
+                record.cached = True
+                record.prompt_tokens = 0
+                record.ttft_ms = round((time.perf_counter() - started) * 1000, 2)
+                self._finish_record(record, started, {"prompt_tokens": 0, "completion_tokens": 0}, cached)
+                if cached:
+                    yield cached
+                return
+
+        chunks: list[str] = []
+        usage: dict = {}
+        throttled = 0
+        finished = False
         try:
-            async for chunk in self._provider.chat_stream(
-                messages, temperature=temperature, max_tokens=max_tokens, **kwargs
-            ):
-                yield chunk
-        except Exception as exc:
-            raise AIClientException(
-                f"Streaming failed: {exc}",
-                provider=self.provider,
-                model=self.model,
-            ) from exc
+            while True:
+                async with self.limiter.slot() as slot:
+                    record.queue_wait_ms += round(slot.queue_wait * 1000, 2)
+                    try:
+                        async for chunk in self._provider.chat_stream(
+                            messages, temperature=temperature, max_tokens=max_tokens, usage=usage, **kwargs
+                        ):
+                            if not slot.started:
+                                slot.started = True
+                                record.ttft_ms = round((time.perf_counter() - started) * 1000, 2)
+                            chunks.append(chunk)
+                            yield chunk
+                    except Exception as exc:
+                        slot.fail(exc)
+                        delay = None if slot.started else self._next_delay(slot, self.retry_attempts, throttled)
+                        if slot.outcome != OUTCOME_RATE_LIMITED or delay is None:
+                            record.throttled = throttled
+                            self._finish_record(record, started, usage, "".join(chunks), error=exc)
+                            finished = True
+                            raise AIClientException(
+                                f"Streaming failed: {exc}",
+                                provider=self.provider,
+                                model=self.model,
+                            ) from exc
+                    else:
+                        break
+                # Only throttled streams that produced nothing are retried.
+                throttled += 1
+                logger.warning(
+                    "AI stream throttled (%s/%s) for %s/%s; retrying in %.2fs",
+                    throttled,
+                    self.rate_limit_retries,
+                    self.provider,
+                    self.model,
+                    delay,
+                )
+                await asyncio.sleep(delay)
+        finally:
+            if not finished:
+                # Normal completion, or the consumer closed the stream early.
+                record.throttled = throttled
+                self._finish_record(record, started, usage, "".join(chunks))
+                finished = True
+
+        if cache_key is not None:
+            await self.cache.set(cache_key, "".join(chunks))
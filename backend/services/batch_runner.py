@@ -0,0 +1,586 @@
+"""
+批量辩论运行器
+
+对 N 个辩题 × M 组模型配对批量运行 Multi-Agent 辩论并持久化为 DebateRecord：
+- 每个 provider 独立的并发信号量与启动速率限制
+- 结果按批次统一提交，减少 SQLite 写事务次数
+- 可断点续跑：已存在相同辩题、模型配对与运行参数（轮数 / 温度 / seed / 预设）
+  DebateRecord 的任务会被跳过
+- 结果写入失败时取消其余任务，批次标记为 failed
+- 汇总吞吐统计（场/分钟、tokens/分钟，tokens 取自 provider 返回的用量）
+
+命令行用法（在 backend 目录下）::
+
+    python -m services.batch_runner --topics-file topics.txt \\
+        --pairing "deepseek:deepseek-v4-flash" \\
+        --pairing "deepseek:deepseek-v4-flash vs openai:gpt-4o" \\
+        --rounds 2 --concurrency deepseek=4 --rpm openai=20
+"""
+import argparse
+import asyncio
+import json
+import re
+import sys
+import time
+import uuid
+from dataclasses import asdict, dataclass
+from typing import Any, Callable, Dict, Iterable, List, Optional
+
+from agents import DebateOrchestrator
+from config import resolve_run_settings
+from database import SessionLocal
+from models.debate_record import DebateRecord
+from models.session import Session
+from services.ai_client import AIClient
+from services.debate_records import build_argument_message, build_debate_record
+from services.graph_store import build_session_graph
+from services.llm_metrics import llm_call_scope
+from services.trace_store import build_session_trace
+from utils import get_api_key
+from utils.logger import get_logger
+
+
+logger = get_logger(__name__)
+
+DEFAULT_PROVIDER_CONCURRENCY = 2
+
+
+@dataclass(frozen=True)
+class ModelPairing:
+    """一组正反方模型配对，评审默认使用正方模型"""
+    pro_provider: str
+    pro_model: str
+    con_provider: str
+    con_model: str
+    jury_provider: Optional[str] = None
+    jury_model: Optional[str] = None
+
+    @property
+    def judge(self) -> tuple[str, str]:
+        return (self.jury_provider or self.pro_provider, self.jury_model or self.pro_model)
+
+    @property
+    def providers(self) -> List[str]:
+        return sorted({self.pro_provider, self.con_provider, self.judge[0]})
+
+    @classmethod
+    def parse(cls, spec: str) -> "ModelPairing":
+        """解析 "provider:model" 或 "provider:model vs provider:model" 格式"""
+        sides = [part.strip() for part in re.split(r"\s+vs\s+", spec.strip()) if part.strip()]
+        if not 1 <= len(sides) <= 2:
+            raise ValueError(f"无效的模型配对: {spec!r}")
+        parsed = []
+        for side in sides:
+            provider, sep, model = side.partition(":")
+            if not sep or not provider or not model:
+                raise ValueError(f"无效的模型标识（应为 provider:model）: {side!r}")
+            parsed.append((provider, model))
+        pro = parsed[0]
+        con = parsed[-1]
+        return cls(pro_provider=pro[0], pro_model=pro[1], con_provider=con[0], con_model=con[1])
+
+    def label(self) -> str:
+        pro = f"{self.pro_provider}:{self.pro_model}"
+        con = f"{self.con_provider}:{self.con_model}"
+        return pro if pro == con else f"{pro} vs {con}"
+
+
+@dataclass
+class BatchJob:
+    """单场辩论任务"""
+    topic: str
+    pairing: ModelPairing
+    rounds: int = 3
+    temperature: Optional[float] = None
+    seed: Optional[int] = None
+    preset: Optional[str] = None
+
+    @property
+    def record_key(self) -> tuple:
+        """与 DebateRecord 比对的去重键（运行参数按预设补全后比较，见 record_key_of）"""
+        p = self.pairing
+        settings = resolve_run_settings(self.rounds, self.temperature, self.seed, self.preset)
+        return (
+            self.topic, p.pro_provider, p.pro_model, p.con_provider, p.con_model, p.judge[1],
+            settings["total_rounds"], settings["temperature"], settings["seed"], settings["preset"],
+        )
+
+
+def record_key_of(record: Any) -> tuple:
+    """已保存 DebateRecord（或同名列的查询行）的去重键，与 BatchJob.record_key 对应"""
+    run_config = record.run_config or {}
+    return (
+        record.topic, record.pro_provider, record.pro_model, record.con_provider, record.con_model, record.jury_model,
+        record.total_rounds, run_config.get("temperature"), run_config.get("seed"), run_config.get("preset"),
+    )
+
+
+@dataclass
+class BatchJobResult:
+    topic: str
+    pairing: str
+    status: str  # completed / skipped / failed
+    session_id: Optional[int] = None
+    winner: Optional[str] = None
+    duration_s: float = 0.0
+    tokens: int = 0
+    tokens_estimated: bool = False
+    error: Optional[str] = None
+
+
+@dataclass
+class DebateDraft:
+    """已完成但尚未提交的辩论结果"""
+    session: Session
+    arguments: List[Dict[str, Any]]
+    orchestrator: Any
+    trace: Dict[str, Any]
+    result: BatchJobResult
+
+
+def build_jobs(
+    topics: Iterable[str],
+    pairings: Iterable[ModelPairing],
+    rounds: int = 3,
+    temperature: Optional[float] = None,
+    seed: Optional[int] = None,
+    preset: Optional[str] = None,
+) -> List[BatchJob]:
+    """辩题 × 配对 的笛卡尔积，辩题去空白、去重并保持顺序"""
+    unique_topics = list(dict.fromkeys(topic.strip() for topic in topics if topic and topic.strip()))
+    pairings = list(pairings)
+    return [
+        BatchJob(topic=topic, pairing=pairing, rounds=rounds, temperature=temperature, seed=seed, preset=preset)
+        for topic in unique_topics
+        for pairing in pairings
+    ]
+
+
+class _StartRateLimiter:
+    """限制同一 provider 的辩论启动间隔（每分钟最多 rpm 场）"""
+
+    def __init__(self, per_minute: float):
+        self.interval = 60.0 / per_minute if per_minute > 0 else 0.0
+        self._next_at = 0.0
+        self._lock = asyncio.Lock()
+
+    async def acquire(self) -> None:
+        if self.interval <= 0:
+            return
+        async with self._lock:
+            now = time.monotonic()
+            wait = self._next_at - now
+            self._next_at = max(now, self._next_at) + self.interval
+        if wait > 0:
+            await asyncio.sleep(wait)
+
+
+class BatchRunner:
+    """批量辩论运行器
+
+    Args:
+        jobs: 待运行的任务列表
+        provider_concurrency: 每个 provider 同时运行的辩论数上限，可按 provider 指定
+        provider_rpm: 每个 provider 每分钟最多启动的辩论数，未指定则不限
+        commit_every: 累计多少场结果提交一次事务；崩溃时最多丢失这一批，重跑会补齐
+        session_factory: 数据库会话工厂，测试中可替换
+        client_factory: AIClient 构造函数，签名同 AIClient(provider, model, api_key, seed)
+        pipeline_rounds / pipeline_jury: 透传给 DebateOrchestrator.setup_debate
+    """
+
+    def __init__(
+        self,
+        jobs: List[BatchJob],
+        provider_concurrency: Optional[Dict[str, int]] = None,
+        default_concurrency: int = DEFAULT_PROVIDER_CONCURRENCY,
+        provider_rpm: Optional[Dict[str, float]] = None,
+        commit_every: int = 10,
+        session_factory: Callable = SessionLocal,
+        client_factory: Callable[..., Any] = AIClient,
+        pipeline_rounds: bool = False,
+        pipeline_jury: bool = False,
+        batch_id: Optional[str] = None,
+    ):
+        self.batch_id = batch_id or uuid.uuid4().hex[:12]
+        self.jobs = jobs
+        self.provider_concurrency = provider_concurrency or {}
+        self.default_concurrency = max(1, default_concurrency)
+        self.provider_rpm = provider_rpm or {}
+        self.commit_every = max(1, commit_every)
+        self.session_factory = session_factory
+        self.client_factory = client_factory
+        self.pipeline_rounds = pipeline_rounds
+        self.pipeline_jury = pipeline_jury
+
+        self.status = "pending"
+        self.results: List[BatchJobResult] = []
+        self.running = 0
+        self.started_at: Optional[float] = None
+        self.finished_at: Optional[float] = None
+        self.commits = 0
+
+        self._semaphores: Dict[str, asyncio.Semaphore] = {}
+        self._rate_limiters: Dict[str, _StartRateLimiter] = {}
+        self._pending: List[DebateDraft] = []
+        self._flush_lock: Optional[asyncio.Lock] = None
+
+    # ---------- 断点续跑 ----------
+
+    def _existing_keys(self) -> set:
+        topics = sorted({job.topic for job in self.jobs})
+        if not topics:
+            return set()
+        db = self.session_factory()
+        try:
+            rows = (
+                db.query(
+                    DebateRecord.topic,
+                    DebateRecord.pro_provider,
+                    DebateRecord.pro_model,
+                    DebateRecord.con_provider,
+                    DebateRecord.con_model,
+                    DebateRecord.jury_model,
+                    DebateRecord.total_rounds,
+                    DebateRecord.run_config,
+                )
+                .filter(DebateRecord.topic.in_(topics))
+                .all()
+            )
+        finally:
+            db.close()
+        return {record_key_of(row) for row in rows}
+
+    # ---------- 并发控制 ----------
+
+    def _semaphore(self, provider: str) -> asyncio.Semaphore:
+        if provider not in self._semaphores:
+            limit = self.provider_concurrency.get(provider, self.default_concurrency)
+            self._semaphores[provider] = asyncio.Semaphore(max(1, limit))
+        return self._semaphores[provider]
+
+    def _rate_limiter(self, provider: str) -> _StartRateLimiter:
+        if provider not in self._rate_limiters:
+            self._rate_limiters[provider] = _StartRateLimiter(self.provider_rpm.get(provider, 0))
+        return self._rate_limiters[provider]
+
+    async def _acquire(self, providers: List[str]) -> None:
+        # 按固定顺序获取多个 provider 的信号量，避免交叉等待导致死锁
+        acquired = []
+        try:
+            for provider in providers:
+                await self._semaphore(provider).acquire()
+                acquired.append(provider)
+        except BaseException:
+            for provider in acquired:
+                self._semaphore(provider).release()
+            raise
+        for provider in providers:
+            await self._rate_limiter(provider).acquire()
+
+    def _release(self, providers: List[str]) -> None:
+        for provider in providers:
+            self._semaphore(provider).release()
+
+    # ---------- 单场运行 ----------
+
+    def _make_client(self, provider: str, model: str, seed: Optional[int]):
+        return self.client_factory(provider=provider, model=model, api_key=get_api_key(provider), seed=seed)
+
+    async def _run_debate(self, orchestrator, job: BatchJob, pro_client, con_client) -> List[Dict[str, Any]]:
+        """运行单场辩论，返回完整论点事件"""
+        jury_provider, jury_model = job.pairing.judge
+        await orchestrator.setup_debate(
+            topic=job.topic,
+            total_rounds=job.rounds,
+            provider=jury_provider,
+            model=jury_model,
+            temperature=job.temperature,
+            seed=job.seed,
+            preset=job.preset,
+            pro_ai_client=pro_client,
+            con_ai_client=con_client,
+            pipeline_rounds=self.pipeline_rounds,
+            pipeline_jury=self.pipeline_jury,
+        )
+
+        arguments: List[Dict[str, Any]] = []
+        async for event in orchestrator.run_debate_streaming():
+            if event.get("type") == "argument_complete":
+                arguments.append(event)
+            elif event.get("type") == "error":
+                raise RuntimeError(event.get("message") or event.get("error") or "辩论运行失败")
+        return arguments
+
+    async def _run_job(self, job: BatchJob) -> BatchJobResult:
+        pairing = job.pairing
+        providers = pairing.providers
+        await self._acquire(providers)
+        self.running += 1
+        started = time.perf_counter()
+        try:
+            jury_provider, jury_model = pairing.judge
+            orchestrator = DebateOrchestrator(ai_client=self._make_client(jury_provider, jury_model, job.seed))
+            pro_client = None
+            con_client = None
+            if (pairing.pro_provider, pairing.pro_model) != (jury_provider, jury_model):
+                pro_client = self._make_client(pairing.pro_provider, pairing.pro_model, job.seed)
+            if (pairing.con_provider, pairing.con_model) != (jury_provider, jury_model):
+                con_client = self._make_client(pairing.con_provider, pairing.con_model, job.seed)
+
+            with llm_call_scope(batch_id=self.batch_id):
+                arguments = await self._run_debate(orchestrator, job, pro_client, con_client)
+
+            trace = orchestrator.build_trace()
+            usage = trace.get("usage") or {}
+            session = Session(
+                session_type="debate",
+                topic=job.topic,
+                settings={
+                    "rounds": orchestrator.total_rounds,
+                    "provider": jury_provider,
+                    "model": jury_model,
+                    "temperature": orchestrator.run_config.get("temperature"),
+                    "seed": orchestrator.run_config.get("seed"),
+                    "preset": orchestrator.run_config.get("preset"),
+                    "mode": "multi-agent",
+                    "batch_id": self.batch_id,
+                    "status": "completed",
+                },
+            )
+            result = BatchJobResult(
+                topic=job.topic,
+                pairing=pairing.label(),
+                status="completed",
+                winner=(trace.get("verdict") or {}).get("winner"),
+                duration_s=round(time.perf_counter() - started, 3),
+                tokens=usage.get("total_tokens", 0),
+                tokens_estimated=bool(usage.get("usage_estimated")),
+            )
+            self._pending.append(DebateDraft(session, arguments, orchestrator, trace, result))
+            return result
+        except asyncio.CancelledError:
+            raise
+        except Exception as exc:
+            logger.warning("批量辩论任务失败 [%s | %s]: %s", job.topic, pairing.label(), exc)
+            return BatchJobResult(
+                topic=job.topic,
+                pairing=pairing.label(),
+                status="failed",
+                duration_s=round(time.perf_counter() - started, 3),
+                error=str(exc),
+            )
+        finally:
+            self.running -= 1
+            self._release(providers)
+
+    # ---------- 批量持久化 ----------
+
+    def _write_drafts(self, drafts: List[DebateDraft]) -> None:
+        db = self.session_factory()
+        try:
+            db.add_all([draft.session for draft in drafts])
+            db.flush()
+            for draft in drafts:
+                session_id = draft.session.id
+                messages = [build_argument_message(session_id, event) for event in draft.arguments]
+                db.add_all(messages)
+                db.add(build_session_trace(session_id, draft.trace, draft.orchestrator.get_full_state()))
+                db.add(build_debate_record(session_id, draft.orchestrator, draft.trace, completed=True))
+                graph = build_session_graph(session_id, draft.orchestrator.topic, messages)
+                if graph is not None:
+                    db.add(graph)
+                draft.result.session_id = session_id
+            db.commit()
+        except Exception:
+            db.rollback()
+            for draft in drafts:
+                draft.result.session_id = None
+            raise
+        finally:
+            db.close()
+
+    async def _flush(self, force: bool = False) -> None:
+        async with self._flush_lock:
+            if not self._pending or (not force and len(self._pending) < self.commit_every):
+                return
+            drafts, self._pending = self._pending, []
+            try:
+                await asyncio.to_thread(self._write_drafts, drafts)
+            except Exception as exc:
+                for draft in drafts:
+                    draft.result.status = "failed"
+                    draft.result.error = f"结果保存失败: {exc}"
+                raise
+            self.commits += 1
+
+    # ---------- 主流程 ----------
+
+    async def run(self) -> Dict[str, Any]:
+        """运行全部任务，返回汇总统计"""
+        self.status = "running"
+        self.started_at = time.perf_counter()
+        self._flush_lock = asyncio.Lock()
+
+        existing = await asyncio.to_thread(self._existing_keys)
+        pending_jobs = []
+        for job in self.jobs:
+            if job.record_key in existing:
+                self.results.append(BatchJobResult(topic=job.topic, pairing=job.pairing.label(), status="skipped"))
+            else:
+                pending_jobs.append(job)
+                # 同一批内重复的任务只运行一次
+                existing.add(job.record_key)
+
+        finished: set = set()
+
+        async def run_one(index: int, job: BatchJob) -> None:
+            self.results.append(await self._run_job(job))
+            finished.add(index)
+            await self._flush()
+
+        tasks = [asyncio.create_task(run_one(index, job)) for index, job in enumerate(pending_jobs)]
+        try:
+            await asyncio.gather(*tasks)
+            await self._flush(force=True)
+            self.status = "completed"
+        except asyncio.CancelledError:
+            self.status = "cancelled"
+            await self._flush(force=True)
+            raise
+        except Exception as exc:
+            # 写入失败：取消其余任务，未保存与未完成的任务都记为失败
+            self.status = "failed"
+            logger.error("批量辩论 %s 结果保存失败，取消剩余任务: %s", self.batch_id, exc)
+            for task in tasks:
+                task.cancel()
+            await asyncio.gather(*tasks, return_exceptions=True)
+            for draft in self._pending:
+                draft.result.status = "failed"
+                draft.result.error = "批次失败，结果未保存"
+            self._pending = []
+            for index, job in enumerate(pending_jobs):
+                if index not in finished:
+                    self.results.append(BatchJobResult(
+                        topic=job.topic, pairing=job.pairing.label(), status="failed", error="批次失败，任务已取消",
+                    ))
+            raise
+        finally:
+            for task in tasks:
+                task.cancel()
+            self.finished_at = time.perf_counter()
+
+        summary = self.progress()
+        logger.info(
+            "批量辩论 %s 完成: %s 场完成, %s 场跳过, %s 场失败, %.2f 场/分钟",
+            self.batch_id,
+            summary["completed"],
+            summary["skipped"],
+            summary["failed"],
+            summary["throughput"]["debates_per_min"],
+        )
+        return summary
+
+    def progress(self) -> Dict[str, Any]:
+        """当前进度与吞吐统计"""
+        counts = {"completed": 0, "skipped": 0, "failed": 0}
+        tokens = 0
+        tokens_estimated = False
+        for result in self.results:
+            counts[result.status] += 1
+            tokens += result.tokens
+            tokens_estimated = tokens_estimated or result.tokens_estimated
+
+        if self.started_at is None:
+            elapsed = 0.0
+        else:
+            elapsed = (self.finished_at or time.perf_counter()) - self.started_at
+        minutes = elapsed / 60 if elapsed > 0 else 0.0
+
+        return {
+            "batch_id": self.batch_id,
+            "status": self.status,
+            "total": len(self.jobs),
+            **counts,
+            "running": self.running,
+            "queued": max(0, len(self.jobs) - len(self.results) - self.running),
+            "commits": self.commits,
+            "elapsed_s": round(elapsed, 3),
+            "throughput": {
+                "debates_per_min": round(counts["completed"] / minutes, 3) if minutes else 0.0,
+                "tokens": tokens,
+                "tokens_per_min": round(tokens / minutes, 1) if minutes else 0.0,
+                "tokens_estimated": tokens_estimated,
+            },
+            "results": [asdict(result) for result in self.results],
+        }
+
+
+# ---------- 命令行 ----------
+
+def _parse_provider_map(values: Optional[List[str]], cast: Callable) -> Dict[str, Any]:
+    mapping = {}
+    for item in values or []:
+        provider, sep, value = item.partition("=")
+        if not sep:
+            raise argparse.ArgumentTypeError(f"应为 provider=value: {item!r}")
+        mapping[provider.strip()] = cast(value)
+    return mapping
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description="批量运行 Multi-Agent 辩论并保存为 DebateRecord")
+    parser.add_argument("--topic", action="append", default=[], help="辩题，可重复")
+    parser.add_argument("--topics-file", help="辩题文件，每行一个")
+    parser.add_argument(
+        "--pairing",
+        action="append",
+        required=True,
+        help='模型配对，如 "deepseek:deepseek-v4-flash" 或 "deepseek:deepseek-v4-flash vs openai:gpt-4o"',
+    )
+    parser.add_argument("--rounds", type=int, default=3)
+    parser.add_argument("--temperature", type=float)
+    parser.add_argument("--seed", type=int)
+    parser.add_argument("--preset", choices=["basic", "quality", "budget"])
+    parser.add_argument("--concurrency", action="append", help="provider=N，每个 provider 的并发上限")
+    parser.add_argument("--default-concurrency", type=int, default=DEFAULT_PROVIDER_CONCURRENCY)
+    parser.add_argument("--rpm", action="append", help="provider=N，每分钟最多启动的辩论数")
+    parser.add_argument("--commit-every", type=int, default=10)
+    parser.add_argument("--pipeline-rounds", action="store_true")
+    parser.add_argument("--pipeline-jury", action="store_true")
+    args = parser.parse_args(argv)
+
+    topics = list(args.topic)
+    if args.topics_file:
+        with open(args.topics_file, encoding="utf-8") as handle:
+            topics.extend(line for line in handle.read().splitlines() if not line.startswith("#"))
+    if not topics:
+        parser.error("至少需要一个辩题（--topic 或 --topics-file）")
+
+    from database import init_db
+    init_db()
+
+    jobs = build_jobs(
+        topics,
+        [ModelPairing.parse(spec) for spec in args.pairing],
+        rounds=args.rounds,
+        temperature=args.temperature,
+        seed=args.seed,
+        preset=args.preset,
+    )
+    runner = BatchRunner(
+        jobs,
+        provider_concurrency=_parse_provider_map(args.concurrency, int),
+        default_concurrency=args.default_concurrency,
+        provider_rpm=_parse_provider_map(args.rpm, float),
+        commit_every=args.commit_every,
+        pipeline_rounds=args.pipeline_rounds,
+        pipeline_jury=args.pipeline_jury,
+    )
+    summary = asyncio.run(runner.run())
+    summary.pop("results", None)
+    print(json.dumps(summary, ensure_ascii=False, indent=2))
+    return 0 if summary["failed"] == 0 else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
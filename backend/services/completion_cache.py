@@ -0,0 +1,230 @@
+"""
+LLM 补全缓存
+
+以 (provider, model, messages, temperature, max_tokens, seed) 的规范化哈希为键，
+提供带容量上限与 TTL 的内存 LRU，以及可选的 SQLite 磁盘层（与 aigument.db 同目录）。
+"""
+import asyncio
+import hashlib
+import json
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+from pathlib import Path
+from typing import Any, Dict, Optional
+
+from config import get_settings
+from runtime import get_database_path
+from utils.logger import get_logger
+
+
+logger = get_logger(__name__)
+
+CACHE_DB_FILENAME = "llm_cache.db"
+
+
+def make_cache_key(
+    *,
+    provider: str,
+    model: str,
+    messages: list[dict],
+    temperature: float,
+    max_tokens: int,
+    seed: Optional[int],
+    extra: Optional[Dict[str, Any]] = None,
+) -> str:
+    """生成请求的规范化内容哈希"""
+    payload = {
+        "provider": provider,
+        "model": model,
+        "messages": messages,
+        "temperature": temperature,
+        "max_tokens": max_tokens,
+        "seed": seed,
+        "extra": extra or {},
+    }
+    raw = json.dumps(payload, ensure_ascii=False, sort_keys=True, separators=(",", ":"), default=str)
+    return hashlib.sha256(raw.encode("utf-8")).hexdigest()
+
+
+class SQLiteCacheTier:
+    """SQLite 磁盘缓存层，进程重启后仍可命中"""
+
+    def __init__(self, path: Path):
+        self.path = Path(path)
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(str(self.path), check_same_thread=False)
+        with self._lock:
+            self._conn.execute(
+                "CREATE TABLE IF NOT EXISTS completion_cache ("
+                "key TEXT PRIMARY KEY, value TEXT NOT NULL, created_at REAL NOT NULL)"
+            )
+            self._conn.commit()
+
+    def get(self, key: str) -> Optional[tuple[str, float]]:
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT value, created_at FROM completion_cache WHERE key = ?", (key,)
+            ).fetchone()
+        return (row[0], row[1]) if row else None
+
+    def set(self, key: str, value: str, created_at: float) -> None:
+        with self._lock:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO completion_cache (key, value, created_at) VALUES (?, ?, ?)",
+                (key, value, created_at),
+            )
+            self._conn.commit()
+
+    def delete(self, key: str) -> None:
+        with self._lock:
+            self._conn.execute("DELETE FROM completion_cache WHERE key = ?", (key,))
+            self._conn.commit()
+
+    def clear(self) -> None:
+        with self._lock:
+            self._conn.execute("DELETE FROM completion_cache")
+            self._conn.commit()
+
+    def close(self) -> None:
+        with self._lock:
+            self._conn.close()
+
+
+class CompletionCache:
+    """内存 LRU + 可选磁盘层的补全缓存
+
+    Args:
+        max_entries: 内存层最大条目数，超出时淘汰最久未使用的条目
+        ttl_seconds: 条目有效期（秒），<= 0 表示永不过期
+        disk_path: 磁盘层 SQLite 文件路径，None 表示仅使用内存
+        seeded_only: 为 True 时只缓存带 seed 的请求，避免改变非确定性调用的语义
+    """
+
+    def __init__(
+        self,
+        max_entries: int = 512,
+        ttl_seconds: float = 3600.0,
+        disk_path: Optional[Path] = None,
+        seeded_only: bool = True,
+    ):
+        self.max_entries = max(1, max_entries)
+        self.ttl_seconds = ttl_seconds
+        self.seeded_only = seeded_only
+        self._entries: "OrderedDict[str, tuple[str, float]]" = OrderedDict()
+        self._disk = SQLiteCacheTier(disk_path) if disk_path is not None else None
+
+        self.hits = 0
+        self.misses = 0
+        self.disk_hits = 0
+        self.evictions = 0
+        self.expirations = 0
+
+    def _is_expired(self, created_at: float) -> bool:
+        return self.ttl_seconds > 0 and (time.time() - created_at) > self.ttl_seconds
+
+    def _get_memory(self, key: str) -> Optional[str]:
+        entry = self._entries.get(key)
+        if entry is None:
+            return None
+        value, created_at = entry
+        if self._is_expired(created_at):
+            del self._entries[key]
+            self.expirations += 1
+            return None
+        self._entries.move_to_end(key)
+        return value
+
+    def _set_memory(self, key: str, value: str, created_at: float) -> None:
+        self._entries[key] = (value, created_at)
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+            self.evictions += 1
+
+    def should_cache(self, seed: Optional[int]) -> bool:
+        """根据缓存策略判断请求是否可缓存"""
+        return seed is not None or not self.seeded_only
+
+    async def get(self, key: str) -> Optional[str]:
+        """查询缓存；磁盘层读取在线程中执行，避免阻塞事件循环"""
+        value = self._get_memory(key)
+        if value is not None:
+            self.hits += 1
+            return value
+
+        if self._disk is not None:
+            row = await asyncio.to_thread(self._disk.get, key)
+            if row is not None:
+                value, created_at = row
+                if self._is_expired(created_at):
+                    self.expirations += 1
+                    await asyncio.to_thread(self._disk.delete, key)
+                else:
+                    self._set_memory(key, value, created_at)
+                    self.hits += 1
+                    self.disk_hits += 1
+                    return value
+
+        self.misses += 1
+        return None
+
+    async def set(self, key: str, value: str) -> None:
+        created_at = time.time()
+        self._set_memory(key, value, created_at)
+        if self._disk is not None:
+            try:
+                await asyncio.to_thread(self._disk.set, key, value, created_at)
+            except sqlite3.Error:
+                logger.exception("写入磁盘补全缓存失败")
+
+    def clear(self) -> None:
+        self._entries.clear()
+        if self._disk is not None:
+            self._disk.clear()
+
+    def close(self) -> None:
+        if self._disk is not None:
+            self._disk.close()
+            self._disk = None
+
+    def stats(self) -> Dict[str, Any]:
+        lookups = self.hits + self.misses
+        return {
+            "entries": len(self._entries),
+            "max_entries": self.max_entries,
+            "ttl_seconds": self.ttl_seconds,
+            "disk_enabled": self._disk is not None,
+            "hits": self.hits,
+            "misses": self.misses,
+            "disk_hits": self.disk_hits,
+            "evictions": self.evictions,
+            "expirations": self.expirations,
+            "hit_rate": round(self.hits / lookups, 4) if lookups else 0.0,
+        }
+
+
+_default_cache: Optional[CompletionCache] = None
+_default_cache_initialized = False
+
+
+def get_completion_cache() -> Optional[CompletionCache]:
+    """获取进程级共享缓存；配置禁用时返回 None"""
+    global _default_cache, _default_cache_initialized
+    if _default_cache_initialized:
+        return _default_cache
+
+    settings = get_settings()
+    if settings.llm_cache_enabled:
+        disk_path = None
+        if settings.llm_cache_disk_enabled:
+            disk_path = get_database_path().with_name(CACHE_DB_FILENAME)
+        _default_cache = CompletionCache(
+            max_entries=settings.llm_cache_max_entries,
+            ttl_seconds=settings.llm_cache_ttl_seconds,
+            disk_path=disk_path,
+            seeded_only=settings.llm_cache_seeded_only,
+        )
+    _default_cache_initialized = True
+    return _default_cache
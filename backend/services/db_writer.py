@@ -0,0 +1,166 @@
+"""
+数据库写线程
+
+流式路由在事件循环线程上同步执行 commit / refresh 时，一次慢 fsync 会卡住
+所有并发 SSE 流。DBWriter 用单个专用线程 + FIFO 队列执行这些阻塞操作：
+
+- 操作的仍是调用方自己的 Session，事务边界与原先完全一致；
+  调用方 await 结果后才继续使用该 Session，因此同一 Session 不会被并发访问
+- 单线程串行执行写入，与 SQLite 的单写者锁一致，避免多线程争锁
+- 异常原样抛回调用方，由调用方决定 rollback（同样经写线程执行）
+- 结果通过 call_soon_threadsafe 回到提交任务所在的事件循环，
+  因此同一个写线程可服务多个事件循环（如测试中的多次 asyncio.run）
+
+注意：refresh 之后 Session 会持有连接直到下次提交，连接池容量应覆盖并发流数量，
+否则写线程会在取连接时等待池超时。
+"""
+import asyncio
+import queue
+import threading
+import time
+from collections import deque
+from typing import Any, Callable, Deque, Dict, Optional, TypeVar
+
+from sqlalchemy.orm import Session as DBSession
+
+from utils.logger import get_logger
+
+
+logger = get_logger(__name__)
+
+T = TypeVar("T")
+
+_STOP = object()
+
+
+def _resolve(future: asyncio.Future, result: Any, error: Optional[BaseException]) -> None:
+    if future.done():
+        return
+    if error is not None:
+        future.set_exception(error)
+    else:
+        future.set_result(result)
+
+
+class DBWriter:
+    """单个专用线程串行执行数据库阻塞操作"""
+
+    def __init__(self, name: str = "aigument-db-writer"):
+        self.name = name
+        self._queue: "queue.SimpleQueue[Any]" = queue.SimpleQueue()
+        self._thread: Optional[threading.Thread] = None
+        self._lock = threading.Lock()
+
+        self.jobs = 0
+        self.errors = 0
+        self.pending = 0
+        self.max_pending = 0
+        self._recent_run_s: Deque[float] = deque(maxlen=512)
+        self._recent_wait_s: Deque[float] = deque(maxlen=512)
+
+    def _ensure_started(self) -> None:
+        with self._lock:
+            if self._thread is None or not self._thread.is_alive():
+                self._thread = threading.Thread(target=self._worker, name=self.name, daemon=True)
+                self._thread.start()
+
+    def _worker(self) -> None:
+        while True:
+            item = self._queue.get()
+            if item is _STOP:
+                return
+            fn, args, kwargs, loop, future, enqueued = item
+            started = time.perf_counter()
+            result, error = None, None
+            try:
+                result = fn(*args, **kwargs)
+            except BaseException as exc:  # 异常交还给调用方
+                error = exc
+            finished = time.perf_counter()
+            with self._lock:
+                self.pending -= 1
+                self.jobs += 1
+                self.errors += 1 if error is not None else 0
+                self._recent_wait_s.append(started - enqueued)
+                self._recent_run_s.append(finished - started)
+            try:
+                loop.call_soon_threadsafe(_resolve, future, result, error)
+            except RuntimeError:
+                # 提交方的事件循环已关闭，结果无人等待
+                if error is not None:
+                    logger.warning("DB 写操作失败且调用方已退出: %s", error)
+
+    async def run(self, fn: Callable[..., T], *args: Any, **kwargs: Any) -> T:
+        """在写线程中执行 fn(*args, **kwargs) 并等待结果"""
+        self._ensure_started()
+        loop = asyncio.get_running_loop()
+        future = loop.create_future()
+        with self._lock:
+            self.pending += 1
+            self.max_pending = max(self.max_pending, self.pending)
+        self._queue.put((fn, args, kwargs, loop, future, time.perf_counter()))
+        # 调用方被取消时也要等操作结束，避免其 Session 被两个线程同时使用
+        return await asyncio.shield(future)
+
+    async def commit(self, db: DBSession, *refresh: Any) -> None:
+        """提交事务，随后刷新给定对象（避免之后在事件循环中触发过期属性的懒加载）"""
+        await self.run(_commit_and_refresh, db, refresh)
+
+    async def rollback(self, db: DBSession) -> None:
+        await self.run(db.rollback)
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            runs = sorted(self._recent_run_s)
+            waits = sorted(self._recent_wait_s)
+            pending, max_pending = self.pending, self.max_pending
+
+        def percentile(values, p: float) -> float:
+            if not values:
+                return 0.0
+            return round(values[min(len(values) - 1, int(round(p * (len(values) - 1))))] * 1000, 2)
+
+        return {
+            "jobs": self.jobs,
+            "errors": self.errors,
+            "pending": pending,
+            "max_pending": max_pending,
+            "run_ms": {"p50": percentile(runs, 0.5), "p99": percentile(runs, 0.99)},
+            "queue_wait_ms": {"p50": percentile(waits, 0.5), "p99": percentile(waits, 0.99)},
+        }
+
+    def close(self, timeout: Optional[float] = 5.0) -> None:
+        """处理完已入队的操作后停止写线程"""
+        with self._lock:
+            thread, self._thread = self._thread, None
+        if thread is not None and thread.is_alive():
+            self._queue.put(_STOP)
+            thread.join(timeout)
+
+
+def _commit_and_refresh(db: DBSession, refresh) -> None:
+    db.commit()
+    for obj in refresh:
+        db.refresh(obj)
+
+
+_default_writer: Optional[DBWriter] = None
+_default_writer_lock = threading.Lock()
+
+
+def get_db_writer() -> DBWriter:
+    """获取进程级数据库写线程"""
+    global _default_writer
+    with _default_writer_lock:
+        if _default_writer is None:
+            _default_writer = DBWriter()
+        return _default_writer
+
+
+def close_db_writer() -> None:
+    """停止进程级写线程（应用关闭时调用）"""
+    global _default_writer
+    with _default_writer_lock:
+        writer, _default_writer = _default_writer, None
+    if writer is not None:
+        writer.close()
@@ -0,0 +1,57 @@
+"""
+Multi-Agent 辩论结果持久化辅助
+
+将 DebateOrchestrator 的运行结果转换为 Message / DebateRecord 行，
+供流式接口与批量运行器共用。
+"""
+from datetime import datetime, timezone
+from typing import Any, Dict, Optional
+
+from models.debate_record import DebateRecord
+from models.session import Message
+
+
+def build_argument_message(session_id: int, event: Dict[str, Any], mode: str = "multi-agent") -> Message:
+    """根据 argument_complete 事件构建论点消息"""
+    return Message(
+        session_id=session_id,
+        role=event.get("name", event.get("side", "unknown")),
+        content=event.get("content", ""),
+        meta_info={
+            "round": event.get("round"),
+            "side": event.get("side"),
+            "mode": mode,
+        },
+    )
+
+
+def build_debate_record(
+    session_id: int,
+    orchestrator,
+    trace: Optional[Dict[str, Any]] = None,
+    completed: bool = False,
+) -> DebateRecord:
+    """根据协调器的运行配置与 trace 构建 DebateRecord"""
+    trace = trace if trace is not None else orchestrator.build_trace()
+    run_cfg = orchestrator.run_config
+    verdict_data = trace.get("verdict") or {}
+    return DebateRecord(
+        session_id=session_id,
+        topic=orchestrator.topic,
+        total_rounds=orchestrator.total_rounds,
+        winner=verdict_data.get("winner"),
+        pro_provider=run_cfg.get("pro_provider", run_cfg.get("provider")),
+        pro_model=run_cfg.get("pro_model", run_cfg.get("model")),
+        con_provider=run_cfg.get("con_provider", run_cfg.get("provider")),
+        con_model=run_cfg.get("con_model", run_cfg.get("model")),
+        jury_model=run_cfg.get("model"),
+        is_mixed=1 if run_cfg.get("mixed_model") else 0,
+        total_score_pro=verdict_data.get("pro_total_score", 0),
+        total_score_con=verdict_data.get("con_total_score", 0),
+        margin=verdict_data.get("margin"),
+        verdict=verdict_data,
+        evaluations=trace.get("evaluations"),
+        run_config=run_cfg,
+        usage=trace.get("usage"),
+        completed_at=datetime.now(timezone.utc) if completed else None,
+    )
@@ -0,0 +1,117 @@
+"""
+辩论统计聚合
+
+debate_stats 表由 DebateRecord 的 flush 钩子增量维护（见 models.debate_record），
+统计接口只读取这张小表。rebuild_debate_stats 根据 debate_records 全量重算，
+用于旧数据回填或修复。
+
+命令行用法（在 backend 目录下）::
+
+    python -m services.debate_stats --rebuild
+"""
+import argparse
+import json
+import sys
+from collections import Counter
+from datetime import date, datetime, timedelta, timezone
+from typing import Any, Dict, List, Optional
+
+from sqlalchemy import delete, select
+from sqlalchemy.orm import Session as DBSession
+
+from models.debate_record import STAT_FIELDS, DebateRecord, DebateStat, apply_stat_deltas, debate_stat_keys
+
+
+SUMMARY_METRICS = ("total", "winner", "mixed", "model")
+
+
+def rebuild_debate_stats(db: DBSession, batch_size: int = 1000) -> int:
+    """根据 debate_records 重算全部统计，返回处理的记录数（调用方提交）"""
+    deltas = Counter()
+    processed = 0
+    last_id = 0
+    columns = [getattr(DebateRecord, field) for field in STAT_FIELDS]
+    while True:
+        rows = db.execute(
+            select(DebateRecord.id, *columns)
+            .where(DebateRecord.id > last_id)
+            .order_by(DebateRecord.id)
+            .limit(batch_size)
+        ).all()
+        if not rows:
+            break
+        for row in rows:
+            deltas.update(debate_stat_keys(row._asdict()))
+        processed += len(rows)
+        last_id = rows[-1].id
+    connection = db.connection()
+    connection.execute(delete(DebateStat.__table__))
+    apply_stat_deltas(connection, deltas)
+    return processed
+
+
+def backfill_debate_stats(bind) -> bool:
+    """统计表为空而已有辩论记录时回填（启动时调用），返回是否执行了回填"""
+    with DBSession(bind=bind) as db:
+        has_stats = db.execute(select(DebateStat.metric).limit(1)).first() is not None
+        has_records = db.execute(select(DebateRecord.id).limit(1)).first() is not None
+        if has_stats or not has_records:
+            return False
+        rebuild_debate_stats(db)
+        db.commit()
+        return True
+
+
+def read_debate_stats(db: DBSession, days: int = 0) -> Dict[str, Any]:
+    """读取汇总统计；days > 0 时附带最近 N 天的每日场次"""
+    rows = db.execute(
+        select(DebateStat.metric, DebateStat.bucket, DebateStat.value)
+        .where(DebateStat.metric.in_(SUMMARY_METRICS), DebateStat.value != 0)
+    ).all()
+    counts = {(metric, bucket): value for metric, bucket, value in rows}
+    result: Dict[str, Any] = {
+        "total_debates": counts.get(("total", ""), 0),
+        "pro_wins": counts.get(("winner", "pro"), 0),
+        "con_wins": counts.get(("winner", "con"), 0),
+        "ties": counts.get(("winner", "tie"), 0),
+        "mixed_model_debates": counts.get(("mixed", ""), 0),
+        "model_usage": {bucket: value for (metric, bucket), value in counts.items() if metric == "model"},
+    }
+    if days > 0:
+        result["daily"] = read_daily_counts(db, days)
+    return result
+
+
+def read_daily_counts(db: DBSession, days: int, today: Optional[date] = None) -> List[Dict[str, Any]]:
+    """最近 N 天（含今天，UTC）的每日辩论场次，没有记录的日期补 0"""
+    today = today or datetime.now(timezone.utc).date()
+    start = today - timedelta(days=days - 1)
+    rows = dict(db.execute(
+        select(DebateStat.bucket, DebateStat.value)
+        .where(DebateStat.metric == "day", DebateStat.bucket >= start.isoformat())
+    ).all())
+    return [
+        {"date": day.isoformat(), "debates": rows.get(day.isoformat(), 0)}
+        for day in (start + timedelta(days=offset) for offset in range(days))
+    ]
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description="辩论统计聚合维护")
+    parser.add_argument("--rebuild", action="store_true", help="根据 debate_records 全量重算 debate_stats")
+    args = parser.parse_args(argv)
+
+    from database import SessionLocal, init_db
+
+    init_db()
+    with SessionLocal() as db:
+        if args.rebuild:
+            processed = rebuild_debate_stats(db)
+            db.commit()
+            print(f"已重算 {processed} 条辩论记录的统计")
+        print(json.dumps(read_debate_stats(db), ensure_ascii=False, indent=2))
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
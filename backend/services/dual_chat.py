@@ -156,12 +156,15 @@ class DualChatService:
 
         full_response = ""
         async for chunk in self.ai_client.chat_stream(messages, temperature=0.9):
+            offset = len(full_response)
             full_response += chunk
             yield {
                 "type": "message",
                 "speaker": role.name,
                 "role_id": responding_role,
                 "content": full_response,
+                "delta": chunk,
+                "offset": offset,
                 "is_complete": False,
                 "turn": len(self.conversation_history) + 1,
             }
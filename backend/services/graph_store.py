@@ -0,0 +1,175 @@
+"""
+论点图谱持久化
+
+辩论结束时根据论点消息构建一次 ArgumentGraph，把图谱、评分和 Mermaid 文本
+一起存入 session_graph 表；图谱 / 分析接口之后只需按 session_id 读取这一行。
+没有在结束时保存的会话（同步 / 旧版流式 / 辩证法等）在首次访问时构建并写入。
+图谱记录构建时的消息数，与 Session.message_count 不一致（进行中的辩论又有新消息）
+或构建规则变化（提升 GRAPH_SCHEMA_VERSION）时视为过期，在下次访问时重建。
+
+AI 分析图谱（ArgumentAnalyzer，按需请求）不落库，重复请求由 LLM 补全缓存兜底。
+"""
+from typing import Any, Dict, Iterable, List, Optional
+
+from sqlalchemy import select
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.orm import Session as DBSession
+
+from memory import ArgumentAnalyzer, ArgumentGraph, ArgumentStrength, LexicalRelationInferer
+from models.session import Message, Session, SessionGraph
+
+
+# 2: 关系边由 LexicalRelationInferer 推断（原为相邻论点固定连边）
+# 3: 削弱关系不再给攻击方加分（恢复原评分公式）
+GRAPH_SCHEMA_VERSION = 3
+
+RELATION_INFERER = LexicalRelationInferer()
+
+ROLE_TO_AUTHOR = {
+    "正方": "pro",
+    "反方": "con",
+    "pro": "pro",
+    "con": "con",
+}
+
+
+def debate_arguments(messages: Iterable[Any]) -> List[Dict[str, Any]]:
+    """从消息（需有 role / content / meta_info）中取出辩手论点，跳过 user / assistant 等"""
+    arguments = []
+    for msg in messages:
+        author = ROLE_TO_AUTHOR.get(msg.role or "")
+        if not author:
+            continue
+        round_num = msg.meta_info.get("round", 1) if msg.meta_info else 1
+        arguments.append({"content": msg.content or "", "author": author, "round": round_num})
+    return arguments
+
+
+def build_argument_graph(topic: str, messages: Iterable[Any]) -> ArgumentGraph:
+    """根据消息构建论点图谱（长度定强度、词法推断关系，不调用 LLM）"""
+    graph = ArgumentGraph(topic=topic or "")
+    for arg in debate_arguments(messages):
+        # 简单的关键点提取
+        content = arg["content"]
+        sentences = [s.strip() for s in content.replace("。", ".").split(".") if s.strip()]
+        key_points = sentences[:3] if len(sentences) > 3 else sentences
+
+        # 根据内容长度判断强度
+        strength = ArgumentStrength.MODERATE
+        if len(content) > 400:
+            strength = ArgumentStrength.STRONG
+        elif len(content) < 100:
+            strength = ArgumentStrength.WEAK
+
+        graph.add_argument(
+            content=content,
+            author=arg["author"],
+            round_num=arg["round"],
+            key_points=key_points,
+            strength=strength
+        )
+
+    # 本地词法推断论点关系（不调用 LLM）
+    RELATION_INFERER.apply(graph)
+    return graph
+
+
+def graph_payload(graph: ArgumentGraph, message_count: int = 0) -> Dict[str, Any]:
+    return {
+        "version": GRAPH_SCHEMA_VERSION,
+        "message_count": message_count,
+        "graph": graph.to_dict(),
+        "mermaid": graph.to_mermaid(),
+        "scores": graph.calculate_debate_score(),
+    }
+
+
+def build_graph_payload(topic: str, messages: Iterable[Any]) -> Optional[Dict[str, Any]]:
+    """构建可持久化的图谱数据；没有辩手消息时返回 None
+
+    messages 应为会话的全部消息，其数量作为缓存是否过期的依据。
+    """
+    messages = list(messages)
+    graph = build_argument_graph(topic, messages)
+    return graph_payload(graph, len(messages)) if graph.nodes else None
+
+
+def build_session_graph(session_id: int, topic: str, messages: Iterable[Any]) -> Optional[SessionGraph]:
+    """构建会话图谱行（与消息一起交给调用方提交）；没有辩手消息时返回 None"""
+    payload = build_graph_payload(topic, messages)
+    return SessionGraph(session_id=session_id, payload=payload) if payload is not None else None
+
+
+def is_current_payload(payload: Any, message_count: Optional[int]) -> bool:
+    return (
+        isinstance(payload, dict)
+        and payload.get("version") == GRAPH_SCHEMA_VERSION
+        and payload.get("message_count") == message_count
+    )
+
+
+def load_graph_payload(db: DBSession, session_id: int) -> Optional[Dict[str, Any]]:
+    """读取已持久化、版本与消息数都匹配的图谱（按主键的单次查询）"""
+    row = db.execute(
+        select(SessionGraph.payload, Session.message_count)
+        .join(Session, Session.id == SessionGraph.session_id)
+        .where(SessionGraph.session_id == session_id)
+    ).first()
+    return row.payload if row is not None and is_current_payload(row.payload, row.message_count) else None
+
+
+def _load_messages(db: DBSession, session_id: int) -> List[Any]:
+    return db.execute(
+        select(Message.role, Message.content, Message.meta_info)
+        .where(Message.session_id == session_id)
+        .order_by(Message.created_at, Message.id)
+    ).all()
+
+
+def rebuild_graph_payload(db: DBSession, session_id: int, topic: str) -> Optional[Dict[str, Any]]:
+    """从会话的全部消息重建图谱（不写库）；没有辩手消息时返回 None"""
+    return build_graph_payload(topic, _load_messages(db, session_id))
+
+
+def save_graph_payload(
+    db: DBSession,
+    session_id: int,
+    payload: Dict[str, Any],
+    replace: bool = True,
+) -> Dict[str, Any]:
+    """写入会话图谱并提交（按 session_id 插入或更新），返回最终保存的图谱
+
+    同一会话可能被并发写入（如流式辩论收尾时前端已在请求图谱）：插入撞上唯一约束时
+    回滚并重读已有行。replace=False 时已有行与本次构建的消息数一致就直接采用。
+    """
+    store = db.get(SessionGraph, session_id)
+    if store is None:
+        db.add(SessionGraph(session_id=session_id, payload=payload))
+        try:
+            db.commit()
+            return payload
+        except IntegrityError:
+            db.rollback()
+            store = db.get(SessionGraph, session_id)
+            if store is None:
+                raise
+    if not replace and is_current_payload(store.payload, payload.get("message_count")):
+        return store.payload
+    store.payload = payload
+    db.commit()
+    return payload
+
+
+async def build_analyzed_payload(
+    db: DBSession,
+    session_id: int,
+    topic: str,
+    analyzer: ArgumentAnalyzer,
+    batched: bool = True,
+) -> Optional[Dict[str, Any]]:
+    """使用 ArgumentAnalyzer（LLM）构建图谱；没有辩手消息时返回 None"""
+    arguments = debate_arguments(_load_messages(db, session_id))
+    if not arguments:
+        return None
+    graph = await analyzer.build_graph_from_debate(topic, arguments, batched=batched)
+    return {**graph_payload(graph), "analyzed": True}
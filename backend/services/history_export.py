@@ -0,0 +1,244 @@
+"""
+会话导出（流式）
+
+所有导出都是生成器：消息按主键分批读取（只取列、不建 ORM 对象，
+Session 的 identity map 不会随导出量增长），边读边输出，
+因此内存占用与会话大小、会话数量无关。
+
+- 单会话：json / markdown / txt
+- 批量：ndjson（每行一个会话）或 zip（每个会话一个文件，流式写入、无需可 seek 的输出）
+"""
+import io
+import json
+import zipfile
+from datetime import datetime, timezone
+from typing import Any, Dict, Iterator, Optional
+
+from sqlalchemy import select
+from sqlalchemy.orm import Session as DBSession
+
+from models.session import Message, Session
+
+
+EXPORT_BATCH_SIZE = 500
+
+SINGLE_EXPORT_FORMATS = {"json", "markdown", "txt"}
+BULK_EXPORT_FORMATS = {"ndjson", "zip"}
+
+FORMAT_ALIASES = {"md": "markdown", "text": "txt", "jsonl": "ndjson"}
+
+EXPORT_MEDIA_TYPES = {
+    "json": "application/json",
+    "markdown": "text/markdown",
+    "txt": "text/plain; charset=utf-8",
+    "ndjson": "application/x-ndjson",
+    "zip": "application/zip",
+}
+
+EXPORT_EXTENSIONS = {"json": "json", "markdown": "md", "txt": "txt", "ndjson": "ndjson", "zip": "zip"}
+
+
+def normalize_export_format(value: str) -> str:
+    value = value.lower()
+    return FORMAT_ALIASES.get(value, value)
+
+
+def get_export_role_label(role: str, *, markdown: bool = False) -> str:
+    """Return a user-facing role label for exported session content."""
+    labels = {
+        "user": "用户",
+        "assistant": "AI",
+        "正方": "正方",
+        "反方": "反方",
+        "正题": "正题",
+        "反题": "反题",
+        "合题": "合题",
+    }
+    label = labels.get(role, role)
+
+    if not markdown:
+        return label
+
+    markdown_labels = {
+        "user": "👤 用户",
+        "assistant": "🤖 AI",
+        "正方": "👍 正方",
+        "反方": "👎 反方",
+    }
+    return markdown_labels.get(role, label)
+
+
+def _isoformat(value: Optional[datetime]) -> Optional[str]:
+    return value.isoformat() if value else None
+
+
+def iter_message_rows(db: DBSession, session_id: int, batch_size: int = EXPORT_BATCH_SIZE) -> Iterator[Any]:
+    """按消息 id（即写入顺序）分批读取消息行"""
+    last_id = 0
+    while True:
+        rows = db.execute(
+            select(Message.id, Message.role, Message.content, Message.created_at)
+            .where(Message.session_id == session_id, Message.id > last_id)
+            .order_by(Message.id)
+            .limit(batch_size)
+        ).all()
+        if not rows:
+            return
+        yield from rows
+        last_id = rows[-1].id
+
+
+def _message_dict(row) -> Dict[str, Any]:
+    return {"role": row.role, "content": row.content, "created_at": _isoformat(row.created_at)}
+
+
+def _indent(text: str, prefix: str) -> str:
+    return "\n".join(prefix + line for line in text.split("\n"))
+
+
+def stream_session_json(db: DBSession, session) -> Iterator[str]:
+    """输出与 json.dumps(data, ensure_ascii=False, indent=2) 相同的文档，但逐条生成消息"""
+    header = json.dumps({
+        "session_id": session.id,
+        "type": session.session_type,
+        "topic": session.topic,
+        "created_at": _isoformat(session.created_at),
+    }, ensure_ascii=False, indent=2)
+    yield header[:-2] + ',\n  "messages": ['
+    first = True
+    for row in iter_message_rows(db, session.id):
+        item = _indent(json.dumps(_message_dict(row), ensure_ascii=False, indent=2), "    ")
+        yield ("\n" if first else ",\n") + item
+        first = False
+    yield "]\n}" if first else "\n  ]\n}"
+
+
+def stream_session_markdown(db: DBSession, session) -> Iterator[str]:
+    yield (
+        f"# {session.topic or '会话记录'}\n\n"
+        f"类型: {session.session_type}\n"
+        f"时间: {_isoformat(session.created_at) or 'N/A'}\n\n"
+        "---\n\n"
+    )
+    for row in iter_message_rows(db, session.id):
+        yield f"### {get_export_role_label(row.role, markdown=True)}\n\n{row.content}\n\n"
+
+
+def stream_session_txt(db: DBSession, session) -> Iterator[str]:
+    yield "\n".join([
+        session.topic or "会话记录",
+        f"类型: {session.session_type}",
+        f"时间: {_isoformat(session.created_at) or 'N/A'}",
+        "-" * 40,
+        "",
+    ])
+    for row in iter_message_rows(db, session.id):
+        yield f"\n[{get_export_role_label(row.role)}]\n{row.content or ''}\n"
+
+
+SESSION_STREAMERS = {
+    "json": stream_session_json,
+    "markdown": stream_session_markdown,
+    "txt": stream_session_txt,
+}
+
+
+def stream_session(db: DBSession, session, export_format: str) -> Iterator[bytes]:
+    """单会话导出的字节流"""
+    for chunk in SESSION_STREAMERS[export_format](db, session):
+        yield chunk.encode("utf-8")
+
+
+def _utc_naive(value: Optional[datetime]) -> Optional[datetime]:
+    """SQLite 中的时间按 UTC 无时区保存，比较前统一换算"""
+    if value is None or value.tzinfo is None:
+        return value
+    return value.astimezone(timezone.utc).replace(tzinfo=None)
+
+
+def iter_session_rows(
+    db: DBSession,
+    session_type: Optional[str] = None,
+    start: Optional[datetime] = None,
+    end: Optional[datetime] = None,
+    batch_size: int = EXPORT_BATCH_SIZE,
+) -> Iterator[Any]:
+    """按 id 分批读取符合条件的会话行（created_at 位于 [start, end)）"""
+    filters = []
+    if session_type:
+        filters.append(Session.session_type == session_type)
+    if start is not None:
+        filters.append(Session.created_at >= _utc_naive(start))
+    if end is not None:
+        filters.append(Session.created_at < _utc_naive(end))
+    last_id = 0
+    while True:
+        rows = db.execute(
+            select(Session.id, Session.session_type, Session.topic, Session.created_at)
+            .where(Session.id > last_id, *filters)
+            .order_by(Session.id)
+            .limit(batch_size)
+        ).all()
+        if not rows:
+            return
+        yield from rows
+        last_id = rows[-1].id
+
+
+def stream_ndjson(db: DBSession, sessions: Iterator[Any]) -> Iterator[bytes]:
+    """每个会话一行 JSON；单行内的消息也逐条输出"""
+    for session in sessions:
+        header = json.dumps({
+            "session_id": session.id,
+            "type": session.session_type,
+            "topic": session.topic,
+            "created_at": _isoformat(session.created_at),
+        }, ensure_ascii=False)
+        parts = [header[:-1] + ', "messages": [']
+        first = True
+        for row in iter_message_rows(db, session.id):
+            parts.append(("" if first else ", ") + json.dumps(_message_dict(row), ensure_ascii=False))
+            first = False
+            if len(parts) >= 64:
+                yield "".join(parts).encode("utf-8")
+                parts = []
+        parts.append("]}\n")
+        yield "".join(parts).encode("utf-8")
+
+
+class _ChunkSink(io.RawIOBase):
+    """zipfile 的只写输出：累积写入的字节，由生成器取走"""
+
+    def __init__(self):
+        self._chunks = []
+
+    def writable(self) -> bool:
+        return True
+
+    def write(self, data) -> int:
+        self._chunks.append(bytes(data))
+        return len(data)
+
+    def drain(self) -> bytes:
+        data = b"".join(self._chunks)
+        self._chunks.clear()
+        return data
+
+
+def stream_zip(db: DBSession, sessions: Iterator[Any], item_format: str = "markdown") -> Iterator[bytes]:
+    """每个会话写成 zip 中的一个文件；输出不可 seek，zipfile 会改用数据描述符记录大小"""
+    sink = _ChunkSink()
+    extension = EXPORT_EXTENSIONS[item_format]
+    with zipfile.ZipFile(sink, mode="w", compression=zipfile.ZIP_DEFLATED) as archive:
+        for session in sessions:
+            name = f"session_{session.id}.{extension}"
+            with archive.open(name, mode="w", force_zip64=True) as entry:
+                for chunk in SESSION_STREAMERS[item_format](db, session):
+                    entry.write(chunk.encode("utf-8"))
+                    data = sink.drain()
+                    if data:
+                        yield data
+            data = sink.drain()
+            if data:
+                yield data
+    yield sink.drain()
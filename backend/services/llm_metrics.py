@@ -0,0 +1,239 @@
+"""
+LLM 调用计量
+
+AIClient 每次调用（get_completion / chat_stream）生成一条 LLMCallRecord：
+provider、model、prompt/completion tokens、首 token 延迟、总延迟、重试次数，
+并带上请求 ID（request_id_var）与辩论会话等上下文标签。
+
+- 进程级 LLMMetricsRegistry 保存最近调用与全局汇总，并向监听器广播
+- UsageCollector 通过 ContextVar 绑定到一次辩论运行，汇总该运行的用量；
+  asyncio.create_task 会复制上下文，因此流水线中的后台评审/预取也会被计入
+"""
+import re
+import threading
+import time
+from collections import deque
+from contextlib import contextmanager
+from contextvars import ContextVar
+from dataclasses import asdict, dataclass, field
+from typing import Any, Callable, Deque, Dict, Iterator, List, Optional
+
+from utils.logger import get_logger, get_request_id, log_ai_call
+
+
+logger = get_logger(__name__)
+
+_CJK_RE = re.compile(r"[　-鿿＀-￯]")
+
+
+def estimate_tokens(text: str) -> int:
+    """粗略估算文本 token 数：中日韩字符按 1 个计，其余按 4 字符 1 个计"""
+    if not text:
+        return 0
+    cjk = len(_CJK_RE.findall(text))
+    return cjk + max(0, len(text) - cjk) // 4
+
+
+def estimate_prompt_tokens(messages: List[Dict[str, Any]]) -> int:
+    return sum(estimate_tokens(str(message.get("content", ""))) for message in messages)
+
+
+@dataclass
+class LLMCallRecord:
+    """单次 LLM 调用的计量数据"""
+    provider: str
+    model: str
+    mode: str  # completion / stream
+    started_at: float
+    latency_ms: float = 0.0
+    ttft_ms: Optional[float] = None
+    prompt_tokens: int = 0
+    completion_tokens: int = 0
+    usage_estimated: bool = False
+    retries: int = 0
+    throttled: int = 0
+    queue_wait_ms: float = 0.0
+    cached: bool = False
+    success: bool = True
+    error: Optional[str] = None
+    request_id: str = ""
+    tags: Dict[str, Any] = field(default_factory=dict)
+
+    @property
+    def total_tokens(self) -> int:
+        return self.prompt_tokens + self.completion_tokens
+
+    def to_dict(self) -> Dict[str, Any]:
+        data = asdict(self)
+        data["total_tokens"] = self.total_tokens
+        return data
+
+
+def _empty_bucket() -> Dict[str, Any]:
+    return {
+        "calls": 0,
+        "errors": 0,
+        "cached": 0,
+        "retries": 0,
+        "throttled": 0,
+        "prompt_tokens": 0,
+        "completion_tokens": 0,
+        "total_tokens": 0,
+        "latency_ms": 0.0,
+        "ttft_ms_total": 0.0,
+        "ttft_samples": 0,
+        "usage_estimated": False,
+    }
+
+
+def _add_to_bucket(bucket: Dict[str, Any], record: LLMCallRecord) -> None:
+    bucket["calls"] += 1
+    bucket["errors"] += 0 if record.success else 1
+    bucket["cached"] += 1 if record.cached else 0
+    bucket["retries"] += record.retries
+    bucket["throttled"] += record.throttled
+    bucket["prompt_tokens"] += record.prompt_tokens
+    bucket["completion_tokens"] += record.completion_tokens
+    bucket["total_tokens"] += record.total_tokens
+    bucket["latency_ms"] += record.latency_ms
+    if record.ttft_ms is not None:
+        bucket["ttft_ms_total"] += record.ttft_ms
+        bucket["ttft_samples"] += 1
+    bucket["usage_estimated"] = bucket["usage_estimated"] or record.usage_estimated
+
+
+def _finalize_bucket(bucket: Dict[str, Any]) -> Dict[str, Any]:
+    result = {key: value for key, value in bucket.items() if key not in ("ttft_ms_total", "ttft_samples")}
+    result["latency_ms"] = round(bucket["latency_ms"], 2)
+    result["avg_latency_ms"] = round(bucket["latency_ms"] / bucket["calls"], 2) if bucket["calls"] else 0.0
+    result["avg_ttft_ms"] = (
+        round(bucket["ttft_ms_total"] / bucket["ttft_samples"], 2) if bucket["ttft_samples"] else None
+    )
+    return result
+
+
+class UsageCollector:
+    """汇总一组 LLM 调用（通常是一次辩论运行）"""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._total = _empty_bucket()
+        self._by_model: Dict[str, Dict[str, Any]] = {}
+        self._by_agent: Dict[str, Dict[str, Any]] = {}
+
+    def add(self, record: LLMCallRecord) -> None:
+        model_key = f"{record.provider}/{record.model}"
+        agent_key = str(record.tags.get("agent") or "other")
+        with self._lock:
+            _add_to_bucket(self._total, record)
+            _add_to_bucket(self._by_model.setdefault(model_key, _empty_bucket()), record)
+            _add_to_bucket(self._by_agent.setdefault(agent_key, _empty_bucket()), record)
+
+    @property
+    def total_tokens(self) -> int:
+        return self._total["total_tokens"]
+
+    def summary(self) -> Dict[str, Any]:
+        with self._lock:
+            return {
+                **_finalize_bucket(self._total),
+                "by_model": {key: _finalize_bucket(value) for key, value in self._by_model.items()},
+                "by_agent": {key: _finalize_bucket(value) for key, value in self._by_agent.items()},
+            }
+
+
+_call_tags: ContextVar[Dict[str, Any]] = ContextVar("llm_call_tags", default={})
+_collectors: ContextVar[tuple] = ContextVar("llm_usage_collectors", default=())
+
+
+@contextmanager
+def llm_call_scope(collector: Optional[UsageCollector] = None, **tags: Any) -> Iterator[None]:
+    """在当前上下文内为 LLM 调用附加标签，并可选地挂载用量收集器
+
+    可在异步生成器中跨 yield 使用；若生成器在其他上下文中被关闭，
+    复位失败会被忽略（上下文随之丢弃）。
+    """
+    tag_token = _call_tags.set({**_call_tags.get(), **tags})
+    collector_token = _collectors.set(_collectors.get() + (collector,)) if collector is not None else None
+    try:
+        yield
+    finally:
+        for var, token in ((_collectors, collector_token), (_call_tags, tag_token)):
+            if token is None:
+                continue
+            try:
+                var.reset(token)
+            except ValueError:
+                pass
+
+
+def current_call_tags() -> Dict[str, Any]:
+    return dict(_call_tags.get())
+
+
+class LLMMetricsRegistry:
+    """进程级 LLM 调用计量：最近调用环形缓冲 + 全局汇总 + 监听器"""
+
+    def __init__(self, max_recent: int = 500):
+        self._lock = threading.Lock()
+        self._recent: Deque[LLMCallRecord] = deque(maxlen=max_recent)
+        self._totals = UsageCollector()
+        self._listeners: List[Callable[[LLMCallRecord], None]] = []
+        self.started_at = time.time()
+
+    def add_listener(self, listener: Callable[[LLMCallRecord], None]) -> None:
+        with self._lock:
+            if listener not in self._listeners:
+                self._listeners.append(listener)
+
+    def remove_listener(self, listener: Callable[[LLMCallRecord], None]) -> None:
+        with self._lock:
+            if listener in self._listeners:
+                self._listeners.remove(listener)
+
+    def record(self, record: LLMCallRecord) -> None:
+        if not record.request_id:
+            record.request_id = get_request_id()
+        record.tags = {**current_call_tags(), **record.tags}
+
+        with self._lock:
+            self._recent.append(record)
+            listeners = list(self._listeners)
+        self._totals.add(record)
+        for collector in _collectors.get():
+            collector.add(record)
+        for listener in listeners:
+            try:
+                listener(record)
+            except Exception:
+                logger.exception("LLM 计量监听器执行失败")
+
+        if not record.cached:
+            log_ai_call(record.provider, record.model, record.total_tokens, record.latency_ms)
+
+    def recent(self, limit: int = 50, session_id: Optional[int] = None) -> List[Dict[str, Any]]:
+        with self._lock:
+            records = list(self._recent)
+        if session_id is not None:
+            records = [record for record in records if record.tags.get("session_id") == session_id]
+        return [record.to_dict() for record in records[-limit:]] if limit > 0 else []
+
+    def summary(self) -> Dict[str, Any]:
+        return {
+            "since": self.started_at,
+            **self._totals.summary(),
+        }
+
+    def reset(self) -> None:
+        with self._lock:
+            self._recent.clear()
+            self._totals = UsageCollector()
+            self.started_at = time.time()
+
+
+_registry = LLMMetricsRegistry()
+
+
+def get_llm_metrics() -> LLMMetricsRegistry:
+    """获取进程级 LLM 计量注册表"""
+    return _registry
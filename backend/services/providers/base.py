@@ -4,11 +4,24 @@ Provider 抽象基类
 定义所有 AI Provider 的统一异步接口。
 """
 from abc import ABC, abstractmethod
-from typing import AsyncGenerator
+from typing import AsyncGenerator, Optional
 
 
 class BaseProvider(ABC):
-    """AI Provider 抽象基类"""
+    """AI Provider 抽象基类
+
+    调用方可通过关键字参数 usage 传入一个 dict，provider 在响应中拿到用量后
+    写入 prompt_tokens / completion_tokens；无法获取时保持为空。
+    """
+
+    @staticmethod
+    def _report_usage(usage: Optional[dict], prompt_tokens, completion_tokens) -> None:
+        if usage is None:
+            return
+        if prompt_tokens is not None:
+            usage["prompt_tokens"] = int(prompt_tokens)
+        if completion_tokens is not None:
+            usage["completion_tokens"] = int(completion_tokens)
 
     @abstractmethod
     async def get_completion(
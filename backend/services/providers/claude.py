@@ -1,11 +1,14 @@
 """
 Anthropic Claude Provider
 
-使用 anthropic SDK 的异步接口。
+使用 anthropic SDK 的异步接口，客户端从共享客户端池获取。
+SDK 内置重试已关闭，429/529 交由 AIClient 的共享限流器统一退避。
 """
 from typing import AsyncGenerator
 
+from services.rate_limiter import api_key_digest
 from .base import BaseProvider
+from .client_pool import get_client_pool, http_library_for
 
 
 class ClaudeProvider(BaseProvider):
@@ -13,8 +16,16 @@ class ClaudeProvider(BaseProvider):
 
     def __init__(self, api_key: str, model: str):
         import anthropic
-        self.client = anthropic.AsyncAnthropic(api_key=api_key)
         self.model = model
+        self.client = get_client_pool().get(
+            f"claude:{api_key_digest(api_key)}",
+            lambda http_client: anthropic.AsyncAnthropic(
+                api_key=api_key,
+                max_retries=0,
+                http_client=http_client,
+            ),
+            http_library=http_library_for(anthropic.DefaultAsyncHttpxClient),
+        )
 
     def _convert_messages(self, messages: list[dict]) -> tuple[str, list[dict]]:
         """分离 system prompt 和对话消息"""
@@ -43,6 +54,9 @@ class ClaudeProvider(BaseProvider):
         )
         if not response.content:
             raise ValueError("Claude API returned empty content")
+        usage = getattr(response, "usage", None)
+        if usage is not None:
+            self._report_usage(kwargs.get("usage"), usage.input_tokens, usage.output_tokens)
         return response.content[0].text
 
     async def chat_stream(self, messages, temperature=0.7, max_tokens=2000, **kwargs) -> AsyncGenerator[str, None]:
@@ -56,3 +70,6 @@ class ClaudeProvider(BaseProvider):
         ) as stream:
             async for text in stream.text_stream:
                 yield text
+            final = await stream.get_final_message()
+            if final.usage is not None:
+                self._report_usage(kwargs.get("usage"), final.usage.input_tokens, final.usage.output_tokens)
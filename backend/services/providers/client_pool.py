@@ -0,0 +1,221 @@
+"""
+Provider SDK 客户端池
+
+所有 Provider（OpenAI 兼容 / Gemini / Claude）的 SDK 客户端按
+(provider, API Key 摘要, base_url) 复用，并共享 httpx.AsyncClient：
+- 全局连接上限与 keep-alive 由一处配置，避免每个请求冷启动 TLS
+- 新版 openai / anthropic SDK 要求 httpx2 客户端，因此按 HTTP 库各维护一个共享客户端
+- 池内 SDK 客户端数量有上限（LRU），空闲超时后淘汰
+- 通过 httpcore trace 统计新建连接数与请求数，得出连接复用率
+
+淘汰 SDK 客户端只是丢弃引用，底层连接仍归共享 httpx 客户端所有，
+因此不会调用 SDK 的 close()；应用关闭时由 lifespan 调用 aclose() 统一释放。
+"""
+import importlib
+import threading
+import time
+from collections import OrderedDict
+from types import ModuleType
+from typing import Any, Callable, Dict, Optional
+
+import httpx
+
+from config import get_settings
+
+
+DEFAULT_TIMEOUT = {"connect": 5.0, "read": 60.0, "write": 10.0, "pool": 10.0}
+
+
+def http_library_for(sdk_http_client_cls: type) -> ModuleType:
+    """根据 SDK 的 DefaultAsyncHttpxClient 推断其要求的 HTTP 库（httpx 或 httpx2）"""
+    for base in sdk_http_client_cls.__mro__:
+        if base.__name__ == "AsyncClient":
+            return importlib.import_module(base.__module__.split(".")[0])
+    return httpx
+
+
+class _PoolEntry:
+    __slots__ = ("client", "created_at", "last_used", "hits")
+
+    def __init__(self, client: Any, now: float):
+        self.client = client
+        self.created_at = now
+        self.last_used = now
+        self.hits = 0
+
+
+class ProviderClientPool:
+    """有界的 SDK 客户端池
+
+    Args:
+        max_clients: 池内最多保留的 SDK 客户端数，超出时淘汰最久未使用的
+        idle_ttl_seconds: 客户端空闲超过该时长后淘汰，<= 0 表示不按空闲淘汰
+        max_connections / max_keepalive_connections / keepalive_expiry: 共享 httpx 连接池参数
+    """
+
+    def __init__(
+        self,
+        max_clients: int = 32,
+        idle_ttl_seconds: float = 300.0,
+        max_connections: int = 100,
+        max_keepalive_connections: int = 20,
+        keepalive_expiry: float = 30.0,
+        timeout: Optional[Dict[str, float]] = None,
+    ):
+        self.max_clients = max(1, max_clients)
+        self.idle_ttl_seconds = idle_ttl_seconds
+        self.limits = {
+            "max_connections": max_connections,
+            "max_keepalive_connections": max_keepalive_connections,
+            "keepalive_expiry": keepalive_expiry,
+        }
+        self.timeout = timeout or DEFAULT_TIMEOUT
+
+        self._lock = threading.Lock()
+        self._entries: "OrderedDict[str, _PoolEntry]" = OrderedDict()
+        self._http_clients: Dict[str, Any] = {}
+
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.idle_evictions = 0
+        self.http_requests = 0
+        self.connections_opened = 0
+
+    # ---------- 共享 httpx 客户端 ----------
+
+    async def _trace(self, event_name: str, info: Dict[str, Any]) -> None:
+        if event_name == "connection.connect_tcp.complete":
+            self.connections_opened += 1
+
+    async def _on_request(self, request) -> None:
+        self.http_requests += 1
+        request.extensions["trace"] = self._trace
+
+    def http_client_for(self, library: ModuleType = httpx):
+        """指定 HTTP 库的共享 AsyncClient，首次使用时创建"""
+        with self._lock:
+            client = self._http_clients.get(library.__name__)
+            if client is None or client.is_closed:
+                client = library.AsyncClient(
+                    limits=library.Limits(**self.limits),
+                    timeout=library.Timeout(**self.timeout),
+                    event_hooks={"request": [self._on_request]},
+                )
+                self._http_clients[library.__name__] = client
+            return client
+
+    @property
+    def http_client(self) -> httpx.AsyncClient:
+        """共享的 httpx.AsyncClient"""
+        return self.http_client_for(httpx)
+
+    # ---------- SDK 客户端 ----------
+
+    def _evict_locked(self, now: float) -> None:
+        if self.idle_ttl_seconds > 0:
+            expired = [
+                key for key, entry in self._entries.items()
+                if now - entry.last_used > self.idle_ttl_seconds
+            ]
+            for key in expired:
+                del self._entries[key]
+                self.idle_evictions += 1
+        while len(self._entries) > self.max_clients:
+            self._entries.popitem(last=False)
+            self.evictions += 1
+
+    def get(
+        self,
+        key: str,
+        factory: Callable[[Any], Any],
+        http_library: ModuleType = httpx,
+    ) -> Any:
+        """获取 key 对应的 SDK 客户端；不存在时用 factory(http_client) 创建"""
+        now = time.monotonic()
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None and (
+                self.idle_ttl_seconds <= 0 or now - entry.last_used <= self.idle_ttl_seconds
+            ):
+                entry.last_used = now
+                entry.hits += 1
+                self._entries.move_to_end(key)
+                self.hits += 1
+                return entry.client
+            self.misses += 1
+
+        client = factory(self.http_client_for(http_library))
+        with self._lock:
+            self._entries[key] = _PoolEntry(client, now)
+            self._entries.move_to_end(key)
+            self._evict_locked(now)
+        return client
+
+    def evict_idle(self) -> int:
+        """主动淘汰空闲客户端，返回淘汰数量"""
+        with self._lock:
+            before = self.idle_evictions
+            self._evict_locked(time.monotonic())
+            return self.idle_evictions - before
+
+    async def aclose(self) -> None:
+        """释放全部客户端与共享连接"""
+        with self._lock:
+            self._entries.clear()
+            http_clients, self._http_clients = list(self._http_clients.values()), {}
+        for http_client in http_clients:
+            if not http_client.is_closed:
+                await http_client.aclose()
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            clients = {key.split(":", 1)[0]: 0 for key in self._entries}
+            for key in self._entries:
+                clients[key.split(":", 1)[0]] += 1
+            size = len(self._entries)
+        lookups = self.hits + self.misses
+        reused = max(0, self.http_requests - self.connections_opened)
+        return {
+            "clients": size,
+            "clients_by_provider": clients,
+            "max_clients": self.max_clients,
+            "hits": self.hits,
+            "misses": self.misses,
+            "client_reuse_rate": round(self.hits / lookups, 4) if lookups else 0.0,
+            "evictions": self.evictions,
+            "idle_evictions": self.idle_evictions,
+            "http_requests": self.http_requests,
+            "connections_opened": self.connections_opened,
+            "connection_reuse_rate": round(reused / self.http_requests, 4) if self.http_requests else 0.0,
+            "limits": dict(self.limits),
+        }
+
+
+_default_pool: Optional[ProviderClientPool] = None
+_default_pool_lock = threading.Lock()
+
+
+def get_client_pool() -> ProviderClientPool:
+    """获取进程级共享客户端池"""
+    global _default_pool
+    with _default_pool_lock:
+        if _default_pool is None:
+            settings = get_settings()
+            _default_pool = ProviderClientPool(
+                max_clients=settings.llm_pool_max_clients,
+                idle_ttl_seconds=settings.llm_pool_idle_seconds,
+                max_connections=settings.llm_http_max_connections,
+                max_keepalive_connections=settings.llm_http_max_keepalive,
+                keepalive_expiry=settings.llm_http_keepalive_expiry,
+            )
+        return _default_pool
+
+
+async def close_client_pool() -> None:
+    """关闭进程级客户端池（应用关闭时调用）"""
+    global _default_pool
+    with _default_pool_lock:
+        pool, _default_pool = _default_pool, None
+    if pool is not None:
+        await pool.aclose()
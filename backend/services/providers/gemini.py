@@ -2,10 +2,13 @@
 Google Gemini Provider
 
 使用 google-genai SDK 的异步接口，并正确转换多轮消息格式。
+客户端从共享客户端池获取，异步请求走共享 httpx 连接。
 """
 from typing import AsyncGenerator
 
+from services.rate_limiter import api_key_digest
 from .base import BaseProvider
+from .client_pool import get_client_pool
 
 
 class GeminiProvider(BaseProvider):
@@ -14,8 +17,24 @@ class GeminiProvider(BaseProvider):
     def __init__(self, api_key: str, model: str):
         self.api_key = api_key
         self.model = model
+        self.client = get_client_pool().get(
+            f"gemini:{api_key_digest(api_key)}",
+            lambda http_client: self._create_client(api_key, http_client),
+        )
+
+    @staticmethod
+    def _create_client(api_key: str, http_client):
         from google import genai as google_genai
-        self.client = google_genai.Client(api_key=self.api_key)
+        from google.genai import types as genai_types
+        return google_genai.Client(
+            api_key=api_key,
+            http_options=genai_types.HttpOptions(httpx_async_client=http_client),
+        )
+
+    def _record_usage(self, usage_out, response) -> None:
+        metadata = getattr(response, "usage_metadata", None)
+        if metadata is not None:
+            self._report_usage(usage_out, metadata.prompt_token_count, metadata.candidates_token_count)
 
     def _convert_messages(self, messages: list[dict]):
         """将 OpenAI 格式消息转换为 Gemini Contents + system_instruction"""
@@ -66,6 +85,7 @@ class GeminiProvider(BaseProvider):
         )
         if not response.text:
             raise ValueError("Gemini API returned empty response")
+        self._record_usage(kwargs.get("usage"), response)
         return response.text
 
     async def chat_stream(self, messages, temperature=0.7, max_tokens=2000, **kwargs) -> AsyncGenerator[str, None]:
@@ -77,5 +97,7 @@ class GeminiProvider(BaseProvider):
             contents=contents,
             config=config,
         ):
+            # 流式 chunk 的 usage_metadata 为累计值，以最后一次为准
+            self._record_usage(kwargs.get("usage"), chunk)
             if chunk.text:
                 yield chunk.text
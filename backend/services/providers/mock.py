@@ -9,6 +9,7 @@ import json
 import random
 from typing import AsyncGenerator, Dict, Optional
 
+from services.llm_metrics import estimate_prompt_tokens, estimate_tokens
 from .base import BaseProvider
 
 
@@ -103,11 +104,17 @@ class MockProvider(BaseProvider):
         rng.shuffle(templates)
         return " ".join(templates)
 
+    def _mock_usage(self, usage: Optional[dict], messages: list[dict], content: str) -> None:
+        self._report_usage(usage, estimate_prompt_tokens(messages), estimate_tokens(content))
+
     async def get_completion(self, messages, temperature=0.7, max_tokens=2000, **kwargs) -> str:
-        return self._mock_response(messages, temperature=temperature)
+        content = self._mock_response(messages, temperature=temperature)
+        self._mock_usage(kwargs.get("usage"), messages, content)
+        return content
 
     async def chat_stream(self, messages, temperature=0.7, max_tokens=2000, **kwargs) -> AsyncGenerator[str, None]:
         content = self._mock_response(messages, temperature=temperature)
         chunk_size = 24
         for i in range(0, len(content), chunk_size):
             yield content[i : i + chunk_size]
+        self._mock_usage(kwargs.get("usage"), messages, content)
@@ -1,40 +1,23 @@
 """
 OpenAI 兼容 Provider（适用于 DeepSeek 和 OpenAI）
 
-使用 AsyncOpenAI 客户端，支持连接池复用。
+使用 AsyncOpenAI 客户端，通过共享客户端池复用连接。
+SDK 内置重试已关闭，429 交由 AIClient 的共享限流器统一退避。
 """
-from typing import AsyncGenerator, Dict, Optional
-import hashlib
-import httpx
-from openai import AsyncOpenAI
+from typing import AsyncGenerator, Optional
+from openai import AsyncOpenAI, DefaultAsyncHttpxClient
 
+from services.rate_limiter import api_key_digest
 from .base import BaseProvider
+from .client_pool import get_client_pool, http_library_for
 
 
 class OpenAICompatProvider(BaseProvider):
     """OpenAI 兼容 API Provider（DeepSeek / OpenAI）
 
-    类级别连接池，相同配置复用同一 AsyncOpenAI 实例。
+    相同 API Key 与 base_url 复用进程级客户端池中的同一 AsyncOpenAI 实例。
     """
 
-    _client_pool: Dict[str, AsyncOpenAI] = {}
-
-    @classmethod
-    def _get_or_create_client(
-        cls,
-        pool_key: str,
-        api_key: str,
-        base_url: str,
-        timeout: httpx.Timeout,
-    ) -> AsyncOpenAI:
-        if pool_key not in cls._client_pool:
-            cls._client_pool[pool_key] = AsyncOpenAI(
-                api_key=api_key,
-                base_url=base_url,
-                timeout=timeout,
-            )
-        return cls._client_pool[pool_key]
-
     def __init__(
         self,
         api_key: str,
@@ -44,10 +27,17 @@ class OpenAICompatProvider(BaseProvider):
     ):
         self.model = model
         self.seed = seed
-        timeout = httpx.Timeout(connect=5.0, read=60.0, write=10.0, pool=10.0)
-        key_digest = hashlib.sha256(api_key.encode("utf-8")).hexdigest()
-        pool_key = f"{key_digest}:{base_url}"
-        self.client = self._get_or_create_client(pool_key, api_key, base_url, timeout)
+        pool_key = f"openai_compat:{api_key_digest(api_key)}:{base_url}"
+        self.client = get_client_pool().get(
+            pool_key,
+            lambda http_client: AsyncOpenAI(
+                api_key=api_key,
+                base_url=base_url,
+                max_retries=0,
+                http_client=http_client,
+            ),
+            http_library=http_library_for(DefaultAsyncHttpxClient),
+        )
 
     def _build_payload(self, messages, temperature, max_tokens, stream=False) -> dict:
         payload = {
@@ -61,18 +51,25 @@ class OpenAICompatProvider(BaseProvider):
             payload["seed"] = self.seed
         return payload
 
+    def _record_usage(self, usage_out: Optional[dict], usage) -> None:
+        if usage is not None:
+            self._report_usage(usage_out, usage.prompt_tokens, usage.completion_tokens)
+
     async def get_completion(self, messages, temperature=0.7, max_tokens=2000, **kwargs) -> str:
         response = await self.client.chat.completions.create(
             **self._build_payload(messages, temperature, max_tokens, stream=False)
         )
         if not response.choices:
             raise ValueError("API returned empty choices")
+        self._record_usage(kwargs.get("usage"), getattr(response, "usage", None))
         return response.choices[0].message.content or ""
 
     async def chat_stream(self, messages, temperature=0.7, max_tokens=2000, **kwargs) -> AsyncGenerator[str, None]:
-        stream = await self.client.chat.completions.create(
-            **self._build_payload(messages, temperature, max_tokens, stream=True)
-        )
+        payload = self._build_payload(messages, temperature, max_tokens, stream=True)
+        # 最后一个 chunk 携带 usage（choices 为空）
+        payload["stream_options"] = {"include_usage": True}
+        stream = await self.client.chat.completions.create(**payload)
         async for chunk in stream:
+            self._record_usage(kwargs.get("usage"), getattr(chunk, "usage", None))
             if chunk.choices and chunk.choices[0].delta.content:
                 yield chunk.choices[0].delta.content
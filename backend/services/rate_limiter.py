@@ -0,0 +1,326 @@
+"""
+LLM 请求限流与并发调节
+
+进程级共享，按 (provider, API Key 摘要) 分桶：
+- 令牌桶限制请求速率（可选）
+- AIMD 并发窗口：成功时加性增长，遇到 429 时乘性减半
+- 尊重 Retry-After，冷却期内同一桶的新请求全部排队
+- 记录排队等待时间，供监控接口读取
+
+等待者以 (loop, future) 形式登记并通过 call_soon_threadsafe 唤醒，
+因此同一个限流器可以被不同事件循环（如测试中的多次 asyncio.run）安全复用。
+"""
+import asyncio
+import hashlib
+import random
+import threading
+import time
+from collections import deque
+from contextlib import asynccontextmanager
+from email.utils import parsedate_to_datetime
+from typing import Any, AsyncIterator, Deque, Dict, List, Optional, Tuple
+
+from config import get_settings
+
+
+RATE_LIMIT_STATUS_CODES = {429, 529}
+
+OUTCOME_SUCCESS = "success"
+OUTCOME_RATE_LIMITED = "rate_limited"
+OUTCOME_ERROR = "error"
+OUTCOME_CANCELLED = "cancelled"
+
+
+def api_key_digest(api_key: Optional[str]) -> str:
+    """API Key 的 SHA-256 摘要，用作连接池与限流分桶的键"""
+    return hashlib.sha256((api_key or "").encode("utf-8")).hexdigest()
+
+
+def _status_code(exc: BaseException) -> Optional[int]:
+    for attr in ("status_code", "code", "status"):
+        value = getattr(exc, attr, None)
+        if isinstance(value, int):
+            return value
+    response = getattr(exc, "response", None)
+    value = getattr(response, "status_code", None)
+    return value if isinstance(value, int) else None
+
+
+def is_rate_limit_error(exc: BaseException) -> bool:
+    """判断异常是否为服务端限流（429 / Anthropic 529 过载）"""
+    if _status_code(exc) in RATE_LIMIT_STATUS_CODES:
+        return True
+    return type(exc).__name__ in ("RateLimitError", "OverloadedError")
+
+
+def extract_retry_after(exc: BaseException) -> Optional[float]:
+    """从异常携带的响应头中解析 Retry-After（秒），支持秒数、HTTP 日期与 retry-after-ms"""
+    value = getattr(exc, "retry_after", None)
+    if isinstance(value, (int, float)):
+        return max(0.0, float(value))
+
+    headers = getattr(getattr(exc, "response", None), "headers", None)
+    if not headers:
+        return None
+    try:
+        retry_ms = headers.get("retry-after-ms")
+        if retry_ms is not None:
+            return max(0.0, float(retry_ms) / 1000)
+        retry_after = headers.get("retry-after")
+    except Exception:
+        return None
+    if retry_after is None:
+        return None
+    try:
+        return max(0.0, float(retry_after))
+    except (TypeError, ValueError):
+        pass
+    try:
+        return max(0.0, parsedate_to_datetime(retry_after).timestamp() - time.time())
+    except (TypeError, ValueError, IndexError):
+        return None
+
+
+def compute_backoff(
+    attempt: int,
+    base: float,
+    cap: float,
+    retry_after: Optional[float] = None,
+    rng: Optional[random.Random] = None,
+) -> float:
+    """带抖动的指数退避（full jitter）；有 Retry-After 时以其为下限"""
+    rng = rng or random
+    ceiling = min(cap, base * (2 ** max(0, attempt - 1)))
+    delay = rng.uniform(0, ceiling) if ceiling > 0 else 0.0
+    if retry_after is not None:
+        delay = max(delay, min(retry_after, cap))
+    return delay
+
+
+def _wake(future: asyncio.Future) -> None:
+    if not future.done():
+        future.set_result(None)
+
+
+class ProviderRateLimiter:
+    """单个 (provider, API Key) 桶的限流器
+
+    Args:
+        name: 桶名称，用于监控输出
+        rate_per_sec: 令牌桶速率，<= 0 表示不限速
+        burst: 令牌桶容量
+        max_concurrency: 并发窗口上限（也是初始值）
+        min_concurrency: 并发窗口下限
+    """
+
+    def __init__(
+        self,
+        name: str,
+        rate_per_sec: float = 0.0,
+        burst: int = 10,
+        max_concurrency: int = 8,
+        min_concurrency: int = 1,
+    ):
+        self.name = name
+        self.rate_per_sec = rate_per_sec
+        self.burst = max(1, burst)
+        self.max_concurrency = max(1, max_concurrency)
+        self.min_concurrency = max(1, min(min_concurrency, self.max_concurrency))
+
+        self._lock = threading.Lock()
+        self._waiters: List[Tuple[asyncio.AbstractEventLoop, asyncio.Future]] = []
+        self._tokens = float(self.burst)
+        self._refilled_at = time.monotonic()
+        self._limit = float(self.max_concurrency)
+        self._cooldown_until = 0.0
+
+        self.in_flight = 0
+        self.acquired = 0
+        self.successes = 0
+        self.errors = 0
+        self.rate_limited = 0
+        self.total_wait_s = 0.0
+        self.max_wait_s = 0.0
+        self._recent_waits: Deque[float] = deque(maxlen=512)
+
+    @property
+    def concurrency_limit(self) -> int:
+        return max(self.min_concurrency, int(self._limit))
+
+    def _refill(self, now: float) -> None:
+        if self.rate_per_sec <= 0:
+            return
+        elapsed = now - self._refilled_at
+        self._tokens = min(float(self.burst), self._tokens + elapsed * self.rate_per_sec)
+        self._refilled_at = now
+
+    def _try_acquire(self, now: float) -> Optional[float]:
+        """尝试占用一个并发名额与一个令牌；成功返回 0，否则返回建议等待秒数（None 表示等待释放）"""
+        if now < self._cooldown_until:
+            return self._cooldown_until - now
+        if self.in_flight >= self.concurrency_limit:
+            return None
+        if self.rate_per_sec > 0:
+            self._refill(now)
+            if self._tokens < 1:
+                return (1 - self._tokens) / self.rate_per_sec
+            self._tokens -= 1
+        self.in_flight += 1
+        return 0.0
+
+    def _notify_all(self) -> None:
+        waiters, self._waiters = self._waiters, []
+        for loop, future in waiters:
+            try:
+                loop.call_soon_threadsafe(_wake, future)
+            except RuntimeError:
+                # 事件循环已关闭，等待者随之失效
+                pass
+
+    async def acquire(self) -> float:
+        """等待一个可用名额，返回排队等待的秒数"""
+        loop = asyncio.get_running_loop()
+        started = time.monotonic()
+        while True:
+            with self._lock:
+                delay = self._try_acquire(time.monotonic())
+                if delay == 0.0:
+                    waited = time.monotonic() - started
+                    self.acquired += 1
+                    self.total_wait_s += waited
+                    self.max_wait_s = max(self.max_wait_s, waited)
+                    self._recent_waits.append(waited)
+                    return waited
+                future = loop.create_future()
+                entry = (loop, future)
+                self._waiters.append(entry)
+            try:
+                await asyncio.wait({future}, timeout=delay)
+            finally:
+                with self._lock:
+                    if entry in self._waiters:
+                        self._waiters.remove(entry)
+
+    def release(self, outcome: str = OUTCOME_SUCCESS, retry_after: Optional[float] = None) -> None:
+        """归还名额并根据结果调整并发窗口"""
+        with self._lock:
+            self.in_flight = max(0, self.in_flight - 1)
+            if outcome == OUTCOME_RATE_LIMITED:
+                self.rate_limited += 1
+                self._limit = max(float(self.min_concurrency), self._limit / 2)
+                if retry_after:
+                    self._cooldown_until = max(self._cooldown_until, time.monotonic() + retry_after)
+            elif outcome == OUTCOME_SUCCESS:
+                self.successes += 1
+                self._limit = min(float(self.max_concurrency), self._limit + 1 / self._limit)
+            elif outcome == OUTCOME_ERROR:
+                self.errors += 1
+            self._notify_all()
+
+    @asynccontextmanager
+    async def slot(self) -> AsyncIterator["_Slot"]:
+        """占用名额的上下文；调用方通过 slot.outcome / slot.retry_after 报告结果"""
+        waited = await self.acquire()
+        slot = _Slot()
+        slot.queue_wait = waited
+        try:
+            yield slot
+        except BaseException as exc:
+            if slot.outcome == OUTCOME_SUCCESS:
+                slot.fail(exc)
+            raise
+        finally:
+            self.release(slot.outcome, slot.retry_after)
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            waits = sorted(self._recent_waits)
+            cooldown = max(0.0, self._cooldown_until - time.monotonic())
+            queued = len(self._waiters)
+
+        def percentile(p: float) -> float:
+            if not waits:
+                return 0.0
+            return waits[min(len(waits) - 1, int(round(p * (len(waits) - 1))))]
+
+        return {
+            "name": self.name,
+            "in_flight": self.in_flight,
+            "queued": queued,
+            "concurrency_limit": self.concurrency_limit,
+            "max_concurrency": self.max_concurrency,
+            "rate_per_sec": self.rate_per_sec,
+            "cooldown_s": round(cooldown, 3),
+            "acquired": self.acquired,
+            "successes": self.successes,
+            "errors": self.errors,
+            "rate_limited": self.rate_limited,
+            "queue_wait_ms": {
+                "avg": round(self.total_wait_s / self.acquired * 1000, 2) if self.acquired else 0.0,
+                "p50": round(percentile(0.5) * 1000, 2),
+                "p95": round(percentile(0.95) * 1000, 2),
+                "max": round(self.max_wait_s * 1000, 2),
+            },
+        }
+
+
+class _Slot:
+    """一次占用的结果记录；started 表示流式响应已产出内容，不可再重试"""
+    __slots__ = ("outcome", "retry_after", "started", "queue_wait")
+
+    def __init__(self):
+        self.outcome = OUTCOME_SUCCESS
+        self.retry_after: Optional[float] = None
+        self.started = False
+        self.queue_wait = 0.0
+
+    def fail(self, exc: BaseException) -> None:
+        if isinstance(exc, (asyncio.CancelledError, GeneratorExit)):
+            # 调用方取消或提前关闭流，不计入错误也不调整窗口
+            self.outcome = OUTCOME_CANCELLED
+        elif is_rate_limit_error(exc):
+            self.outcome = OUTCOME_RATE_LIMITED
+            self.retry_after = extract_retry_after(exc)
+        else:
+            self.outcome = OUTCOME_ERROR
+
+
+class RateLimiterRegistry:
+    """按 (provider, API Key 摘要) 管理限流器"""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._limiters: Dict[str, ProviderRateLimiter] = {}
+
+    def get(self, provider: str, api_key: Optional[str] = None) -> ProviderRateLimiter:
+        key = f"{provider}:{api_key_digest(api_key)[:16]}"
+        with self._lock:
+            limiter = self._limiters.get(key)
+            if limiter is None:
+                settings = get_settings()
+                limiter = ProviderRateLimiter(
+                    name=key,
+                    rate_per_sec=settings.llm_provider_rps.get(provider, settings.llm_rate_limit_rps),
+                    burst=settings.llm_rate_limit_burst,
+                    max_concurrency=settings.llm_provider_concurrency.get(provider, settings.llm_max_concurrency),
+                    min_concurrency=settings.llm_min_concurrency,
+                )
+                self._limiters[key] = limiter
+            return limiter
+
+    def stats(self) -> List[Dict[str, Any]]:
+        with self._lock:
+            limiters = list(self._limiters.values())
+        return [limiter.stats() for limiter in limiters]
+
+    def clear(self) -> None:
+        with self._lock:
+            self._limiters.clear()
+
+
+_registry = RateLimiterRegistry()
+
+
+def get_rate_limiter_registry() -> RateLimiterRegistry:
+    """获取进程级限流器注册表"""
+    return _registry
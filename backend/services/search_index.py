@@ -0,0 +1,235 @@
+"""
+历史记录全文检索（SQLite FTS5 + trigram 分词）
+
+search_index 虚拟表同时索引会话主题与消息正文：
+- rowid = message.id 表示消息，rowid = -session.id 表示会话主题，删除 / 更新按 rowid 定位
+- 由 session / message 表上的触发器同步，任何写入路径（ORM、批量、原始 SQL）都会更新索引
+- trigram 分词对中文无需词典，但查询词至少 3 个字符；更短的词回退到 LIKE 扫描
+
+非 SQLite 或 SQLite 未编译 FTS5 / trigram（< 3.34）时不创建索引，检索回退到 LIKE。
+"""
+from dataclasses import dataclass
+from typing import List, Optional, Tuple
+
+from sqlalchemy import Float, Integer, String, event, or_, select, text
+from sqlalchemy.exc import OperationalError
+from sqlalchemy.orm import Session as DBSession
+
+from database import Base
+from models.session import Message, Session
+from utils.logger import get_logger
+
+
+logger = get_logger(__name__)
+
+SEARCH_TABLE = "search_index"
+MIN_TRIGRAM_LENGTH = 3
+SNIPPET_OPEN = "【"
+SNIPPET_CLOSE = "】"
+SNIPPET_TOKENS = 24
+
+_CREATE_TABLE = (
+    f"CREATE VIRTUAL TABLE IF NOT EXISTS {SEARCH_TABLE} "
+    "USING fts5(content, session_id UNINDEXED, kind UNINDEXED, tokenize='trigram')"
+)
+
+_TRIGGERS = {
+    "search_session_ai": f"""
+        CREATE TRIGGER IF NOT EXISTS search_session_ai AFTER INSERT ON session
+        WHEN new.topic IS NOT NULL BEGIN
+            INSERT INTO {SEARCH_TABLE}(rowid, content, session_id, kind) VALUES (-new.id, new.topic, new.id, 'topic');
+        END""",
+    "search_session_au": f"""
+        CREATE TRIGGER IF NOT EXISTS search_session_au AFTER UPDATE OF topic ON session BEGIN
+            DELETE FROM {SEARCH_TABLE} WHERE rowid = -old.id;
+            INSERT INTO {SEARCH_TABLE}(rowid, content, session_id, kind)
+                SELECT -new.id, new.topic, new.id, 'topic' WHERE new.topic IS NOT NULL;
+        END""",
+    "search_session_ad": f"""
+        CREATE TRIGGER IF NOT EXISTS search_session_ad AFTER DELETE ON session BEGIN
+            DELETE FROM {SEARCH_TABLE} WHERE rowid = -old.id;
+        END""",
+    "search_message_ai": f"""
+        CREATE TRIGGER IF NOT EXISTS search_message_ai AFTER INSERT ON message
+        WHEN new.content IS NOT NULL BEGIN
+            INSERT INTO {SEARCH_TABLE}(rowid, content, session_id, kind) VALUES (new.id, new.content, new.session_id, 'message');
+        END""",
+    "search_message_au": f"""
+        CREATE TRIGGER IF NOT EXISTS search_message_au AFTER UPDATE OF content ON message BEGIN
+            DELETE FROM {SEARCH_TABLE} WHERE rowid = old.id;
+            INSERT INTO {SEARCH_TABLE}(rowid, content, session_id, kind)
+                SELECT new.id, new.content, new.session_id, 'message' WHERE new.content IS NOT NULL;
+        END""",
+    "search_message_ad": f"""
+        CREATE TRIGGER IF NOT EXISTS search_message_ad AFTER DELETE ON message BEGIN
+            DELETE FROM {SEARCH_TABLE} WHERE rowid = old.id;
+        END""",
+}
+
+_BACKFILL = (
+    f"INSERT INTO {SEARCH_TABLE}(rowid, content, session_id, kind) "
+    "SELECT -id, topic, id, 'topic' FROM session WHERE topic IS NOT NULL",
+    f"INSERT INTO {SEARCH_TABLE}(rowid, content, session_id, kind) "
+    "SELECT id, content, session_id, 'message' FROM message WHERE content IS NOT NULL",
+)
+
+
+@dataclass
+class SearchHit:
+    """一条会话级检索结果（同一会话取得分最高的命中）"""
+    session_id: int
+    topic: Optional[str]
+    session_type: str
+    created_at: object
+    message_count: int
+    snippet: Optional[str] = None
+    score: Optional[float] = None
+
+
+def _index_exists(connection) -> bool:
+    return connection.execute(
+        text("SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = :name"),
+        {"name": SEARCH_TABLE},
+    ).first() is not None
+
+
+def ensure_search_index(connection) -> bool:
+    """创建索引表与同步触发器；首次创建时用已有数据回填。返回索引是否可用"""
+    if connection.dialect.name != "sqlite":
+        return False
+    existed = _index_exists(connection)
+    try:
+        connection.execute(text(_CREATE_TABLE))
+    except OperationalError as exc:
+        logger.warning("SQLite 不支持 FTS5 trigram，历史检索回退到 LIKE: %s", exc)
+        return False
+    for ddl in _TRIGGERS.values():
+        connection.execute(text(ddl))
+    if not existed:
+        for statement in _BACKFILL:
+            connection.execute(text(statement))
+    return True
+
+
+def drop_search_index(connection) -> None:
+    if connection.dialect.name != "sqlite":
+        return
+    for name in _TRIGGERS:
+        connection.execute(text(f"DROP TRIGGER IF EXISTS {name}"))
+    connection.execute(text(f"DROP TABLE IF EXISTS {SEARCH_TABLE}"))
+
+
+@event.listens_for(Base.metadata, "after_create")
+def _create_with_metadata(target, connection, **kw):
+    ensure_search_index(connection)
+
+
+@event.listens_for(Base.metadata, "before_drop")
+def _drop_with_metadata(target, connection, **kw):
+    drop_search_index(connection)
+
+
+def _match_query(terms: List[str]) -> str:
+    """每个词作为短语（双引号转义），多个词之间为 AND"""
+    return " ".join('"' + term.replace('"', '""') + '"' for term in terms)
+
+
+def search_sessions(
+    db: DBSession,
+    query: str,
+    session_type: Optional[str] = None,
+    limit: int = 20,
+    offset: int = 0,
+    include_total: bool = True,
+) -> Tuple[List[SearchHit], bool, Optional[int]]:
+    """按相关度检索会话主题与消息正文，返回 (结果, 是否还有更多, 总数)"""
+    terms = query.split()
+    if not terms:
+        return [], False, 0 if include_total else None
+    if (
+        db.get_bind().dialect.name == "sqlite"
+        and min(len(term) for term in terms) >= MIN_TRIGRAM_LENGTH
+        and _index_exists(db.connection())
+    ):
+        return _search_fts(db, _match_query(terms), session_type, limit, offset, include_total)
+    return _search_like(db, terms, session_type, limit, offset, include_total)
+
+
+def _search_fts(db, match, session_type, limit, offset, include_total):
+    type_filter = "AND s.session_type = :session_type" if session_type else ""
+    params = {"match": match, "session_type": session_type, "limit": limit + 1, "offset": offset}
+    # 先按会话取最佳命中（只算 rank），再只为当前页生成摘要
+    rows = db.execute(text(f"""
+        SELECT s.id, s.topic, s.session_type, s.created_at, s.message_count, hit.hit_rowid, hit.rank
+        FROM (
+            SELECT session_id, rowid AS hit_rowid, rank,
+                   row_number() OVER (PARTITION BY session_id ORDER BY rank) AS rn
+            FROM {SEARCH_TABLE} WHERE {SEARCH_TABLE} MATCH :match
+        ) AS hit
+        JOIN session s ON s.id = hit.session_id
+        WHERE hit.rn = 1 {type_filter}
+        ORDER BY hit.rank, s.id DESC
+        LIMIT :limit OFFSET :offset
+    """).columns(
+        id=Integer, topic=String, session_type=String, created_at=Session.created_at.type,
+        message_count=Integer, hit_rowid=Integer, rank=Float,
+    ), params).all()
+    has_more = len(rows) > limit
+    rows = rows[:limit]
+
+    snippets = {}
+    if rows:
+        rowids = ", ".join(str(int(row.hit_rowid)) for row in rows)
+        snippets = dict(db.execute(text(f"""
+            SELECT rowid, snippet({SEARCH_TABLE}, 0, :open, :close, '…', :tokens)
+            FROM {SEARCH_TABLE} WHERE {SEARCH_TABLE} MATCH :match AND rowid IN ({rowids})
+        """), {"match": match, "open": SNIPPET_OPEN, "close": SNIPPET_CLOSE, "tokens": SNIPPET_TOKENS}).all())
+
+    total = None
+    if include_total:
+        total = db.execute(text(f"""
+            SELECT count(DISTINCT hit.session_id)
+            FROM {SEARCH_TABLE} AS hit JOIN session s ON s.id = hit.session_id
+            WHERE hit.{SEARCH_TABLE} MATCH :match {type_filter}
+        """), params).scalar()
+
+    hits = [
+        SearchHit(
+            session_id=row.id,
+            topic=row.topic,
+            session_type=row.session_type,
+            created_at=row.created_at,
+            message_count=row.message_count,
+            snippet=snippets.get(row.hit_rowid),
+            score=round(-row.rank, 6),
+        )
+        for row in rows
+    ]
+    return hits, has_more, total
+
+
+def _search_like(db, terms, session_type, limit, offset, include_total):
+    """无索引或查询词过短时的回退：主题或任一消息包含全部查询词"""
+    filters = []
+    for term in terms:
+        pattern = f"%{term}%"
+        in_messages = select(Message.id).where(Message.session_id == Session.id, Message.content.ilike(pattern)).exists()
+        filters.append(or_(Session.topic.ilike(pattern), in_messages))
+    if session_type:
+        filters.append(Session.session_type == session_type)
+
+    base = db.query(Session.id, Session.topic, Session.session_type, Session.created_at, Session.message_count).filter(*filters)
+    total = base.count() if include_total else None
+    rows = base.order_by(Session.created_at.desc(), Session.id.desc()).offset(offset).limit(limit + 1).all()
+    has_more = len(rows) > limit
+    hits = [
+        SearchHit(
+            session_id=row.id,
+            topic=row.topic,
+            session_type=row.session_type,
+            created_at=row.created_at,
+            message_count=row.message_count,
+        )
+        for row in rows[:limit]
+    ]
+    return hits, has_more, total
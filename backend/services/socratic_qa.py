@@ -274,8 +274,9 @@ class SocraticQAService:
 
         full_response = ""
         async for chunk in self.ai_client.chat_stream(messages, temperature=0.7):
+            offset = len(full_response)
             full_response += chunk
-            yield {"type": "content", "content": full_response, "is_complete": False}
+            yield {"type": "content", "content": full_response, "delta": chunk, "offset": offset, "is_complete": False}
 
         self.conversation_history.append({"role": "user", "content": question})
         self.conversation_history.append({"role": "assistant", "content": full_response})
@@ -0,0 +1,389 @@
+"""
+Prometheus 文本格式的运行指标
+
+不依赖 prometheus_client，提供最小的 Counter / Gauge / Histogram 与文本导出：
+- HTTP：按路由模板统计请求数与延迟直方图
+- SSE：活跃流数量、流持续时间与事件数（流结束时一次性累加，逐块不加锁）
+- LLM：订阅 LLMMetricsRegistry，按 provider / model 统计延迟、首 token 延迟与 tokens
+- DB：通过 SQLAlchemy cursor 事件统计语句耗时
+
+观测只在请求 / 调用 / 语句粒度上发生，每个标签组合一把锁，开销可忽略。
+"""
+import bisect
+import math
+import threading
+import time
+from typing import Any, Callable, Dict, Iterable, List, Sequence, Tuple
+
+
+CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+LLM_LATENCY_BUCKETS = (0.1, 0.25, 0.5, 1.0, 2.0, 5.0, 10.0, 20.0, 30.0, 60.0, 120.0)
+STREAM_DURATION_BUCKETS = (1.0, 5.0, 10.0, 30.0, 60.0, 120.0, 300.0, 600.0, 1800.0)
+DB_BUCKETS = (0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 1.0)
+
+
+def _escape(value: Any) -> str:
+    return str(value).replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _format_labels(names: Sequence[str], values: Sequence[Any], extra: str = "") -> str:
+    parts = [f'{name}="{_escape(value)}"' for name, value in zip(names, values)]
+    if extra:
+        parts.append(extra)
+    return "{" + ",".join(parts) + "}" if parts else ""
+
+
+def _format_value(value: float) -> str:
+    if math.isinf(value):
+        return "+Inf" if value > 0 else "-Inf"
+    if float(value).is_integer():
+        return str(int(value))
+    return repr(float(value))
+
+
+class _Metric:
+    kind = ""
+
+    def __init__(self, name: str, documentation: str, labelnames: Sequence[str] = ()):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self._lock = threading.Lock()
+        self._children: Dict[Tuple[str, ...], Any] = {}
+
+    def _key(self, labels: Dict[str, Any]) -> Tuple[str, ...]:
+        return tuple(str(labels.get(name, "")) for name in self.labelnames)
+
+    def _child(self, labels: Dict[str, Any]):
+        key = self._key(labels)
+        child = self._children.get(key)
+        if child is None:
+            with self._lock:
+                child = self._children.setdefault(key, self._new_child())
+        return child
+
+    def _new_child(self):
+        raise NotImplementedError
+
+    def _samples(self) -> Iterable[str]:
+        raise NotImplementedError
+
+    def render(self) -> List[str]:
+        lines = [f"# HELP {self.name} {self.documentation}", f"# TYPE {self.name} {self.kind}"]
+        lines.extend(self._samples())
+        return lines
+
+    def clear(self) -> None:
+        with self._lock:
+            self._children.clear()
+
+
+class _Value:
+    __slots__ = ("value", "lock")
+
+    def __init__(self):
+        self.value = 0.0
+        self.lock = threading.Lock()
+
+    def add(self, amount: float) -> None:
+        with self.lock:
+            self.value += amount
+
+
+class Counter(_Metric):
+    kind = "counter"
+
+    def _new_child(self) -> _Value:
+        return _Value()
+
+    def inc(self, amount: float = 1.0, **labels: Any) -> None:
+        self._child(labels).add(amount)
+
+    def value(self, **labels: Any) -> float:
+        child = self._children.get(self._key(labels))
+        return child.value if child is not None else 0.0
+
+    def _samples(self) -> Iterable[str]:
+        for key, child in sorted(self._children.items()):
+            yield f"{self.name}{_format_labels(self.labelnames, key)} {_format_value(child.value)}"
+
+
+class Gauge(Counter):
+    kind = "gauge"
+
+    def dec(self, amount: float = 1.0, **labels: Any) -> None:
+        self._child(labels).add(-amount)
+
+    def set(self, value: float, **labels: Any) -> None:
+        child = self._child(labels)
+        with child.lock:
+            child.value = float(value)
+
+
+class _HistogramValue:
+    __slots__ = ("counts", "sum", "count", "lock")
+
+    def __init__(self, size: int):
+        self.counts = [0] * size
+        self.sum = 0.0
+        self.count = 0
+        self.lock = threading.Lock()
+
+
+class Histogram(_Metric):
+    kind = "histogram"
+
+    def __init__(
+        self,
+        name: str,
+        documentation: str,
+        labelnames: Sequence[str] = (),
+        buckets: Sequence[float] = LATENCY_BUCKETS,
+    ):
+        super().__init__(name, documentation, labelnames)
+        self.buckets = tuple(sorted(buckets))
+
+    def _new_child(self) -> _HistogramValue:
+        return _HistogramValue(len(self.buckets) + 1)
+
+    def observe(self, value: float, **labels: Any) -> None:
+        child = self._child(labels)
+        index = bisect.bisect_left(self.buckets, value)
+        with child.lock:
+            child.counts[index] += 1
+            child.sum += value
+            child.count += 1
+
+    def count(self, **labels: Any) -> int:
+        child = self._children.get(self._key(labels))
+        return child.count if child is not None else 0
+
+    def _samples(self) -> Iterable[str]:
+        for key, child in sorted(self._children.items()):
+            with child.lock:
+                counts, total, count = list(child.counts), child.sum, child.count
+            cumulative = 0
+            for bound, bucket_count in zip(self.buckets + (math.inf,), counts):
+                cumulative += bucket_count
+                le = f'le="{_format_value(bound)}"'
+                yield f"{self.name}_bucket{_format_labels(self.labelnames, key, le)} {cumulative}"
+            labels = _format_labels(self.labelnames, key)
+            yield f"{self.name}_sum{labels} {_format_value(total)}"
+            yield f"{self.name}_count{labels} {count}"
+
+
+class MetricsRegistry:
+    """指标集合；collectors 在导出前被调用，用于刷新按需采样的 Gauge"""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._metrics: Dict[str, _Metric] = {}
+        self._collectors: List[Callable[[], None]] = []
+
+    def register(self, metric: _Metric) -> _Metric:
+        with self._lock:
+            existing = self._metrics.get(metric.name)
+            if existing is not None:
+                return existing
+            self._metrics[metric.name] = metric
+            return metric
+
+    def counter(self, name: str, documentation: str, labelnames: Sequence[str] = ()) -> Counter:
+        return self.register(Counter(name, documentation, labelnames))
+
+    def gauge(self, name: str, documentation: str, labelnames: Sequence[str] = ()) -> Gauge:
+        return self.register(Gauge(name, documentation, labelnames))
+
+    def histogram(
+        self,
+        name: str,
+        documentation: str,
+        labelnames: Sequence[str] = (),
+        buckets: Sequence[float] = LATENCY_BUCKETS,
+    ) -> Histogram:
+        return self.register(Histogram(name, documentation, labelnames, buckets))
+
+    def add_collector(self, collector: Callable[[], None]) -> None:
+        with self._lock:
+            if collector not in self._collectors:
+                self._collectors.append(collector)
+
+    def render(self) -> str:
+        with self._lock:
+            collectors = list(self._collectors)
+            metrics = list(self._metrics.values())
+        for collector in collectors:
+            try:
+                collector()
+            except Exception:
+                pass
+        lines: List[str] = []
+        for metric in metrics:
+            lines.extend(metric.render())
+        return "\n".join(lines) + "\n"
+
+    def clear(self) -> None:
+        with self._lock:
+            metrics = list(self._metrics.values())
+        for metric in metrics:
+            metric.clear()
+
+
+REGISTRY = MetricsRegistry()
+
+HTTP_REQUESTS = REGISTRY.counter(
+    "aigument_http_requests_total", "HTTP 请求数", ("method", "route", "status"),
+)
+HTTP_LATENCY = REGISTRY.histogram(
+    "aigument_http_request_duration_seconds", "HTTP 请求处理耗时（流式响应为发出响应头前的耗时）",
+    ("method", "route"),
+)
+SSE_ACTIVE = REGISTRY.gauge("aigument_sse_active_streams", "当前活跃的 SSE 流", ("route",))
+SSE_DURATION = REGISTRY.histogram(
+    "aigument_sse_stream_duration_seconds", "SSE 流持续时间", ("route", "status"), STREAM_DURATION_BUCKETS,
+)
+SSE_EVENTS = REGISTRY.counter("aigument_sse_events_total", "SSE 已发送的数据块数", ("route",))
+LLM_CALLS = REGISTRY.counter(
+    "aigument_llm_calls_total", "LLM 调用次数", ("provider", "model", "mode", "status"),
+)
+LLM_LATENCY = REGISTRY.histogram(
+    "aigument_llm_call_duration_seconds", "LLM 调用总耗时", ("provider", "model", "mode"), LLM_LATENCY_BUCKETS,
+)
+LLM_TTFT = REGISTRY.histogram(
+    "aigument_llm_time_to_first_token_seconds", "LLM 流式调用首 token 延迟", ("provider", "model"),
+    LLM_LATENCY_BUCKETS,
+)
+LLM_TOKENS = REGISTRY.counter("aigument_llm_tokens_total", "LLM tokens 用量", ("provider", "model", "kind"))
+LLM_RETRIES = REGISTRY.counter("aigument_llm_retries_total", "LLM 调用重试次数", ("provider", "model"))
+DB_QUERIES = REGISTRY.histogram(
+    "aigument_db_query_duration_seconds", "数据库语句执行耗时", ("operation",), DB_BUCKETS,
+)
+DB_ERRORS = REGISTRY.counter("aigument_db_query_errors_total", "数据库语句执行失败次数", ("operation",))
+LIMITER_IN_FLIGHT = REGISTRY.gauge("aigument_llm_limiter_in_flight", "限流器占用中的并发名额", ("limiter",))
+LIMITER_QUEUED = REGISTRY.gauge("aigument_llm_limiter_queued", "限流器排队中的请求", ("limiter",))
+LIMITER_CONCURRENCY = REGISTRY.gauge(
+    "aigument_llm_limiter_concurrency_limit", "限流器当前并发窗口", ("limiter",),
+)
+
+
+# ---------- HTTP / SSE ----------
+
+def route_template(scope: Dict[str, Any]) -> str:
+    """请求匹配到的路由模板（如 /api/history/{session_id}），避免路径参数撑爆标签基数"""
+    route = scope.get("route")
+    path = getattr(route, "path", None)
+    return path if path else "<unmatched>"
+
+
+def observe_http_request(method: str, route: str, status: int, duration: float) -> None:
+    HTTP_REQUESTS.inc(method=method, route=route, status=status)
+    HTTP_LATENCY.observe(duration, method=method, route=route)
+
+
+async def track_sse_stream(body_iterator, route: str):
+    """包装 SSE 响应体：开始与结束时更新活跃流 Gauge，事件数在本地计数、结束时一次性累加"""
+    SSE_ACTIVE.inc(route=route)
+    started = time.perf_counter()
+    events = 0
+    status = "completed"
+    try:
+        async for chunk in body_iterator:
+            events += 1
+            yield chunk
+    except BaseException:
+        status = "aborted"
+        raise
+    finally:
+        SSE_ACTIVE.dec(route=route)
+        SSE_EVENTS.inc(events, route=route)
+        SSE_DURATION.observe(time.perf_counter() - started, route=route, status=status)
+
+
+# ---------- LLM ----------
+
+def observe_llm_call(record) -> None:
+    """LLMMetricsRegistry 监听器：把单次调用记录转换为 Prometheus 指标"""
+    provider, model = record.provider, record.model
+    if record.cached:
+        status = "cached"
+    else:
+        status = "success" if record.success else "error"
+    LLM_CALLS.inc(provider=provider, model=model, mode=record.mode, status=status)
+    if record.cached:
+        return
+    LLM_LATENCY.observe(record.latency_ms / 1000, provider=provider, model=model, mode=record.mode)
+    if record.ttft_ms is not None:
+        LLM_TTFT.observe(record.ttft_ms / 1000, provider=provider, model=model)
+    LLM_TOKENS.inc(record.prompt_tokens, provider=provider, model=model, kind="prompt")
+    LLM_TOKENS.inc(record.completion_tokens, provider=provider, model=model, kind="completion")
+    if record.retries:
+        LLM_RETRIES.inc(record.retries, provider=provider, model=model)
+
+
+def _collect_limiters() -> None:
+    from services.rate_limiter import get_rate_limiter_registry
+    for stats in get_rate_limiter_registry().stats():
+        LIMITER_IN_FLIGHT.set(stats["in_flight"], limiter=stats["name"])
+        LIMITER_QUEUED.set(stats["queued"], limiter=stats["name"])
+        LIMITER_CONCURRENCY.set(stats["concurrency_limit"], limiter=stats["name"])
+
+
+# ---------- DB ----------
+
+_QUERY_START_KEY = "aigument_query_start"
+
+
+def _operation(statement: str) -> str:
+    head = statement.lstrip().split(None, 1)
+    return head[0].upper() if head else "UNKNOWN"
+
+
+def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    conn.info.setdefault(_QUERY_START_KEY, []).append(time.perf_counter())
+
+
+def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    starts = conn.info.get(_QUERY_START_KEY)
+    if starts:
+        DB_QUERIES.observe(time.perf_counter() - starts.pop(), operation=_operation(statement))
+
+
+def _handle_error(exception_context):
+    conn = exception_context.connection
+    starts = conn.info.get(_QUERY_START_KEY) if conn is not None else None
+    if starts:
+        starts.pop()
+    DB_ERRORS.inc(operation=_operation(exception_context.statement or ""))
+
+
+def instrument_engine(engine) -> None:
+    """为 SQLAlchemy Engine 挂载语句计时事件（重复调用安全）"""
+    from sqlalchemy import event
+
+    for name, handler in (
+        ("before_cursor_execute", _before_cursor_execute),
+        ("after_cursor_execute", _after_cursor_execute),
+        ("handle_error", _handle_error),
+    ):
+        if not event.contains(engine, name, handler):
+            event.listen(engine, name, handler)
+
+
+_installed = False
+
+
+def install() -> None:
+    """挂载 LLM 监听器与按需采样的 Gauge（重复调用安全）"""
+    global _installed
+    if _installed:
+        return
+    from services.llm_metrics import get_llm_metrics
+    get_llm_metrics().add_listener(observe_llm_call)
+    REGISTRY.add_collector(_collect_limiters)
+    _installed = True
+
+
+def render_metrics() -> str:
+    return REGISTRY.render()
@@ -0,0 +1,118 @@
+"""
+会话 trace 存储辅助
+
+trace / final_state 存放在独立的 session_trace 表中，
+Session.settings 只保留轮次、模型、状态等小字段；DebateRecord 也不再另存一份 trace。
+"""
+from typing import Any, Dict, Optional
+
+from sqlalchemy import select, text, update
+from sqlalchemy.orm import Session as DBSession
+
+from models.debate_record import DebateRecord
+from models.session import Session, SessionTrace
+
+
+# 旧版本写在 Session.settings 中、需要迁出的键 -> SessionTrace 字段
+LEGACY_SETTINGS_KEYS = {
+    "trace": "trace",
+    "dialectic_trace": "trace",
+    "final_state": "final_state",
+}
+
+
+def build_session_trace(
+    session_id: int,
+    trace: Optional[Dict[str, Any]],
+    final_state: Optional[Dict[str, Any]] = None,
+) -> SessionTrace:
+    """构建会话 trace 行（与消息一起交给调用方提交）"""
+    return SessionTrace(session_id=session_id, trace=trace, final_state=final_state)
+
+
+def load_session_trace(db: DBSession, session_id: int) -> Optional[Dict[str, Any]]:
+    """只读取 trace 列，不加载会话其余字段"""
+    return db.execute(
+        select(SessionTrace.trace).where(SessionTrace.session_id == session_id)
+    ).scalar_one_or_none()
+
+
+def load_final_state(db: DBSession, session_id: int) -> Optional[Dict[str, Any]]:
+    return db.execute(
+        select(SessionTrace.final_state).where(SessionTrace.session_id == session_id)
+    ).scalar_one_or_none()
+
+
+def migrate_settings_traces(bind, batch_size: int = 200) -> int:
+    """把旧数据 Session.settings 中的 trace / final_state 迁到 session_trace，返回迁移的会话数
+
+    迁移后这些键会从 settings 中删除，再次运行时不会命中，因此可在每次启动时调用。
+    """
+    # 先用文本匹配缩小范围，避免启动时解析全部会话的 settings
+    candidates = text(" OR ".join(f"settings LIKE '%\"{key}\"%'" for key in LEGACY_SETTINGS_KEYS))
+    migrated = 0
+    last_id = 0
+    with DBSession(bind=bind, autoflush=False) as db:
+        while True:
+            rows = db.execute(
+                select(Session.id, Session.settings)
+                .where(Session.id > last_id, candidates)
+                .order_by(Session.id)
+                .limit(batch_size)
+            ).all()
+            if not rows:
+                break
+            for session_id, settings in rows:
+                last_id = session_id
+                if not isinstance(settings, dict) or not any(key in settings for key in LEGACY_SETTINGS_KEYS):
+                    continue
+                moved = {
+                    field: settings[key]
+                    for key, field in LEGACY_SETTINGS_KEYS.items()
+                    if settings.get(key) is not None
+                }
+                store = db.get(SessionTrace, session_id)
+                if store is None:
+                    db.add(SessionTrace(session_id=session_id, **moved))
+                else:
+                    for field, value in moved.items():
+                        if getattr(store, field) is None:
+                            setattr(store, field, value)
+                slim = {key: value for key, value in settings.items() if key not in LEGACY_SETTINGS_KEYS}
+                db.execute(update(Session).where(Session.id == session_id).values(settings=slim))
+                migrated += 1
+            db.commit()
+    return migrated
+
+
+def migrate_record_traces(bind, batch_size: int = 200) -> int:
+    """把旧数据 DebateRecord.trace 迁到 session_trace 并清空该列，返回处理的记录数
+
+    会话已有 trace 时直接清空旧列；会话已不存在的记录保持不动。
+    清空后不再命中，因此可在每次启动时调用。
+    """
+    migrated = 0
+    last_id = 0
+    with DBSession(bind=bind, autoflush=False) as db:
+        while True:
+            rows = db.execute(
+                select(DebateRecord.id, DebateRecord.session_id, DebateRecord.trace)
+                .where(DebateRecord.id > last_id, DebateRecord.trace.is_not(None))
+                .order_by(DebateRecord.id)
+                .limit(batch_size)
+            ).all()
+            if not rows:
+                break
+            for record_id, session_id, trace in rows:
+                last_id = record_id
+                if session_id is None or db.get(Session, session_id) is None:
+                    continue
+                store = db.get(SessionTrace, session_id)
+                if store is None:
+                    db.add(SessionTrace(session_id=session_id, trace=trace))
+                elif store.trace is None:
+                    store.trace = trace
+                db.execute(update(DebateRecord).where(DebateRecord.id == record_id).values(trace=None))
+                migrated += 1
+            db.commit()
+    return migrated
@@ -0,0 +1,156 @@
+"""
+流式消息的写后缓冲（write-behind）
+
+流式路由不再逐条提交 Message，而是先挂到请求自己的 Session 上，
+再按数量或时间合并成一次事务提交（经 DBWriter 写线程执行）：
+
+- 待提交条目达到 max_pending 时立即提交
+- 第一条待提交条目登记时挂定时器，flush_interval 后提交（流没有新事件也会落库）
+- 轮次边界调用 checkpoint() 立即提交，保证已完成的轮次不会丢失
+- 进程崩溃时最多丢失一个提交窗口内的数据
+
+缓冲期间 Session 只能通过本对象修改（add / update_settings），
+定时提交与调用方的修改由同一把 asyncio.Lock 串行化。定时提交任务由缓冲持有，
+close() / abort() 会等待它结束；定时提交失败会记录日志，并在调用方下一次操作时抛出。
+提交后会刷新 session 对象，调用方仍应缓存 session.id 等字段，避免在提交过程中读取。
+"""
+import asyncio
+from typing import Any, Dict, Optional
+
+from sqlalchemy.orm import Session as DBSession
+
+from config import get_settings
+from services.db_writer import DBWriter, get_db_writer
+from utils.logger import get_logger
+from utils.session_state import merge_session_settings
+
+
+logger = get_logger(__name__)
+
+
+class WriteBehindBuffer:
+    """按数量 / 时间批量提交一个请求 Session 上的写入
+
+    Args:
+        db: 请求的数据库 Session
+        session: 需要在提交后刷新的会话对象（其 settings 会被持续更新）
+        writer: 执行提交的写线程，默认使用进程级实例
+        max_pending: 待提交条目数上限，默认取 DB_FLUSH_MAX_PENDING
+        flush_interval: 首条待提交条目的最长等待时间（秒），默认取 DB_FLUSH_INTERVAL_SECONDS
+    """
+
+    def __init__(
+        self,
+        db: DBSession,
+        session: Any = None,
+        writer: Optional[DBWriter] = None,
+        max_pending: Optional[int] = None,
+        flush_interval: Optional[float] = None,
+    ):
+        self.db = db
+        self.session = session
+        settings = get_settings()
+        self.writer = writer or get_db_writer()
+        self.max_pending = max(1, max_pending if max_pending is not None else settings.db_flush_max_pending)
+        self.flush_interval = flush_interval if flush_interval is not None else settings.db_flush_interval_seconds
+
+        self._lock = asyncio.Lock()
+        self._pending = 0
+        self._timer: Optional[asyncio.TimerHandle] = None
+        self._flush_task: Optional[asyncio.Task] = None
+        self._error: Optional[BaseException] = None
+        self._aborted = False
+
+        self.flushes = 0
+        self.items_written = 0
+
+    @property
+    def pending(self) -> int:
+        return self._pending
+
+    async def add(self, *objects: Any) -> None:
+        """登记待插入的对象"""
+        async with self._lock:
+            self._raise_deferred_error()
+            self.db.add_all(objects)
+            await self._after_write_locked(len(objects))
+
+    async def update_settings(self, updates: Dict[str, Any]) -> None:
+        """合并会话 settings 更新（与消息一起批量提交）"""
+        async with self._lock:
+            self._raise_deferred_error()
+            merge_session_settings(self.session, updates)
+            await self._after_write_locked(1)
+
+    async def checkpoint(self) -> None:
+        """立即提交全部待写入内容（轮次边界调用）"""
+        async with self._lock:
+            self._raise_deferred_error()
+            await self._flush_locked()
+
+    async def close(self) -> None:
+        """取消定时器，等待进行中的定时提交后提交剩余内容（定时提交的失败在此抛出）"""
+        self._cancel_timer()
+        await self._wait_timed_flush()
+        await self.checkpoint()
+
+    async def abort(self) -> None:
+        """停止缓冲并等待进行中的提交结束，调用方随后自行 rollback"""
+        self._aborted = True
+        self._cancel_timer()
+        await self._wait_timed_flush()
+        async with self._lock:
+            self._pending = 0
+            self._error = None
+
+    def stats(self) -> Dict[str, Any]:
+        return {"flushes": self.flushes, "items_written": self.items_written, "pending": self._pending}
+
+    async def _after_write_locked(self, count: int) -> None:
+        self._pending += count
+        if self._pending >= self.max_pending:
+            await self._flush_locked()
+        elif self._timer is None:
+            loop = asyncio.get_running_loop()
+            self._timer = loop.call_later(self.flush_interval, self._on_timer, loop)
+
+    async def _flush_locked(self) -> None:
+        self._cancel_timer()
+        if self._pending == 0:
+            return
+        refresh = (self.session,) if self.session is not None else ()
+        await self.writer.commit(self.db, *refresh)
+        self.flushes += 1
+        self.items_written += self._pending
+        self._pending = 0
+
+    def _on_timer(self, loop: asyncio.AbstractEventLoop) -> None:
+        self._timer = None
+        # 持有任务引用，避免提交途中被垃圾回收
+        self._flush_task = loop.create_task(self._timed_flush())
+
+    async def _timed_flush(self) -> None:
+        try:
+            async with self._lock:
+                if self._error is None and not self._aborted:
+                    await self._flush_locked()
+        except Exception as exc:
+            # 定时提交无人等待，失败留到调用方下一次操作时抛出
+            logger.warning("定时提交失败，将在下一次写入时抛出: %s", exc)
+            self._error = exc
+
+    async def _wait_timed_flush(self) -> None:
+        """等待已启动的定时提交结束（提交可能正在写线程中执行，不能取消）"""
+        task, self._flush_task = self._flush_task, None
+        if task is not None and task is not asyncio.current_task():
+            await task
+
+    def _cancel_timer(self) -> None:
+        if self._timer is not None:
+            self._timer.cancel()
+            self._timer = None
+
+    def _raise_deferred_error(self) -> None:
+        if self._error is not None:
+            error, self._error = self._error, None
+            raise error
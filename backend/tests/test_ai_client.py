@@ -4,6 +4,7 @@ AI client tests aligned with the provider-based implementation.
 
 import asyncio
 import os
+import random
 import sys
 
 import pytest
@@ -12,6 +13,8 @@ sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 
 from exceptions import AIClientException
 from services.ai_client import AIClient
+from services.completion_cache import CompletionCache, make_cache_key
+from services.rate_limiter import ProviderRateLimiter, compute_backoff, extract_retry_after, is_rate_limit_error
 
 
 class TestAIClientInit:
@@ -61,3 +64,195 @@ class TestRetryWrapping:
 
         with pytest.raises(AIClientException):
             asyncio.run(client.get_completion([{"role": "user", "content": "hi"}]))
+
+
+class TestCompletionCache:
+    def _counting_client(self, cache, seed=42):
+        client = AIClient(provider="mock", model="mock", seed=seed, cache=cache)
+        calls = {"count": 0}
+        original = client._provider.get_completion
+
+        async def counting_completion(*args, **kwargs):
+            calls["count"] += 1
+            return await original(*args, **kwargs)
+
+        client._provider.get_completion = counting_completion
+        return client, calls
+
+    def test_seeded_completion_is_served_from_cache(self):
+        cache = CompletionCache(max_entries=8)
+        client, calls = self._counting_client(cache)
+        messages = [{"role": "user", "content": "cache me"}]
+
+        first = asyncio.run(client.get_completion(messages, temperature=0.6))
+        second = asyncio.run(client.get_completion(messages, temperature=0.6))
+
+        assert first == second
+        assert calls["count"] == 1
+        assert cache.stats()["hits"] == 1
+        assert cache.stats()["misses"] == 1
+
+    def test_key_covers_temperature_and_seed(self):
+        messages = [{"role": "user", "content": "x"}]
+        base = dict(provider="mock", model="mock", messages=messages, temperature=0.6, max_tokens=2000, seed=42)
+        assert make_cache_key(**base) == make_cache_key(**dict(base))
+        assert make_cache_key(**base) != make_cache_key(**{**base, "temperature": 0.7})
+        assert make_cache_key(**base) != make_cache_key(**{**base, "seed": 7})
+        assert make_cache_key(**base) != make_cache_key(**{**base, "max_tokens": 100})
+
+    def test_unseeded_requests_bypass_cache_by_default(self):
+        cache = CompletionCache(max_entries=8)
+        client, calls = self._counting_client(cache, seed=None)
+        messages = [{"role": "user", "content": "no seed"}]
+
+        asyncio.run(client.get_completion(messages))
+        asyncio.run(client.get_completion(messages))
+
+        assert calls["count"] == 2
+        assert cache.stats()["misses"] == 0
+
+    def test_lru_eviction_and_ttl(self):
+        cache = CompletionCache(max_entries=2, ttl_seconds=60)
+
+        async def _fill():
+            await cache.set("a", "1")
+            await cache.set("b", "2")
+            await cache.get("a")
+            await cache.set("c", "3")
+            return await cache.get("b"), await cache.get("a")
+
+        evicted, kept = asyncio.run(_fill())
+        assert evicted is None
+        assert kept == "1"
+        assert cache.stats()["evictions"] == 1
+
+        cache.ttl_seconds = 1e-9
+        assert asyncio.run(cache.get("a")) is None
+        assert cache.stats()["expirations"] >= 1
+
+    def test_stream_is_replayed_from_cache(self):
+        cache = CompletionCache(max_entries=8)
+        client = AIClient(provider="mock", model="mock", seed=42, cache=cache)
+        messages = [{"role": "user", "content": "stream me"}]
+
+        async def _collect():
+            return [chunk async for chunk in client.chat_stream(messages, temperature=0.6)]
+
+        fresh = asyncio.run(_collect())
+        replayed = asyncio.run(_collect())
+
+        assert len(fresh) > 1
+        assert replayed == ["".join(fresh)]
+
+    def test_disk_tier_survives_new_cache_instance(self, tmp_path):
+        disk_path = tmp_path / "llm_cache.db"
+        first = CompletionCache(disk_path=disk_path)
+        asyncio.run(first.set("k", "persisted"))
+        first.close()
+
+        second = CompletionCache(disk_path=disk_path)
+        try:
+            assert asyncio.run(second.get("k")) == "persisted"
+            assert second.stats()["disk_hits"] == 1
+        finally:
+            second.close()
+
+
+class _FakeRateLimitError(Exception):
+    status_code = 429
+
+    def __init__(self, retry_after=None):
+        super().__init__("rate limited")
+        self.response = type("Resp", (), {"headers": {"retry-after": str(retry_after)} if retry_after is not None else {}})()
+
+
+class TestRateLimiter:
+    def test_backoff_is_jittered_and_honors_retry_after(self):
+        rng = random.Random(0)
+        delays = [compute_backoff(3, 0.5, 30.0, rng=rng) for _ in range(50)]
+        assert all(0 <= delay <= 2.0 for delay in delays)
+        assert len(set(delays)) > 1
+        assert compute_backoff(1, 0.5, 30.0, retry_after=4.0) >= 4.0
+        assert compute_backoff(1, 0.5, 30.0, retry_after=120.0) == 30.0
+
+    def test_retry_after_header_parsing(self):
+        assert extract_retry_after(_FakeRateLimitError(retry_after=2)) == 2.0
+        assert extract_retry_after(_FakeRateLimitError()) is None
+        assert is_rate_limit_error(_FakeRateLimitError())
+        assert not is_rate_limit_error(RuntimeError("boom"))
+
+    def test_throttled_calls_back_off_and_shrink_window(self):
+        limiter = ProviderRateLimiter("test", max_concurrency=4)
+        client = AIClient(provider="mock", model="mock", seed=1, use_cache=False, limiter=limiter, retry_delay=0)
+        calls = {"count": 0}
+
+        async def flaky_completion(*args, **kwargs):
+            calls["count"] += 1
+            if calls["count"] <= 2:
+                raise _FakeRateLimitError(retry_after=0)
+            return "ok"
+
+        client._provider.get_completion = flaky_completion
+        assert asyncio.run(client.get_completion([{"role": "user", "content": "hi"}])) == "ok"
+
+        stats = limiter.stats()
+        assert stats["rate_limited"] == 2
+        assert stats["successes"] == 1
+        assert stats["concurrency_limit"] < 4
+        assert stats["in_flight"] == 0
+
+    def test_throttle_budget_exhaustion_raises(self):
+        limiter = ProviderRateLimiter("test", max_concurrency=2)
+        client = AIClient(provider="mock", model="mock", use_cache=False, limiter=limiter, retry_delay=0)
+        client.rate_limit_retries = 1
+
+        async def always_throttled(*args, **kwargs):
+            raise _FakeRateLimitError(retry_after=0)
+
+        client._provider.get_completion = always_throttled
+        with pytest.raises(AIClientException):
+            asyncio.run(client.get_completion([{"role": "user", "content": "hi"}]))
+        assert limiter.stats()["rate_limited"] == 2
+
+    def test_concurrency_is_bounded_and_queue_wait_recorded(self):
+        limiter = ProviderRateLimiter("test", max_concurrency=2)
+        client = AIClient(provider="mock", model="mock", use_cache=False, limiter=limiter)
+        state = {"active": 0, "peak": 0}
+
+        async def slow_completion(*args, **kwargs):
+            state["active"] += 1
+            state["peak"] = max(state["peak"], state["active"])
+            await asyncio.sleep(0.01)
+            state["active"] -= 1
+            return "ok"
+
+        client._provider.get_completion = slow_completion
+
+        async def _run():
+            return await asyncio.gather(*(client.get_completion([{"role": "user", "content": str(i)}]) for i in range(6)))
+
+        assert asyncio.run(_run()) == ["ok"] * 6
+        stats = limiter.stats()
+        assert state["peak"] == 2
+        assert stats["acquired"] == 6
+        assert stats["queue_wait_ms"]["max"] > 0
+
+    def test_stream_throttled_before_first_chunk_is_retried(self):
+        limiter = ProviderRateLimiter("test")
+        client = AIClient(provider="mock", model="mock", use_cache=False, limiter=limiter, retry_delay=0)
+        calls = {"count": 0}
+
+        async def flaky_stream(*args, **kwargs):
+            calls["count"] += 1
+            if calls["count"] == 1:
+                raise _FakeRateLimitError(retry_after=0)
+            yield "a"
+            yield "b"
+
+        client._provider.chat_stream = flaky_stream
+
+        async def _collect():
+            return [chunk async for chunk in client.chat_stream([{"role": "user", "content": "hi"}])]
+
+        assert asyncio.run(_collect()) == ["a", "b"]
+        assert limiter.stats()["rate_limited"] == 1
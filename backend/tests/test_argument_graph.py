@@ -1,16 +1,22 @@
 """
 ArgumentGraph 测试
 
-覆盖图分析算法：add_argument, add_relation, get_unaddressed, strongest, attack_chains, mermaid
+覆盖图分析算法：add_argument, add_relation, get_unaddressed, strongest, attack_chains, mermaid, 论辩语义
 """
 import asyncio
+import json
+import math
+import random
+import re
+import time
 import pytest
+from hypothesis import given, settings, strategies as st
 import sys
 import os
 from unittest.mock import AsyncMock
 sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 
-from memory.argument_graph import ArgumentAnalyzer, ArgumentGraph, RelationType
+from memory.argument_graph import ArgumentAnalyzer, ArgumentGraph, ArgumentStrength, RelationType, _parse_indexed_items
 
 
 class TestArgumentGraph:
@@ -124,3 +130,530 @@ class TestArgumentAnalyzer:
         assert result is not None
         assert result["relation_type"] == "attacks"
         ai_client.get_completion.assert_awaited_once()
+
+
+class FakeAnalyzerClient:
+    """按提示词类型返回结构化结果，并记录调用次数与峰值并发"""
+
+    def __init__(self, latency: float = 0.0, broken_relation: int = 0):
+        self.latency = latency
+        self.broken_relation = broken_relation
+        self.calls = 0
+        self.in_flight = 0
+        self.peak = 0
+
+    async def get_completion(self, messages, temperature=0.7):
+        self.calls += 1
+        self.in_flight += 1
+        self.peak = max(self.peak, self.in_flight)
+        try:
+            await asyncio.sleep(self.latency)
+            prompt = messages[-1]["content"]
+            relation = {"has_relation": True, "relation_type": "rebuts", "strength": 0.7, "description": "反驳"}
+            if "【论点A】" in prompt:
+                return json.dumps(relation, ensure_ascii=False)
+            if "【关系" in prompt:
+                count = len(re.findall(r"【关系\d+】", prompt))
+                items = {str(i): relation for i in range(1, count + 1) if i != self.broken_relation}
+                return "分析结果：" + json.dumps(items, ensure_ascii=False)
+            if "【论点" in prompt:
+                count = len(re.findall(r"【论点\d+】", prompt))
+                return json.dumps({str(i): [f"要点{i}"] for i in range(1, count + 1)}, ensure_ascii=False)
+            return '["要点"]'
+        finally:
+            self.in_flight -= 1
+
+
+def _arguments(count):
+    return [{"content": f"第{i}条论点", "author": "pro" if i % 2 == 0 else "con", "round": i // 2 + 1} for i in range(count)]
+
+
+class TestConcurrentGraphBuilder:
+    def test_concurrent_build_respects_limit_and_order(self):
+        client = FakeAnalyzerClient(latency=0.01)
+        analyzer = ArgumentAnalyzer(client, max_concurrency=3)
+        graph = asyncio.run(analyzer.build_graph_from_debate("辩题", _arguments(8)))
+
+        assert client.calls == 8 + 7
+        assert 1 < client.peak <= 3
+        assert [node.id for node in graph.nodes.values()] == [f"arg_{i // 2 + 1}_{'pro' if i % 2 == 0 else 'con'}_{i + 1}" for i in range(8)]
+        assert all(edge.relation == RelationType.REBUTS for edge in graph.edges)
+        assert [(edge.source_id, edge.target_id) for edge in graph.edges][0] == ("arg_1_con_2", "arg_1_pro_1")
+
+    def test_batched_build_uses_few_calls_and_retries_missing_items(self):
+        client = FakeAnalyzerClient(broken_relation=2)
+        analyzer = ArgumentAnalyzer(client, batch_size=8)
+        graph = asyncio.run(analyzer.build_graph_from_debate("辩题", _arguments(10), batched=True))
+
+        # 论点 2 批 + 论点对 2 批 + 第一批缺失的关系 2 单独补调
+        assert client.calls == 2 + 2 + 1
+        assert len(graph.edges) == 9
+        assert all(node.key_points for node in graph.nodes.values())
+
+    def test_unknown_relation_types_are_dropped(self):
+        ai_client = AsyncMock()
+        ai_client.get_completion = AsyncMock(return_value='{"has_relation": true, "relation_type": "none"}')
+        analyzer = ArgumentAnalyzer(ai_client)
+        assert asyncio.run(analyzer.analyze_relation("A", "B", "pro", "con")) is None
+
+    @pytest.mark.parametrize("response, expected", [
+        ('{"1": ["a"], "2": ["b"]}', {0: ["a"], 1: ["b"]}),
+        ('说明文字 {"论点1": ["a"]} 结束', {0: ["a"]}),
+        ('"1": ["a"], "2": ["b", 未闭合', {0: ["a"]}),
+        ('[["x"], ["y"], ["z"]]', {0: ["x"], 1: ["y"]}),
+        ('[{"index": 2, "has_relation": true}]', {1: {"index": 2, "has_relation": True}}),
+        ("无法解析", {}),
+    ])
+    def test_parse_indexed_items(self, response, expected):
+        assert _parse_indexed_items(response, 2) == expected
+
+    def test_analyze_endpoint_builds_ai_graph(self, client, db_session):
+        from models.session import Message, Session
+
+        session = Session(session_type="debate", topic="AI 图谱")
+        db_session.add(session)
+        db_session.flush()
+        db_session.add_all([
+            Message(session_id=session.id, role="正方", content="正方观点", meta_info={"round": 1}),
+            Message(session_id=session.id, role="反方", content="反方观点", meta_info={"round": 1}),
+        ])
+        db_session.commit()
+
+        response = client.get(
+            f"/api/debate/{session.id}/graph",
+            params={"analyze": True, "provider": "mock", "model": "mock"},
+        )
+        assert response.status_code == 200
+        data = response.json()
+        assert data["analyzed"] is True
+        assert data["scores"]["total_arguments"] == 2
+
+    def test_benchmark_serial_vs_concurrent_vs_batched(self):
+        """20 条论点、每次调用 20ms：串行、并发与批量模式的构建耗时"""
+        arguments = _arguments(20)
+        timings = {}
+        for name, concurrency, batched in (("serial", 1, False), ("concurrent", 8, False), ("batched", 8, True)):
+            client = FakeAnalyzerClient(latency=0.02)
+            analyzer = ArgumentAnalyzer(client, max_concurrency=concurrency, batch_size=8)
+            started = time.perf_counter()
+            asyncio.run(analyzer.build_graph_from_debate("辩题", arguments, batched=batched))
+            timings[name] = (time.perf_counter() - started, client.calls)
+        print("\n[analyzer benchmark] " + " ".join(
+            f"{name}={seconds * 1000:.0f}ms/{calls} calls" for name, (seconds, calls) in timings.items()
+        ))
+        assert timings["concurrent"][0] < timings["serial"][0] / 3
+        assert timings["batched"][1] < timings["concurrent"][1] / 4
+
+
+def _reference_score(graph):
+    """逐节点 / 逐边重算的原评分公式（求和用 fsum，与累加顺序无关）"""
+    parts = {"pro": [], "con": []}
+    for node in graph.nodes.values():
+        base_score = node.strength.value * 5
+        if not node.is_rebutted:
+            base_score += 10
+        else:
+            base_score -= 3 * node.rebuttal_count
+        base_score += node.support_count * 2
+        parts["pro" if node.author == "pro" else "con"].append(base_score)
+    for edge in graph.edges:
+        if edge.relation in [RelationType.ATTACKS, RelationType.REBUTS]:
+            attacker = graph.nodes[edge.source_id]
+            parts["pro" if attacker.author == "pro" else "con"].append(edge.strength * 5)
+    pro_score, con_score = math.fsum(parts["pro"]), math.fsum(parts["con"])
+    total = pro_score + con_score
+    pro_percentage = (pro_score / total * 100) if total > 0 else 50
+    unaddressed = {
+        side: sum(1 for node in graph.nodes.values() if node.author == side and not node.is_rebutted)
+        for side in ("pro", "con")
+    }
+    return {
+        "pro_score": round(pro_score, 1),
+        "con_score": round(con_score, 1),
+        "pro_percentage": round(pro_percentage, 1),
+        "con_percentage": round(100 - pro_percentage, 1),
+        "leader": "pro" if pro_score > con_score else ("con" if con_score > pro_score else "tie"),
+        "pro_unaddressed": unaddressed["pro"],
+        "con_unaddressed": unaddressed["con"],
+        "total_arguments": len(graph.nodes),
+        "total_relations": len(graph.edges),
+    }
+
+
+def _reference_strongest(graph, side, limit):
+    nodes = [node for node in graph.nodes.values() if node.author == side]
+
+    def score(node):
+        rebuttal_penalty = node.rebuttal_count * 3 if node.is_rebutted else 0
+        return node.strength.value * 10 + node.support_count * 2 - rebuttal_penalty
+
+    return [node.id for node in sorted(nodes, key=score, reverse=True)[:limit]]
+
+
+_operations = st.lists(
+    st.one_of(
+        st.tuples(st.just("node"), st.sampled_from(["pro", "con"]), st.sampled_from(list(ArgumentStrength))),
+        st.tuples(
+            st.just("edge"),
+            st.integers(min_value=0, max_value=40),
+            st.integers(min_value=0, max_value=40),
+            st.sampled_from(list(RelationType)),
+            st.floats(min_value=0.0, max_value=1.0, allow_nan=False),
+        ),
+    ),
+    max_size=80,
+)
+
+
+class TestIncrementalScores:
+    @settings(max_examples=150, deadline=None)
+    @given(_operations)
+    def test_incremental_aggregates_match_full_recalculation(self, operations):
+        graph = ArgumentGraph(topic="性质测试")
+        ids = []
+        for op in operations:
+            if op[0] == "node":
+                ids.append(graph.add_argument(content="论点", author=op[1], round_num=1, strength=op[2]).id)
+            elif ids:
+                _, source, target, relation, strength = op
+                graph.add_relation(ids[source % len(ids)], ids[target % len(ids)], relation, strength=strength)
+
+            assert graph.calculate_debate_score() == _reference_score(graph)
+            for side in ("pro", "con"):
+                assert graph.count_unaddressed_arguments(side) == len(graph.get_unaddressed_arguments(side))
+                for limit in (0, 1, 2, 3, 10, -1):
+                    assert [n.id for n in graph.get_strongest_arguments(side, limit)] == _reference_strongest(graph, side, limit)
+
+    def test_undermines_does_not_add_attack_bonus(self):
+        graph = ArgumentGraph(topic="削弱")
+        pro = graph.add_argument(content="论点", author="pro", round_num=1)
+        con = graph.add_argument(content="质疑", author="con", round_num=1)
+        before = graph.calculate_debate_score()["con_score"]
+        graph.add_relation(con.id, pro.id, RelationType.UNDERMINES, strength=1.0)
+        score = graph.calculate_debate_score()
+        assert score["con_score"] == before
+        assert score["pro_unaddressed"] == 0
+
+    def test_benchmark_summary_on_large_graph(self):
+        """1000 论点 / 3000 关系：增量聚合与逐次全量重算的摘要耗时"""
+        graph = ArgumentGraph(topic="基准")
+        ids = [
+            graph.add_argument(content=f"论点{i}", author="pro" if i % 2 == 0 else "con", round_num=i // 20 + 1).id
+            for i in range(1000)
+        ]
+        for i in range(3000):
+            graph.add_relation(ids[(i * 7) % 1000], ids[(i * 13 + 1) % 1000], list(RelationType)[i % 5], strength=(i % 10) / 10)
+
+        def timed(fn, repeat=50):
+            started = time.perf_counter()
+            for _ in range(repeat):
+                result = fn()
+            return (time.perf_counter() - started) / repeat, result
+
+        full_s, reference = timed(lambda: (_reference_score(graph), _reference_strongest(graph, "pro", 2)))
+        incremental_s, result = timed(lambda: (graph.calculate_debate_score(), [n.id for n in graph.get_strongest_arguments("pro", 2)]))
+        print(f"\n[score benchmark] 1000 nodes / 3000 edges: full={full_s * 1000:.3f}ms incremental={incremental_s * 1000:.3f}ms")
+        assert result == reference
+        assert incremental_s * 10 < full_s
+
+
+def _recursive_chains(graph, node_id):
+    """原递归实现（仅用于无环图的对照）"""
+    chains = []
+
+    def dfs(current_id, chain):
+        attacks = [e for e in graph._incoming_edges.get(current_id, []) if e.relation in [
+            RelationType.ATTACKS, RelationType.REBUTS, RelationType.UNDERMINES
+        ]]
+        if not attacks:
+            if len(chain) > 1:
+                chains.append(chain[:])
+            return
+        for edge in attacks:
+            chain.append(edge.source_id)
+            dfs(edge.source_id, chain)
+            chain.pop()
+
+    dfs(node_id, [node_id])
+    return chains
+
+
+def _dag(edges, size=8):
+    """后发言的论点指向先发言的论点，保证无环"""
+    graph = ArgumentGraph()
+    ids = [graph.add_argument(f"论点{i}", "pro" if i % 2 == 0 else "con", round_num=1).id for i in range(size)]
+    for a, b, relation, strength in edges:
+        if a != b:
+            graph.add_relation(ids[max(a, b)], ids[min(a, b)], relation, strength=strength)
+    return graph, ids
+
+
+_dag_edges = st.lists(
+    st.tuples(
+        st.integers(0, 7), st.integers(0, 7),
+        st.sampled_from(list(RelationType)),
+        st.floats(min_value=0.0, max_value=1.0, allow_nan=False),
+    ),
+    max_size=18,
+)
+
+
+class TestAttackChains:
+    @settings(max_examples=100, deadline=None)
+    @given(_dag_edges)
+    def test_iterative_chains_match_recursive_on_dags(self, edges):
+        graph, ids = _dag(edges)
+        for node_id in ids:
+            assert graph.get_attack_chains(node_id, max_depth=100, max_paths=10 ** 6) == _recursive_chains(graph, node_id)
+
+    @settings(max_examples=100, deadline=None)
+    @given(_dag_edges, st.integers(1, 4))
+    def test_strongest_chains_match_brute_force(self, edges, k):
+        graph, ids = _dag(edges)
+        strengths = {}
+        for edge in graph.edges:
+            if edge.relation in [RelationType.ATTACKS, RelationType.REBUTS, RelationType.UNDERMINES]:
+                strengths.setdefault((edge.source_id, edge.target_id), []).append(edge.strength)
+        for node_id in ids:
+            result = graph.get_strongest_chains(node_id, k=k)
+            expected = sorted(
+                (math.prod(strengths[(chain[i + 1], chain[i])][0] for i in range(len(chain) - 1)) for chain in _recursive_chains(graph, node_id)),
+                reverse=True,
+            )
+            assert len(result) == min(k, len(expected))
+            got = [item["strength"] for item in result]
+            assert got == sorted(got, reverse=True)
+            # 重复边取其一即可：只比较最强链强度不超过枚举结果上界
+            if expected and all(len(v) == 1 for v in strengths.values()):
+                assert got == pytest.approx(expected[:k])
+
+    def test_strongest_chains_keep_tiny_strengths_ordered(self):
+        graph, ids = _dag([(0, 1, RelationType.ATTACKS, 0.0), (0, 1, RelationType.ATTACKS, 9.57e-114)])
+        assert [item["strength"] for item in graph.get_strongest_chains(ids[0], k=2)] == [9.57e-114, 0.0]
+
+    def test_cycles_terminate(self):
+        graph = ArgumentGraph()
+        a = graph.add_argument("甲", "pro", 1).id
+        b = graph.add_argument("乙", "con", 1).id
+        c = graph.add_argument("丙", "pro", 2).id
+        graph.add_relation(b, a, RelationType.ATTACKS)
+        graph.add_relation(a, b, RelationType.REBUTS)
+        graph.add_relation(c, b, RelationType.ATTACKS)
+        graph.add_relation(a, a, RelationType.ATTACKS)
+
+        assert graph.get_attack_chains(a) == [[a, b, c]]
+        summary = graph.get_chain_summary(a)
+        assert summary["in_cycle"] is True
+        assert summary["direct_attackers"] == 1
+        assert summary["total_attackers"] == 2
+        assert summary["depth_histogram"] == {1: 1, 2: 1}
+        assert graph.get_strongest_chains(a, k=5) == [{"chain": [a, b, c], "strength": 0.25, "depth": 2}]
+
+    def test_summary_is_memoized_and_invalidated(self):
+        graph, ids = _dag([(1, 0, RelationType.ATTACKS, 0.5), (2, 1, RelationType.ATTACKS, 0.5), (3, 0, RelationType.REBUTS, 0.5)])
+        first = graph.get_chain_summary(ids[0])
+        assert first["longest_chain"] == 2 and first["total_attackers"] == 3
+        assert first["depth_histogram"] == {1: 2, 2: 1}
+        assert graph.get_chain_summary(ids[0]) is first
+
+        graph.add_relation(ids[4], ids[2], RelationType.ATTACKS)
+        updated = graph.get_chain_summary(ids[0])
+        assert updated is not first and updated["longest_chain"] == 3
+
+    def test_limits_bound_dense_graphs(self):
+        graph = ArgumentGraph()
+        layers = [[graph.add_argument(f"{d}-{i}", "pro" if d % 2 == 0 else "con", d).id for i in range(6)] for d in range(12)]
+        for upper, lower in zip(layers[1:], layers):
+            for source in upper:
+                for target in lower:
+                    graph.add_relation(source, target, RelationType.ATTACKS, strength=0.9)
+
+        chains = graph.get_attack_chains(layers[0][0], max_depth=5, max_paths=50)
+        assert len(chains) == 50 and all(len(chain) == 6 for chain in chains)
+        assert graph.get_chain_summary(layers[0][0])["longest_chain"] == 11
+        top = graph.get_strongest_chains(layers[0][0], k=3)
+        assert [item["depth"] for item in top] == [11, 11, 11]
+
+    def test_benchmark_dense_chains(self):
+        """6 层 x 6 个论点的全连接攻击（7776 条完整链）：递归全量枚举与带上限 / 最佳优先查询"""
+        graph = ArgumentGraph()
+        layers = [[graph.add_argument(f"{d}-{i}", "pro" if d % 2 == 0 else "con", d).id for i in range(6)] for d in range(6)]
+        for depth, (upper, lower) in enumerate(zip(layers[1:], layers)):
+            for i, source in enumerate(upper):
+                for j, target in enumerate(lower):
+                    graph.add_relation(source, target, RelationType.ATTACKS, strength=0.5 + 0.05 * ((i + j + depth) % 10))
+        root = layers[0][0]
+
+        started = time.perf_counter()
+        full = _recursive_chains(graph, root)
+        recursive_s = time.perf_counter() - started
+        started = time.perf_counter()
+        limited = graph.get_attack_chains(root, max_paths=100)
+        top = graph.get_strongest_chains(root, k=5)
+        summary = graph.get_chain_summary(root)
+        bounded_s = time.perf_counter() - started
+        print(
+            f"\n[chain benchmark] {len(full)} chains: recursive={recursive_s * 1000:.1f}ms "
+            f"bounded+top5+summary={bounded_s * 1000:.1f}ms"
+        )
+        assert limited == full[:100]
+        assert summary["longest_chain"] == 5 and summary["total_attackers"] == 30
+        best = max(
+            math.prod(
+                next(e.strength for e in graph._incoming_edges[chain[i]] if e.source_id == chain[i + 1])
+                for i in range(5)
+            )
+            for chain in full
+        )
+        assert top[0]["strength"] == pytest.approx(best)
+        assert bounded_s < recursive_s
+
+
+_any_edges = st.lists(
+    st.tuples(
+        st.integers(0, 6), st.integers(0, 6),
+        st.sampled_from(list(RelationType)),
+        st.floats(min_value=0.0, max_value=1.0, allow_nan=False),
+    ),
+    max_size=16,
+)
+
+
+def _cyclic_graph(edges, size=7):
+    """任意方向（含自我攻击与环）的关系"""
+    graph = ArgumentGraph()
+    ids = [graph.add_argument(f"论点{i}", "pro" if i % 2 == 0 else "con", round_num=1).id for i in range(size)]
+    for a, b, relation, strength in edges:
+        graph.add_relation(ids[a], ids[b], relation, strength=strength)
+    return graph, ids
+
+
+def _reference_semantics(graph):
+    """按 Dung 定义枚举全部子集：基础外延为特征函数的最小不动点，优先外延为极大可采纳集"""
+    ids = list(graph.nodes)
+    attacks = {
+        (e.source_id, e.target_id) for e in graph.edges
+        if e.relation in (RelationType.ATTACKS, RelationType.REBUTS, RelationType.UNDERMINES)
+    }
+
+    def defends(chosen, arg):
+        return all(any((c, b) in attacks for c in chosen) for b in ids if (b, arg) in attacks)
+
+    grounded = set()
+    while True:
+        expanded = {arg for arg in ids if defends(grounded, arg)}
+        if expanded == grounded:
+            break
+        grounded = expanded
+
+    admissible = []
+    for mask in range(1 << len(ids)):
+        chosen = {ids[i] for i in range(len(ids)) if mask >> i & 1}
+        if any((a, b) in attacks for a in chosen for b in chosen):
+            continue
+        if all(defends(chosen, arg) for arg in chosen):
+            admissible.append(chosen)
+    preferred = [s for s in admissible if not any(s < other for other in admissible)]
+    return grounded, preferred
+
+
+class TestArgumentationSemantics:
+    @settings(max_examples=150, deadline=None)
+    @given(_any_edges)
+    def test_extensions_match_definitions(self, edges):
+        graph, ids = _cyclic_graph(edges)
+        grounded, preferred = _reference_semantics(graph)
+        assert {n.id for n in graph.get_grounded_extension()} == grounded
+        found = [{n.id for n in extension} for extension in graph.get_preferred_extensions()]
+        assert len(found) == len(preferred)
+        assert all(extension in preferred for extension in found)
+        assert all(grounded <= extension for extension in found)
+
+    @settings(max_examples=100, deadline=None)
+    @given(_any_edges)
+    def test_h_categorizer_is_fixed_point(self, edges):
+        graph, ids = _cyclic_graph(edges)
+        strengths = graph.get_argument_strengths()
+        for node_id in ids:
+            weight = graph.nodes[node_id].strength.value / ArgumentStrength.DECISIVE.value
+            pressure = sum(
+                e.strength * strengths[e.source_id] for e in graph.edges
+                if e.target_id == node_id and e.relation in (RelationType.ATTACKS, RelationType.REBUTS, RelationType.UNDERMINES)
+            )
+            assert strengths[node_id] == pytest.approx(weight / (1 + pressure), abs=1e-6)
+            assert 0 < strengths[node_id] <= weight
+
+    def test_reinstatement_differs_from_is_rebutted(self):
+        graph = ArgumentGraph()
+        a = graph.add_argument("论点A", "pro", 1, strength=ArgumentStrength.STRONG)
+        b = graph.add_argument("论点B", "con", 1)
+        c = graph.add_argument("论点C", "pro", 2)
+        graph.add_relation(b.id, a.id, RelationType.ATTACKS, strength=0.8)
+        graph.add_relation(c.id, b.id, RelationType.REBUTS)
+        graph.add_relation(c.id, a.id, RelationType.SUPPORTS)
+
+        assert a.is_rebutted
+        assert [n.id for n in graph.get_grounded_extension()] == [a.id, c.id]
+        assert [[n.id for n in e] for e in graph.get_preferred_extensions()] == [[a.id, c.id]]
+        strengths = graph.get_argument_strengths()
+        assert strengths[c.id] == 0.5
+        assert strengths[b.id] == pytest.approx(0.5 / 1.25)
+        assert strengths[a.id] == pytest.approx(0.75 / (1 + 0.8 * 0.4))
+
+    def test_mutual_attack_yields_two_preferred_extensions(self):
+        graph = ArgumentGraph()
+        a = graph.add_argument("论点A", "pro", 1)
+        b = graph.add_argument("论点B", "con", 1)
+        c = graph.add_argument("论点C", "con", 1)
+        graph.add_relation(a.id, b.id, RelationType.ATTACKS)
+        graph.add_relation(b.id, a.id, RelationType.ATTACKS)
+        graph.add_relation(c.id, c.id, RelationType.UNDERMINES)
+
+        assert graph.get_grounded_extension() == []
+        assert [[n.id for n in e] for e in graph.get_preferred_extensions()] == [[a.id], [b.id]]
+        assert ArgumentGraph().get_preferred_extensions() == [[]]
+
+    def test_framework_snapshot_and_compact_storage(self):
+        graph, ids = _dag([(1, 0, RelationType.ATTACKS, 0.5), (2, 1, RelationType.SUPPORTS, 0.5)], size=3)
+        first = graph.framework
+        assert graph.framework is first
+        assert first.sources.tolist() == [1] and first.targets.tolist() == [0]
+
+        graph.add_relation(ids[2], ids[1], RelationType.REBUTS, strength=2.0)
+        assert graph.framework is not first
+        assert graph.framework.weights.tolist() == [0.5, 1.0]
+        assert [n.id for n in graph.get_grounded_extension()] == [ids[0], ids[2]]
+
+        assert not hasattr(graph.nodes[ids[0]], "__dict__")
+        assert not hasattr(graph.edges[0], "__dict__")
+
+    def test_benchmark_grounded_extension(self):
+        """2000 个论点、约 6000 条攻击：特征函数逐轮迭代与 CSR 前沿传播对比"""
+        rng = random.Random(7)
+        graph = ArgumentGraph()
+        ids = [graph.add_argument(f"论点{i}", "pro" if i % 2 == 0 else "con", round_num=i // 40 + 1).id for i in range(2000)]
+        for i in range(1, 2000):
+            graph.add_relation(ids[i], ids[i - 1], RelationType.ATTACKS)
+            for _ in range(2):
+                graph.add_relation(ids[i], ids[rng.randrange(max(0, i - 50), i)], RelationType.REBUTS)
+
+        def naive_grounded():
+            attackers = {nid: [e.source_id for e in graph._incoming_edges[nid]] for nid in ids}
+            accepted, defeated = set(), set()
+            while True:
+                new = {nid for nid in ids if nid not in accepted and all(a in defeated for a in attackers[nid])}
+                if not new:
+                    return accepted
+                accepted |= new
+                defeated |= {e.target_id for e in graph.edges if e.source_id in new}
+
+        started = time.perf_counter()
+        expected = naive_grounded()
+        naive_s = time.perf_counter() - started
+        started = time.perf_counter()
+        graph._framework = None
+        grounded = graph.get_grounded_extension()
+        csr_s = time.perf_counter() - started
+        print(f"\n[grounded benchmark] 2000 nodes: fixpoint rounds={naive_s * 1000:.1f}ms csr frontier={csr_s * 1000:.1f}ms")
+        assert {n.id for n in grounded} == expected
+        assert csr_s < naive_s
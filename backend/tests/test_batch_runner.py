@@ -0,0 +1,133 @@
+"""
+批量辩论运行器测试
+"""
+import asyncio
+import os
+import sys
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import pytest
+from sqlalchemy.orm import sessionmaker
+
+from models.debate_record import DebateRecord
+from models.session import Message, Session
+from services.batch_runner import BatchRunner, ModelPairing, build_jobs
+
+
+@pytest.fixture
+def session_factory(db_session):
+    return sessionmaker(autocommit=False, autoflush=False, bind=db_session.get_bind())
+
+
+def _jobs():
+    pairings = [
+        ModelPairing.parse("mock:mock-a"),
+        ModelPairing.parse("mock:mock-a vs mock:mock-b"),
+    ]
+    return build_jobs(["辩题一", "辩题二", "辩题一"], pairings, rounds=1, seed=7)
+
+
+def test_parse_pairing():
+    same = ModelPairing.parse("deepseek:deepseek-v4-flash")
+    assert (same.pro_provider, same.con_model) == ("deepseek", "deepseek-v4-flash")
+    mixed = ModelPairing.parse("deepseek:deepseek-v4-flash vs openai:gpt-4o")
+    assert mixed.judge == ("deepseek", "deepseek-v4-flash")
+    assert mixed.providers == ["deepseek", "openai"]
+    with pytest.raises(ValueError):
+        ModelPairing.parse("deepseek")
+
+
+def test_batch_persists_records_and_resumes(db_session, session_factory):
+    jobs = _jobs()
+    assert len(jobs) == 4
+
+    runner = BatchRunner(jobs, default_concurrency=2, commit_every=3, session_factory=session_factory)
+    summary = asyncio.run(runner.run())
+
+    assert summary["status"] == "completed"
+    assert summary["completed"] == 4
+    assert summary["failed"] == 0
+    assert summary["commits"] == 2
+    assert summary["throughput"]["debates_per_min"] > 0
+    assert summary["throughput"]["tokens"] > 0
+    assert all(result["session_id"] for result in summary["results"])
+
+    records = db_session.query(DebateRecord).all()
+    assert len(records) == 4
+    assert {record.is_mixed for record in records} == {0, 1}
+    assert all(record.completed_at is not None for record in records)
+    sessions = db_session.query(Session).all()
+    assert all(session.settings["batch_id"] == runner.batch_id for session in sessions)
+    assert db_session.query(Message).count() == 8
+
+    rerun = BatchRunner(_jobs(), session_factory=session_factory)
+    resumed = asyncio.run(rerun.run())
+    assert resumed["skipped"] == 4
+    assert resumed["completed"] == 0
+    assert db_session.query(DebateRecord).count() == 4
+
+
+def test_batch_respects_provider_concurrency(db_session, session_factory):
+    peak = 0
+
+    class CountingRunner(BatchRunner):
+        def _make_client(self, provider, model, seed):
+            nonlocal peak
+            peak = max(peak, self.running)
+            return super()._make_client(provider, model, seed)
+
+    runner = CountingRunner(_jobs(), provider_concurrency={"mock": 1}, session_factory=session_factory)
+    summary = asyncio.run(runner.run())
+
+    assert summary["completed"] == 4
+    assert peak == 1
+
+
+def test_batch_api_rejects_unknown_batch(client):
+    response = client.get("/api/debate/batch/unknown")
+    assert response.status_code == 404
+
+
+def test_record_key_distinguishes_run_settings(db_session, session_factory):
+    pairing = [ModelPairing.parse("mock:mock-a")]
+    jobs = (
+        build_jobs(["参数辩题"], pairing, rounds=1, seed=7)
+        + build_jobs(["参数辩题"], pairing, rounds=2, seed=7)
+        + build_jobs(["参数辩题"], pairing, rounds=1, seed=8)
+        + build_jobs(["参数辩题"], pairing, rounds=1, preset="budget")
+    )
+    jobs += build_jobs(["参数辩题"], pairing, rounds=3, preset="budget")
+
+    summary = asyncio.run(BatchRunner(jobs, session_factory=session_factory).run())
+    assert summary["completed"] == 5
+    assert {record.total_rounds for record in db_session.query(DebateRecord)} == {1, 2}
+
+    # 按预设补全后参数相同（budget 最多 2 轮）的任务仍视为重复
+    duplicate = build_jobs(["参数辩题"], pairing, rounds=5, seed=42, preset="budget")
+    resumed = asyncio.run(BatchRunner(jobs + duplicate, session_factory=session_factory).run())
+    assert resumed["skipped"] == 6 and resumed["completed"] == 0
+
+
+def test_failed_flush_cancels_remaining_jobs(db_session, session_factory):
+    started = 0
+
+    class FailingRunner(BatchRunner):
+        async def _run_debate(self, *args):
+            nonlocal started
+            started += 1
+            await asyncio.sleep(0.2)
+            return await super()._run_debate(*args)
+
+        def _write_drafts(self, drafts):
+            raise RuntimeError("磁盘已满")
+
+    runner = FailingRunner(_jobs(), provider_concurrency={"mock": 1}, commit_every=1, session_factory=session_factory)
+    with pytest.raises(RuntimeError):
+        asyncio.run(runner.run())
+
+    summary = runner.progress()
+    assert summary["status"] == "failed"
+    assert summary["failed"] == summary["total"] == 4
+    assert summary["completed"] == 0 and summary["running"] == 0 and summary["queued"] == 0
+    assert started == 2  # 第一场写入失败时第二场正在运行并被取消，其余未启动
+    assert db_session.query(DebateRecord).count() == 0
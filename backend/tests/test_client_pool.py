@@ -0,0 +1,102 @@
+"""
+Provider 客户端池测试
+"""
+import asyncio
+import os
+import sys
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import pytest
+
+from services.providers.claude import ClaudeProvider
+from services.providers.client_pool import ProviderClientPool, get_client_pool
+from services.providers.gemini import GeminiProvider
+from services.providers.openai_compat import OpenAICompatProvider
+
+
+class _KeepAliveHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+
+    def do_GET(self):
+        body = b"ok"
+        self.send_response(200)
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, *args):
+        pass
+
+
+@pytest.fixture
+def local_server():
+    server = ThreadingHTTPServer(("127.0.0.1", 0), _KeepAliveHandler)
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    try:
+        yield f"http://127.0.0.1:{server.server_address[1]}"
+    finally:
+        server.shutdown()
+        server.server_close()
+
+
+def test_same_key_reuses_client():
+    pool = ProviderClientPool()
+    created = []
+
+    def factory(http_client):
+        created.append(http_client)
+        return object()
+
+    first = pool.get("claude:a", factory)
+    assert pool.get("claude:a", factory) is first
+    assert pool.get("claude:b", factory) is not first
+    assert len(created) == 2
+    assert all(http_client is pool.http_client for http_client in created)
+
+    stats = pool.stats()
+    assert stats["hits"] == 1
+    assert stats["misses"] == 2
+    assert stats["clients_by_provider"] == {"claude": 2}
+
+
+def test_pool_is_bounded_and_evicts_idle_clients():
+    pool = ProviderClientPool(max_clients=2, idle_ttl_seconds=0.05)
+    for key in ("a", "b", "c"):
+        pool.get(f"gemini:{key}", lambda http_client: object())
+    assert pool.stats()["clients"] == 2
+    assert pool.evictions == 1
+
+    time.sleep(0.06)
+    assert pool.evict_idle() == 2
+    assert pool.stats()["clients"] == 0
+
+
+def test_connection_reuse_is_reported(local_server):
+    pool = ProviderClientPool()
+
+    async def _run():
+        for _ in range(3):
+            response = await pool.http_client.get(local_server)
+            assert response.text == "ok"
+        await pool.aclose()
+
+    asyncio.run(_run())
+    stats = pool.stats()
+    assert stats["http_requests"] == 3
+    assert stats["connections_opened"] == 1
+    assert stats["connection_reuse_rate"] == pytest.approx(2 / 3, abs=1e-3)
+
+
+def test_providers_share_pooled_clients():
+    pool = get_client_pool()
+    assert ClaudeProvider("key-1", "m1").client is ClaudeProvider("key-1", "m2").client
+    assert GeminiProvider("key-1", "m1").client is GeminiProvider("key-1", "m2").client
+    openai_a = OpenAICompatProvider("key-1", "https://api.openai.com/v1", "gpt")
+    openai_b = OpenAICompatProvider("key-1", "https://api.deepseek.com/v1", "chat")
+    assert openai_a.client is not openai_b.client
+    assert pool.stats()["hits"] >= 2
@@ -0,0 +1,140 @@
+"""
+SQLite 存储档位测试与读写并发基准
+"""
+import os
+import sys
+import threading
+import time
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import pytest
+from sqlalchemy import text
+from sqlalchemy.exc import OperationalError
+from sqlalchemy.orm import sessionmaker
+
+from config import Settings
+from database import (
+    SQLITE_PROFILES,
+    Base,
+    create_app_engine,
+    resolve_sqlite_pragmas,
+    sqlite_file_path,
+)
+from models.session import Message, Session
+
+
+def test_resolve_pragmas_applies_overrides():
+    config = Settings(database_url="sqlite://", db_profile="production", sqlite_synchronous="FULL")
+    pragmas = resolve_sqlite_pragmas(config)
+    assert pragmas["journal_mode"] == "WAL"
+    assert pragmas["synchronous"] == "FULL"
+
+    assert resolve_sqlite_pragmas(Settings(database_url="sqlite://", db_profile="default")) == {}
+    with pytest.raises(ValueError, match="未知的数据库档位"):
+        resolve_sqlite_pragmas(Settings(database_url="sqlite://", db_profile="turbo"))
+
+
+def test_sqlite_file_path_skips_memory_databases():
+    assert sqlite_file_path("sqlite:///:memory:") is None
+    assert sqlite_file_path("sqlite://") is None
+    assert sqlite_file_path("postgresql://localhost/db") is None
+    assert sqlite_file_path("sqlite:////tmp/app.db") == "/tmp/app.db"
+
+
+def test_profile_is_applied_on_connect_and_reader_is_read_only(tmp_path):
+    url = f"sqlite:///{tmp_path / 'profile.db'}"
+    writer = create_app_engine(url, SQLITE_PROFILES["production"])
+    reader = create_app_engine(url, SQLITE_PROFILES["production"], read_only=True)
+    try:
+        Base.metadata.create_all(bind=writer)
+        with writer.connect() as conn:
+            assert conn.exec_driver_sql("PRAGMA journal_mode").scalar() == "wal"
+            assert conn.exec_driver_sql("PRAGMA synchronous").scalar() == 1  # NORMAL
+            assert conn.exec_driver_sql("PRAGMA busy_timeout").scalar() == 5000
+
+        with reader.connect() as conn:
+            assert conn.execute(text("select count(*) from session")).scalar() == 0
+            with pytest.raises(OperationalError, match="readonly"):
+                conn.execute(text("insert into session (session_type, topic) values ('chat', 'x')"))
+    finally:
+        reader.dispose()
+        writer.dispose()
+
+
+def test_health_db_reports_profile(client):
+    response = client.get("/health/db")
+    assert response.status_code == 200
+    data = response.json()
+    assert data["dialect"] == "sqlite"
+    assert data["profile"] == "default"
+    # 测试使用内存数据库，只读接口回退到主引擎
+    assert data["read_pool"]["separate"] is False
+    assert "journal_mode" in data["effective"]
+
+
+def _read_write_throughput(url, pragmas, duration=0.6, readers=4):
+    """一个线程持续提交小事务，多个线程并发读取历史列表，返回 (读/秒, 写/秒)"""
+    write_engine = create_app_engine(url, pragmas)
+    read_engine = create_app_engine(url, pragmas, read_only=True, pool_size=readers)
+    Base.metadata.create_all(bind=write_engine)
+    WriteSession = sessionmaker(bind=write_engine, autoflush=False)
+    ReadSession = sessionmaker(bind=read_engine, autoflush=False)
+
+    seed = WriteSession()
+    session = Session(session_type="debate", topic="基准")
+    seed.add(session)
+    seed.commit()
+    session_id = session.id
+    seed.close()
+
+    counts = {"reads": 0, "writes": 0}
+    lock = threading.Lock()
+    deadline = time.perf_counter() + duration
+
+    def write_loop():
+        db = WriteSession()
+        try:
+            while time.perf_counter() < deadline:
+                db.add(Message(session_id=session_id, role="pro", content="论点" * 50))
+                db.commit()
+                with lock:
+                    counts["writes"] += 1
+        finally:
+            db.close()
+
+    def read_loop():
+        db = ReadSession()
+        try:
+            while time.perf_counter() < deadline:
+                db.query(Message).filter(Message.session_id == session_id).order_by(Message.id.desc()).limit(20).all()
+                db.rollback()
+                with lock:
+                    counts["reads"] += 1
+        finally:
+            db.close()
+
+    threads = [threading.Thread(target=write_loop)] + [threading.Thread(target=read_loop) for _ in range(readers)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    read_engine.dispose()
+    write_engine.dispose()
+    return counts["reads"] / duration, counts["writes"] / duration
+
+
+def test_benchmark_concurrent_read_write_profiles(tmp_path):
+    """同一负载下对比 SQLite 默认值与 production 档位的读写吞吐"""
+    default_reads, default_writes = _read_write_throughput(
+        f"sqlite:///{tmp_path / 'default.db'}", SQLITE_PROFILES["default"]
+    )
+    tuned_reads, tuned_writes = _read_write_throughput(
+        f"sqlite:///{tmp_path / 'production.db'}", SQLITE_PROFILES["production"]
+    )
+    print(
+        f"\n[sqlite profile benchmark] default: {default_reads:,.0f} reads/s {default_writes:,.0f} writes/s | "
+        f"production: {tuned_reads:,.0f} reads/s {tuned_writes:,.0f} writes/s"
+    )
+    assert tuned_reads > 0
+    # 读吞吐受 GIL 影响波动较大，稳定的收益在写入：WAL + synchronous=NORMAL 减少了 fsync
+    assert tuned_writes > default_writes
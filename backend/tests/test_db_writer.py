@@ -0,0 +1,154 @@
+"""
+数据库写线程测试与并发基准
+"""
+import asyncio
+import os
+import sys
+import threading
+import time
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import pytest
+from sqlalchemy import create_engine, event
+from sqlalchemy.orm import sessionmaker
+
+from agents.orchestrator import DebateOrchestrator
+from database import Base
+from models.session import Message, Session
+from services.ai_client import AIClient
+from services.db_writer import DBWriter
+
+
+@pytest.fixture
+def writer():
+    instance = DBWriter(name="test-db-writer")
+    yield instance
+    instance.close()
+
+
+@pytest.fixture
+def file_engine(tmp_path):
+    # 流式会话 refresh 后会持有连接直到下次提交，连接池需覆盖并发流数量
+    engine = create_engine(
+        f"sqlite:///{tmp_path / 'writer.db'}",
+        connect_args={"check_same_thread": False},
+        pool_size=64,
+    )
+    Base.metadata.create_all(bind=engine)
+    yield engine
+    engine.dispose()
+
+
+def test_run_executes_in_order_on_writer_thread(writer):
+    seen = []
+
+    def job(index):
+        seen.append((index, threading.current_thread().name))
+        return index * 2
+
+    async def _run():
+        return await asyncio.gather(*(writer.run(job, index) for index in range(20)))
+
+    assert asyncio.run(_run()) == [index * 2 for index in range(20)]
+    assert [index for index, _ in seen] == list(range(20))
+    assert {name for _, name in seen} == {"test-db-writer"}
+    # 同一个写线程可服务后续的事件循环
+    assert asyncio.run(writer.run(lambda: "again")) == "again"
+    assert writer.stats()["jobs"] == 21
+
+
+def test_errors_are_raised_to_caller(writer):
+    def boom():
+        raise ValueError("disk full")
+
+    with pytest.raises(ValueError, match="disk full"):
+        asyncio.run(writer.run(boom))
+    assert writer.stats()["errors"] == 1
+
+
+def test_commit_and_rollback_keep_session_transactions(writer, file_engine):
+    SessionLocal = sessionmaker(bind=file_engine, autoflush=False)
+    db = SessionLocal()
+
+    async def _run():
+        session = Session(session_type="chat", topic="写线程")
+        db.add(session)
+        await writer.commit(db, session)
+        db.add(Message(session_id=session.id, role="user", content="保留"))
+        await writer.commit(db, session)
+        db.add(Message(session_id=session.id, role="user", content="回滚"))
+        await writer.rollback(db)
+        return session.id
+
+    session_id = asyncio.run(_run())
+    db.close()
+
+    check = SessionLocal()
+    contents = [message.content for message in check.query(Message).filter(Message.session_id == session_id)]
+    check.close()
+    assert contents == ["保留"]
+
+
+def _p99(values):
+    values = sorted(values)
+    return values[min(len(values) - 1, int(round(0.99 * (len(values) - 1))))]
+
+
+async def _mock_debate(index, SessionLocal, commit, gaps):
+    """模拟 legacy 流式路由：每条完整论点落库一次，SSE 发送时让出事件循环"""
+    db = SessionLocal()
+    try:
+        session = Session(session_type="debate", topic=f"辩题 {index}")
+        db.add(session)
+        await commit(db, session)
+        orchestrator = DebateOrchestrator(AIClient(provider="mock", model="mock", seed=index, use_cache=False))
+        await orchestrator.setup_debate(topic=f"辩题 {index}", total_rounds=1, provider="mock", model="mock")
+        last_chunk = None
+        async for frame in orchestrator.run_debate_streaming():
+            now = time.perf_counter()
+            if frame["type"] == "argument":
+                if last_chunk is not None:
+                    gaps.append(now - last_chunk)
+                last_chunk = now
+            else:
+                last_chunk = None
+            if frame["type"] == "argument_complete":
+                db.add(Message(session_id=session.id, role=frame["side"], content=frame["content"]))
+                await commit(db, session)
+            await asyncio.sleep(0)  # 相当于写 socket
+    finally:
+        db.close()
+
+
+def test_benchmark_p99_inter_chunk_latency_with_50_debates(writer, file_engine):
+    """50 场并发 Mock 辩论，每次提交模拟 2ms 慢盘：对比事件循环内同步提交与写线程提交"""
+    SessionLocal = sessionmaker(bind=file_engine, autoflush=False)
+    event.listen(file_engine, "commit", lambda conn: time.sleep(0.002))
+
+    async def blocking_commit(db, *refresh):
+        db.commit()
+        for obj in refresh:
+            db.refresh(obj)
+
+    def run(commit):
+        gaps = []
+
+        async def _run():
+            await asyncio.gather(*(_mock_debate(index, SessionLocal, commit, gaps) for index in range(50)))
+
+        started = time.perf_counter()
+        asyncio.run(_run())
+        return _p99(gaps), time.perf_counter() - started
+
+    blocking_p99, blocking_total = run(blocking_commit)
+    writer_p99, writer_total = run(writer.commit)
+    print(
+        f"\n[db writer benchmark] 50 debates p99 inter-chunk: "
+        f"blocking={blocking_p99 * 1000:.2f}ms ({blocking_total:.2f}s) "
+        f"writer={writer_p99 * 1000:.2f}ms ({writer_total:.2f}s)"
+    )
+
+    check = SessionLocal()
+    assert check.query(Message).count() == 2 * 50 * 2
+    check.close()
+    assert writer_p99 < blocking_p99
@@ -0,0 +1,151 @@
+"""
+辩论统计聚合表测试与基准
+"""
+import os
+import sys
+import time
+from datetime import datetime, timedelta, timezone
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from sqlalchemy import create_engine, func
+from sqlalchemy.orm import sessionmaker
+
+from database import Base
+from models.debate_record import DebateRecord, DebateStat
+from models.session import Session
+from services.debate_stats import backfill_debate_stats, read_daily_counts, read_debate_stats, rebuild_debate_stats
+
+
+def _add_records(db, specs):
+    session = Session(session_type="debate", topic="统计")
+    db.add(session)
+    db.flush()
+    records = [DebateRecord(session_id=session.id, topic="统计", **spec) for spec in specs]
+    db.add_all(records)
+    db.commit()
+    return records
+
+
+def _legacy_stats(db):
+    """原 /api/analysis/stats 的实现：多次 COUNT 与 GROUP BY"""
+    def count(*filters):
+        return db.query(func.count(DebateRecord.id)).filter(*filters).scalar() or 0
+
+    model_usage = {}
+    for column in (DebateRecord.pro_model, DebateRecord.con_model):
+        for name, value in db.query(column, func.count(DebateRecord.id)).filter(column.isnot(None)).group_by(column):
+            model_usage[name] = model_usage.get(name, 0) + value
+    return {
+        "total_debates": count(),
+        "pro_wins": count(DebateRecord.winner == "pro"),
+        "con_wins": count(DebateRecord.winner == "con"),
+        "ties": count(DebateRecord.winner == "tie"),
+        "mixed_model_debates": count(DebateRecord.is_mixed == 1),
+        "model_usage": model_usage,
+    }
+
+
+SPECS = [
+    {"winner": "pro", "pro_model": "m1", "con_model": "m2", "is_mixed": 1},
+    {"winner": "con", "pro_model": "m1", "con_model": "m1"},
+    {"winner": "tie", "pro_model": "m2", "con_model": "m3", "is_mixed": 1},
+    {"winner": None, "pro_model": None, "con_model": None},
+]
+
+
+def test_stats_follow_inserts_updates_and_deletes(db_session):
+    records = _add_records(db_session, SPECS)
+    assert read_debate_stats(db_session) == _legacy_stats(db_session)
+
+    records[0].winner = "con"
+    records[1].pro_model = "m4"
+    db_session.commit()
+    assert read_debate_stats(db_session) == _legacy_stats(db_session)
+
+    db_session.delete(records[2])
+    db_session.commit()
+    stats = read_debate_stats(db_session)
+    assert stats == _legacy_stats(db_session)
+    assert stats["ties"] == 0 and "m3" not in stats["model_usage"]
+
+
+def test_failed_transaction_leaves_stats_untouched(db_session):
+    _add_records(db_session, SPECS[:1])
+    db_session.add(DebateRecord(session_id=1, topic="回滚", winner="pro"))
+    db_session.flush()
+    db_session.rollback()
+    assert read_debate_stats(db_session)["total_debates"] == 1
+
+
+def test_rebuild_matches_incremental(db_session):
+    _add_records(db_session, SPECS)
+    incremental = read_debate_stats(db_session)
+    db_session.query(DebateStat).delete()
+    db_session.commit()
+    assert read_debate_stats(db_session)["total_debates"] == 0
+
+    assert rebuild_debate_stats(db_session) == len(SPECS)
+    db_session.commit()
+    assert read_debate_stats(db_session) == incremental
+
+
+def test_backfill_only_runs_for_empty_stats(db_session):
+    _add_records(db_session, SPECS)
+    bind = db_session.get_bind()
+    assert backfill_debate_stats(bind) is False
+    db_session.query(DebateStat).delete()
+    db_session.commit()
+    assert backfill_debate_stats(bind) is True
+    assert read_debate_stats(db_session)["total_debates"] == len(SPECS)
+
+
+def test_stats_endpoint_daily_breakdown(client, db_session):
+    today = datetime.now(timezone.utc)
+    _add_records(db_session, [
+        {"winner": "pro", "created_at": today},
+        {"winner": "con", "created_at": today},
+        {"winner": "pro", "created_at": today - timedelta(days=2)},
+        {"winner": "pro", "created_at": today - timedelta(days=30)},
+    ])
+    data = client.get("/api/analysis/stats", params={"days": 3}).json()
+    assert data["total_debates"] == 4
+    assert [item["debates"] for item in data["daily"]] == [1, 0, 2]
+    assert "daily" not in client.get("/api/analysis/stats").json()
+    assert read_daily_counts(db_session, 1) == [{"date": today.date().isoformat(), "debates": 2}]
+
+
+def test_benchmark_stats_read_vs_group_by(tmp_path):
+    """2 万条辩论记录：原 5 次 COUNT + 2 次 GROUP BY 与读取聚合表"""
+    engine = create_engine(f"sqlite:///{tmp_path / 'stats.db'}")
+    Base.metadata.create_all(bind=engine)
+    models = [f"model-{i}" for i in range(8)]
+    base = datetime(2026, 1, 1)
+    with engine.begin() as conn:
+        conn.execute(Session.__table__.insert(), [{"id": 1, "session_type": "debate", "topic": "基准"}])
+        conn.execute(DebateRecord.__table__.insert(), [
+            {
+                "session_id": 1, "topic": f"辩题 {i}", "winner": ("pro", "con", "tie")[i % 3],
+                "pro_model": models[i % 8], "con_model": models[(i * 3) % 8], "is_mixed": i % 2,
+                "created_at": base + timedelta(hours=i),
+            }
+            for i in range(20000)
+        ])
+    db = sessionmaker(bind=engine)()
+    rebuild_debate_stats(db)
+    db.commit()
+
+    def timed(fn):
+        best = float("inf")
+        for _ in range(5):
+            started = time.perf_counter()
+            result = fn()
+            best = min(best, time.perf_counter() - started)
+        return best, result
+
+    legacy_s, legacy = timed(lambda: _legacy_stats(db))
+    aggregate_s, aggregate = timed(lambda: read_debate_stats(db))
+    print(f"\n[stats benchmark] 20000 records: count+group_by={legacy_s * 1000:.2f}ms aggregates={aggregate_s * 1000:.2f}ms")
+    db.close()
+    engine.dispose()
+    assert aggregate == legacy
+    assert aggregate_s < legacy_s
@@ -0,0 +1,222 @@
+"""
+论点图谱持久化测试与基准
+"""
+import os
+import sys
+import time
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from sqlalchemy import select
+
+import services.graph_store as graph_store
+from models.debate_record import DebateRecord
+from models.session import Message, Session, SessionGraph
+from services.graph_store import (
+    GRAPH_SCHEMA_VERSION,
+    build_graph_payload,
+    load_graph_payload,
+    rebuild_graph_payload,
+    save_graph_payload,
+)
+
+
+def _add_debate(db, count=4, with_record=True, graph=None):
+    session = Session(session_type="debate", topic="图谱持久化")
+    db.add(session)
+    db.flush()
+    db.add_all(
+        Message(
+            session_id=session.id,
+            role="正方" if i % 2 == 0 else "反方",
+            content=f"第 {i} 条论点。" + "论证充分。" * (i % 5 * 30),
+            meta_info={"round": i // 2 + 1},
+        )
+        for i in range(count)
+    )
+    if with_record:
+        db.add(DebateRecord(session_id=session.id, topic=session.topic))
+    if graph is not None:
+        db.add(SessionGraph(session_id=session.id, payload=graph))
+    db.commit()
+    return session
+
+
+def _forbid_rebuild(monkeypatch):
+    def fail(*args, **kwargs):
+        raise AssertionError("graph should be served from session_graph")
+
+    monkeypatch.setattr(graph_store, "build_argument_graph", fail)
+
+
+def test_stream_debate_persists_graph(client, db_session, monkeypatch):
+    with client.stream(
+        "GET",
+        "/api/debate/agent-stream",
+        params={"topic": "图谱在结束时保存", "rounds": 1, "provider": "mock", "model": "mock"},
+    ) as response:
+        assert '"type": "complete"' in "".join(response.iter_text())
+
+    record = db_session.query(DebateRecord).one()
+    stored = db_session.get(SessionGraph, record.session_id).payload
+    assert stored["version"] == GRAPH_SCHEMA_VERSION
+    assert stored["scores"]["total_arguments"] == 2
+
+    _forbid_rebuild(monkeypatch)
+    data = client.get(f"/api/debate/{record.session_id}/graph").json()
+    assert data["mermaid"] == stored["mermaid"]
+    assert client.get(f"/api/debate/{record.session_id}/analysis").json()["total_arguments"] == 2
+    assert client.get(f"/api/analysis/debate/{record.session_id}").json()["graph"] == stored
+
+
+def test_graph_cached_mid_stream_does_not_break_final_save(client, db_session, monkeypatch):
+    """前端收到裁决即请求图谱：流式收尾前会话已有一份（不完整的）缓存图谱"""
+    import routers.debate.agent as agent_router
+    from tests.conftest import TestingSessionLocal
+
+    def build_after_early_get(topic, messages):
+        messages = list(messages)
+        with TestingSessionLocal() as other:
+            partial = build_graph_payload(topic, messages[:1])
+            save_graph_payload(other, messages[0].session_id, partial)
+        return build_graph_payload(topic, messages)
+
+    monkeypatch.setattr(agent_router, "build_graph_payload", build_after_early_get)
+    with client.stream(
+        "GET",
+        "/api/debate/agent-stream",
+        params={"topic": "收尾前已请求图谱", "rounds": 1, "provider": "mock", "model": "mock"},
+    ) as response:
+        body = "".join(response.iter_text())
+    assert '"type": "complete"' in body and '"type": "error"' not in body
+
+    db_session.expire_all()
+    session = db_session.query(Session).one()
+    assert session.settings["status"] == "completed"
+    assert db_session.query(DebateRecord).count() == 1
+    assert load_graph_payload(db_session, session.id)["scores"]["total_arguments"] == 2
+
+
+def test_concurrent_insert_rereads_stored_graph(db_session, monkeypatch):
+    from tests.conftest import TestingSessionLocal
+
+    session = _add_debate(db_session)
+    session_id = session.id
+    payload = rebuild_graph_payload(db_session, session_id, session.topic)
+    real_get = db_session.get
+    raced = []
+
+    def get_racing(entity, key):
+        # 两个请求同时未命中：本请求读的时候还没有行，插入前另一请求已写入
+        if entity is SessionGraph and not raced:
+            raced.append(key)
+            with TestingSessionLocal() as other:
+                other.add(SessionGraph(session_id=key, payload={**payload, "mermaid": "已保存"}))
+                other.commit()
+            return None
+        return real_get(entity, key)
+
+    monkeypatch.setattr(db_session, "get", get_racing)
+    assert save_graph_payload(db_session, session_id, payload, replace=False)["mermaid"] == "已保存"
+    assert raced == [session_id]
+    assert save_graph_payload(db_session, session_id, payload)["mermaid"] == payload["mermaid"]
+    assert db_session.query(SessionGraph).count() == 1
+
+
+def test_graph_with_new_messages_is_rebuilt(client, db_session):
+    session = _add_debate(db_session)
+    assert client.get(f"/api/debate/{session.id}/graph").json()["scores"]["total_arguments"] == 4
+
+    db_session.add(Message(session_id=session.id, role="正方", content="进行中的辩论又有新论点。", meta_info={"round": 3}))
+    db_session.commit()
+    assert load_graph_payload(db_session, session.id) is None
+    assert client.get(f"/api/debate/{session.id}/graph").json()["scores"]["total_arguments"] == 5
+    db_session.expire_all()
+    assert load_graph_payload(db_session, session.id)["message_count"] == 5
+
+
+def test_analysis_detail_ignores_legacy_record_graph(client, db_session):
+    session = _add_debate(db_session, with_record=False)
+    db_session.add(DebateRecord(session_id=session.id, topic=session.topic, graph={"version": 1, "scores": {}}))
+    db_session.commit()
+    assert client.get(f"/api/analysis/debate/{session.id}").json()["graph"] is None
+
+
+def test_graph_is_built_lazily_once(client, db_session, monkeypatch):
+    session = _add_debate(db_session)
+    assert load_graph_payload(db_session, session.id) is None
+
+    first = client.get(f"/api/debate/{session.id}/graph").json()
+    assert first["scores"]["total_arguments"] == 4
+    db_session.expire_all()
+    assert load_graph_payload(db_session, session.id)["mermaid"] == first["mermaid"]
+
+    _forbid_rebuild(monkeypatch)
+    assert client.get(f"/api/debate/{session.id}/graph").json() == first
+    assert client.get(f"/api/debate/{session.id}/graph/mermaid").json() == {"mermaid": first["mermaid"]}
+
+
+def test_stale_schema_version_is_rebuilt(client, db_session):
+    session = _add_debate(db_session, graph={"version": GRAPH_SCHEMA_VERSION - 1, "scores": {}})
+    data = client.get(f"/api/debate/{session.id}/analysis").json()
+    assert data["total_arguments"] == 4
+    db_session.expire_all()
+    assert db_session.get(SessionGraph, session.id).payload["version"] == GRAPH_SCHEMA_VERSION
+
+
+def test_sessions_without_record_are_persisted(client, db_session, monkeypatch):
+    session = _add_debate(db_session, with_record=False)
+    first = client.get(f"/api/debate/{session.id}/graph").json()
+    assert first["scores"]["total_arguments"] == 4
+    assert db_session.query(DebateRecord).count() == 0
+    db_session.expire_all()
+    assert db_session.get(SessionGraph, session.id) is not None
+
+    _forbid_rebuild(monkeypatch)
+    assert client.get(f"/api/debate/{session.id}/graph").json() == first
+    assert client.get("/api/debate/99999/graph").status_code == 404
+
+
+def test_cached_graph_does_not_open_write_session(client, db_session, monkeypatch):
+    from database import get_session_factory
+    from main import app
+
+    session = _add_debate(db_session)
+    client.get(f"/api/debate/{session.id}/graph")
+
+    opened = []
+
+    def factory():
+        opened.append(True)
+        raise AssertionError("write session opened on a cache hit")
+
+    monkeypatch.setitem(app.dependency_overrides, get_session_factory, lambda: factory)
+    assert client.get(f"/api/debate/{session.id}/analysis").json()["total_arguments"] == 4
+    assert opened == []
+
+
+def test_benchmark_stored_graph_vs_rebuild(client, db_session):
+    """60 条论点：持久化读取与每次从消息重建对比"""
+    session = _add_debate(db_session, count=60)
+    client.get(f"/api/debate/{session.id}/graph")
+
+    def rebuild():
+        messages = db_session.execute(
+            select(Message.role, Message.content, Message.meta_info)
+            .where(Message.session_id == session.id)
+            .order_by(Message.created_at, Message.id)
+        ).all()
+        return build_graph_payload(session.topic, messages)
+
+    def timed(fn):
+        best = float("inf")
+        for _ in range(10):
+            started = time.perf_counter()
+            result = fn()
+            best = min(best, time.perf_counter() - started)
+        return best, result
+
+    rebuild_s, rebuilt = timed(rebuild)
+    stored_s, stored = timed(lambda: load_graph_payload(db_session, session.id))
+    print(f"\n[graph benchmark] 60 arguments: rebuild={rebuild_s * 1000:.2f}ms stored={stored_s * 1000:.2f}ms")
+    assert stored["scores"] == rebuilt["scores"]
+    assert stored_s < rebuild_s
@@ -0,0 +1,127 @@
+"""
+流式导出测试（单会话 / 批量 NDJSON / ZIP）
+"""
+import io
+import json
+import os
+import sys
+import tracemalloc
+import zipfile
+from datetime import datetime, timedelta, timezone
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+
+from models.session import Message, Session
+from services.history_export import iter_session_rows, stream_ndjson, stream_session, stream_zip
+
+
+def _add_session(db, topic, count, session_type="chat", created_at=None):
+    session = Session(session_type=session_type, topic=topic, created_at=created_at or datetime.now(timezone.utc))
+    db.add(session)
+    db.flush()
+    db.add_all(
+        Message(session_id=session.id, role="user" if i % 2 == 0 else "assistant", content=f"第 {i} 条消息")
+        for i in range(count)
+    )
+    db.commit()
+    return session
+
+
+def test_json_export_matches_previous_document(db_session):
+    session = _add_session(db_session, "流式导出", 7)
+    chunks = list(stream_session(db_session, session, "json"))
+    assert len(chunks) > 2  # 逐条生成，而非一次拼好整个文档
+
+    messages = db_session.query(Message).order_by(Message.id).all()
+    expected = json.dumps({
+        "session_id": session.id,
+        "type": "chat",
+        "topic": "流式导出",
+        "created_at": session.created_at.isoformat(),
+        "messages": [
+            {"role": m.role, "content": m.content, "created_at": m.created_at.isoformat()} for m in messages
+        ],
+    }, ensure_ascii=False, indent=2)
+    assert b"".join(chunks).decode("utf-8") == expected
+
+    empty = _add_session(db_session, "空会话", 0)
+    assert json.loads(b"".join(stream_session(db_session, empty, "json")))["messages"] == []
+
+
+def test_bulk_ndjson_filters_by_type_and_date(client, db_session):
+    base = datetime(2026, 3, 1, tzinfo=timezone.utc)
+    _add_session(db_session, "早期", 2, created_at=base - timedelta(days=10))
+    inside = _add_session(db_session, "区间内", 3, created_at=base + timedelta(days=1))
+    _add_session(db_session, "其他类型", 1, session_type="qa", created_at=base + timedelta(days=1))
+
+    response = client.get("/api/history/export", params={"format": "ndjson"})
+    assert response.status_code == 200
+    assert "application/x-ndjson" in response.headers["content-type"]
+    assert len(response.text.strip().split("\n")) == 3
+
+    response = client.get("/api/history/export", params={
+        "format": "ndjson", "type": "chat", "start": base.isoformat(), "end": (base + timedelta(days=5)).isoformat(),
+    })
+    lines = [json.loads(line) for line in response.text.strip().split("\n")]
+    assert [line["session_id"] for line in lines] == [inside.id]
+    assert [m["content"] for m in lines[0]["messages"]] == ["第 0 条消息", "第 1 条消息", "第 2 条消息"]
+
+
+def test_bulk_zip_contains_one_file_per_session(client, db_session):
+    first = _add_session(db_session, "压缩一", 2)
+    second = _add_session(db_session, "压缩二", 1)
+
+    response = client.get("/api/history/export", params={"format": "zip", "item_format": "md"})
+    assert response.status_code == 200
+    assert response.headers["content-type"] == "application/zip"
+    with zipfile.ZipFile(io.BytesIO(response.content)) as archive:
+        assert archive.namelist() == [f"session_{first.id}.md", f"session_{second.id}.md"]
+        assert "# 压缩一" in archive.read(f"session_{first.id}.md").decode("utf-8")
+
+    assert client.get("/api/history/export", params={"format": "docx"}).status_code == 400
+    assert client.get("/api/history/export", params={"format": "zip", "item_format": "pdf"}).status_code == 400
+
+
+def _peak_export_memory(path, sessions, per_session):
+    engine = create_engine(f"sqlite:///{path}")
+    for table in (Session.__table__, Message.__table__):
+        table.create(engine)
+    with engine.begin() as conn:
+        conn.execute(Session.__table__.insert(), [
+            {"id": i, "session_type": "debate", "topic": f"辩题 {i}", "message_count": per_session}
+            for i in range(1, sessions + 1)
+        ])
+        conn.execute(Message.__table__.insert(), [
+            {"session_id": i, "role": "pro", "content": "论点" * 200}
+            for i in range(1, sessions + 1) for _ in range(per_session)
+        ])
+    db = sessionmaker(bind=engine)()
+    peaks = {}
+    try:
+        for name, make in (
+            ("ndjson", lambda: stream_ndjson(db, iter_session_rows(db))),
+            ("zip", lambda: stream_zip(db, iter_session_rows(db), "json")),
+        ):
+            tracemalloc.start()
+            total = sum(len(chunk) for chunk in make())
+            peaks[name] = (tracemalloc.get_traced_memory()[1], total)
+            tracemalloc.stop()
+    finally:
+        db.close()
+        engine.dispose()
+    return peaks
+
+
+def test_benchmark_export_memory_is_flat(tmp_path):
+    """导出量扩大 8 倍，峰值内存基本不变"""
+    small = _peak_export_memory(tmp_path / "small.db", sessions=50, per_session=20)
+    large = _peak_export_memory(tmp_path / "large.db", sessions=400, per_session=20)
+    for name in ("ndjson", "zip"):
+        print(
+            f"\n[export benchmark] {name}: {small[name][1] / 1024:.0f}KB output peak={small[name][0] / 1024:.0f}KB | "
+            f"{large[name][1] / 1024:.0f}KB output peak={large[name][0] / 1024:.0f}KB"
+        )
+        assert large[name][1] > 7 * small[name][1]
+        assert large[name][0] < 2 * small[name][0]
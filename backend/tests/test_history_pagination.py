@@ -0,0 +1,140 @@
+"""
+历史列表键集分页与 message_count 维护测试
+"""
+import os
+import sys
+import time
+from datetime import datetime, timedelta, timezone
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from sqlalchemy import create_engine, func, inspect, text, tuple_
+from sqlalchemy.orm import sessionmaker
+
+from database import Base, migrate_columns, migrate_indexes
+from models.session import Message, Session
+
+
+def test_message_count_tracks_inserts_and_deletes(db_session):
+    session = Session(session_type="chat", topic="计数")
+    db_session.add(session)
+    db_session.commit()
+
+    db_session.add_all([Message(session_id=session.id, role="user", content=str(i)) for i in range(3)])
+    db_session.commit()
+    session.messages.append(Message(role="assistant", content="经由关系添加"))
+    db_session.commit()
+    assert session.message_count == 4
+
+    db_session.delete(db_session.query(Message).first())
+    db_session.commit()
+    assert session.message_count == 3
+
+
+def test_keyset_pagination_walks_every_session_once(client, db_session):
+    base = datetime(2026, 1, 1, tzinfo=timezone.utc)
+    # 每两个会话共用一个 created_at，验证 id 作为次序键
+    db_session.add_all(
+        Session(session_type="debate" if i % 2 else "chat", topic=f"会话 {i}", created_at=base + timedelta(minutes=i // 2))
+        for i in range(25)
+    )
+    db_session.commit()
+    expected = [s.id for s in db_session.query(Session).order_by(Session.created_at.desc(), Session.id.desc())]
+
+    first = client.get("/api/history", params={"limit": 10}).json()
+    assert first["total"] == 25 and first["has_more"] and first["next_cursor"]
+    seen = [item["session_id"] for item in first["history"]]
+    cursor = first["next_cursor"]
+    while cursor:
+        page = client.get("/api/history", params={"limit": 10, "cursor": cursor, "include_total": False}).json()
+        assert page["total"] is None
+        seen.extend(item["session_id"] for item in page["history"])
+        cursor = page["next_cursor"]
+    assert seen == expected
+
+    typed = client.get("/api/history", params={"type": "debate", "limit": 5}).json()
+    page = client.get("/api/history", params={"type": "debate", "limit": 5, "cursor": typed["next_cursor"]}).json()
+    assert {item["type"] for item in typed["history"] + page["history"]} == {"debate"}
+    assert len(set(item["session_id"] for item in typed["history"] + page["history"])) == 10
+
+
+def test_invalid_cursor_is_rejected(client):
+    assert client.get("/api/history", params={"cursor": "not-a-cursor"}).status_code == 400
+
+
+def test_migration_backfills_message_count(tmp_path):
+    engine = create_engine(f"sqlite:///{tmp_path / 'legacy.db'}")
+    with engine.begin() as conn:
+        conn.execute(text(
+            "CREATE TABLE session (id INTEGER PRIMARY KEY, session_type VARCHAR(20), topic VARCHAR(500), "
+            "created_at DATETIME, updated_at DATETIME, settings JSON)"
+        ))
+        conn.execute(text(
+            "CREATE TABLE message (id INTEGER PRIMARY KEY, session_id INTEGER NOT NULL, role VARCHAR(50), "
+            "content TEXT, created_at DATETIME, meta_info JSON)"
+        ))
+        conn.execute(text("INSERT INTO session (id, session_type, topic) VALUES (1, 'chat', 'a'), (2, 'chat', 'b')"))
+        conn.execute(text("INSERT INTO message (session_id, content) VALUES (1, 'x'), (1, 'y'), (1, 'z')"))
+
+    assert "session.message_count" in migrate_columns(engine)
+    assert "ix_session_type_created_at" in migrate_indexes(engine)
+    with engine.connect() as conn:
+        counts = dict(conn.execute(text("SELECT id, message_count FROM session")).all())
+    assert counts == {1: 3, 2: 0}
+    assert "ix_session_type_created_at" in {index["name"] for index in inspect(engine).get_indexes("session")}
+    engine.dispose()
+
+
+def _timed(fn, repeat=5):
+    best = float("inf")
+    for _ in range(repeat):
+        started = time.perf_counter()
+        fn()
+        best = min(best, time.perf_counter() - started)
+    return best
+
+
+def test_benchmark_deep_page_keyset_vs_offset(tmp_path):
+    """2 万会话、20 万消息：原 count + outerjoin/group_by + OFFSET 与键集分页的深页耗时"""
+    engine = create_engine(f"sqlite:///{tmp_path / 'history.db'}")
+    Base.metadata.create_all(bind=engine)
+    sessions, per_session = 20000, 10
+    base = datetime(2025, 1, 1)
+    with engine.begin() as conn:
+        conn.execute(Session.__table__.insert(), [
+            {"id": i, "session_type": "debate", "topic": f"辩题 {i}", "created_at": base + timedelta(seconds=i),
+             "message_count": per_session}
+            for i in range(1, sessions + 1)
+        ])
+        conn.execute(Message.__table__.insert(), [
+            {"session_id": i, "role": "pro", "content": "论点"}
+            for i in range(1, sessions + 1) for _ in range(per_session)
+        ])
+    db = sessionmaker(bind=engine)()
+    limit, offset = 20, 15000
+
+    def legacy():
+        db.query(Session).count()
+        return (
+            db.query(Session.id, Session.topic, Session.session_type, Session.created_at, func.count(Message.id))
+            .outerjoin(Message).group_by(Session.id)
+            .order_by(Session.created_at.desc()).offset(offset).limit(limit).all()
+        )
+
+    cursor_row = db.query(Session).order_by(Session.created_at.desc(), Session.id.desc()).offset(offset - 1).first()
+
+    def keyset():
+        return (
+            db.query(Session.id, Session.topic, Session.session_type, Session.created_at, Session.message_count)
+            .filter(tuple_(Session.created_at, Session.id) < tuple_(cursor_row.created_at, cursor_row.id))
+            .order_by(Session.created_at.desc(), Session.id.desc()).limit(limit + 1).all()
+        )
+
+    assert [row[0] for row in legacy()] == [row[0] for row in keyset()[:limit]]
+    legacy_s, keyset_s = _timed(legacy), _timed(keyset)
+    print(
+        f"\n[history benchmark] {sessions} sessions / {sessions * per_session} messages, page at offset {offset}: "
+        f"offset+group_by={legacy_s * 1000:.2f}ms keyset={keyset_s * 1000:.2f}ms"
+    )
+    db.close()
+    engine.dispose()
+    assert keyset_s < legacy_s
@@ -0,0 +1,143 @@
+"""
+LLM 调用计量测试
+"""
+import asyncio
+import os
+import sys
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import pytest
+from sqlalchemy import create_engine, inspect, text
+
+from agents.orchestrator import DebateOrchestrator
+from database import migrate_columns
+from exceptions import AIClientException
+from models.debate_record import DebateRecord
+from services.ai_client import AIClient
+from services.llm_metrics import UsageCollector, estimate_tokens, get_llm_metrics, llm_call_scope
+from services.trace_store import load_session_trace
+from utils.logger import request_id_var
+
+
+def test_estimate_tokens():
+    assert estimate_tokens("") == 0
+    assert estimate_tokens("人工智能") == 4
+    assert estimate_tokens("abcdefgh") == 2
+
+
+def test_completion_and_stream_calls_are_recorded_with_tags():
+    client = AIClient(provider="mock", model="mock", seed=1, use_cache=False)
+    collector = UsageCollector()
+    records = []
+    get_llm_metrics().add_listener(records.append)
+
+    async def _run():
+        request_id_var.set("req-123")
+        with llm_call_scope(collector, session_id=99, agent="pro"):
+            await client.get_completion([{"role": "user", "content": "你好"}])
+            async for _ in client.chat_stream([{"role": "user", "content": "继续"}]):
+                pass
+
+    try:
+        asyncio.run(_run())
+    finally:
+        get_llm_metrics().remove_listener(records.append)
+
+    assert [record.mode for record in records] == ["completion", "stream"]
+    for record in records:
+        assert record.request_id == "req-123"
+        assert record.tags == {"session_id": 99, "agent": "pro"}
+        assert record.prompt_tokens > 0 and record.completion_tokens > 0
+        assert not record.usage_estimated
+        assert record.latency_ms >= 0
+    assert records[0].ttft_ms is None
+    assert records[1].ttft_ms is not None
+
+    summary = collector.summary()
+    assert summary["calls"] == 2
+    assert summary["total_tokens"] == sum(record.total_tokens for record in records)
+    assert set(summary["by_agent"]) == {"pro"}
+    assert set(summary["by_model"]) == {"mock/mock"}
+
+
+def test_failed_call_records_retries_and_estimates_usage():
+    client = AIClient(provider="mock", model="mock", use_cache=False, retry_delay=0)
+    collector = UsageCollector()
+
+    async def broken_completion(*args, **kwargs):
+        raise RuntimeError("boom")
+
+    client._provider.get_completion = broken_completion
+
+    async def _run():
+        with llm_call_scope(collector):
+            await client.get_completion([{"role": "user", "content": "hi"}])
+
+    with pytest.raises(AIClientException):
+        asyncio.run(_run())
+
+    summary = collector.summary()
+    assert summary["calls"] == 1
+    assert summary["errors"] == 1
+    assert summary["retries"] == 1
+    assert summary["usage_estimated"] is True
+
+
+def test_orchestrator_trace_includes_usage_by_agent():
+    async def _run():
+        client = AIClient(provider="mock", model="mock", seed=5, use_cache=False)
+        orchestrator = DebateOrchestrator(ai_client=client)
+        await orchestrator.setup_debate(topic="计量辩题", total_rounds=2, provider="mock", model="mock", session_id=7)
+        async for _ in orchestrator.run_debate_streaming():
+            pass
+        return orchestrator.build_trace()
+
+    usage = asyncio.run(_run())["usage"]
+    assert set(usage["by_agent"]) == {"pro", "con", "jury"}
+    assert usage["total_tokens"] > 0
+    # 每轮：双方各一次分析 + 一次流式发言，评审一次；最后一次裁决
+    assert usage["calls"] == 2 * 5 + 1
+
+
+def test_pipelined_jury_calls_are_attributed_to_run():
+    async def _run():
+        client = AIClient(provider="mock", model="mock", seed=5, use_cache=False)
+        orchestrator = DebateOrchestrator(ai_client=client)
+        await orchestrator.setup_debate(topic="计量辩题", total_rounds=2, provider="mock", model="mock", pipeline_jury=True)
+        async for _ in orchestrator.run_debate_streaming():
+            pass
+        return orchestrator.build_trace()
+
+    usage = asyncio.run(_run())["usage"]
+    assert usage["by_agent"]["jury"]["calls"] == 3
+
+
+def test_agent_stream_persists_usage_and_exposes_metrics(client, db_session):
+    with client.stream(
+        "GET",
+        "/api/debate/agent-stream",
+        params={"topic": "计量接口辩题", "rounds": 1, "provider": "mock", "model": "mock", "seed": 3},
+    ) as response:
+        assert response.status_code == 200
+        "".join(response.iter_text())
+
+    record = db_session.query(DebateRecord).first()
+    assert record is not None
+    assert record.usage["calls"] > 0
+    assert load_session_trace(db_session, record.session_id)["usage"] == record.usage
+
+    metrics = client.get("/api/metrics", params={"session_id": record.session_id}).json()
+    assert metrics["session_usage"] == record.usage
+    assert metrics["recent_calls"]
+    assert all(call["tags"]["session_id"] == record.session_id for call in metrics["recent_calls"])
+    assert metrics["llm"]["calls"] >= record.usage["calls"]
+
+
+def test_migrate_columns_adds_usage_to_existing_table(tmp_path):
+    engine = create_engine(f"sqlite:///{tmp_path / 'old.db'}")
+    with engine.begin() as conn:
+        conn.execute(text("CREATE TABLE debate_records (id INTEGER PRIMARY KEY, topic VARCHAR(500))"))
+
+    assert migrate_columns(engine) == ["debate_records.usage"]
+    assert "usage" in {col["name"] for col in inspect(engine).get_columns("debate_records")}
+    assert migrate_columns(engine) == []
@@ -2,12 +2,14 @@
 Orchestrator trace tests.
 """
 import asyncio
+import json
 import os
 import sys
 sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 
 from services.ai_client import AIClient
 from agents.orchestrator import DebateOrchestrator
+from services.completion_cache import CompletionCache
 
 
 def test_build_trace_includes_verdict_streaming():
@@ -38,3 +40,173 @@ def test_build_trace_includes_verdict_streaming():
     assert "argument" not in event_types
     assert len(trace["turns"]) == 2
     assert trace["turns"][0]["thought"] is not None
+
+
+def test_seeded_rerun_is_served_from_completion_cache():
+    cache = CompletionCache(max_entries=256)
+
+    async def _run():
+        client = AIClient(provider="mock", model="mock", seed=42, cache=cache)
+        orchestrator = DebateOrchestrator(ai_client=client)
+        await orchestrator.setup_debate(topic="缓存辩题", total_rounds=2, provider="mock", model="mock", preset="budget")
+        async for _ in orchestrator.run_debate_streaming():
+            pass
+        return orchestrator.get_transcript()
+
+    first = asyncio.run(_run())
+    misses_after_first = cache.stats()["misses"]
+    second = asyncio.run(_run())
+
+    assert first == second
+    assert cache.stats()["misses"] == misses_after_first
+    assert cache.stats()["hits"] >= misses_after_first
+
+
+def _jury_client(seed: int, commentary) -> AIClient:
+    """评审点评由 commentary(第几次调用) 给出，用于控制辩手收到的反馈"""
+    client = AIClient(provider="mock", model="mock", seed=seed)
+    calls = iter(range(1, 100))
+
+    async def jury(*args, **kwargs):
+        score = {"logic": 7, "evidence": 6, "rhetoric": 7, "rebuttal": 6}
+        return json.dumps({
+            "pro_score": score,
+            "con_score": score,
+            "round_winner": "tie",
+            "commentary": commentary(next(calls)),
+            "highlights": [],
+            "suggestions": {"pro": [], "con": []},
+        }, ensure_ascii=False)
+
+    client._provider.get_completion = jury
+    return client
+
+
+async def _run_pipeline_debate(pipeline_rounds: bool, commentary):
+    client = AIClient(provider="mock", model="mock", seed=7)
+    original = client._provider.get_completion
+    prompts = []
+
+    async def recording(messages, *args, **kwargs):
+        prompts.append(messages[-1]["content"])
+        return await original(messages, *args, **kwargs)
+
+    client._provider.get_completion = recording
+    orchestrator = DebateOrchestrator(ai_client=_jury_client(7, commentary))
+    await orchestrator.setup_debate(
+        topic="流水线辩题",
+        total_rounds=3,
+        provider="mock",
+        model="mock",
+        temperature=0.6,
+        seed=7,
+        pro_ai_client=client,
+        con_ai_client=client,
+        pipeline_rounds=pipeline_rounds,
+    )
+    async for _ in orchestrator.run_debate_streaming():
+        pass
+    return orchestrator.get_transcript(), orchestrator.build_trace(), prompts
+
+
+def test_pipelined_rounds_match_sequential_transcript():
+    silent = lambda call: ""
+    sequential_transcript, sequential_trace, _ = asyncio.run(_run_pipeline_debate(False, silent))
+    pipelined_transcript, pipelined_trace, _ = asyncio.run(_run_pipeline_debate(True, silent))
+
+    assert pipelined_transcript == sequential_transcript
+    assert [turn["result"] for turn in pipelined_trace["turns"]] == [
+        turn["result"] for turn in sequential_trace["turns"]
+    ]
+    assert sequential_trace["pipeline"] is None
+
+    pipeline = pipelined_trace["pipeline"]
+    assert pipeline["enabled"] is True
+    assert len(pipeline["prefetches"]) == 2
+    assert pipeline["hits"] == 2 and pipeline["misses"] == 0
+    assert [item["round"] for item in pipeline["saved_ms_by_round"]] == [2, 3]
+    assert pipeline["total_saved_ms"] >= 0
+
+
+def test_jury_feedback_stops_prefetching_and_keeps_sequential_prompts():
+    commentating = lambda call: f"第 {call} 次点评：双方需要更多证据"
+    sequential_transcript, _, sequential_prompts = asyncio.run(_run_pipeline_debate(False, commentating))
+    pipelined_transcript, pipelined_trace, pipelined_prompts = asyncio.run(_run_pipeline_debate(True, commentating))
+
+    assert pipelined_transcript == sequential_transcript
+    # 评审反馈仍在分析提示词中；落空的预取请求重新发起，之后不再预取
+    assert any("评审反馈: 第 1 次点评" in prompt for prompt in sequential_prompts)
+    pipeline = pipelined_trace["pipeline"]
+    assert pipeline["prefetches"] == [{"round": 2, "side": "con", "hit": False, "saved_ms": 0.0}]
+    assert set(sequential_prompts) <= set(pipelined_prompts)
+
+
+def test_mismatched_prefetch_is_discarded():
+    from agents.debater_agent import DebaterAgent
+
+    async def _run():
+        client = AIClient(provider="mock", model="mock", seed=7)
+        agent = DebaterAgent(name="正方", position="pro", ai_client=client, topic="预取辩题")
+        history = [{"round": 1, "side": "con", "content": "对方论点"}]
+        agent.prefetch_analysis({"round": 2, "opponent_last_argument": "对方论点", "history": history})
+        agent.update_belief("latest_evaluation_commentary", "新的评审反馈")
+        result = await agent.think({"round": 2, "opponent_last_argument": "对方论点", "history": history})
+        return agent, result
+
+    agent, result = asyncio.run(_run())
+    assert agent.last_prefetch == {"hit": False, "saved_ms": 0.0}
+    assert result.analysis
+
+
+def test_pipelined_jury_overlaps_next_round_and_keeps_round_order():
+    async def _run():
+        debater_client = AIClient(provider="mock", model="mock", seed=11)
+        jury_client = AIClient(provider="mock", model="mock", seed=11)
+        original = jury_client._provider.get_completion
+
+        async def slow_jury(*args, **kwargs):
+            await asyncio.sleep(0.02)
+            return await original(*args, **kwargs)
+
+        jury_client._provider.get_completion = slow_jury
+        orchestrator = DebateOrchestrator(ai_client=jury_client)
+        await orchestrator.setup_debate(
+            topic="评审并行辩题",
+            total_rounds=3,
+            provider="mock",
+            model="mock",
+            temperature=0.6,
+            seed=11,
+            pro_ai_client=debater_client,
+            con_ai_client=debater_client,
+            pipeline_jury=True,
+        )
+        events = [event async for event in orchestrator.run_debate_streaming()]
+        return orchestrator, events
+
+    orchestrator, events = asyncio.run(_run())
+    durable_types = [event["type"] for event in events if event["type"] != "argument"]
+
+    # 第 1 轮评审在第 2 轮开始之后才发出
+    assert durable_types.index("round_start") < durable_types.index("evaluation")
+    round_two_start = next(i for i, e in enumerate(events) if e["type"] == "round_start" and e["round"] == 2)
+    first_evaluation = next(i for i, e in enumerate(events) if e["type"] == "evaluation")
+    assert first_evaluation > round_two_start
+
+    evaluations = [event for event in events if event["type"] == "evaluation"]
+    assert [event["round"] for event in evaluations] == [1, 2, 3]
+    assert [evaluation.round for evaluation in orchestrator.jury_agent.evaluations] == [1, 2, 3]
+    assert durable_types[-2:] == ["verdict", "complete"]
+
+    bus_rounds = [
+        message["round"]
+        for message in orchestrator.message_bus.export_history()
+        if message["type"] == "evaluation"
+    ]
+    assert bus_rounds == [1, 2, 3]
+
+    pipeline = orchestrator.build_trace()["pipeline"]
+    assert pipeline["overlap_jury"] is True
+    assert pipeline["jury_feedback_lag"] == 1
+    assert [item["round"] for item in pipeline["jury"]] == [1, 2, 3]
+    assert orchestrator.run_config["jury_feedback_lag"] == 1
@@ -0,0 +1,133 @@
+"""
+历史全文检索（FTS5 trigram）测试与基准
+"""
+import os
+import random
+import sys
+import time
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from sqlalchemy import create_engine, text
+from sqlalchemy.orm import sessionmaker
+
+from models.session import Message, Session
+from services.search_index import SEARCH_TABLE, _search_like, ensure_search_index, search_sessions
+
+
+def _add_session(db, topic, contents, session_type="debate"):
+    session = Session(session_type=session_type, topic=topic)
+    db.add(session)
+    db.flush()
+    db.add_all(Message(session_id=session.id, role="pro", content=content) for content in contents)
+    db.commit()
+    return session
+
+
+def test_search_covers_message_content_with_snippets(client, db_session):
+    topic_hit = _add_session(db_session, "量子计算的未来", ["经典计算机仍有优势"])
+    message_hit = _add_session(db_session, "科技与社会", ["第一轮论点：量子计算将改变密码学的基础"], session_type="chat")
+    _add_session(db_session, "教育公平", ["城乡教育资源差距"])
+
+    data = client.get("/api/history", params={"q": "量子计算"}).json()
+    assert data["total"] == 2
+    ids = [item["session_id"] for item in data["history"]]
+    assert set(ids) == {topic_hit.id, message_hit.id}
+    snippets = {item["session_id"]: item["snippet"] for item in data["history"]}
+    assert "【量子计算】" in snippets[message_hit.id]
+    assert all(item["score"] is not None for item in data["history"])
+
+    typed = client.get("/api/history", params={"q": "量子计算", "type": "chat"}).json()
+    assert [item["session_id"] for item in typed["history"]] == [message_hit.id]
+
+
+def test_index_follows_updates_and_deletes(client, db_session):
+    session = _add_session(db_session, "原始主题", ["这是一条关于人工智能伦理的论点"])
+    assert search_sessions(db_session, "人工智能")[2] == 1
+
+    message = db_session.query(Message).one()
+    message.content = "改写后讨论的是气候变化"
+    session.topic = "新的主题名称"
+    db_session.commit()
+    assert search_sessions(db_session, "人工智能")[2] == 0
+    assert search_sessions(db_session, "气候变化")[2] == 1
+    assert search_sessions(db_session, "新的主题")[2] == 1
+
+    assert client.delete(f"/api/history/{session.id}").status_code == 200
+    assert db_session.execute(text(f"SELECT count(*) FROM {SEARCH_TABLE}")).scalar() == 0
+
+
+def test_short_terms_fall_back_to_like(db_session):
+    _add_session(db_session, "辩题甲", ["关于机器的讨论"])
+    _add_session(db_session, "机器人", [])
+    _add_session(db_session, "无关", ["别的内容"])
+
+    hits, has_more, total = search_sessions(db_session, "机器")
+    assert total == 2 and not has_more
+    assert {hit.topic for hit in hits} == {"辩题甲", "机器人"}
+
+
+def test_existing_database_is_backfilled(tmp_path):
+    engine = create_engine(f"sqlite:///{tmp_path / 'legacy.db'}")
+    for table in (Session.__table__, Message.__table__):
+        table.create(engine)
+    with engine.begin() as conn:
+        conn.execute(Session.__table__.insert(), [{"id": 1, "session_type": "qa", "topic": "旧会话主题"}])
+        conn.execute(Message.__table__.insert(), [{"session_id": 1, "role": "user", "content": "旧消息里提到区块链技术"}])
+        assert ensure_search_index(conn)
+        assert ensure_search_index(conn)  # 重复调用不会重复回填
+
+    db = sessionmaker(bind=engine)()
+    assert [hit.session_id for hit in search_sessions(db, "区块链")[0]] == [1]
+    assert db.execute(text(f"SELECT count(*) FROM {SEARCH_TABLE}")).scalar() == 2
+    db.close()
+    engine.dispose()
+
+
+def test_benchmark_search_large_history(tmp_path):
+    """5000 会话、3 万条消息（随机中文）：FTS5 检索与 LIKE 扫描对比"""
+    engine = create_engine(f"sqlite:///{tmp_path / 'search.db'}")
+    for table in (Session.__table__, Message.__table__):
+        table.create(engine)
+    rng = random.Random(0)
+    alphabet = "的一是在不了有和人这中大为上个国我以要他时来用们生到作地于出就分对成会可主发年动同工也能下过子说产种面而方后多定行学法所民得经十三之进着等部度家电力里如水化高自二理起小物现实加量都两体制机当使点从业本去把性好应开它合还因由其些然前外天政四日那社义事平形相全表间样与关各重新线内数正心反你明看原又么利比或但质气第向道命此变条只没结解问意建月公无系军很情者最立代想已通并提直题党程展五果料象员革位入常文总次品式活设及管特件长求老头基资边流路级少图山统接知较将组见计别她手角期根论运农指几九区强放决西被干做必战先回则任取据处队南给色光门即保治北造百规热领七海口东导器压志世金增争济阶油思术极交受联什认六共权收证改清己美再采转更单风切打白教速花带安场身车例真务具万每目至达走积示议声报斗完类八离华名确才科张信马节话米整空元况今集温传土许步群广石记需段研界拉林律叫且究观越织装影算低持音众书布复容儿须际商非验连断深难近矿千周委素技备半办青省列习响约支般史感劳便团往酸历市克何除消构府称太准精值号率族维划选标写存候毛亲快效斯院查江型眼王按格养易置派层片始却专状育厂京识适属圆包火住调满县局照参红细引听该铁价严"
+
+    def sentence(length):
+        return "".join(rng.choices(alphabet, k=length))
+
+    sessions, per_session = 5000, 6
+    with engine.begin() as conn:
+        conn.execute(Session.__table__.insert(), [
+            {"id": i, "session_type": "debate", "topic": sentence(12), "message_count": per_session}
+            for i in range(1, sessions + 1)
+        ])
+        messages = [
+            {"session_id": i, "role": "pro", "content": sentence(60)}
+            for i in range(1, sessions + 1) for _ in range(per_session)
+        ]
+        for index in rng.sample(range(len(messages)), 30):
+            messages[index]["content"] += "量子纠缠通信"
+        conn.execute(Message.__table__.insert(), messages)
+        ensure_search_index(conn)  # 已有数据一次性回填
+
+    db = sessionmaker(bind=engine)()
+
+    def timed(fn):
+        best = float("inf")
+        for _ in range(3):
+            started = time.perf_counter()
+            result = fn()
+            best = min(best, time.perf_counter() - started)
+        return best, result
+
+    fts_s, (fts_hits, _, fts_total) = timed(lambda: search_sessions(db, "量子纠缠", limit=20))
+    like_s, (_, _, like_total) = timed(lambda: _search_like(db, ["量子纠缠"], None, 20, 0, True))
+    print(
+        f"\n[search benchmark] {sessions} sessions / {sessions * per_session} messages: "
+        f"fts5={fts_s * 1000:.2f}ms like={like_s * 1000:.2f}ms ({fts_total} sessions matched)"
+    )
+    db.close()
+    engine.dispose()
+
+    assert fts_total == like_total > 0
+    assert all(hit.snippet and "【" in hit.snippet for hit in fts_hits)
+    assert fts_s < like_s
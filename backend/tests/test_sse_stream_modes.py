@@ -0,0 +1,134 @@
+"""
+SSE 流式帧模式（cumulative / delta）测试与基准
+"""
+import asyncio
+import json
+import os
+import sys
+import time
+import zlib
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from agents.orchestrator import DebateOrchestrator
+from models.session import Message
+from services.ai_client import AIClient
+from utils.sse import ContentStreamEncoder
+
+
+def _parse(frame: str) -> dict:
+    assert frame.startswith("data: ")
+    return json.loads(frame[len("data: "):])
+
+
+def _partial_frames(text: str, chunk_size: int = 4):
+    for offset in range(0, len(text), chunk_size):
+        yield {
+            "type": "content",
+            "content": text[: offset + chunk_size],
+            "delta": text[offset: offset + chunk_size],
+            "offset": offset,
+        }
+
+
+def test_cumulative_mode_keeps_legacy_frames():
+    encoder = ContentStreamEncoder("cumulative")
+    frames = [_parse(encoder.event(frame)) for frame in _partial_frames("人工智能会取代人类吗")]
+    assert frames[-1] == {"type": "content", "content": "人工智能会取代人类吗"}
+    assert all("delta" not in frame and "offset" not in frame for frame in frames)
+
+
+def test_delta_mode_sends_increments_with_periodic_checksum():
+    text = "人工智能会取代人类的工作吗？不会，但会改变工作的形态。"
+    encoder = ContentStreamEncoder("delta", checksum_interval=3)
+    frames = [_parse(encoder.event(frame)) for frame in _partial_frames(text)]
+
+    assert all("content" not in frame for frame in frames)
+    rebuilt = ""
+    for frame in frames:
+        assert frame["offset"] == len(rebuilt)
+        rebuilt += frame["delta"]
+        if "checksum" in frame:
+            assert frame["checksum"] == f"{zlib.crc32(rebuilt.encode('utf-8')):08x}"
+    assert rebuilt == text
+    assert sum("checksum" in frame for frame in frames) == len(frames) // 3
+
+    # offset 归零表示新的一段文本，校验和随之重置
+    second = [_parse(encoder.event(frame)) for frame in _partial_frames("abcdefghijkl")]
+    assert second[2]["checksum"] == f"{zlib.crc32(b'abcdefghijkl'):08x}"
+
+    # 非增量帧原样透传
+    assert _parse(encoder.event({"type": "complete", "content": text})) == {"type": "complete", "content": text}
+
+
+def test_chat_stream_delta_mode_reassembles_response(client, db_session):
+    with client.stream(
+        "GET",
+        "/api/chat/stream",
+        params={"message": "你好", "provider": "mock", "model": "mock", "stream_mode": "delta"},
+    ) as response:
+        assert response.status_code == 200
+        body = "".join(response.iter_text())
+
+    frames = [json.loads(line[len("data: "):]) for line in body.splitlines() if line.startswith("data: ")]
+    content_frames = [frame for frame in frames if frame["type"] == "content"]
+    assert content_frames and all("content" not in frame for frame in content_frames)
+    rebuilt = "".join(frame["delta"] for frame in content_frames)
+
+    saved = db_session.query(Message).filter(Message.role == "assistant").one()
+    assert rebuilt == saved.content
+
+
+def test_agent_stream_rejects_unknown_stream_mode(client):
+    response = client.get(
+        "/api/debate/agent-stream",
+        params={"topic": "测试辩题", "provider": "mock", "model": "mock", "stream_mode": "diff"},
+    )
+    assert response.status_code == 422
+
+
+def _debate_events(rounds: int = 3):
+    async def _run():
+        orchestrator = DebateOrchestrator(AIClient(provider="mock", model="mock", seed=7, use_cache=False))
+        await orchestrator.setup_debate(topic="远程办公是否提升效率", total_rounds=rounds, provider="mock", model="mock")
+        return [event async for event in orchestrator.run_debate_streaming()]
+
+    return asyncio.run(_run())
+
+
+def _encode_all(events, mode: str, repeat: int = 5):
+    frames = []
+    started = time.process_time()
+    for _ in range(repeat):
+        encoder = ContentStreamEncoder(mode)
+        frames = [encoder.event(event) for event in events]
+    cpu = (time.process_time() - started) / repeat
+    return sum(len(frame.encode("utf-8")) for frame in frames), cpu
+
+
+def test_benchmark_bytes_and_cpu_per_debate():
+    """同一场 Mock 辩论分别按两种模式编码，比较发送字节数与编码 CPU 时间（pytest -s 查看输出）"""
+    events = _debate_events()
+    argument_events = [event for event in events if event["type"] == "argument"]
+    assert argument_events and all("delta" in event for event in argument_events)
+
+    cumulative_bytes, cumulative_cpu = _encode_all(events, "cumulative")
+    delta_bytes, delta_cpu = _encode_all(events, "delta")
+    print(
+        f"\n[stream-mode benchmark] debate events={len(events)} "
+        f"cumulative={cumulative_bytes}B/{cumulative_cpu * 1000:.2f}ms "
+        f"delta={delta_bytes}B/{delta_cpu * 1000:.2f}ms "
+        f"ratio={delta_bytes / cumulative_bytes:.2%}"
+    )
+    assert delta_bytes < cumulative_bytes
+
+    # Mock 论点较短；真实模型的长回答下累计模式的二次增长更明显
+    long_answer = list(_partial_frames("论" * 2000, chunk_size=24))
+    cumulative_bytes, cumulative_cpu = _encode_all(long_answer, "cumulative")
+    delta_bytes, delta_cpu = _encode_all(long_answer, "delta")
+    print(
+        f"[stream-mode benchmark] 2000-char answer "
+        f"cumulative={cumulative_bytes}B/{cumulative_cpu * 1000:.2f}ms "
+        f"delta={delta_bytes}B/{delta_cpu * 1000:.2f}ms "
+        f"ratio={delta_bytes / cumulative_bytes:.2%}"
+    )
+    assert delta_bytes < cumulative_bytes * 0.1
@@ -0,0 +1,75 @@
+"""
+流式事件吞吐基准（MockProvider）
+
+pytest -s 可查看 events/sec 输出。
+"""
+import asyncio
+import os
+import sys
+import time
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from agents.events import DebateEvent, stream_frame
+from agents.orchestrator import DebateOrchestrator
+from services.ai_client import AIClient
+
+
+def _run_debate(rounds: int = 3, seed: int = 11):
+    async def _run():
+        client = AIClient(provider="mock", model="mock", seed=seed, use_cache=False)
+        orchestrator = DebateOrchestrator(ai_client=client)
+        await orchestrator.setup_debate(topic="开源是否优于闭源", total_rounds=rounds, provider="mock", model="mock")
+        events = [event async for event in orchestrator.run_debate_streaming()]
+        return orchestrator, events
+
+    return asyncio.run(_run())
+
+
+def test_transient_frames_use_sequence_numbers():
+    orchestrator, events = _run_debate(rounds=2)
+
+    seqs = [event["seq"] for event in events]
+    assert seqs == list(range(1, len(events) + 1))
+
+    arguments = [event for event in events if event["type"] == "argument"]
+    assert arguments
+    assert all("event_id" not in event and "timestamp" not in event for event in arguments)
+
+    durable = [event for event in events if event["type"] != "argument"]
+    assert all("event_id" in event for event in durable)
+    assert len(orchestrator.event_log) == len(durable)
+
+
+def test_benchmark_events_per_second():
+    _run_debate(rounds=1)  # 预热
+
+    started = time.perf_counter()
+    total_events = 0
+    for seed in range(5):
+        _, events = _run_debate(rounds=3, seed=seed)
+        total_events += len(events)
+    elapsed = time.perf_counter() - started
+    print(f"\n[stream benchmark] run_debate_streaming: {total_events} events, {total_events / elapsed:,.0f} events/sec")
+    assert total_events > 0
+
+
+def test_benchmark_transient_frame_vs_debate_event():
+    payload = {"side": "pro", "name": "正方", "content": "论" * 200, "delta": "论" * 24,
+               "offset": 176, "is_complete": False, "round": 1}
+    iterations = 5000
+
+    started = time.perf_counter()
+    for seq in range(iterations):
+        stream_frame("argument", seq, dict(payload))
+    fast = time.perf_counter() - started
+
+    started = time.perf_counter()
+    for _ in range(iterations):
+        DebateEvent.from_payload("argument", dict(payload), transient=True).to_stream_payload()
+    model = time.perf_counter() - started
+
+    print(
+        f"\n[stream benchmark] transient frame: {iterations / fast:,.0f}/s, "
+        f"DebateEvent: {iterations / model:,.0f}/s ({model / fast:.1f}x)"
+    )
+    assert fast < model
@@ -0,0 +1,111 @@
+"""
+Prometheus 指标测试
+"""
+import asyncio
+import os
+import sys
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from sqlalchemy import create_engine, text
+
+from services import telemetry
+from services.llm_metrics import LLMCallRecord
+
+
+def _sample(body: str, prefix: str) -> float:
+    for line in body.splitlines():
+        if line.startswith(prefix + " "):
+            return float(line.rsplit(" ", 1)[1])
+    raise AssertionError(f"未找到指标 {prefix}")
+
+
+def test_histogram_renders_cumulative_buckets():
+    registry = telemetry.MetricsRegistry()
+    histogram = registry.histogram("demo_seconds", "示例", ("route",), buckets=(0.1, 1.0))
+    for value in (0.05, 0.5, 0.5, 3.0):
+        histogram.observe(value, route="/a")
+
+    body = registry.render()
+    assert "# TYPE demo_seconds histogram" in body
+    assert _sample(body, 'demo_seconds_bucket{route="/a",le="0.1"}') == 1
+    assert _sample(body, 'demo_seconds_bucket{route="/a",le="1"}') == 3
+    assert _sample(body, 'demo_seconds_bucket{route="/a",le="+Inf"}') == 4
+    assert _sample(body, 'demo_seconds_count{route="/a"}') == 4
+    assert _sample(body, 'demo_seconds_sum{route="/a"}') == 4.05
+
+
+def test_label_values_are_escaped():
+    registry = telemetry.MetricsRegistry()
+    registry.counter("demo_total", "示例", ("model",)).inc(model='a"b\\c')
+    assert 'demo_total{model="a\\"b\\\\c"} 1' in registry.render()
+
+
+def test_llm_records_feed_histograms():
+    record = LLMCallRecord(
+        provider="mock", model="m1", mode="stream", started_at=0,
+        latency_ms=1500, ttft_ms=200, prompt_tokens=10, completion_tokens=5, retries=2,
+    )
+    before = telemetry.LLM_LATENCY.count(provider="mock", model="m1", mode="stream")
+    telemetry.observe_llm_call(record)
+
+    assert telemetry.LLM_LATENCY.count(provider="mock", model="m1", mode="stream") == before + 1
+    assert telemetry.LLM_TTFT.count(provider="mock", model="m1") >= 1
+    assert telemetry.LLM_TOKENS.value(provider="mock", model="m1", kind="completion") >= 5
+    assert telemetry.LLM_RETRIES.value(provider="mock", model="m1") >= 2
+
+
+def test_sse_stream_gauge_and_event_count():
+    async def body():
+        for chunk in ("a", "b", "c"):
+            yield chunk
+
+    async def consume():
+        seen = []
+        stream = telemetry.track_sse_stream(body(), "/demo/stream")
+        async for chunk in stream:
+            seen.append(chunk)
+            assert telemetry.SSE_ACTIVE.value(route="/demo/stream") == 1
+        return seen
+
+    assert asyncio.run(consume()) == ["a", "b", "c"]
+    assert telemetry.SSE_ACTIVE.value(route="/demo/stream") == 0
+    assert telemetry.SSE_EVENTS.value(route="/demo/stream") == 3
+    assert telemetry.SSE_DURATION.count(route="/demo/stream", status="completed") == 1
+
+
+def test_db_queries_are_timed():
+    engine = create_engine("sqlite:///:memory:")
+    telemetry.instrument_engine(engine)
+    telemetry.instrument_engine(engine)
+    before = telemetry.DB_QUERIES.count(operation="SELECT")
+    errors = telemetry.DB_ERRORS.value(operation="SELECT")
+
+    with engine.connect() as conn:
+        conn.execute(text("SELECT 1"))
+        try:
+            conn.execute(text("SELECT * FROM missing_table"))
+        except Exception:
+            pass
+
+    assert telemetry.DB_QUERIES.count(operation="SELECT") == before + 1
+    assert telemetry.DB_ERRORS.value(operation="SELECT") == errors + 1
+
+
+def test_metrics_endpoint_exposes_routes_and_streams(client):
+    with client.stream(
+        "GET",
+        "/api/chat/stream",
+        params={"message": "你好", "provider": "mock", "model": "mock"},
+    ) as response:
+        assert response.status_code == 200
+        "".join(response.iter_text())
+    client.get("/api/history/12345")
+
+    response = client.get("/metrics")
+    assert response.status_code == 200
+    assert response.headers["content-type"].startswith("text/plain")
+    body = response.text
+    assert 'aigument_http_request_duration_seconds_count{method="GET",route="/api/history/{session_id}"}' in body
+    assert _sample(body, 'aigument_sse_active_streams{route="/api/chat/stream"}') == 0
+    assert _sample(body, 'aigument_sse_events_total{route="/api/chat/stream"}') > 0
+    assert 'aigument_llm_call_duration_seconds_count{provider="mock",model="mock",mode="stream"}' in body
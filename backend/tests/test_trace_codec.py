@@ -0,0 +1,109 @@
+"""
+trace 去重压缩编码测试与存储体积基准
+"""
+import asyncio
+import json
+import os
+import sys
+import zlib
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from sqlalchemy import JSON, Column, Integer, MetaData, Table, create_engine, text
+
+from agents.orchestrator import DebateOrchestrator
+from models.debate_record import DebateRecord
+from models.session import Session, SessionTrace
+from services.ai_client import AIClient
+from utils.trace_codec import MAGIC, CompressedJSON, decode_trace, encode_trace
+
+
+def _mock_trace(seed: int = 1, rounds: int = 3):
+    async def _run():
+        orchestrator = DebateOrchestrator(AIClient(provider="mock", model="mock", seed=seed, use_cache=False))
+        await orchestrator.setup_debate(topic=f"辩题 {seed}", total_rounds=rounds, provider="mock", model="mock")
+        async for _ in orchestrator.run_debate_streaming():
+            pass
+        return orchestrator.build_trace(), orchestrator.get_full_state()
+
+    return asyncio.run(_run())
+
+
+def test_round_trip_preserves_values_and_escapes_references():
+    value = {
+        "text": "论点" * 40,
+        "again": ["论点" * 40, {"nested": "论点" * 40}],
+        "looks_like_ref": "\x000",
+        "double": "\x00\x00x",
+        "numbers": [1, 2.5, None, True],
+        "empty": {},
+    }
+    blob = encode_trace(value)
+    assert blob.startswith(MAGIC)
+    assert decode_trace(blob) == value
+
+    envelope = json.loads(zlib.decompress(blob[len(MAGIC):]))
+    assert envelope["s"] == ["论点" * 40]
+
+
+def test_decodes_legacy_plain_json():
+    assert decode_trace('{"turns": []}') == {"turns": []}
+    assert decode_trace(b'{"turns": []}') == {"turns": []}
+    assert decode_trace("null") is None
+    assert decode_trace(None) is None
+
+
+def test_mock_trace_stores_each_argument_once():
+    trace, _ = _mock_trace()
+    assert decode_trace(encode_trace(trace)) == trace
+
+    blob = encode_trace(trace)
+    envelope = json.loads(zlib.decompress(blob[len(MAGIC):]))
+    for turn in trace["turns"]:
+        if len(turn["result"]) >= 32:
+            assert envelope["s"].count(turn["result"]) == 1
+
+
+def test_analysis_api_returns_decoded_trace(client, db_session):
+    trace, _ = _mock_trace(rounds=1)
+    session = Session(session_type="debate", topic=trace["topic"])
+    db_session.add(session)
+    db_session.commit()
+    db_session.add(DebateRecord(session_id=session.id, topic=trace["topic"]))
+    db_session.add(SessionTrace(session_id=session.id, trace=trace))
+    db_session.commit()
+
+    stored = db_session.execute(text("select trace from session_trace")).scalar()
+    assert stored.startswith(MAGIC)
+
+    response = client.get(f"/api/analysis/debate/{session.id}")
+    assert response.status_code == 200
+    assert response.json()["trace"] == json.loads(json.dumps(trace))
+
+
+def _db_size(path, json_type, rows):
+    engine = create_engine(f"sqlite:///{path}")
+    metadata = MetaData()
+    # 与原先一致：会话中存一份 trace + final_state，辩论记录再存一份 trace
+    sessions = Table("session", metadata, Column("id", Integer, primary_key=True),
+                     Column("trace", json_type), Column("final_state", json_type))
+    records = Table("debate_records", metadata, Column("id", Integer, primary_key=True), Column("trace", json_type))
+    metadata.create_all(engine)
+    with engine.begin() as conn:
+        for trace, final_state in rows:
+            conn.execute(sessions.insert().values(trace=trace, final_state=final_state))
+            conn.execute(records.insert().values(trace=trace))
+    with engine.connect() as conn:
+        conn.exec_driver_sql("VACUUM")
+    engine.dispose()
+    return os.path.getsize(path)
+
+
+def test_benchmark_db_size_over_mock_corpus(tmp_path):
+    corpus = [_mock_trace(seed=seed, rounds=3) for seed in range(12)]
+    plain = _db_size(tmp_path / "plain.db", JSON, corpus)
+    compact = _db_size(tmp_path / "compact.db", CompressedJSON, corpus)
+    print(
+        f"\n[trace codec benchmark] {len(corpus)} mock debates: plain JSON={plain / 1024:.0f}KB, "
+        f"compact={compact / 1024:.0f}KB ({plain / compact:.1f}x smaller)"
+    )
+    assert plain / compact >= 3
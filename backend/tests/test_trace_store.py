@@ -0,0 +1,128 @@
+"""
+会话 trace 存储测试
+
+trace / final_state 写入 session_trace 表，Session.settings 只保留小字段
+"""
+import os
+import sys
+import time
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from models.debate_record import DebateRecord
+from models.session import Session, SessionTrace
+from services.trace_store import load_final_state, load_session_trace, migrate_record_traces, migrate_settings_traces
+
+
+def _legacy_trace(size: int) -> dict:
+    turns = [{"round": index, "result": {"content": "论" * 400}} for index in range(size)]
+    return {"topic": "旧数据", "turns": turns, "evaluations": [], "verdict": {"winner": "pro"}}
+
+
+def test_agent_stream_stores_trace_outside_settings(client, db_session):
+    with client.stream(
+        "GET",
+        "/api/debate/agent-stream",
+        params={"topic": "trace 存储", "rounds": 1, "provider": "mock", "model": "mock"},
+    ) as response:
+        body = "".join(response.iter_text())
+    assert '"type": "complete"' in body
+
+    session = db_session.query(Session).filter(Session.session_type == "debate").one()
+    assert session.settings["status"] == "completed"
+    assert "trace" not in session.settings and "final_state" not in session.settings
+
+    trace = load_session_trace(db_session, session.id)
+    assert trace["topic"] == "trace 存储"
+    assert db_session.query(DebateRecord).one().trace is None
+    assert client.get(f"/api/analysis/debate/{session.id}").json()["trace"] == trace
+    assert load_final_state(db_session, session.id)["topic"] == "trace 存储"
+
+    response = client.post("/api/evaluation/run", json={"session_id": session.id})
+    assert response.status_code == 200
+    assert response.json()["trace_id"] == str(session.id)
+
+
+def test_evaluation_without_trace_returns_404(client, db_session):
+    session = Session(session_type="debate", topic="无 trace", settings={"status": "running"})
+    db_session.add(session)
+    db_session.commit()
+
+    assert client.post("/api/evaluation/run", json={"session_id": session.id}).status_code == 404
+    assert client.post("/api/evaluation/run", json={"session_id": 99999}).status_code == 404
+
+
+def test_migrates_legacy_settings_once(db_session):
+    debate = Session(
+        session_type="debate",
+        topic="旧辩论",
+        settings={"rounds": 2, "status": "completed", "trace": _legacy_trace(2), "final_state": {"round": 2}},
+    )
+    dialectic = Session(session_type="dialectic", topic="旧辩证", settings={"dialectic_trace": {"rounds": []}})
+    chat = Session(session_type="chat", topic="普通对话", settings={"provider": "mock"})
+    db_session.add_all([debate, dialectic, chat])
+    db_session.commit()
+
+    assert migrate_settings_traces(db_session.get_bind()) == 2
+    assert migrate_settings_traces(db_session.get_bind()) == 0
+
+    db_session.expire_all()
+    assert debate.settings == {"rounds": 2, "status": "completed"}
+    assert dialectic.settings == {}
+    assert chat.settings == {"provider": "mock"}
+    assert load_session_trace(db_session, debate.id)["topic"] == "旧数据"
+    assert load_final_state(db_session, debate.id) == {"round": 2}
+    assert load_session_trace(db_session, dialectic.id) == {"rounds": []}
+    assert db_session.get(SessionTrace, chat.id) is None
+
+
+def test_migrates_legacy_record_traces_once(db_session):
+    moved = Session(session_type="debate", topic="旧记录")
+    kept = Session(session_type="debate", topic="已有 trace")
+    db_session.add_all([moved, kept])
+    db_session.flush()
+    db_session.add(SessionTrace(session_id=kept.id, trace={"topic": "session_trace 中的"}))
+    db_session.add_all([
+        DebateRecord(session_id=moved.id, topic=moved.topic, trace=_legacy_trace(1)),
+        DebateRecord(session_id=kept.id, topic=kept.topic, trace=_legacy_trace(1)),
+    ])
+    db_session.commit()
+
+    assert migrate_record_traces(db_session.get_bind()) == 2
+    assert migrate_record_traces(db_session.get_bind()) == 0
+
+    db_session.expire_all()
+    assert load_session_trace(db_session, moved.id)["topic"] == "旧数据"
+    assert load_session_trace(db_session, kept.id) == {"topic": "session_trace 中的"}
+    assert all(record.trace is None for record in db_session.query(DebateRecord))
+
+
+def test_deleting_session_removes_trace(client, db_session):
+    session = Session(session_type="debate", topic="删除", settings={"trace": _legacy_trace(1)})
+    db_session.add(session)
+    db_session.commit()
+    migrate_settings_traces(db_session.get_bind())
+
+    assert client.delete(f"/api/history/{session.id}").status_code == 200
+    assert db_session.query(SessionTrace).count() == 0
+
+
+def test_benchmark_session_lookup_independent_of_trace_size(db_session):
+    """60 个会话各带约 120KB trace：迁移前后加载全部 Session 的耗时"""
+    db_session.add_all(
+        Session(session_type="debate", topic=f"辩题 {index}", settings={"status": "completed", "trace": _legacy_trace(100)})
+        for index in range(60)
+    )
+    db_session.commit()
+
+    def load_all():
+        db_session.expire_all()
+        started = time.perf_counter()
+        sessions = db_session.query(Session).all()
+        assert len(sessions) == 60
+        return time.perf_counter() - started
+
+    legacy = min(load_all() for _ in range(3))
+    migrate_settings_traces(db_session.get_bind())
+    slim = min(load_all() for _ in range(3))
+    print(f"\n[trace store benchmark] load 60 sessions: settings trace={legacy * 1000:.2f}ms, trace store={slim * 1000:.2f}ms")
+    assert slim < legacy
@@ -0,0 +1,181 @@
+"""
+写后缓冲测试
+"""
+import asyncio
+import os
+import sys
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import pytest
+from sqlalchemy import create_engine, event
+from sqlalchemy.orm import sessionmaker
+
+from agents.jury_agent import JuryAgent
+from database import Base
+from models.debate_record import DebateRecord
+from models.session import Message, Session
+from services.db_writer import DBWriter
+from services.write_behind import WriteBehindBuffer
+
+
+@pytest.fixture
+def session_factory(tmp_path):
+    engine = create_engine(f"sqlite:///{tmp_path / 'buffer.db'}", connect_args={"check_same_thread": False})
+    Base.metadata.create_all(bind=engine)
+    yield sessionmaker(bind=engine, autoflush=False)
+    engine.dispose()
+
+
+@pytest.fixture
+def writer():
+    instance = DBWriter(name="test-write-behind")
+    yield instance
+    instance.close()
+
+
+def _count_messages(session_factory) -> int:
+    check = session_factory()
+    try:
+        return check.query(Message).count()
+    finally:
+        check.close()
+
+
+def _run_with_buffer(session_factory, writer, scenario, **buffer_kwargs):
+    db = session_factory()
+    session = Session(session_type="debate", topic="缓冲")
+    db.add(session)
+    db.commit()
+    db.refresh(session)
+
+    async def _run():
+        buffer = WriteBehindBuffer(db, session, writer=writer, **buffer_kwargs)
+        return await scenario(buffer, session.id)
+
+    try:
+        return asyncio.run(_run())
+    finally:
+        db.close()
+
+
+def test_flushes_when_batch_is_full(session_factory, writer):
+    async def scenario(buffer, session_id):
+        for index in range(5):
+            await buffer.add(Message(session_id=session_id, role="pro", content=str(index)))
+        flushed = _count_messages(session_factory)
+        await buffer.close()
+        return flushed, buffer.stats()
+
+    flushed, stats = _run_with_buffer(session_factory, writer, scenario, max_pending=3, flush_interval=60)
+    assert flushed == 3
+    assert stats == {"flushes": 2, "items_written": 5, "pending": 0}
+    assert _count_messages(session_factory) == 5
+
+
+def test_timer_flushes_within_one_window(session_factory, writer):
+    async def scenario(buffer, session_id):
+        await buffer.add(Message(session_id=session_id, role="pro", content="a"))
+        await buffer.update_settings({"status": "running", "round": 1})
+        before = _count_messages(session_factory)
+        await asyncio.sleep(0.2)
+        return before, _count_messages(session_factory), buffer.stats()
+
+    before, after, stats = _run_with_buffer(session_factory, writer, scenario, max_pending=100, flush_interval=0.05)
+    assert before == 0
+    assert after == 1
+    assert stats["flushes"] == 1 and stats["items_written"] == 2
+
+
+def test_checkpoint_and_abort(session_factory, writer):
+    async def scenario(buffer, session_id):
+        await buffer.add(Message(session_id=session_id, role="pro", content="round 1"))
+        await buffer.checkpoint()
+        await buffer.add(Message(session_id=session_id, role="pro", content="round 2"))
+        await buffer.abort()
+        await writer.rollback(buffer.db)
+        return buffer.stats()
+
+    stats = _run_with_buffer(session_factory, writer, scenario, max_pending=100, flush_interval=60)
+    assert stats["pending"] == 0
+    assert _count_messages(session_factory) == 1
+
+
+def test_timed_flush_task_is_held_and_failure_reported(session_factory, writer):
+    class FailingWriter:
+        async def commit(self, db, *refresh):
+            await asyncio.sleep(0.05)
+            raise RuntimeError("database is locked")
+
+    async def scenario(buffer, session_id):
+        await buffer.add(Message(session_id=session_id, role="pro", content="a"))
+        await asyncio.sleep(0.02)
+        task = buffer._flush_task
+        assert task is not None and not task.done()
+        with pytest.raises(RuntimeError, match="locked"):
+            await buffer.close()
+        return task
+
+    task = _run_with_buffer(session_factory, FailingWriter(), scenario, max_pending=100, flush_interval=0.01)
+    assert task.done() and not task.cancelled()
+
+
+def test_abort_skips_pending_timed_flush(session_factory, writer):
+    async def scenario(buffer, session_id):
+        await buffer.add(Message(session_id=session_id, role="pro", content="丢弃"))
+        async with buffer._lock:
+            # 定时提交已触发但还在等锁，此时调用方放弃本次写入
+            await asyncio.sleep(0.03)
+            assert buffer._flush_task is not None
+            abort = asyncio.create_task(buffer.abort())
+        await abort
+        await writer.rollback(buffer.db)
+        return buffer.stats()
+
+    stats = _run_with_buffer(session_factory, writer, scenario, max_pending=100, flush_interval=0.01)
+    assert stats["flushes"] == 0 and stats["pending"] == 0
+    assert _count_messages(session_factory) == 0
+
+
+def test_legacy_stream_commits_once_per_round(client, db_session):
+    commits = []
+
+    def on_commit(conn):
+        commits.append(1)
+
+    bind = db_session.get_bind()
+    event.listen(bind, "commit", on_commit)
+    try:
+        with client.stream(
+            "GET",
+            "/api/debate/stream",
+            params={"topic": "写后缓冲", "rounds": 3, "provider": "mock", "model": "mock"},
+        ) as response:
+            body = "".join(response.iter_text())
+    finally:
+        event.remove(bind, "commit", on_commit)
+
+    assert '"type": "complete"' in body
+    # 创建会话 + 每轮一次 + 完成状态（原先每条消息一次提交）
+    assert len(commits) == 1 + 3 + 1
+    assert db_session.query(Message).count() == 6
+
+
+def test_agent_stream_keeps_completed_rounds_on_failure(client, db_session, monkeypatch):
+    async def broken_verdict(self):
+        raise RuntimeError("jury crashed")
+
+    monkeypatch.setattr(JuryAgent, "final_verdict", broken_verdict)
+    with client.stream(
+        "GET",
+        "/api/debate/agent-stream",
+        params={"topic": "写后缓冲", "rounds": 2, "provider": "mock", "model": "mock"},
+    ) as response:
+        body = "".join(response.iter_text())
+
+    assert "jury crashed" in body
+    session = db_session.query(Session).filter(Session.session_type == "debate").one()
+    assert session.settings["status"] == "failed"
+    rounds = [message.meta_info["round"] for message in db_session.query(Message).all()]
+    # 第二轮开始前第一轮论点已落库，失败时不会随整场辩论一起丢失
+    assert rounds.count(1) == 2
+    assert db_session.query(DebateRecord).count() == 0
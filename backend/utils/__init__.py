@@ -8,7 +8,7 @@ from exceptions import APIKeyMissingException, ProviderNotSupportedException
 from .logger import get_logger, log_request, log_ai_call, log_debate_event
 from .prompting import resolve_prompt
 from .session_state import mark_session_status, merge_session_settings
-from .sse import sse_event, sse_response
+from .sse import ContentStreamEncoder, StreamMode, sse_event, sse_response
 
 
 def get_api_key(provider: str = "deepseek") -> str:
@@ -44,4 +44,6 @@ __all__ = [
     "merge_session_settings",
     "sse_event",
     "sse_response",
+    "ContentStreamEncoder",
+    "StreamMode",
 ]
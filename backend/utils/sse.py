@@ -1,7 +1,8 @@
 """SSE helpers for consistent event serialization and response headers."""
 
 import json
-from typing import Any, AsyncIterator, Iterator
+import zlib
+from typing import Any, AsyncIterator, Iterator, Literal
 
 from fastapi.responses import StreamingResponse
 
@@ -17,6 +18,55 @@ def sse_event(payload: dict[str, Any], ensure_ascii: bool = False) -> str:
     return f"data: {json.dumps(payload, ensure_ascii=ensure_ascii)}\n\n"
 
 
+STREAM_MODE_CUMULATIVE = "cumulative"
+STREAM_MODE_DELTA = "delta"
+StreamMode = Literal["cumulative", "delta"]
+
+
+class ContentStreamEncoder:
+    """Encode incremental text frames according to the negotiated stream mode.
+
+    Producers put three fields on partial frames: ``delta`` (new text),
+    ``offset`` (characters emitted before it) and ``content`` (the text so far).
+
+    - ``cumulative`` (legacy): send ``content`` and drop ``delta``/``offset``.
+      Each frame repeats the whole prefix, so bytes grow quadratically.
+    - ``delta``: send only ``delta``/``offset``. Every ``checksum_interval``
+      frames also carry ``checksum``, the CRC32 of the UTF-8 text so far, so
+      clients can detect gaps. Completion frames still carry full ``content``.
+
+    Frames without ``delta`` pass through unchanged. ``offset == 0`` starts a
+    new text, which resets the running checksum.
+    """
+
+    def __init__(self, mode: StreamMode = STREAM_MODE_CUMULATIVE, checksum_interval: int = 16):
+        self.mode = mode
+        self.checksum_interval = max(1, checksum_interval)
+        self._crc = 0
+        self._frames = 0
+
+    def event(self, payload: dict[str, Any], ensure_ascii: bool = False) -> str:
+        if "delta" in payload:
+            payload = self._encode_partial(payload)
+        return sse_event(payload, ensure_ascii=ensure_ascii)
+
+    def _encode_partial(self, payload: dict[str, Any]) -> dict[str, Any]:
+        if self.mode != STREAM_MODE_DELTA:
+            return {key: value for key, value in payload.items() if key not in ("delta", "offset")}
+
+        delta = payload["delta"] or ""
+        if not payload.get("offset"):
+            self._crc = 0
+            self._frames = 0
+        self._crc = zlib.crc32(delta.encode("utf-8"), self._crc)
+        self._frames += 1
+        frame = {key: value for key, value in payload.items() if key != "content"}
+        frame.setdefault("offset", 0)
+        if self._frames % self.checksum_interval == 0:
+            frame["checksum"] = f"{self._crc:08x}"
+        return frame
+
+
 def sse_response(generator: Iterator[str] | AsyncIterator[str]) -> StreamingResponse:
     """Create a StreamingResponse with unified SSE headers."""
     return StreamingResponse(
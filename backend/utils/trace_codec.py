@@ -0,0 +1,97 @@
+"""Compact, deduplicated storage encoding for debate traces.
+
+A trace repeats every argument several times (event payloads, ``turns[].result``,
+``message_history``, ``final_state.arguments``). ``encode_trace`` stores each long
+string once in a string table, replaces the other occurrences with references,
+serializes without ASCII escaping and compresses the result with zlib.
+
+Wire format: ``MAGIC`` + zlib(json({"s": [strings...], "d": data})).
+Inside ``d`` a string starting with ``REF`` is either a reference (``REF`` + index)
+or an escaped literal (``REF`` + ``REF`` + rest), so any input round-trips exactly.
+"""
+
+import json
+import zlib
+from typing import Any, Dict, List, Optional
+
+from sqlalchemy.types import LargeBinary, TypeDecorator
+
+MAGIC = b"AGT1"
+REF = "\x00"
+MIN_INTERN_LENGTH = 32
+COMPRESSION_LEVEL = 6
+
+
+def _pack(value: Any, table: List[str], index: Dict[str, int]) -> Any:
+    if isinstance(value, str):
+        if len(value) >= MIN_INTERN_LENGTH:
+            position = index.get(value)
+            if position is None:
+                position = index[value] = len(table)
+                table.append(value)
+            return f"{REF}{position}"
+        if value.startswith(REF):
+            return REF + value
+        return value
+    if isinstance(value, dict):
+        return {key: _pack(item, table, index) for key, item in value.items()}
+    if isinstance(value, (list, tuple)):
+        return [_pack(item, table, index) for item in value]
+    return value
+
+
+def _unpack(value: Any, table: List[str]) -> Any:
+    if isinstance(value, str):
+        if not value.startswith(REF):
+            return value
+        if value.startswith(REF, 1):
+            return value[1:]
+        return table[int(value[1:])]
+    if isinstance(value, dict):
+        return {key: _unpack(item, table) for key, item in value.items()}
+    if isinstance(value, list):
+        return [_unpack(item, table) for item in value]
+    return value
+
+
+def encode_trace(value: Any) -> bytes:
+    """Encode a JSON-compatible value into the compact compressed format."""
+    table: List[str] = []
+    data = _pack(value, table, {})
+    payload = json.dumps({"s": table, "d": data}, ensure_ascii=False, separators=(",", ":"))
+    return MAGIC + zlib.compress(payload.encode("utf-8"), COMPRESSION_LEVEL)
+
+
+def decode_trace(blob: Any) -> Any:
+    """Decode ``encode_trace`` output; plain JSON text from older rows is accepted as-is."""
+    if blob is None:
+        return None
+    if isinstance(blob, memoryview):
+        blob = blob.tobytes()
+    if isinstance(blob, (bytes, bytearray)):
+        if not blob.startswith(MAGIC):
+            return json.loads(blob.decode("utf-8"))
+        envelope = json.loads(zlib.decompress(blob[len(MAGIC):]).decode("utf-8"))
+        return _unpack(envelope["d"], envelope["s"])
+    if isinstance(blob, str):
+        return json.loads(blob)
+    return blob
+
+
+class CompressedJSON(TypeDecorator):
+    """JSON column stored with ``encode_trace``.
+
+    Reads stay compatible with rows written by the plain ``JSON`` type, so a
+    column can switch to this type without rewriting existing data.
+    """
+
+    impl = LargeBinary
+    cache_ok = True
+
+    def process_bind_param(self, value: Any, dialect) -> Optional[bytes]:
+        if value is None:
+            return None
+        return encode_trace(value)
+
+    def process_result_value(self, value: Any, dialect) -> Any:
+        return decode_trace(value)
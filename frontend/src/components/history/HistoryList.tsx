@@ -173,6 +173,11 @@ export function HistoryList({ onViewDetail }: HistoryListProps) {
                                                     {item.topic || '未命名会话'}
                                                 </h3>
                                             </div>
+                                            {item.snippet && (
+                                                <p className="text-sm text-gray-500 line-clamp-2">
+                                                    {item.snippet}
+                                                </p>
+                                            )}
                                             <div className="flex items-center gap-4 mt-2 text-xs text-gray-400">
                                                 <span className="flex items-center gap-1">
                                                     <Calendar className="h-3 w-3" />
@@ -310,7 +310,7 @@ export const qaAPI = {
 // ====== 历史记录 API ======
 
 export const historyAPI = {
-    getHistory: (type: SessionType | 'all' = 'all', limit = 100, offset = 0, query = '') => {
+    getHistory: (type: SessionType | 'all' = 'all', limit = 100, offset = 0, query = '', cursor: string | null = null) => {
         const params = new URLSearchParams({
             type,
             limit: String(limit),
@@ -319,7 +319,19 @@ export const historyAPI = {
         if (query.trim()) {
             params.set('q', query.trim())
         }
-        return api.get<{ history: HistoryItem[]; total: number; limit: number; offset: number; has_more: boolean }>(
+        if (cursor) {
+            // 游标翻页时总数沿用首页结果，省去 count 查询
+            params.set('cursor', cursor)
+            params.set('include_total', 'false')
+        }
+        return api.get<{
+            history: HistoryItem[]
+            total: number | null
+            limit: number
+            offset: number
+            has_more: boolean
+            next_cursor: string | null
+        }>(
             `/api/history?${params.toString()}`
         )
     },
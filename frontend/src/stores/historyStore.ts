@@ -30,6 +30,7 @@ interface HistoryState {
     hasMore: boolean
     limit: number
     offset: number
+    nextCursor: string | null
 
     fetchHistory: () => Promise<void>
     loadMore: () => Promise<void>
@@ -53,18 +54,20 @@ export const useHistoryStore = create<HistoryState>((set, get) => ({
     hasMore: false,
     limit: HISTORY_PAGE_SIZE,
     offset: 0,
+    nextCursor: null,
 
     fetchHistory: async () => {
         const { filter, limit, searchQuery } = get()
-        set({ isLoading: true, error: null, offset: 0, hasMore: false })
+        set({ isLoading: true, error: null, offset: 0, hasMore: false, nextCursor: null })
         try {
             const response = await historyAPI.getHistory(filter, limit, 0, searchQuery)
             const history = response.data.history || []
             set({
                 items: history,
-                total: response.data.total,
+                total: response.data.total ?? history.length,
                 hasMore: response.data.has_more,
                 offset: history.length,
+                nextCursor: response.data.next_cursor,
                 isLoading: false,
             })
         } catch (error) {
@@ -76,18 +79,19 @@ export const useHistoryStore = create<HistoryState>((set, get) => ({
     },
 
     loadMore: async () => {
-        const { filter, limit, offset, hasMore, isLoadingMore, searchQuery } = get()
+        const { filter, limit, offset, nextCursor, hasMore, isLoadingMore, searchQuery } = get()
         if (!hasMore || isLoadingMore) return
 
         set({ isLoadingMore: true, error: null })
         try {
-            const response = await historyAPI.getHistory(filter, limit, offset, searchQuery)
+            const response = await historyAPI.getHistory(filter, limit, offset, searchQuery, nextCursor)
             const history = response.data.history || []
             set((state) => ({
                 items: [...state.items, ...history],
-                total: response.data.total,
+                total: response.data.total ?? state.total,
                 hasMore: response.data.has_more,
                 offset: offset + history.length,
+                nextCursor: response.data.next_cursor,
                 isLoadingMore: false,
             }))
         } catch (error) {
@@ -76,6 +76,7 @@ export interface HistoryItem {
     start_time: string
     message_count: number
     type: SessionType
+    snippet?: string | null // 检索时的命中摘要
 }
 
 // ====== API响应类型 ======